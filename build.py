@@ -26,7 +26,9 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import argparse
+import hashlib
 import importlib.util
+import json
 import multiprocessing
 import os
 import os.path
@@ -89,8 +91,90 @@ OVERRIDE_CORE_CMAKE_FLAGS = {}
 EXTRA_BACKEND_CMAKE_FLAGS = {}
 OVERRIDE_BACKEND_CMAKE_FLAGS = {}
 
+# Build cache directory as seen by the build scripts, None if
+# --build-cache-dir is not specified. Map from (repo url, tag) to the
+# resolved commit SHA.
+SCRIPT_BUILD_CACHE_DIR = None
+RESOLVED_REPO_SHAS = {}
+
 THIS_SCRIPT_DIR = os.path.dirname(os.path.abspath(getsourcefile(lambda: 0)))
 
+# Bash function used by the build script to run the component build
+# scripts in parallel when --parallel-components is specified. Each job
+# runs in its own process group with its output written to
+# <log-dir>/<job>.log. When a job fails no further jobs are started, the
+# running jobs are stopped and the failure is reported with the tail of
+# the job log.
+RUN_JOBS_FUNCTION = r"""
+run_jobs() {
+  local max_jobs=$1 log_dir=$2
+  shift 2
+  mkdir -p "${log_dir}"
+
+  local -a pending=("$@") running=() still_running=() failed=() cancelled=()
+  local -A pids=()
+  local job name status
+  while [[ ${#pending[@]} -gt 0 || ${#running[@]} -gt 0 ]]; do
+    while [[ ${#pending[@]} -gt 0 && ${#running[@]} -lt ${max_jobs} && ${#failed[@]} -eq 0 ]]; do
+      job=${pending[0]}
+      pending=("${pending[@]:1}")
+      name=${job##*/}
+      rm -f "${log_dir}/${name}.status"
+      echo "[start] ${name} (log ${log_dir}/${name}.log)"
+      setsid bash -c "\"${job}\" > \"${log_dir}/${name}.log\" 2>&1; echo \$? > \"${log_dir}/${name}.status.tmp\"; mv \"${log_dir}/${name}.status.tmp\" \"${log_dir}/${name}.status\"" &
+      pids[${name}]=$!
+      running+=("${job}")
+    done
+
+    sleep 1
+    still_running=()
+    for job in "${running[@]}"; do
+      name=${job##*/}
+      if [[ -f "${log_dir}/${name}.status" ]]; then
+        status=$(cat "${log_dir}/${name}.status")
+        if [[ "${status}" == "0" ]]; then
+          echo "[done] ${name}"
+        else
+          echo "[failed] ${name} (exit status ${status})"
+          failed+=("${name}")
+        fi
+      else
+        still_running+=("${job}")
+      fi
+    done
+    running=("${still_running[@]}")
+
+    # Fail fast, stop all jobs that are still running
+    if [[ ${#failed[@]} -gt 0 ]]; then
+      for job in "${running[@]}"; do
+        name=${job##*/}
+        kill -TERM -- -${pids[${name}]} 2> /dev/null || true
+        cancelled+=("${name}")
+      done
+      for job in "${pending[@]}"; do
+        cancelled+=("${job##*/}")
+      done
+      wait || true
+      pending=()
+      running=()
+    fi
+  done
+
+  if [[ ${#failed[@]} -gt 0 ]]; then
+    echo
+    echo "error: build failed"
+    for name in "${failed[@]}"; do
+      echo "  failed: ${name}, last lines of ${log_dir}/${name}.log:"
+      tail -n 50 "${log_dir}/${name}.log" | sed 's/^/    /'
+    done
+    for name in "${cancelled[@]}"; do
+      echo "  cancelled: ${name}"
+    done
+    return 1
+  fi
+}
+"""
+
 
 def log(msg, force=False):
     if force or not FLAGS.quiet:
@@ -152,10 +236,14 @@ def container_versions(version, container_version, upstream_container_version):
 class BuildScript:
     """Utility class for writing build scripts"""
 
-    def __init__(self, filepath, desc=None, verbose=False):
+    def __init__(
+        self, filepath, desc=None, verbose=False, build_parallel=None, timeline=None
+    ):
         self._filepath = filepath
         self._file = open(self._filepath, "w")
         self._verbose = verbose
+        self._build_parallel = build_parallel
+        self._timeline = timeline
         self.header(desc)
 
     def __enter__(self):
@@ -300,8 +388,11 @@ class BuildScript:
 
     def makeinstall(self, target="install"):
         verbose_flag = "-v" if self._verbose else ""
+        build_parallel = self._build_parallel
+        if build_parallel is None:
+            build_parallel = FLAGS.build_parallel
         self.cmd(
-            f"cmake --build . --config {FLAGS.build_type} -j{FLAGS.build_parallel} {verbose_flag} -t {target}"
+            f"cmake --build . --config {FLAGS.build_type} -j{build_parallel} {verbose_flag} -t {target}"
         )
 
     def gitclone(self, repo, tag, subdir, org):
@@ -336,6 +427,260 @@ class BuildScript:
             )
             self.cmd("}" if target_platform() == "windows" else "fi")
 
+    def timeline_reset(self):
+        if self._timeline is not None:
+            if target_platform() == "windows":
+                self.cmd(f"Set-Content -Path {self._timeline} -Value $null")
+            else:
+                self.cmd(f"rm -f {self._timeline}")
+
+    def timeline_begin(self, name):
+        self._timeline_event("B", name)
+
+    def timeline_end(self, name):
+        self._timeline_event("E", name)
+
+    def _timeline_event(self, event, name):
+        # Append "<event> <name> <seconds since epoch>" to the timeline,
+        # parsed by build_timing_report()
+        if self._timeline is None:
+            return
+        if target_platform() == "windows":
+            self.cmd(
+                f'Add-Content -Path {self._timeline} -Value "{event} {name} $([DateTimeOffset]::UtcNow.ToUnixTimeMilliseconds() / 1000)"'
+            )
+        else:
+            self.cmd(f'echo "{event} {name} $(date +%s.%N)" >> {self._timeline}')
+
+    def run_jobs(self, jobs_dir, jobs, max_jobs, log_dir):
+        """Run the job scripts 'jobs' in 'jobs_dir', which is relative to
+        the directory of this script, with at most 'max_jobs' at a time"""
+        if target_platform() == "windows":
+            fail("unsupported operation: run_jobs")
+        job_paths = " ".join(
+            f'"${{TRITON_BUILD_SCRIPT_DIR}}/{jobs_dir}/{j}"' for j in jobs
+        )
+        self.cmd(f"run_jobs {max_jobs} {log_dir} {job_paths}")
+
+
+def component_job_script(jobs_dir, name, desc, build_parallel, timeline):
+    """Return a BuildScript for a job that is run by run_jobs"""
+    return BuildScript(
+        os.path.join(FLAGS.build_dir, jobs_dir, name),
+        verbose=FLAGS.verbose,
+        desc=desc,
+        build_parallel=build_parallel,
+        timeline=timeline,
+    )
+
+
+def build_timing_report(timeline_paths, report_dir):
+    """Read the timelines written by the build scripts, write them to
+    'report_dir' as JSON and as a Chrome trace (chrome://tracing or
+    https://ui.perfetto.dev), and log the sections on the critical path of
+    the build. A timeline is a list of sections, each with a name and
+    begin/end timestamps. Sections that did not end, for example because
+    the build failed, are reported as not completed."""
+    timelines = []
+    for path in timeline_paths:
+        if not os.path.exists(path):
+            continue
+        sections = {}
+        with open(path, "r") as tfile:
+            for line in tfile:
+                parts = line.split()
+                if len(parts) != 3 or parts[0] not in ("B", "E"):
+                    continue
+                event, name, timestamp = parts
+                section = sections.setdefault(name, {"name": name})
+                section["begin" if event == "B" else "end"] = float(timestamp)
+        timelines.append(
+            (
+                os.path.basename(path),
+                sorted(
+                    [s for s in sections.values() if "begin" in s],
+                    key=lambda s: s["begin"],
+                ),
+            )
+        )
+    if not timelines:
+        return
+
+    # The critical path is found from the section that ended last by
+    # repeatedly stepping to the section that ended last before the
+    # current one began, as that section held up the current one.
+    build_sections = timelines[-1][1]
+    completed = [s for s in build_sections if "end" in s]
+    critical_path = []
+    if completed:
+        current = max(completed, key=lambda s: s["end"])
+        while current is not None:
+            critical_path.insert(0, current)
+            preceding = [s for s in completed if s["end"] <= current["begin"]]
+            current = max(preceding, key=lambda s: s["end"]) if preceding else None
+
+    report = {
+        "version": FLAGS.version,
+        "timelines": [],
+        "critical_path": [s["name"] for s in critical_path],
+    }
+    trace_events = []
+    for pid, (timeline_name, sections) in enumerate(timelines):
+        # Assign each section to the first lane that is free when it
+        # begins so that concurrent sections are shown side by side
+        lane_ends = []
+        timeline = {"name": timeline_name, "sections": []}
+        for section in sections:
+            end = section.get("end")
+            timeline["sections"].append(
+                {
+                    "name": section["name"],
+                    "begin": section["begin"],
+                    "end": end,
+                    "duration": None if end is None else end - section["begin"],
+                }
+            )
+            if end is None:
+                continue
+            lane = next(
+                (i for i, e in enumerate(lane_ends) if e <= section["begin"]),
+                len(lane_ends),
+            )
+            if lane == len(lane_ends):
+                lane_ends.append(end)
+            lane_ends[lane] = end
+            trace_events.append(
+                {
+                    "name": section["name"],
+                    "cat": timeline_name,
+                    "ph": "X",
+                    "ts": int(section["begin"] * 1e6),
+                    "dur": int((end - section["begin"]) * 1e6),
+                    "pid": pid,
+                    "tid": lane,
+                }
+            )
+        trace_events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": timeline_name},
+            }
+        )
+        report["timelines"].append(timeline)
+
+    json_path = os.path.join(report_dir, "build_timeline.json")
+    with open(json_path, "w") as jfile:
+        json.dump(report, jfile, indent=2)
+    trace_path = os.path.join(report_dir, "build_timeline.trace.json")
+    with open(trace_path, "w") as tfile:
+        json.dump({"traceEvents": trace_events}, tfile)
+
+    log(f"build timeline written to {json_path} and {trace_path}", force=True)
+    for timeline_name, sections in timelines:
+        log(f"{timeline_name}:", force=True)
+        for section in sections:
+            if "end" in section:
+                log(
+                    "  {:<32} {:>10.1f}s".format(
+                        section["name"], section["end"] - section["begin"]
+                    ),
+                    force=True,
+                )
+            else:
+                log(
+                    "  {:<32} {:>11}".format(section["name"], "not completed"),
+                    force=True,
+                )
+    if critical_path:
+        total = critical_path[-1]["end"] - critical_path[0]["begin"]
+        log(f"critical path ({total:.1f}s):", force=True)
+        for section in critical_path:
+            duration = section["end"] - section["begin"]
+            log(
+                "  {:<32} {:>10.1f}s {:>5.1f}%".format(
+                    section["name"], duration, 100 * duration / max(total, 1e-9)
+                ),
+                force=True,
+            )
+
+
+def resolve_repo_sha(org, repo, tag):
+    """Return the commit SHA that 'tag' of the repo refers to, or None if
+    it cannot be resolved"""
+    url = f"{org}/{repo}.git"
+    if (url, tag) not in RESOLVED_REPO_SHAS:
+        sha = None
+        try:
+            p = subprocess.run(
+                ["git", "ls-remote", url, tag],
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            lines = p.stdout.split()
+            if p.returncode == 0 and lines:
+                sha = lines[0]
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        log_verbose(f"resolved {url} {tag} to {sha}")
+        RESOLVED_REPO_SHAS[(url, tag)] = sha
+    return RESOLVED_REPO_SHAS[(url, tag)]
+
+
+def component_cache_key(org, repo, tag, cmake_args, images, components):
+    """Return the key of a component build in the build cache, or None if
+    the component must not be cached. The key covers everything that the
+    build depends on: the resolved commit of the component repo and of the
+    common, core and backend repos it fetches, the cmake args, the images
+    and the target platform."""
+    if SCRIPT_BUILD_CACHE_DIR is None:
+        return None
+
+    parts = [f"{org}/{repo}.git", resolve_repo_sha(org, repo, tag)]
+    for c in ("common", "core", "backend"):
+        parts.append(resolve_repo_sha(FLAGS.github_organization, c, components[c]))
+    if None in parts:
+        log(f"unable to resolve commit of '{repo}', skipping build cache")
+        return None
+
+    parts += cmake_args
+    parts += [f"{k}={images[k]}" for k in sorted(images)]
+    parts += [target_platform(), target_machine(), FLAGS.build_type]
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_restore_begin(cmake_script, name, key, repo_install_dir):
+    """Restore the install directory of a component from the build cache
+    if it holds 'key', otherwise build the component with the commands
+    that follow until cache_save_end()"""
+    if key is None:
+        return
+    cache_entry_dir = os.path.join(SCRIPT_BUILD_CACHE_DIR, key)
+    cmake_script.cmd(f"if [[ -e {cache_entry_dir} ]]; then")
+    cmake_script.cmd(f'  echo "{name}: using build cache {cache_entry_dir}"')
+    cmake_script.rmdir(repo_install_dir)
+    cmake_script.cpdir(cache_entry_dir, repo_install_dir)
+    cmake_script.cmd("else")
+
+
+def cache_save_end(cmake_script, name, key, repo_install_dir):
+    """Save the install directory of a component built after
+    cache_restore_begin() in the build cache"""
+    if key is None:
+        return
+    cache_entry_dir = os.path.join(SCRIPT_BUILD_CACHE_DIR, key)
+    cmake_script.mkdir(SCRIPT_BUILD_CACHE_DIR)
+    cmake_script.rmdir(f"{cache_entry_dir}.tmp")
+    cmake_script.cpdir(repo_install_dir, f"{cache_entry_dir}.tmp")
+    cmake_script.cmd(f"mv {cache_entry_dir}.tmp {cache_entry_dir}")
+    cmake_script.cmd("fi")
+
 
 def cmake_core_arg(name, type, value):
     # Return cmake -D setting to set name=value for core build. Use
@@ -950,6 +1295,8 @@ RUN yum install -y \\
             unzip \\
             wget \\
             zlib-devel \\
+            libzstd-devel \\
+            lz4-devel \\
             libarchive-devel \\
             libxml2-devel \\
             numactl-devel \\
@@ -1067,6 +1414,8 @@ RUN apt-get update \\
             unzip \\
             wget \\
             zlib1g-dev \\
+            libzstd-dev \\
+            liblz4-dev \\
             libarchive-dev \\
             libxml2-dev \\
             libnuma-dev \\
@@ -1316,7 +1665,9 @@ RUN yum install -y \\
         gperftools-devel \\
         patchelf \\
         wget \\
-        numactl-devel
+        numactl-devel \\
+        libzstd \\
+        lz4-libs
 """
     else:
         df += """
@@ -1336,8 +1687,10 @@ RUN apt-get update \\
               libcurl4-openssl-dev \\
               libgoogle-perftools-dev \\
               libjemalloc-dev \\
+              liblz4-1 \\
               libnuma-dev \\
               libre2-9 \\
+              libzstd1 \\
               software-properties-common \\
               wget \\
               {backend_dependencies} \\
@@ -1631,7 +1984,13 @@ def create_docker_build_script(script_name, container_install_dir, container_ci_
         os.path.join(FLAGS.build_dir, script_name),
         verbose=FLAGS.verbose,
         desc=("Docker-based build script for Triton Inference Server"),
+        timeline=os.path.join(FLAGS.build_dir, "docker_build_timeline.log"),
     ) as docker_script:
+        docker_script.timeline_reset()
+        # The cmake_build timeline is copied out of the build container
+        # after a successful build, remove the one of any earlier build.
+        docker_script.rmdir(os.path.join(FLAGS.build_dir, "cmake_build_timeline.log"))
+
         #
         # Build base image... tritonserver_buildbase
         #
@@ -1672,7 +2031,9 @@ def create_docker_build_script(script_name, container_install_dir, container_ci_
         baseargs += ["."]
 
         docker_script.cwd(THIS_SCRIPT_DIR)
+        docker_script.timeline_begin("buildbase_image")
         docker_script.cmd(baseargs, check_exitcode=True)
+        docker_script.timeline_end("buildbase_image")
 
         #
         # Build...
@@ -1722,7 +2083,38 @@ def create_docker_build_script(script_name, container_install_dir, container_ci_
                 'if [ "$(docker ps -a | grep tritonserver_builder)" ]; then  docker rm -f tritonserver_builder; fi\n'
             )
 
-        docker_script.cmd(runargs, check_exitcode=True)
+        docker_script.timeline_begin("cmake_build")
+        if FLAGS.build_cache_dir is None:
+            docker_script.cmd(runargs, check_exitcode=True)
+        else:
+            # Copy the build cache into the container before running the
+            # build, and the updated cache back out after the build.
+            runargs[1] = "create"
+            docker_script.cmd(runargs, check_exitcode=True)
+            docker_script.mkdir(FLAGS.build_cache_dir)
+            docker_script.cmd(
+                [
+                    "docker",
+                    "cp",
+                    os.path.join(FLAGS.build_cache_dir, "."),
+                    f"tritonserver_builder:{SCRIPT_BUILD_CACHE_DIR}",
+                ],
+                check_exitcode=True,
+            )
+            startargs = ["docker", "start", "-a"]
+            if not FLAGS.no_container_interactive:
+                startargs += ["-i"]
+            docker_script.cmd(startargs + ["tritonserver_builder"], check_exitcode=True)
+            docker_script.cmd(
+                [
+                    "docker",
+                    "cp",
+                    f"tritonserver_builder:{os.path.join(SCRIPT_BUILD_CACHE_DIR, '.')}",
+                    FLAGS.build_cache_dir,
+                ],
+                check_exitcode=True,
+            )
+        docker_script.timeline_end("cmake_build")
 
         docker_script.cmd(
             [
@@ -1742,6 +2134,15 @@ def create_docker_build_script(script_name, container_install_dir, container_ci_
             ],
             check_exitcode=True,
         )
+        docker_script.cmd(
+            [
+                "docker",
+                "cp",
+                "tritonserver_builder:/tmp/tritonbuild/cmake_build_timeline.log",
+                FLAGS.build_dir,
+            ],
+            check_exitcode=True,
+        )
 
         #
         # Final image... tritonserver
@@ -1762,7 +2163,9 @@ def create_docker_build_script(script_name, container_install_dir, container_ci_
         ]
 
         docker_script.cwd(THIS_SCRIPT_DIR)
+        docker_script.timeline_begin("tritonserver_image")
         docker_script.cmd(finalargs, check_exitcode=True)
+        docker_script.timeline_end("tritonserver_image")
 
         #
         # CI base image... tritonserver_cibase
@@ -1783,7 +2186,9 @@ def create_docker_build_script(script_name, container_install_dir, container_ci_
         ]
 
         docker_script.cwd(THIS_SCRIPT_DIR)
+        docker_script.timeline_begin("cibase_image")
         docker_script.cmd(cibaseargs, check_exitcode=True)
+        docker_script.timeline_end("cibase_image")
 
 
 def core_build(
@@ -1928,20 +2333,28 @@ def backend_build(
     cmake_script.cwd(build_dir)
     cmake_script.gitclone(backend_repo(be), tag, be, github_organization)
 
+    cmake_args = backend_cmake_args(
+        images, components, be, repo_install_dir, library_paths
+    )
+    cache_key = component_cache_key(
+        github_organization, backend_repo(be), tag, cmake_args, images, components
+    )
+    cache_restore_begin(cmake_script, be, cache_key, repo_install_dir)
+
     if be == "tensorrtllm":
         tensorrtllm_prebuild(cmake_script)
 
     cmake_script.mkdir(repo_build_dir)
     cmake_script.cwd(repo_build_dir)
-    cmake_script.cmake(
-        backend_cmake_args(images, components, be, repo_install_dir, library_paths)
-    )
+    cmake_script.cmake(cmake_args)
     cmake_script.makeinstall()
 
     if be == "tensorrtllm":
         tensorrtllm_be_dir = os.path.join(build_dir, be)
         tensorrtllm_postbuild(cmake_script, repo_install_dir, tensorrtllm_be_dir)
 
+    cache_save_end(cmake_script, be, cache_key, repo_install_dir)
+
     cmake_script.mkdir(os.path.join(install_dir, "backends"))
     cmake_script.rmdir(os.path.join(install_dir, "backends", be))
 
@@ -2009,11 +2422,24 @@ def repo_agent_build(
         repoagent_repo(ra), repoagents[ra], ra, FLAGS.github_organization
     )
 
+    cmake_args = repoagent_cmake_args(images, components, ra, repo_install_dir)
+    cache_key = component_cache_key(
+        FLAGS.github_organization,
+        repoagent_repo(ra),
+        repoagents[ra],
+        cmake_args,
+        images,
+        components,
+    )
+    cache_restore_begin(cmake_script, ra, cache_key, repo_install_dir)
+
     cmake_script.mkdir(repo_build_dir)
     cmake_script.cwd(repo_build_dir)
-    cmake_script.cmake(repoagent_cmake_args(images, components, ra, repo_install_dir))
+    cmake_script.cmake(cmake_args)
     cmake_script.makeinstall()
 
+    cache_save_end(cmake_script, ra, cache_key, repo_install_dir)
+
     cmake_script.mkdir(os.path.join(install_dir, "repoagents"))
     cmake_script.rmdir(os.path.join(install_dir, "repoagents", ra))
     cmake_script.cpdir(
@@ -2040,11 +2466,24 @@ def cache_build(cache, cmake_script, build_dir, install_dir, cache_repo, caches)
         cache_repo(cache), caches[cache], cache, FLAGS.github_organization
     )
 
+    cmake_args = cache_cmake_args(images, components, cache, repo_install_dir)
+    cache_key = component_cache_key(
+        FLAGS.github_organization,
+        cache_repo(cache),
+        caches[cache],
+        cmake_args,
+        images,
+        components,
+    )
+    cache_restore_begin(cmake_script, cache, cache_key, repo_install_dir)
+
     cmake_script.mkdir(repo_build_dir)
     cmake_script.cwd(repo_build_dir)
-    cmake_script.cmake(cache_cmake_args(images, components, cache, repo_install_dir))
+    cmake_script.cmake(cmake_args)
     cmake_script.makeinstall()
 
+    cache_save_end(cmake_script, cache, cache_key, repo_install_dir)
+
     cmake_script.mkdir(os.path.join(install_dir, "caches"))
     cmake_script.rmdir(os.path.join(install_dir, "caches", cache))
     cmake_script.cpdir(
@@ -2369,6 +2808,13 @@ if __name__ == "__main__":
         default=None,
         help="Build parallelism. Defaults to 2 * number-of-cores.",
     )
+    parser.add_argument(
+        "--parallel-components",
+        type=int,
+        required=False,
+        default=None,
+        help="Build up to this many backends, repo agents and caches concurrently after the core is built. The build parallelism is split between the concurrent builds and the output of each build is written to <build-dir>/logs/<component>.log. Not supported on Windows.",
+    )
 
     parser.add_argument(
         "--github-organization",
@@ -2518,6 +2964,13 @@ if __name__ == "__main__":
         default=False,
         help="Do not create fresh clones of repos that have already been cloned.",
     )
+    parser.add_argument(
+        "--build-cache-dir",
+        type=str,
+        required=False,
+        default=None,
+        help="Directory of the build cache. When specified, the install tree of each backend, repo agent and cache is saved in the build cache, keyed on the resolved commit of its repo, its cmake arguments, the images and the target platform, and a later build with the same key restores it instead of building the component. Not supported on Windows.",
+    )
     parser.add_argument(
         "--extra-core-cmake-arg",
         action="append",
@@ -2604,6 +3057,20 @@ if __name__ == "__main__":
 
     if FLAGS.build_parallel is None:
         FLAGS.build_parallel = multiprocessing.cpu_count() * 2
+    if FLAGS.build_cache_dir is not None:
+        fail_if(
+            target_platform() == "windows",
+            "--build-cache-dir is not supported on windows",
+        )
+        FLAGS.build_cache_dir = os.path.abspath(FLAGS.build_cache_dir)
+    if FLAGS.parallel_components is not None:
+        fail_if(
+            FLAGS.parallel_components < 1, "--parallel-components must be at least 1"
+        )
+        fail_if(
+            target_platform() == "windows",
+            "--parallel-components is not supported on windows",
+        )
 
     log("Building Triton Inference Server")
     log("platform {}".format(target_platform()))
@@ -2815,6 +3282,16 @@ if __name__ == "__main__":
         else:
             script_repo_dir = script_cmake_dir = "/workspace"
 
+    # The build cache is copied into and out of the build container, so
+    # within the container it is a directory in FLAGS.tmp_dir.
+    if FLAGS.build_cache_dir is not None:
+        SCRIPT_BUILD_CACHE_DIR = FLAGS.build_cache_dir
+        if not FLAGS.no_container_build:
+            SCRIPT_BUILD_CACHE_DIR = os.path.normpath(
+                os.path.join(FLAGS.tmp_dir, "tritonbuildcache").replace("\\", "/")
+            )
+        log("build cache dir {}".format(FLAGS.build_cache_dir))
+
     script_name = "cmake_build"
     if target_platform() == "windows":
         script_name += ".ps1"
@@ -2825,23 +3302,38 @@ if __name__ == "__main__":
         os.path.join(FLAGS.build_dir, script_name),
         verbose=FLAGS.verbose,
         desc=("Build script for Triton Inference Server"),
+        timeline=os.path.join(script_build_dir, "cmake_build_timeline.log"),
     ) as cmake_script:
+        cmake_script.timeline_reset()
+
         # Run the container pre-build command if the cmake build is
         # being done within the build container.
         if not FLAGS.no_container_build and FLAGS.container_prebuild_command:
             cmake_script.cmd(FLAGS.container_prebuild_command, check_exitcode=True)
             cmake_script.blankln()
 
+        # Each component build writes its section of the build script
+        # with the function in 'component_builds'. The core must be built
+        # first, the backends, repo agents and caches are independent of
+        # each other.
+        core_builds = []
+        component_builds = []
+
         # Commands to build the core shared library and the server executable.
         if not FLAGS.no_core_build:
-            core_build(
-                cmake_script,
-                script_repo_dir,
-                script_cmake_dir,
-                script_build_dir,
-                script_install_dir,
-                components,
-                backends,
+            core_builds.append(
+                (
+                    "core",
+                    lambda script: core_build(
+                        script,
+                        script_repo_dir,
+                        script_cmake_dir,
+                        script_build_dir,
+                        script_install_dir,
+                        components,
+                        backends,
+                    ),
+                )
             )
 
         # Commands to build each backend...
@@ -2857,53 +3349,128 @@ if __name__ == "__main__":
                 github_organization = FLAGS.github_organization
 
             if be == "vllm":
-                backend_clone(
-                    be,
-                    cmake_script,
-                    backends[be],
-                    script_build_dir,
-                    script_install_dir,
-                    github_organization,
+                component_builds.append(
+                    (
+                        f"backend_{be}",
+                        lambda script, be=be, org=github_organization: backend_clone(
+                            be,
+                            script,
+                            backends[be],
+                            script_build_dir,
+                            script_install_dir,
+                            org,
+                        ),
+                    )
                 )
             else:
-                backend_build(
-                    be,
-                    cmake_script,
-                    backends[be],
-                    script_build_dir,
-                    script_install_dir,
-                    github_organization,
-                    images,
-                    components,
-                    library_paths,
+                component_builds.append(
+                    (
+                        f"backend_{be}",
+                        lambda script, be=be, org=github_organization: backend_build(
+                            be,
+                            script,
+                            backends[be],
+                            script_build_dir,
+                            script_install_dir,
+                            org,
+                            images,
+                            components,
+                            library_paths,
+                        ),
+                    )
                 )
 
         # Commands to build each repo agent...
         for ra in repoagents:
-            repo_agent_build(
-                ra,
-                cmake_script,
-                script_build_dir,
-                script_install_dir,
-                repoagent_repo,
-                repoagents,
+            component_builds.append(
+                (
+                    f"repoagent_{ra}",
+                    lambda script, ra=ra: repo_agent_build(
+                        ra,
+                        script,
+                        script_build_dir,
+                        script_install_dir,
+                        repoagent_repo,
+                        repoagents,
+                    ),
+                )
             )
 
         # Commands to build each cache...
         for cache in caches:
-            cache_build(
-                cache,
-                cmake_script,
-                script_build_dir,
-                script_install_dir,
-                cache_repo,
-                caches,
+            component_builds.append(
+                (
+                    f"cache_{cache}",
+                    lambda script, cache=cache: cache_build(
+                        cache,
+                        script,
+                        script_build_dir,
+                        script_install_dir,
+                        cache_repo,
+                        caches,
+                    ),
+                )
+            )
+
+        if FLAGS.parallel_components is None:
+            for name, build in core_builds + component_builds:
+                cmake_script.timeline_begin(name)
+                build(cmake_script)
+                cmake_script.timeline_end(name)
+        else:
+            # Write each component build to its own script and run them
+            # from the build script in dependency order: the core, then
+            # all other components in parallel. The CPU budget is split
+            # evenly between the component builds running at the same time.
+            jobs_dir = script_name + ".d"
+            pathlib.Path(os.path.join(FLAGS.build_dir, jobs_dir)).mkdir(
+                parents=True, exist_ok=True
+            )
+            max_jobs = max(1, min(FLAGS.parallel_components, len(component_builds)))
+            waves = [
+                (core_builds, FLAGS.build_parallel, 1),
+                (component_builds, max(1, FLAGS.build_parallel // max_jobs), max_jobs),
+            ]
+
+            cmake_script.comment("Directory of this script, containing the job scripts")
+            cmake_script.cmd(
+                'TRITON_BUILD_SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"'
             )
+            cmake_script.cmd(RUN_JOBS_FUNCTION)
+            for builds, build_parallel, wave_jobs in waves:
+                if not builds:
+                    continue
+                for name, build in builds:
+                    with component_job_script(
+                        jobs_dir,
+                        name,
+                        f"Build script for Triton Inference Server '{name}'",
+                        build_parallel,
+                        os.path.join(script_build_dir, "cmake_build_timeline.log"),
+                    ) as job_script:
+                        job_script.timeline_begin(name)
+                        build(job_script)
+                        job_script.timeline_end(name)
+                log(
+                    "parallel build of {} with {} jobs of -j{}".format(
+                        ", ".join(name for name, _ in builds),
+                        wave_jobs,
+                        build_parallel,
+                    )
+                )
+                cmake_script.run_jobs(
+                    jobs_dir,
+                    [name for name, _ in builds],
+                    wave_jobs,
+                    os.path.join(script_build_dir, "logs"),
+                )
+                cmake_script.blankln()
 
         # Commands needed only when building with Docker...
         if not FLAGS.no_container_build:
             # Commands to collect all the build artifacts needed for CI
             # testing.
+            cmake_script.timeline_begin("cibase")
             cibase_build(
                 cmake_script,
                 script_repo_dir,
@@ -2913,6 +3480,7 @@ if __name__ == "__main__":
                 script_ci_dir,
                 backends,
             )
+            cmake_script.timeline_end("cibase")
 
             # When building with Docker the install and ci artifacts
             # written to the build-dir while running the docker container
@@ -2948,4 +3516,11 @@ if __name__ == "__main__":
         else:
             p = subprocess.Popen([f"./{script_name}"], cwd=FLAGS.build_dir)
         p.wait()
+        build_timing_report(
+            [
+                os.path.join(FLAGS.build_dir, "docker_build_timeline.log"),
+                os.path.join(FLAGS.build_dir, "cmake_build_timeline.log"),
+            ],
+            FLAGS.build_dir,
+        )
         fail_if(p.returncode != 0, "build failed")
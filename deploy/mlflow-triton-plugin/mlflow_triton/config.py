@@ -37,6 +37,14 @@ class Config(dict):
         super().__init__()
         self["triton_url"] = os.environ.get("TRITON_URL")
         self["triton_model_repo"] = os.environ.get("TRITON_MODEL_REPO")
+        # Number of batches predict() sends to the server at the same time
+        self["predict_concurrency"] = int(
+            os.environ.get("TRITON_PREDICT_CONCURRENCY", 4)
+        )
+        # Seconds a cached deployment meta is used before it is revalidated
+        self["meta_cache_ttl"] = float(
+            os.environ.get("TRITON_MLFLOW_META_CACHE_TTL", 5)
+        )
 
         if self["triton_model_repo"].startswith("s3://"):
             self.s3_regex = re.compile(
@@ -59,6 +67,16 @@ class Config(dict):
             self["s3"] = boto3.client("s3", endpoint_url=endpoint_url)
             self["s3_bucket"] = uri.bucket
             self["s3_prefix"] = uri.prefix
+            # Transfer settings used when uploading model files
+            self["s3_max_concurrency"] = int(
+                os.environ.get("TRITON_S3_MAX_CONCURRENCY", 10)
+            )
+            self["s3_multipart_threshold"] = int(
+                os.environ.get("TRITON_S3_MULTIPART_THRESHOLD", 64 * 1024 * 1024)
+            )
+            self["s3_multipart_chunksize"] = int(
+                os.environ.get("TRITON_S3_MULTIPART_CHUNKSIZE", 16 * 1024 * 1024)
+            )
             self["triton_model_repo"] = "s3://{}".format(
                 os.path.join(uri.bucket, uri.prefix)
             )
@@ -25,12 +25,14 @@
 # OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-import ast
 import glob
 import json
 import logging
 import os
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -41,6 +43,7 @@ from mlflow.exceptions import MlflowException
 from mlflow.models import Model
 from mlflow.tracking.artifact_utils import _download_artifact_from_uri
 from mlflow_triton.config import Config
+from mlflow_triton.s3_transfer import S3Uploader
 from tritonclient.utils import (
     InferenceServerException,
     np_to_triton_dtype,
@@ -51,6 +54,9 @@ logger = logging.getLogger(__name__)
 
 _MLFLOW_META_FILENAME = "mlflow-meta.json"
 
+# Maximum number of keys accepted by a single S3 DeleteObjects request
+_S3_DELETE_BATCH_SIZE = 1000
+
 
 class TritonPlugin(BaseDeploymentClient):
     def __init__(self, uri):
@@ -70,8 +76,16 @@ class TritonPlugin(BaseDeploymentClient):
             triton_url = triton_url[len("https://") :]
             ssl = True
         self.triton_client = tritonhttpclient.InferenceServerClient(
-            url=triton_url, ssl=ssl
+            url=triton_url,
+            ssl=ssl,
+            concurrency=self.server_config["predict_concurrency"],
         )
+        # model name -> input / output info used by predict()
+        self._model_info_cache = {}
+        # model name -> (fetch time, version, mlflow meta dict), the version is
+        # the ETag on S3 or the (mtime, size) of the local meta file
+        self._meta_cache = {}
+        self._meta_cache_lock = threading.Lock()
 
     def _get_triton_server_config(self):
         triton_url = "localhost:8000"
@@ -111,6 +125,7 @@ class TritonPlugin(BaseDeploymentClient):
         self._copy_files_to_triton_repo(path, name, flavor)
         self._generate_mlflow_meta_file(name, flavor, model_uri)
 
+        self._model_info_cache.pop(name, None)
         try:
             self.triton_client.load_model(name)
         except InferenceServerException as ex:
@@ -133,6 +148,7 @@ class TritonPlugin(BaseDeploymentClient):
                 % (name)
             )
 
+        self._model_info_cache.pop(name, None)
         try:
             self.triton_client.unload_model(name)
         except InferenceServerException as ex:
@@ -173,6 +189,7 @@ class TritonPlugin(BaseDeploymentClient):
 
         self._generate_mlflow_meta_file(name, flavor, model_uri)
 
+        self._model_info_cache.pop(name, None)
         try:
             self.triton_client.load_model(name)
         except InferenceServerException as ex:
@@ -187,35 +204,21 @@ class TritonPlugin(BaseDeploymentClient):
         :return: None
         """
         resp = self.triton_client.get_model_repository_index()
-        actives = []
-        for d in resp:
-            if "state" in d and d["state"] == "READY":
-                mlflow_meta_path = os.path.join(
-                    self.triton_model_repo, d["name"], _MLFLOW_META_FILENAME
-                )
-                if "s3" in self.server_config:
-                    meta_dict = ast.literal_eval(
-                        self.server_config["s3"]
-                        .get_object(
-                            Bucket=self.server_config["s3_bucket"],
-                            Key=os.path.join(
-                                self.server_config["s3_prefix"],
-                                d["name"],
-                                _MLFLOW_META_FILENAME,
-                            ),
-                        )["Body"]
-                        .read()
-                        .decode("utf-8")
-                    )
-                elif os.path.isfile(mlflow_meta_path):
-                    meta_dict = self._get_mlflow_meta_dict(d["name"])
-                else:
-                    continue
+        ready = [d for d in resp if "state" in d and d["state"] == "READY"]
+        names = list(dict.fromkeys(d["name"] for d in ready))
+        if "s3" in self.server_config and len(names) > 1:
+            with ThreadPoolExecutor(
+                max_workers=self.server_config["s3_max_concurrency"]
+            ) as pool:
+                metas = dict(zip(names, pool.map(self._get_mlflow_meta_dict, names)))
+        else:
+            metas = {name: self._get_mlflow_meta_dict(name) for name in names}
 
-                d["triton_model_path"] = meta_dict["triton_model_path"]
-                d["mlflow_model_uri"] = meta_dict["mlflow_model_uri"]
-                d["flavor"] = meta_dict["flavor"]
-                actives.append(d)
+        actives = []
+        for d in ready:
+            # Skip models that are not deployed via MLflow
+            if metas[d["name"]] is not None:
+                actives.append(self._add_mlflow_meta(d, metas[d["name"]]))
 
         return actives
 
@@ -228,59 +231,145 @@ class TritonPlugin(BaseDeploymentClient):
 
         :return: output - Returns a dict with model info
         """
-        deployments = self.list_deployments()
-        for d in deployments:
-            if d["name"] == name:
-                return d
+        resp = self.triton_client.get_model_repository_index()
+        for d in resp:
+            if d["name"] == name and "state" in d and d["state"] == "READY":
+                meta_dict = self._get_mlflow_meta_dict(name)
+                if meta_dict is None:
+                    break
+                return self._add_mlflow_meta(d, meta_dict)
         raise ValueError(f"Unable to get deployment with name {name}")
 
     def predict(self, deployment_name, df):
-        single_input_np = None
-        if isinstance(df, np.ndarray):
-            single_input_np = df
+        """
+        Run inference on the deployment. Inputs larger than the max batch
+        size of the model are split into batches that are sent concurrently,
+        the outputs are concatenated in the original order.
 
-        inputs = []
-        if single_input_np is not None:
+        :param deployment_name: Name of the model
+        :param df: Pandas DataFrame or dict of input name to numpy array. The
+                   DataFrame either has a single column indexed by input name,
+                   or one column per input with one row per sample.
+
+        :return: Pandas DataFrame with the outputs in the 'outputs' column
+        """
+        if isinstance(df, np.ndarray):
             raise MlflowException("Unnamed input is not currently supported")
-        else:
-            if isinstance(df, pd.DataFrame):
-                model_metadata = self.triton_client.get_model_metadata(deployment_name)
-                input_dtype = {}
-                for input in model_metadata["inputs"]:
-                    input_dtype[input["name"]] = triton_to_np_dtype(input["datatype"])
-                # Sanity check
-                if len(df.columns) != 1:
-                    raise MlflowException("Expect Pandas DataFrame has only 1 column")
-                col = df.columns[0]
-                for row in df.index:
-                    val = df[col][row]
-                    # Need to form numpy array of the data type expected
-                    if type(df[col][row]) != np.ndarray:
-                        val = np.array(val, dtype=input_dtype[row])
-                    inputs.append(
-                        tritonhttpclient.InferInput(
-                            row, val.shape, np_to_triton_dtype(val.dtype)
-                        )
+
+        try:
+            model_info = self._get_model_info(deployment_name)
+            input_arrays = self._get_input_arrays(df, model_info)
+            batches = self._split_batches(input_arrays, model_info["max_batch_size"])
+            outputs = [
+                tritonhttpclient.InferRequestedOutput(name, binary_data=True)
+                for name in model_info["outputs"]
+            ]
+
+            if len(batches) == 1:
+                results = [
+                    self.triton_client.infer(
+                        model_name=deployment_name,
+                        inputs=self._get_infer_inputs(batches[0]),
+                        outputs=outputs,
                     )
-                    inputs[-1].set_data_from_numpy(val)
+                ]
             else:
-                for key, val in df.items():
-                    inputs.append(
-                        tritonhttpclient.InferInput(
-                            key, val.shape, np_to_triton_dtype(val.dtype)
-                        )
+                requests = [
+                    self.triton_client.async_infer(
+                        model_name=deployment_name,
+                        inputs=self._get_infer_inputs(batch),
+                        outputs=outputs,
                     )
-                    inputs[-1].set_data_from_numpy(val)
-
-        try:
-            resp = self.triton_client.infer(model_name=deployment_name, inputs=inputs)
-            res = {}
-            for output in resp.get_response()["outputs"]:
-                res[output["name"]] = resp.as_numpy(output["name"])
-            return pd.DataFrame.from_dict({"outputs": res})
+                    for batch in batches
+                ]
+                results = [request.get_result() for request in requests]
         except InferenceServerException as ex:
+            # The model may have been changed outside of the plugin
+            self._model_info_cache.pop(deployment_name, None)
             raise MlflowException(str(ex))
 
+        res = {}
+        for name in model_info["outputs"]:
+            arrays = [result.as_numpy(name) for result in results]
+            res[name] = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+        return pd.DataFrame.from_dict({"outputs": res})
+
+    def _get_model_info(self, name):
+        """
+        Get the input datatypes and shapes, output names and max batch size
+        of the model, the result is cached per deployment.
+        """
+        model_info = self._model_info_cache.get(name)
+        if model_info is None:
+            model_metadata = self.triton_client.get_model_metadata(name)
+            model_config = self.triton_client.get_model_config(name)
+            model_info = {
+                "inputs": {
+                    i["name"]: (triton_to_np_dtype(i["datatype"]), i["shape"])
+                    for i in model_metadata["inputs"]
+                },
+                "outputs": [o["name"] for o in model_metadata["outputs"]],
+                "max_batch_size": model_config.get("max_batch_size", 0),
+            }
+            self._model_info_cache[name] = model_info
+        return model_info
+
+    def _get_input_arrays(self, df, model_info):
+        input_arrays = {}
+        if isinstance(df, pd.DataFrame):
+            if set(df.columns) <= set(model_info["inputs"]) and (
+                len(df.columns) > 1 or df.columns[0] not in df.index
+            ):
+                # One column per input, one row per sample
+                for col in df.columns:
+                    dtype, shape = model_info["inputs"][col]
+                    values = df[col].to_numpy()
+                    if len(values) and isinstance(values[0], (np.ndarray, list)):
+                        val = np.stack(values).astype(dtype, copy=False)
+                    else:
+                        val = values.astype(dtype, copy=False)
+                    # Scalar columns of inputs with shape [-1, 1]
+                    if val.ndim < len(shape):
+                        val = val.reshape(val.shape + (1,) * (len(shape) - val.ndim))
+                    input_arrays[col] = np.ascontiguousarray(val)
+            else:
+                # Sanity check
+                if len(df.columns) != 1:
+                    raise MlflowException("Expect Pandas DataFrame has only 1 column")
+                col = df.columns[0]
+                for row, val in df[col].items():
+                    # Need to form numpy array of the data type expected
+                    if not isinstance(val, np.ndarray):
+                        val = np.array(val, dtype=model_info["inputs"][row][0])
+                    input_arrays[row] = np.ascontiguousarray(val)
+        else:
+            for key, val in df.items():
+                input_arrays[key] = np.ascontiguousarray(val)
+        return input_arrays
+
+    def _split_batches(self, input_arrays, max_batch_size):
+        batch_size = min((val.shape[0] for val in input_arrays.values()), default=0)
+        if max_batch_size <= 0 or batch_size <= max_batch_size:
+            return [input_arrays]
+        return [
+            {
+                key: val[start : start + max_batch_size]
+                for key, val in input_arrays.items()
+            }
+            for start in range(0, batch_size, max_batch_size)
+        ]
+
+    def _get_infer_inputs(self, input_arrays):
+        inputs = []
+        for key, val in input_arrays.items():
+            inputs.append(
+                tritonhttpclient.InferInput(
+                    key, val.shape, np_to_triton_dtype(val.dtype)
+                )
+            )
+            inputs[-1].set_data_from_numpy(val, binary_data=True)
+        return inputs
+
     def _generate_mlflow_meta_file(self, name, flavor, model_uri):
         triton_deployment_dir = os.path.join(self.triton_model_repo, name)
         meta_dict = {
@@ -304,30 +393,88 @@ class TritonPlugin(BaseDeploymentClient):
             ) as outfile:
                 json.dump(meta_dict, outfile, indent=4)
 
+        with self._meta_cache_lock:
+            self._meta_cache.pop(name, None)
+
         print("Saved", _MLFLOW_META_FILENAME, "to", triton_deployment_dir)
 
+    def _add_mlflow_meta(self, d, meta_dict):
+        d["triton_model_path"] = meta_dict["triton_model_path"]
+        d["mlflow_model_uri"] = meta_dict["mlflow_model_uri"]
+        d["flavor"] = meta_dict["flavor"]
+        return d
+
     def _get_mlflow_meta_dict(self, name):
-        mlflow_meta_path = os.path.join(
-            self.triton_model_repo, name, _MLFLOW_META_FILENAME
+        """
+        Get the MLflow meta of a deployment. A cached meta is returned as is
+        for 'meta_cache_ttl' seconds, after that it is revalidated against
+        the ETag (S3) or modification time (local) of the meta file.
+
+        :param name: Name of the model
+
+        :return: The meta dict, None if the model is not deployed via MLflow
+        """
+        now = time.monotonic()
+        with self._meta_cache_lock:
+            cached = self._meta_cache.get(name)
+        if (
+            cached is not None
+            and now - cached[0] < self.server_config["meta_cache_ttl"]
+        ):
+            return cached[2]
+
+        version, mlflow_meta_dict = self._read_mlflow_meta(
+            name, None if cached is None else cached[1]
         )
+        if version is not None and mlflow_meta_dict is None:
+            # Not modified since it was cached
+            mlflow_meta_dict = cached[2]
+        with self._meta_cache_lock:
+            self._meta_cache[name] = (now, version, mlflow_meta_dict)
+        return mlflow_meta_dict
 
+    def _read_mlflow_meta(self, name, cached_version=None):
+        """
+        Read the MLflow meta file of a deployment unless it still has
+        'cached_version'.
+
+        :return: (version, meta dict), the meta dict is None if the file is
+                 not modified, both are None if there is no meta file
+        """
         if "s3" in self.server_config:
-            mlflow_meta_dict = ast.literal_eval(
-                self.server_config["s3"]
-                .get_object(
-                    Bucket=self.server_config["s3_bucket"],
-                    Key=os.path.join(
-                        self.server_config["s3_prefix"], name, _MLFLOW_META_FILENAME
-                    ),
-                )["Body"]
-                .read()
-                .decode("utf-8")
-            )
-        else:
-            with open(mlflow_meta_path, "r") as metafile:
-                mlflow_meta_dict = json.load(metafile)
+            from botocore.exceptions import ClientError
 
-        return mlflow_meta_dict
+            args = {
+                "Bucket": self.server_config["s3_bucket"],
+                "Key": os.path.join(
+                    self.server_config["s3_prefix"], name, _MLFLOW_META_FILENAME
+                ),
+            }
+            if cached_version is not None:
+                args["IfNoneMatch"] = cached_version
+            try:
+                obj = self.server_config["s3"].get_object(**args)
+            except ClientError as ex:
+                code = ex.response["Error"]["Code"]
+                if code in ("304", "NotModified"):
+                    return cached_version, None
+                if code in ("404", "NoSuchKey"):
+                    return None, None
+                raise
+            return obj["ETag"], json.loads(obj["Body"].read().decode("utf-8"))
+
+        mlflow_meta_path = os.path.join(
+            self.triton_model_repo, name, _MLFLOW_META_FILENAME
+        )
+        try:
+            stat = os.stat(mlflow_meta_path)
+        except FileNotFoundError:
+            return None, None
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == cached_version:
+            return version, None
+        with open(mlflow_meta_path, "r") as metafile:
+            return version, json.load(metafile)
 
     def _get_copy_paths(self, artifact_path, name, flavor):
         copy_paths = {}
@@ -403,9 +550,11 @@ default_model_filename: "{}"
 
     def _copy_files_to_triton_repo(self, artifact_path, name, flavor):
         copy_paths = self._get_copy_paths(artifact_path, name, flavor)
+        s3_files = []
         for key in copy_paths:
             if "s3" in self.server_config:
-                # copy model dir to s3 recursively
+                # collect the files of the model dir, they are uploaded to s3
+                # together below
                 for root, dirs, files in self._walk(copy_paths[key]["from"]):
                     for filename in files:
                         local_path = os.path.join(root, filename)
@@ -428,11 +577,7 @@ default_model_filename: "{}"
                                 self.server_config["s3_prefix"], name, rel_path
                             )
 
-                        self.server_config["s3"].upload_file(
-                            local_path,
-                            self.server_config["s3_bucket"],
-                            s3_path,
-                        )
+                        s3_files.append((local_path, s3_path))
             else:
                 if os.path.isdir(copy_paths[key]["from"]):
                     if os.path.isdir(copy_paths[key]["to"]):
@@ -443,7 +588,15 @@ default_model_filename: "{}"
                         os.makedirs(copy_paths[key]["to"])
                     shutil.copy(copy_paths[key]["from"], copy_paths[key]["to"])
 
-        if "s3" not in self.server_config:
+        if "s3" in self.server_config:
+            S3Uploader(
+                self.server_config["s3"],
+                self.server_config["s3_bucket"],
+                max_concurrency=self.server_config["s3_max_concurrency"],
+                multipart_threshold=self.server_config["s3_multipart_threshold"],
+                multipart_chunksize=self.server_config["s3_multipart_chunksize"],
+            ).upload(s3_files)
+        else:
             triton_deployment_dir = os.path.join(self.triton_model_repo, name)
             version_folder = os.path.join(triton_deployment_dir, "1")
             os.makedirs(version_folder, exist_ok=True)
@@ -463,20 +616,28 @@ default_model_filename: "{}"
         triton_deployment_dir = os.path.join(self.triton_model_repo, name)
 
         if "s3" in self.server_config:
-            objs = self.server_config["s3"].list_objects(
+            # Each listed page holds at most 1000 keys, which is also the
+            # limit of a single delete request
+            paginator = self.server_config["s3"].get_paginator("list_objects_v2")
+            for page in paginator.paginate(
                 Bucket=self.server_config["s3_bucket"],
-                Prefix=os.path.join(self.server_config["s3_prefix"], name),
-            )
-
-            for key in objs["Contents"]:
-                key = key["Key"]
-                try:
-                    self.server_config["s3"].delete_object(
-                        Bucket=self.server_config["s3_bucket"],
-                        Key=key,
+                Prefix=os.path.join(self.server_config["s3_prefix"], name, ""),
+                PaginationConfig={"PageSize": _S3_DELETE_BATCH_SIZE},
+            ):
+                keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+                if not keys:
+                    continue
+                resp = self.server_config["s3"].delete_objects(
+                    Bucket=self.server_config["s3_bucket"],
+                    Delete={"Objects": keys, "Quiet": True},
+                )
+                if resp.get("Errors"):
+                    error = resp["Errors"][0]
+                    raise Exception(
+                        "Could not delete {}: {}".format(
+                            error["Key"], error.get("Message", error.get("Code"))
+                        )
                     )
-                except Exception as e:
-                    raise Exception(f"Could not delete {key}: {e}")
 
         else:
             # Check if the deployment directory exists
@@ -498,6 +659,8 @@ default_model_filename: "{}"
             self.triton_model_repo, name, _MLFLOW_META_FILENAME
         )
         self._delete_mlflow_meta(mlflow_meta_path)
+        with self._meta_cache_lock:
+            self._meta_cache.pop(name, None)
 
     def _validate_config_args(self, config):
         if not config["version"]:
@@ -514,12 +677,11 @@ default_model_filename: "{}"
             raise Exception("{} model flavor not supported by Triton".format(flavor))
 
     def _model_exists(self, name):
-        deploys = self.list_deployments()
-        exists = False
-        for d in deploys:
-            if d["name"] == name:
-                exists = True
-        return exists
+        try:
+            self.get_deployment(name)
+        except ValueError:
+            return False
+        return True
 
 
 def run_local(name, model_uri, flavor=None, config=None):
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+# Copyright 2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from mlflow.exceptions import MlflowException
+
+logger = logging.getLogger(__name__)
+
+# S3 limits on multipart uploads
+_MIN_PART_SIZE = 5 * 1024 * 1024
+_MAX_PARTS = 10000
+
+_READ_SIZE = 8 * 1024 * 1024
+
+
+class S3Uploader:
+    """
+    Uploads a set of local files to S3 concurrently. Files at or above
+    'multipart_threshold' bytes are split into 'multipart_chunksize' parts
+    and the parts are uploaded on the same thread pool as the small files.
+
+    Objects whose size and ETag already match the local file are skipped, and
+    an interrupted multipart upload is left in place so the next upload of
+    the same key only sends the parts that are missing or different.
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket,
+        max_concurrency=10,
+        multipart_threshold=64 * 1024 * 1024,
+        multipart_chunksize=16 * 1024 * 1024,
+    ):
+        if max_concurrency < 1:
+            raise MlflowException(
+                "S3 max concurrency must be at least 1, got {}".format(max_concurrency)
+            )
+        if multipart_chunksize < _MIN_PART_SIZE:
+            raise MlflowException(
+                "S3 multipart chunk size must be at least {} bytes, got {}".format(
+                    _MIN_PART_SIZE, multipart_chunksize
+                )
+            )
+        self.client = client
+        self.bucket = bucket
+        self.max_concurrency = max_concurrency
+        self.multipart_threshold = max(multipart_threshold, 1)
+        self.multipart_chunksize = multipart_chunksize
+
+    def upload(self, files):
+        """
+        Upload the files to the bucket.
+
+        :param files: List of (local_path, key) pairs
+
+        :return: dict with the number of 'uploaded' and 'skipped' files
+        """
+        if not files:
+            return {"uploaded": 0, "skipped": 0}
+
+        remote = self._list_remote(os.path.commonprefix([key for _, key in files]))
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            plans = list(
+                pool.map(
+                    lambda f: self._plan(f[0], f[1], remote.get(f[1])),
+                    files,
+                )
+            )
+
+            single_futures = []
+            part_futures = []
+            for plan in plans:
+                if plan["skip"]:
+                    continue
+                if plan["upload_id"] is None:
+                    single_futures.append(
+                        pool.submit(self._put_object, plan["path"], plan["key"])
+                    )
+                else:
+                    part_futures.append(
+                        (
+                            plan,
+                            [
+                                pool.submit(self._upload_part, plan, number)
+                                for number in range(1, plan["part_count"] + 1)
+                            ],
+                        )
+                    )
+
+            for future in single_futures:
+                future.result()
+            # Multipart uploads are not aborted on failure so that a retry
+            # can resume them
+            for plan, futures in part_futures:
+                parts = [future.result() for future in futures]
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=plan["key"],
+                    UploadId=plan["upload_id"],
+                    MultipartUpload={"Parts": parts},
+                )
+
+        skipped = sum(1 for plan in plans if plan["skip"])
+        logger.info(
+            "Uploaded {} file(s) to s3://{}, skipped {} unchanged file(s)".format(
+                len(plans) - skipped, self.bucket, skipped
+            )
+        )
+        return {"uploaded": len(plans) - skipped, "skipped": skipped}
+
+    def part_size(self, size):
+        """
+        Return the part size used for a multipart upload of 'size' bytes.
+        """
+        part_size = self.multipart_chunksize
+        if size > part_size * _MAX_PARTS:
+            part_size = -(-size // _MAX_PARTS)
+        return part_size
+
+    def local_etag(self, path, size):
+        """
+        Return the ETag S3 would assign to 'path' if it was uploaded by
+        this uploader, without the surrounding quotes.
+        """
+        if size < self.multipart_threshold:
+            md5 = hashlib.md5()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(_READ_SIZE), b""):
+                    md5.update(chunk)
+            return md5.hexdigest()
+
+        part_size = self.part_size(size)
+        digests = []
+        with open(path, "rb") as f:
+            for _ in range(0, size, part_size):
+                digests.append(hashlib.md5(f.read(part_size)).digest())
+        return "{}-{}".format(hashlib.md5(b"".join(digests)).hexdigest(), len(digests))
+
+    def _list_remote(self, prefix):
+        remote = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                remote[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+        return remote
+
+    def _plan(self, path, key, remote):
+        size = os.path.getsize(path)
+        plan = {
+            "path": path,
+            "key": key,
+            "size": size,
+            "skip": False,
+            "upload_id": None,
+            "part_count": 0,
+            "part_size": 0,
+            "uploaded_parts": {},
+        }
+        if remote is not None and remote[0] == size:
+            if self.local_etag(path, size) == remote[1]:
+                plan["skip"] = True
+                return plan
+
+        if size >= self.multipart_threshold:
+            plan["part_size"] = self.part_size(size)
+            plan["part_count"] = -(-size // plan["part_size"])
+            plan["upload_id"], plan["uploaded_parts"] = self._resume_or_create(key)
+        return plan
+
+    def _resume_or_create(self, key):
+        uploads = []
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=key):
+            uploads.extend(u for u in page.get("Uploads", []) if u["Key"] == key)
+
+        if not uploads:
+            response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)
+            return response["UploadId"], {}
+
+        # Resume the most recent upload and abort any older leftovers
+        uploads.sort(key=lambda u: u["Initiated"])
+        for stale in uploads[:-1]:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=stale["UploadId"]
+            )
+        upload_id = uploads[-1]["UploadId"]
+        uploaded_parts = {}
+        paginator = self.client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id):
+            for part in page.get("Parts", []):
+                uploaded_parts[part["PartNumber"]] = (
+                    part["Size"],
+                    part["ETag"].strip('"'),
+                )
+        logger.info(
+            "Resuming upload of s3://{}/{} with {} part(s) already uploaded".format(
+                self.bucket, key, len(uploaded_parts)
+            )
+        )
+        return upload_id, uploaded_parts
+
+    def _put_object(self, path, key):
+        with open(path, "rb") as f:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=f)
+
+    def _upload_part(self, plan, number):
+        with open(plan["path"], "rb") as f:
+            f.seek((number - 1) * plan["part_size"])
+            data = f.read(plan["part_size"])
+
+        etag = hashlib.md5(data).hexdigest()
+        if plan["uploaded_parts"].get(number) == (len(data), etag):
+            return {"PartNumber": number, "ETag": '"{}"'.format(etag)}
+
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=plan["key"],
+            UploadId=plan["upload_id"],
+            PartNumber=number,
+            Body=data,
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
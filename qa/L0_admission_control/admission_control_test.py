@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+sys.path.append("../common")
+
+import csv
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import test_util as tu
+import tritonclient.grpc as grpcclient
+from tritonclient.utils import InferenceServerException
+
+MODEL_NAME = "delayed_identity"
+# The model runs one request at a time for 'EXECUTE_DELAY_MS'
+EXECUTE_DELAY_MS = int(os.environ.get("EXECUTE_DELAY_MS", "10"))
+CAPACITY = 1000 // EXECUTE_DELAY_MS
+# Offered loads, as multiples of the capacity of the model
+LOAD_FACTORS = [0.5, 1, 2, 4]
+DURATION_S = float(os.environ.get("DURATION_S", "5"))
+# A response is only useful to the client within the deadline
+DEADLINE_S = 0.25
+RESULTS = os.environ.get("RESULTS", "goodput.csv")
+
+
+class AdmissionControlTest(tu.TestResultCollector):
+    def setUp(self):
+        self._url = "http://localhost:8000/v2/models/{}/infer".format(MODEL_NAME)
+        self._body = {
+            "inputs": [
+                {"name": "INPUT0", "datatype": "FP32", "shape": [1], "data": [1.0]}
+            ]
+        }
+        self._local = threading.local()
+
+    def _infer(self, scheduled):
+        # Latency is measured from when the request is due so that a
+        # client falling behind doesn't hide the delay
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        r = self._local.session.post(self._url, json=self._body)
+        return r.status_code, time.perf_counter() - scheduled
+
+    def _offer_load(self, rate):
+        # Send requests at 'rate' per second regardless of the responses
+        count = int(rate * DURATION_S)
+        futures = []
+        with ThreadPoolExecutor(max_workers=256) as executor:
+            start = time.perf_counter()
+            for i in range(count):
+                scheduled = start + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self._infer, scheduled))
+        results = [f.result() for f in futures]
+
+        good = sum(
+            1 for code, latency in results if code == 200 and latency <= DEADLINE_S
+        )
+        rejected = sum(1 for code, _ in results if code == 429)
+        errors = [code for code, _ in results if code not in (200, 429)]
+        self.assertEqual(errors, [], "unexpected response codes")
+        return good / DURATION_S, rejected
+
+    def _goodput_sweep(self, admission_control):
+        goodputs = {}
+        rejections = {}
+        with open(RESULTS, "a") as f:
+            writer = csv.writer(f)
+            for factor in LOAD_FACTORS:
+                rate = CAPACITY * factor
+                goodputs[factor], rejections[factor] = self._offer_load(rate)
+                writer.writerow(
+                    [
+                        admission_control,
+                        rate,
+                        "{:.1f}".format(goodputs[factor]),
+                        rejections[factor],
+                    ]
+                )
+                print(
+                    "offered {}/s: goodput {:.1f}/s, rejected {}".format(
+                        rate, goodputs[factor], rejections[factor]
+                    )
+                )
+        return goodputs, rejections
+
+    def _rejected_metric(self, protocol):
+        labels = [
+            'model="{}"'.format(MODEL_NAME),
+            'protocol="{}"'.format(protocol),
+        ]
+        metrics = requests.get("http://localhost:8002/metrics").text
+        total = 0
+        for line in metrics.splitlines():
+            if not line.startswith("nv_frontend_admission_rejected{"):
+                continue
+            if all(label in line for label in labels):
+                total += float(line.split()[-1])
+        return total
+
+    def test_goodput_with_admission_control(self):
+        goodputs, rejections = self._goodput_sweep(True)
+
+        # Under overload the excess requests are rejected and the model keeps
+        # serving close to its capacity within the deadline
+        for factor in LOAD_FACTORS:
+            if factor > 1:
+                self.assertGreater(rejections[factor], 0)
+                self.assertGreaterEqual(goodputs[factor], 0.8 * goodputs[1])
+        self.assertEqual(self._rejected_metric("http"), sum(rejections.values()))
+
+    def test_goodput_without_admission_control(self):
+        # Baseline for the report, every request is eventually served but
+        # under overload most of them miss the deadline
+        _, rejections = self._goodput_sweep(False)
+        self.assertEqual(sum(rejections.values()), 0)
+
+    def test_grpc_resource_exhausted(self):
+        client = grpcclient.InferenceServerClient("localhost:8001")
+        inputs = [grpcclient.InferInput("INPUT0", [1], "FP32")]
+        inputs[0].set_data_from_numpy(np.ones([1], dtype=np.float32))
+
+        results = []
+        done = threading.Event()
+
+        def callback(result, error):
+            results.append(error)
+            if len(results) == 64:
+                done.set()
+
+        for _ in range(64):
+            client.async_infer(MODEL_NAME, inputs, callback)
+        self.assertTrue(done.wait(30))
+
+        errors = [e for e in results if e is not None]
+        self.assertGreater(len(errors), 0)
+        self.assertLess(len(errors), 64)
+        for e in errors:
+            self.assertIsInstance(e, InferenceServerException)
+            self.assertEqual(e.status(), "StatusCode.RESOURCE_EXHAUSTED")
+            self.assertIn("rejected by admission control", e.message())
+        self.assertEqual(self._rejected_metric("grpc"), len(errors))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/bin/bash
+# Copyright (c) 2024, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Checks that frontend admission control keeps the goodput of an overloaded
+# model flat. A model that serves one request every EXECUTE_DELAY_MS is
+# offered up to 4x its capacity, once with admission control and once
+# without. The goodput, the responses received within a deadline, of both
+# runs is written to goodput.csv.
+
+export CUDA_VISIBLE_DEVICES=""
+
+ADMISSION_TEST=admission_control_test.py
+ADMISSION_UNIT_TEST=./admission_control_test
+CLIENT_LOG="./client.log"
+TEST_RESULT_FILE='test_results.txt'
+MODEL=delayed_identity
+export EXECUTE_DELAY_MS=10
+export RESULTS=goodput.csv
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+source ../common/util.sh
+
+rm -fr *.log *.csv models
+
+RET=0
+
+set +e
+LD_LIBRARY_PATH=/opt/tritonserver/lib:${LD_LIBRARY_PATH} $ADMISSION_UNIT_TEST >> admission_control_unit_test.log 2>&1
+if [ $? -ne 0 ]; then
+    cat admission_control_unit_test.log
+    echo -e "\n***\n*** Admission Control Unit Test Failed\n***"
+    RET=1
+fi
+set -e
+
+mkdir -p models/${MODEL}/1
+cat > models/${MODEL}/config.pbtxt << EOF2
+name: "${MODEL}"
+backend: "identity"
+max_batch_size: 0
+input [
+  {
+    name: "INPUT0"
+    data_type: TYPE_FP32
+    dims: [ 1 ]
+  }
+]
+output [
+  {
+    name: "OUTPUT0"
+    data_type: TYPE_FP32
+    dims: [ 1 ]
+  }
+]
+instance_group [
+  {
+    kind: KIND_CPU
+    count: 1
+  }
+]
+parameters [
+  {
+    key: "execute_delay_ms"
+    value: { string_value: "${EXECUTE_DELAY_MS}" }
+  }
+]
+EOF2
+
+echo "admission_control,offered_per_sec,goodput_per_sec,rejected" > $RESULTS
+
+# Admit 8 requests to the model at a time, which bounds the queue delay
+# well below the deadline of the client, and shed requests if the delay
+# still grows past 100ms
+ADMISSION_ARGS="--admission-control=${MODEL},max-inflight=8 --admission-control=${MODEL},target-delay-us=100000"
+
+for ADMISSION_CONTROL in true false; do
+    if [ "$ADMISSION_CONTROL" == "true" ]; then
+        SERVER_ARGS="--model-repository=`pwd`/models ${ADMISSION_ARGS}"
+        TESTS="test_goodput_with_admission_control test_grpc_resource_exhausted"
+    else
+        SERVER_ARGS="--model-repository=`pwd`/models"
+        TESTS="test_goodput_without_admission_control"
+    fi
+    SERVER_LOG="${SERVER_LOG_BASE}.admission_${ADMISSION_CONTROL}.log"
+    run_server
+    if [ "$SERVER_PID" == "0" ]; then
+        echo -e "\n***\n*** Failed to start $SERVER\n***"
+        cat $SERVER_LOG
+        exit 1
+    fi
+
+    set +e
+    for TEST in $TESTS; do
+        python3 $ADMISSION_TEST AdmissionControlTest.$TEST >> $CLIENT_LOG 2>&1
+        if [ $? -ne 0 ]; then
+            cat $CLIENT_LOG
+            echo -e "\n***\n*** Test $TEST Failed\n***"
+            RET=1
+        else
+            check_test_results $TEST_RESULT_FILE 1
+            if [ $? -ne 0 ]; then
+                cat $CLIENT_LOG
+                echo -e "\n***\n*** Test Result Verification Failed\n***"
+                RET=1
+            fi
+        fi
+    done
+    set -e
+
+    kill $SERVER_PID
+    wait $SERVER_PID
+done
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
@@ -149,7 +149,7 @@ for PROTOCOL in http grpc; do
 
             set +e
             # Check for memory growth
-            python $MASSIF_TEST $MASSIF_LOG $MAX_ALLOWED_ALLOC >> ${CLIENT_LOG}.massif 2>&1
+            python $MASSIF_TEST $MASSIF_LOG $MAX_ALLOWED_ALLOC --json-report ${MASSIF_LOG}.json >> ${CLIENT_LOG}.massif 2>&1
             if [ $? -ne 0 ]; then
                 echo -e "\n***\n*** Massif Test for ${PROTOCOL} ${LANG} Failed\n***"
                 RET=1
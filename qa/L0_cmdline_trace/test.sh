@@ -366,6 +366,24 @@ if [ `grep -c ^simple summary_frequency.log.1` != "1" ]; then
     RET=1
 fi
 
+# Streaming summary must merge the indexed files into the same trace count
+$TRACE_SUMMARY -s "trace_frequency.log.*" \
+    --export-csv summary_frequency_stream.csv > summary_frequency_stream.log
+if [ `grep "^Summary for simple" summary_frequency_stream.log | \
+        awk '{sum += $NF} END {print sum}'` != "3" ]; then
+    cat summary_frequency_stream.log
+    echo -e "\n***\n*** Test Failed\n***"
+    RET=1
+fi
+
+# Exported percentiles must cover the same traces
+if [ `python3 -c 'import csv, sys; print(sum(int(row["count"]) for row in csv.DictReader(open(sys.argv[1])) if row["span"] == "REQUEST"))' \
+        summary_frequency_stream.csv` != "3" ]; then
+    cat summary_frequency_stream.csv
+    echo -e "\n***\n*** Test Failed\n***"
+    RET=1
+fi
+
 set -e
 
 # trace-rate == 9, trace-level=TIMESTAMPS
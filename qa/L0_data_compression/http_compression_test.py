@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# Copyright 2022-2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+
+sys.path.append("../common")
+
+import gzip
+import json
+import os
+import unittest
+
+import numpy as np
+import requests
+import test_util as tu
+
+INFER_URL = "http://localhost:8000/v2/models/simple/infer"
+
+
+def infer_body():
+    data = np.arange(16, dtype=np.int32).tolist()
+    return json.dumps(
+        {
+            "inputs": [
+                {"name": "INPUT0", "datatype": "INT32", "shape": [1, 16], "data": data},
+                {"name": "INPUT1", "datatype": "INT32", "shape": [1, 16], "data": data},
+            ]
+        }
+    ).encode()
+
+
+def decompress(encoding, data):
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if encoding == "lz4":
+        import lz4.frame
+
+        return lz4.frame.decompress(data)
+    raise ValueError("unexpected encoding " + encoding)
+
+
+def compress(encoding, data):
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().compress(data)
+    if encoding == "lz4":
+        import lz4.frame
+
+        return lz4.frame.compress(data)
+    raise ValueError("unexpected encoding " + encoding)
+
+
+class HttpCompressionTest(tu.TestResultCollector):
+    def _infer(self, body, headers):
+        # Let the test see the raw response body
+        response = requests.post(INFER_URL, data=body, headers=headers, stream=True)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response, response.raw.read(decode_content=False)
+
+    def _check_outputs(self, body):
+        outputs = {o["name"]: o["data"] for o in json.loads(body)["outputs"]}
+        data = np.arange(16, dtype=np.int32)
+        self.assertEqual(outputs["OUTPUT0"], (data + data).tolist())
+        self.assertEqual(outputs["OUTPUT1"], (data - data).tolist())
+
+    def test_response_compression(self):
+        for encoding in ("gzip", "zstd", "lz4"):
+            response, body = self._infer(
+                infer_body(), {"Accept-Encoding": "{}, identity;q=0.5".format(encoding)}
+            )
+            self.assertEqual(response.headers.get("Content-Encoding"), encoding)
+            self._check_outputs(decompress(encoding, body))
+
+    def test_request_compression(self):
+        for encoding in ("zstd", "lz4"):
+            response, body = self._infer(
+                compress(encoding, infer_body()), {"Content-Encoding": encoding}
+            )
+            self.assertIsNone(response.headers.get("Content-Encoding"))
+            self._check_outputs(body)
+
+    def test_unsupported_encoding(self):
+        # Unsupported encodings are not selected for the response...
+        response, body = self._infer(infer_body(), {"Accept-Encoding": "br"})
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+        self._check_outputs(body)
+
+        # ... and rejected for the request, listing the supported ones
+        response = requests.post(
+            INFER_URL, data=infer_body(), headers={"Content-Encoding": "br"}
+        )
+        self.assertNotEqual(response.status_code, 200)
+        accepted = [e.strip() for e in response.headers["Accept-Encoding"].split(",")]
+        for encoding in ("gzip", "deflate", "zstd", "lz4"):
+            self.assertIn(encoding, accepted)
+
+    def test_threshold(self):
+        # The server is started with a threshold larger than the response
+        threshold = int(os.environ["COMPRESSION_THRESHOLD"])
+        response, body = self._infer(infer_body(), {"Accept-Encoding": "zstd"})
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+        self.assertLess(len(body), threshold)
+        self._check_outputs(body)
+
+
+if __name__ == "__main__":
+    unittest.main()
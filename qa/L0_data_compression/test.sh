@@ -132,9 +132,69 @@ for INFER_CLIENT in "$SIMPLE_INFER_CLIENT_PY" "$SIMPLE_AIO_INFER_CLIENT_PY" "$SI
     done
 done
 
+pip3 install zstandard lz4
+
+TEST_RESULT_FILE='test_results.txt'
+COMPRESSION_TEST=http_compression_test.py
+set +e
+python $COMPRESSION_TEST HttpCompressionTest.test_response_compression \
+    HttpCompressionTest.test_request_compression \
+    HttpCompressionTest.test_unsupported_encoding >> $CLIENT_LOG 2>&1
+if [ $? -ne 0 ]; then
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE 3
+    if [ $? -ne 0 ]; then
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+set -e
+
 kill $SERVER_PID
 wait $SERVER_PID
 
+# Responses smaller than the threshold are not compressed
+export COMPRESSION_THRESHOLD=100000
+SERVER_ARGS="--model-repository=$DATADIR --http-compression-threshold=$COMPRESSION_THRESHOLD --http-compression-level=zstd,1"
+run_server
+if [ "$SERVER_PID" == "0" ]; then
+    echo -e "\n***\n*** Failed to start $SERVER\n***"
+    cat $SERVER_LOG
+    exit 1
+fi
+
+set +e
+python $COMPRESSION_TEST HttpCompressionTest.test_threshold >> $CLIENT_LOG 2>&1
+if [ $? -ne 0 ]; then
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE 1
+    if [ $? -ne 0 ]; then
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+set -e
+
+kill $SERVER_PID
+wait $SERVER_PID
+
+# An invalid compression level is rejected at startup
+SERVER_ARGS="--model-repository=$DATADIR --http-compression-level=gzip,10"
+SERVER_LOG="./invalid_level_server.log"
+run_server
+if [ "$SERVER_PID" != "0" ]; then
+    echo -e "\n***\n*** Expected server to fail with invalid compression level\n***"
+    kill $SERVER_PID
+    wait $SERVER_PID
+    RET=1
+fi
+if [ `grep -c "invalid compression level 10 for gzip" $SERVER_LOG` == "0" ]; then
+    echo -e "\n***\n*** Expected invalid compression level error\n***"
+    RET=1
+fi
+
 if [ $RET -eq 0 ]; then
     echo -e "\n***\n*** Test Passed\n***"
 else
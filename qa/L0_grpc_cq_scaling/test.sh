@@ -0,0 +1,152 @@
+#!/bin/bash
+# Copyright (c) 2021, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Measures GRPC inference throughput of a trivial model as the number of
+# cores available to the server grows, once with the default single
+# completion queue and once with one completion queue per core
+# ('--grpc-cq-count'). The results are written to grpc_cq_scaling.csv.
+# The test fails if perf_analyzer fails, the numbers are for reporting.
+
+export CUDA_VISIBLE_DEVICES=""
+
+PERF_ANALYZER=../clients/perf_analyzer
+MODEL=identity_fp32
+RESULTS=grpc_cq_scaling.csv
+CLIENT_LOG="./client.log"
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+source ../common/util.sh
+
+rm -fr *.log *.csv models
+
+mkdir -p models/${MODEL}/1
+cat > models/${MODEL}/config.pbtxt << EOF2
+name: "${MODEL}"
+backend: "identity"
+max_batch_size: 0
+input [
+  {
+    name: "INPUT0"
+    data_type: TYPE_FP32
+    dims: [ 16 ]
+  }
+]
+output [
+  {
+    name: "OUTPUT0"
+    data_type: TYPE_FP32
+    dims: [ 16 ]
+  }
+]
+instance_group [
+  {
+    kind: KIND_CPU
+    count: 8
+  }
+]
+EOF2
+
+# Half of the cores run the server, the other half perf_analyzer
+NPROC=$(nproc)
+if [ $NPROC -lt 2 ]; then
+    echo -e "\n***\n*** At least 2 cores are required\n***"
+    exit 1
+fi
+MAX_SERVER_CORES=${MAX_SERVER_CORES:=$((NPROC / 2))}
+CORE_COUNTS=""
+for c in 1 2 4 8 16 32 64; do
+    if [ $c -le $MAX_SERVER_CORES ]; then
+        CORE_COUNTS="$CORE_COUNTS $c"
+    fi
+done
+
+RET=0
+
+echo "cores,cq_count,infer_thread_count,infer_per_sec,p99_latency_us" > $RESULTS
+
+for CORES in $CORE_COUNTS; do
+    CQ_COUNTS="1"
+    if [ $CORES -gt 1 ]; then
+        CQ_COUNTS="1 $CORES"
+    fi
+    for CQ_COUNT in $CQ_COUNTS; do
+        # A single completion queue uses the default thread count, the
+        # sharded runs use two inference threads per completion queue
+        THREAD_COUNT=$((CQ_COUNT * 2))
+
+        NAME=cores${CORES}_cq${CQ_COUNT}
+        SERVER_ARGS="--model-repository=`pwd`/models --grpc-cq-count=${CQ_COUNT} --grpc-infer-thread-count=${THREAD_COUNT}"
+        SERVER_LOG="${SERVER_LOG_BASE}.${NAME}.log"
+        run_server
+        if [ "$SERVER_PID" == "0" ]; then
+            echo -e "\n***\n*** Failed to start $SERVER\n***"
+            cat $SERVER_LOG
+            exit 1
+        fi
+        # Pin all server threads to the first CORES cores
+        taskset -a -c -p 0-$((CORES - 1)) $SERVER_PID > /dev/null
+
+        set +e
+        taskset -c ${MAX_SERVER_CORES}-$((NPROC - 1)) \
+            $PERF_ANALYZER -m $MODEL -i grpc --concurrency-range $((CORES * 16)) \
+            --measurement-interval 5000 -f ${NAME}.csv >> $CLIENT_LOG 2>&1
+        if [ $? -ne 0 ]; then
+            cat $CLIENT_LOG
+            echo -e "\n***\n*** perf_analyzer failed for ${NAME}\n***"
+            RET=1
+        else
+            # Pick the throughput and p99 latency from the perf_analyzer CSV
+            python3 - ${NAME}.csv ${CORES} ${CQ_COUNT} ${THREAD_COUNT} >> $RESULTS << EOF2
+import csv
+import sys
+
+with open(sys.argv[1]) as f:
+    row = next(csv.DictReader(f))
+print(
+    ",".join(
+        sys.argv[2:5] + [row["Inferences/Second"], row.get("p99 latency", "")]
+    )
+)
+EOF2
+        fi
+        set -e
+
+        kill $SERVER_PID
+        wait $SERVER_PID
+    done
+done
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
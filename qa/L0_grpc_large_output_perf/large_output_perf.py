@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Sends identity requests with a large UINT8 tensor to a server that has
+# malloc_count.so preloaded and reports the GRPC throughput and the
+# number of server side allocations made per request. Exits non-zero if
+# any response does not match its request.
+
+import argparse
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+import tritonclient.grpc as grpcclient
+
+
+def sample_allocations(pid, count_file):
+    # The preloaded library appends a line to the file for every SIGUSR2
+    lines = 0
+    if os.path.exists(count_file):
+        with open(count_file) as f:
+            lines = len(f.readlines())
+    os.kill(pid, signal.SIGUSR2)
+    for _ in range(100):
+        with open(count_file) as f:
+            samples = f.readlines()
+        if len(samples) > lines:
+            return int(samples[-1])
+        time.sleep(0.01)
+    raise Exception("no allocation count written to '{}'".format(count_file))
+
+
+def run_requests(url, model, data, count, errors):
+    try:
+        client = grpcclient.InferenceServerClient(url)
+        inputs = [grpcclient.InferInput("INPUT0", data.shape, "UINT8")]
+        inputs[0].set_data_from_numpy(data)
+        outputs = [grpcclient.InferRequestedOutput("OUTPUT0")]
+        for _ in range(count):
+            result = client.infer(model, inputs, outputs=outputs)
+            output = result.as_numpy("OUTPUT0")
+            if not np.array_equal(output, data):
+                raise Exception("unexpected output for {} bytes".format(data.size))
+        client.close()
+    except Exception as ex:
+        errors.append(ex)
+
+
+def run(url, model, data, concurrency, count):
+    errors = []
+    threads = [
+        threading.Thread(target=run_requests, args=(url, model, data, count, errors))
+        for _ in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-u", "--url", default="localhost:8001")
+    parser.add_argument("-m", "--model", default="identity_uint8")
+    parser.add_argument("-b", "--byte-size", type=int, required=True)
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument("-p", "--server-pid", type=int, required=True)
+    parser.add_argument("-f", "--count-file", required=True)
+    FLAGS = parser.parse_args()
+
+    data = np.random.randint(0, 255, size=FLAGS.byte_size, dtype=np.uint8)
+    per_thread = max(1, FLAGS.requests // FLAGS.concurrency)
+    total = per_thread * FLAGS.concurrency
+
+    # Warm up so the recycled GRPC states already hold buffers of the
+    # requested size
+    run(FLAGS.url, FLAGS.model, data, FLAGS.concurrency, 4)
+
+    start_count = sample_allocations(FLAGS.server_pid, FLAGS.count_file)
+    start = time.perf_counter()
+    run(FLAGS.url, FLAGS.model, data, FLAGS.concurrency, per_thread)
+    elapsed = time.perf_counter() - start
+    end_count = sample_allocations(FLAGS.server_pid, FLAGS.count_file)
+
+    print(
+        "{},{},{:.1f},{:.3f},{:.1f}".format(
+            FLAGS.byte_size,
+            FLAGS.concurrency,
+            total / elapsed,
+            total * FLAGS.byte_size / elapsed / 1e9,
+            (end_count - start_count) / total,
+        )
+    )
@@ -0,0 +1,116 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+// LD_PRELOAD library that counts the calls to malloc(), calloc(),
+// realloc() and posix_memalign() made by the process. Sending SIGUSR2
+// to the process appends the current count to the file named by the
+// MALLOC_COUNT_FILE environment variable, so the number of
+// allocations made while handling a set of requests is the difference
+// between two samples.
+
+#define _GNU_SOURCE
+#include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
+#include <stdatomic.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+
+extern void* __libc_malloc(size_t size);
+extern void* __libc_calloc(size_t nmemb, size_t size);
+extern void* __libc_realloc(void* ptr, size_t size);
+extern void* __libc_memalign(size_t alignment, size_t size);
+
+static atomic_ulong count_;
+
+void*
+malloc(size_t size)
+{
+  atomic_fetch_add_explicit(&count_, 1, memory_order_relaxed);
+  return __libc_malloc(size);
+}
+
+void*
+calloc(size_t nmemb, size_t size)
+{
+  atomic_fetch_add_explicit(&count_, 1, memory_order_relaxed);
+  return __libc_calloc(nmemb, size);
+}
+
+void*
+realloc(void* ptr, size_t size)
+{
+  atomic_fetch_add_explicit(&count_, 1, memory_order_relaxed);
+  return __libc_realloc(ptr, size);
+}
+
+int
+posix_memalign(void** memptr, size_t alignment, size_t size)
+{
+  atomic_fetch_add_explicit(&count_, 1, memory_order_relaxed);
+  void* ptr = __libc_memalign(alignment, size);
+  if (ptr == NULL) {
+    return ENOMEM;
+  }
+  *memptr = ptr;
+  return 0;
+}
+
+// Only async-signal-safe calls are allowed in the handler so the count
+// is formatted by hand and written with write().
+static void
+sample(int signum)
+{
+  const char* path = getenv("MALLOC_COUNT_FILE");
+  if (path == NULL) {
+    return;
+  }
+  char buf[32];
+  size_t pos = sizeof(buf);
+  buf[--pos] = '\n';
+  unsigned long count = atomic_load_explicit(&count_, memory_order_relaxed);
+  do {
+    buf[--pos] = '0' + (count % 10);
+    count /= 10;
+  } while (count > 0);
+
+  int fd = open(path, O_WRONLY | O_CREAT | O_APPEND, 0644);
+  if (fd >= 0) {
+    ssize_t written = write(fd, buf + pos, sizeof(buf) - pos);
+    (void)written;
+    close(fd);
+  }
+}
+
+__attribute__((constructor)) static void
+install()
+{
+  struct sigaction action;
+  memset(&action, 0, sizeof(action));
+  action.sa_handler = sample;
+  sigaction(SIGUSR2, &action, NULL);
+}
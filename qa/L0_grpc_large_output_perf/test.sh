@@ -0,0 +1,123 @@
+#!/bin/bash
+# Copyright (c) 2024, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Measures GRPC throughput and the number of server side allocations per
+# request of an identity model as the tensor size grows into the multi-MB
+# range, where filling and reallocating the response buffers dominate.
+# The server runs with malloc_count.so preloaded to count allocations.
+# The results are written to grpc_large_output_perf.csv. The test fails
+# if any response is wrong, the numbers are for reporting.
+
+export CUDA_VISIBLE_DEVICES=""
+
+MODEL=identity_uint8
+PERF_CLIENT=large_output_perf.py
+RESULTS=grpc_large_output_perf.csv
+CLIENT_LOG="./client.log"
+MALLOC_COUNT_LIB=`pwd`/malloc_count.so
+export MALLOC_COUNT_FILE=`pwd`/malloc_count.txt
+
+BYTE_SIZES=${BYTE_SIZES:="65536 1048576 4194304 16777216"}
+CONCURRENCY=${CONCURRENCY:=4}
+REQUESTS=${REQUESTS:=200}
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_ARGS="--model-repository=`pwd`/models"
+SERVER_LOG="./inference_server.log"
+source ../common/util.sh
+
+rm -fr *.log *.csv *.so models $MALLOC_COUNT_FILE
+
+gcc -O2 -Wall -shared -fPIC -o $MALLOC_COUNT_LIB malloc_count.c
+if [ $? -ne 0 ]; then
+    echo -e "\n***\n*** Failed to build malloc_count.so\n***"
+    exit 1
+fi
+
+mkdir -p models/${MODEL}/1
+cat > models/${MODEL}/config.pbtxt << EOF2
+name: "${MODEL}"
+backend: "identity"
+max_batch_size: 0
+input [
+  {
+    name: "INPUT0"
+    data_type: TYPE_UINT8
+    dims: [ -1 ]
+  }
+]
+output [
+  {
+    name: "OUTPUT0"
+    data_type: TYPE_UINT8
+    dims: [ -1 ]
+  }
+]
+instance_group [
+  {
+    kind: KIND_CPU
+    count: ${CONCURRENCY}
+  }
+]
+EOF2
+
+SERVER_LD_PRELOAD=$MALLOC_COUNT_LIB
+run_server
+if [ "$SERVER_PID" == "0" ]; then
+    echo -e "\n***\n*** Failed to start $SERVER\n***"
+    cat $SERVER_LOG
+    exit 1
+fi
+
+RET=0
+
+echo "byte_size,concurrency,infer_per_sec,gbytes_per_sec,allocs_per_request" > $RESULTS
+
+set +e
+for BYTE_SIZE in $BYTE_SIZES; do
+    python3 $PERF_CLIENT -b $BYTE_SIZE -c $CONCURRENCY -n $REQUESTS \
+        -p $SERVER_PID -f $MALLOC_COUNT_FILE >> $RESULTS 2>> $CLIENT_LOG
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** $PERF_CLIENT failed for ${BYTE_SIZE} bytes\n***"
+        RET=1
+    fi
+done
+set -e
+
+kill $SERVER_PID
+wait $SERVER_PID
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
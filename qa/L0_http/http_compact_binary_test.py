@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# Copyright 2022-2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+
+sys.path.append("../common")
+
+import json
+import struct
+import time
+import unittest
+
+import numpy as np
+import requests
+import test_util as tu
+
+COMPACT_CONTENT_TYPE = "application/vnd.triton.infer-compact"
+MAGIC = b"TRTB"
+VERSION = 1
+# TRITONSERVER_DataType values
+FP32 = 11
+
+
+def encode_request(inputs, outputs=(), request_id=""):
+    # 'inputs' is a list of (name, numpy array) in the order the data
+    # follows the header
+    id_bytes = request_id.encode()
+    header = [
+        MAGIC,
+        struct.pack("<HHIII", VERSION, 0, len(inputs), len(outputs), len(id_bytes)),
+        id_bytes,
+    ]
+    for name, data in inputs:
+        name_bytes = name.encode()
+        header.append(
+            struct.pack("<BBHQ", FP32, data.ndim, len(name_bytes), data.nbytes)
+        )
+        header.append(struct.pack("<{}q".format(data.ndim), *data.shape))
+        header.append(name_bytes)
+    for name in outputs:
+        name_bytes = name.encode()
+        header.append(struct.pack("<H", len(name_bytes)))
+        header.append(name_bytes)
+    return b"".join(header + [data.tobytes() for _, data in inputs])
+
+
+def decode_response(body):
+    assert body[:4] == MAGIC
+    version, _, output_count, id_size = struct.unpack_from("<HHII", body, 4)
+    assert version == VERSION
+    offset = 16
+    request_id = body[offset : offset + id_size].decode()
+    offset += id_size
+    (model_name_size,) = struct.unpack_from("<I", body, offset)
+    offset += 4
+    model_name = body[offset : offset + model_name_size].decode()
+    offset += model_name_size
+    (model_version,) = struct.unpack_from("<q", body, offset)
+    offset += 8
+
+    descriptors = []
+    for _ in range(output_count):
+        datatype, dim_count, name_size, byte_size = struct.unpack_from(
+            "<BBHQ", body, offset
+        )
+        offset += 12
+        shape = struct.unpack_from("<{}q".format(dim_count), body, offset)
+        offset += 8 * dim_count
+        name = body[offset : offset + name_size].decode()
+        offset += name_size
+        descriptors.append((name, datatype, shape, byte_size))
+
+    outputs = {}
+    for name, datatype, shape, byte_size in descriptors:
+        assert datatype == FP32
+        outputs[name] = np.frombuffer(
+            body[offset : offset + byte_size], dtype=np.float32
+        ).reshape(shape)
+        offset += byte_size
+    assert offset == len(body)
+    return request_id, model_name, model_version, outputs
+
+
+class HttpCompactBinaryTest(tu.TestResultCollector):
+    def setUp(self):
+        self.model_ = "onnx_zero_3_float32"
+        self.url_ = "http://localhost:8000/v2/models/{}/infer".format(self.model_)
+        self.inputs_ = [
+            ("INPUT{}".format(i), np.arange(16, dtype=np.float32) * (i + 1))
+            for i in range(3)
+        ]
+
+    def _post(self, body, session=requests):
+        return session.post(
+            self.url_, data=body, headers={"Content-Type": COMPACT_CONTENT_TYPE}
+        )
+
+    def test_infer(self):
+        r = self._post(encode_request(self.inputs_, request_id="compact_1"))
+        r.raise_for_status()
+        self.assertEqual(r.headers["Content-Type"], COMPACT_CONTENT_TYPE)
+        request_id, model_name, model_version, outputs = decode_response(r.content)
+        self.assertEqual(request_id, "compact_1")
+        self.assertEqual(model_name, self.model_)
+        self.assertEqual(model_version, 1)
+        self.assertEqual(sorted(outputs), ["OUTPUT0", "OUTPUT1", "OUTPUT2"])
+        for i, (_, data) in enumerate(self.inputs_):
+            np.testing.assert_array_equal(outputs["OUTPUT{}".format(i)], data)
+
+    def test_requested_outputs(self):
+        r = self._post(encode_request(self.inputs_, outputs=["OUTPUT2"]))
+        r.raise_for_status()
+        _, _, _, outputs = decode_response(r.content)
+        self.assertEqual(list(outputs), ["OUTPUT2"])
+        np.testing.assert_array_equal(outputs["OUTPUT2"], self.inputs_[2][1])
+
+    def test_chunked_request(self):
+        # Inputs are read across the chunks of the HTTP body
+        body = encode_request(self.inputs_)
+        chunks = (body[i : i + 7] for i in range(0, len(body), 7))
+        r = self._post(chunks)
+        r.raise_for_status()
+        _, _, _, outputs = decode_response(r.content)
+        np.testing.assert_array_equal(outputs["OUTPUT1"], self.inputs_[1][1])
+
+    def test_invalid_request(self):
+        body = encode_request(self.inputs_)
+        for invalid, message in (
+            (b"XXXX" + body[4:], "unexpected magic"),
+            (
+                body[:6] + struct.pack("<H", 1) + body[8:],
+                "reserved flags 1 must be 0",
+            ),
+            (body[:20], "unexpected end of compact binary inference request"),
+            (body[:-4], "unexpected size for input 'INPUT2'"),
+            (body + b"\0", "unexpected additional 1 bytes"),
+        ):
+            r = self._post(invalid)
+            self.assertEqual(r.status_code, 400, message)
+            self.assertIn(message, r.json()["error"])
+
+    def test_benchmark(self):
+        # Compare the compact binary framing with the JSON and binary data
+        # extension paths for small tensors, all sent on one connection
+        iterations = 2000
+        session = requests.Session()
+        results = {}
+
+        def run(name, infer):
+            np.testing.assert_array_equal(infer(), self.inputs_[0][1])
+            start = time.perf_counter()
+            for _ in range(iterations):
+                infer()
+            results[name] = (time.perf_counter() - start) / iterations * 1e6
+
+        def json_infer():
+            request = {
+                "inputs": [
+                    {
+                        "name": name,
+                        "shape": list(data.shape),
+                        "datatype": "FP32",
+                        "data": data.tolist(),
+                    }
+                    for name, data in self.inputs_
+                ]
+            }
+            r = session.post(self.url_, data=json.dumps(request))
+            output = r.json()["outputs"][0]
+            return np.array(output["data"], dtype=np.float32)
+
+        binary_header = json.dumps(
+            {
+                "inputs": [
+                    {
+                        "name": name,
+                        "shape": list(data.shape),
+                        "datatype": "FP32",
+                        "parameters": {"binary_data_size": data.nbytes},
+                    }
+                    for name, data in self.inputs_
+                ],
+                "parameters": {"binary_data_output": True},
+            }
+        ).encode()
+        binary_body = binary_header + b"".join(d.tobytes() for _, d in self.inputs_)
+        binary_headers = {"Inference-Header-Content-Length": str(len(binary_header))}
+
+        def binary_infer():
+            r = session.post(self.url_, data=binary_body, headers=binary_headers)
+            header_size = int(r.headers["Inference-Header-Content-Length"])
+            output = json.loads(r.content[:header_size])["outputs"][0]
+            byte_size = output["parameters"]["binary_data_size"]
+            return np.frombuffer(
+                r.content[header_size : header_size + byte_size], dtype=np.float32
+            )
+
+        compact_body = encode_request(self.inputs_)
+
+        def compact_infer():
+            return decode_response(self._post(compact_body, session).content)[3][
+                "OUTPUT0"
+            ]
+
+        run("json", json_infer)
+        run("binary_data", binary_infer)
+        run("compact", compact_infer)
+        for name, usec in results.items():
+            print("{}: {:.1f} usec/infer".format(name, usec))
+
+
+if __name__ == "__main__":
+    unittest.main()
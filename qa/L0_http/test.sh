@@ -640,6 +640,26 @@ else
 fi
 set -e
 
+# Compact binary framing, also reports the per-request latency of the JSON,
+# binary data extension and compact binary requests
+PYTHON_TEST=http_compact_binary_test.py
+EXPECTED_NUM_TESTS=5
+set +e
+python $PYTHON_TEST >${CLIENT_LOG}.compact 2>&1
+if [ $? -ne 0 ]; then
+    cat ${CLIENT_LOG}.compact
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE $EXPECTED_NUM_TESTS
+    if [ $? -ne 0 ]; then
+        cat ${CLIENT_LOG}.compact
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+grep "usec/infer" ${CLIENT_LOG}.compact
+set -e
+
 kill $SERVER_PID
 wait $SERVER_PID
 
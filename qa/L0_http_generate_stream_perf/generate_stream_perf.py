@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Opens a number of concurrent 'generate_stream' requests against the
+# 'token_stream' model and reports the aggregate token throughput, the
+# inter-token latency seen by the client and how many HTTP chunks were
+# received per token. Exits non-zero if any stream is incomplete or out
+# of order.
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+import requests
+
+
+def run_stream(url, index, max_tokens, result):
+    prefix = "s{}".format(index)
+    body = {"text_input": prefix, "max_tokens": max_tokens}
+    r = requests.post(
+        url,
+        data=json.dumps(body),
+        headers={"Accept": "text/event-stream"},
+        stream=True,
+    )
+    r.raise_for_status()
+
+    arrivals = []
+    chunks = 0
+    pending = b""
+    for chunk in r.iter_content(chunk_size=None):
+        now = time.perf_counter_ns()
+        chunks += 1
+        pending += chunk
+        # Every token received in the same chunk arrives at the same time
+        while b"\n\n" in pending:
+            event, pending = pending.split(b"\n\n", 1)
+            if not event.startswith(b"data: "):
+                raise Exception("unexpected event '{}'".format(event))
+            data = json.loads(event[len(b"data: ") :])
+            if "error" in data:
+                raise Exception(data["error"])
+            expected = "{}_{}".format(prefix, len(arrivals))
+            if data["text_output"] != expected:
+                raise Exception(
+                    "expected '{}', got '{}'".format(expected, data["text_output"])
+                )
+            arrivals.append(now)
+    if pending:
+        raise Exception("incomplete event '{}'".format(pending))
+    if len(arrivals) != max_tokens:
+        raise Exception("expected {} tokens, got {}".format(max_tokens, len(arrivals)))
+
+    result["chunks"] = chunks
+    result["gaps"] = [b - a for a, b in zip(arrivals, arrivals[1:])]
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-u", "--url", type=str, default="localhost:8000")
+    parser.add_argument("-m", "--model", type=str, default="token_stream")
+    parser.add_argument("-s", "--streams", type=int, default=16)
+    parser.add_argument("-t", "--tokens", type=int, default=1000)
+    parser.add_argument(
+        "-f",
+        "--flush-interval-us",
+        type=int,
+        default=0,
+        help="Flush interval of the server, only used in the CSV line",
+    )
+    FLAGS = parser.parse_args()
+
+    url = "http://{}/v2/models/{}/generate_stream".format(FLAGS.url, FLAGS.model)
+    results = [{} for _ in range(FLAGS.streams)]
+    errors = []
+
+    def worker(index):
+        try:
+            run_stream(url, index, FLAGS.tokens, results[index])
+        except Exception as ex:
+            errors.append("stream {}: {}".format(index, ex))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(FLAGS.streams)]
+    start = time.perf_counter_ns()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed_s = (time.perf_counter_ns() - start) / 1e9
+
+    if errors:
+        for error in errors:
+            print(error, file=sys.stderr)
+        sys.exit(1)
+
+    tokens = FLAGS.streams * FLAGS.tokens
+    chunks = sum(r["chunks"] for r in results)
+    gaps = [g for r in results for g in r["gaps"]]
+    print(
+        "{},{},{},{:.1f},{:.1f},{:.1f},{:.3f}".format(
+            FLAGS.flush_interval_us,
+            FLAGS.streams,
+            tokens,
+            tokens / elapsed_s,
+            percentile(gaps, 50) / 1000,
+            percentile(gaps, 99) / 1000,
+            chunks / tokens,
+        )
+    )
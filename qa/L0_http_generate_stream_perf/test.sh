@@ -0,0 +1,93 @@
+#!/bin/bash
+# Copyright (c) 2024, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Measures 'generate_stream' token throughput and client side inter-token
+# latency of a decoupled model that emits tokens as fast as it can, with
+# every token flushed on its own ('--http-generate-stream-flush-interval-us'
+# of 0) and with tokens coalesced into periodic flushes. The results are
+# written to generate_stream_perf.csv. The test fails if any stream loses
+# or reorders tokens, the numbers are for reporting.
+
+export CUDA_VISIBLE_DEVICES=""
+
+MODEL=token_stream
+PERF_CLIENT=generate_stream_perf.py
+RESULTS=generate_stream_perf.csv
+CLIENT_LOG="./client.log"
+
+TOKENS=${TOKENS:=1000}
+STREAM_COUNTS=${STREAM_COUNTS:="1 16 64"}
+FLUSH_INTERVALS=${FLUSH_INTERVALS:="0 1000"}
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+source ../common/util.sh
+
+rm -fr *.log *.csv models
+
+mkdir -p models/${MODEL}/1
+cp ../python_models/${MODEL}/model.py models/${MODEL}/1/.
+cp ../python_models/${MODEL}/config.pbtxt models/${MODEL}/.
+
+RET=0
+
+echo "flush_interval_us,streams,tokens,tokens_per_sec,itl_p50_us,itl_p99_us,chunks_per_token" > $RESULTS
+
+for INTERVAL in $FLUSH_INTERVALS; do
+    SERVER_ARGS="--model-repository=`pwd`/models --http-generate-stream-flush-interval-us=${INTERVAL}"
+    SERVER_LOG="${SERVER_LOG_BASE}.flush${INTERVAL}.log"
+    run_server
+    if [ "$SERVER_PID" == "0" ]; then
+        echo -e "\n***\n*** Failed to start $SERVER\n***"
+        cat $SERVER_LOG
+        exit 1
+    fi
+
+    set +e
+    for STREAMS in $STREAM_COUNTS; do
+        python3 $PERF_CLIENT -s $STREAMS -t $TOKENS -f $INTERVAL >> $RESULTS 2>> $CLIENT_LOG
+        if [ $? -ne 0 ]; then
+            cat $CLIENT_LOG
+            echo -e "\n***\n*** $PERF_CLIENT failed for flush interval ${INTERVAL}, ${STREAMS} streams\n***"
+            RET=1
+        fi
+    done
+    set -e
+
+    kill $SERVER_PID
+    wait $SERVER_PID
+done
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
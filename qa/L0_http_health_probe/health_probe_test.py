@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+
+sys.path.append("../common")
+
+import csv
+import http.client
+import multiprocessing
+import os
+import time
+import unittest
+
+import numpy as np
+import test_util as tu
+import tritonclient.http as httpclient
+
+MODEL = os.environ.get("MODEL", "identity_uint8")
+HTTP_PORT = 8000
+HEALTH_PORT = int(os.environ.get("HEALTH_PORT", "8003"))
+REFRESH_MS = int(os.environ.get("REFRESH_MS", "500"))
+RESULTS = os.environ.get("RESULTS", "probe_latency.csv")
+# Size and number of concurrent inference requests used to saturate the
+# HTTP endpoint, and for how long
+LOAD_BYTE_SIZE = int(os.environ.get("LOAD_BYTE_SIZE", str(16 * 1024 * 1024)))
+LOAD_CONCURRENCY = int(os.environ.get("LOAD_CONCURRENCY", "16"))
+LOAD_SECONDS = float(os.environ.get("LOAD_SECONDS", "20"))
+# Bound on the 99th percentile latency of probes on the health port
+PROBE_BOUND_MS = float(os.environ.get("PROBE_BOUND_MS", "100"))
+PROBE_INTERVAL_S = 0.05
+
+PROBE_PATHS = [
+    "/v2/health/live",
+    "/v2/health/ready",
+    "/v2/models/{}/ready".format(MODEL),
+]
+
+
+def probe(port, path, method="GET", timeout=10):
+    # A new connection for every probe, as sent by Kubernetes
+    conn = http.client.HTTPConnection("localhost", port, timeout=timeout)
+    try:
+        conn.request(method, path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def run_load(deadline, completed):
+    # Runs in its own process so that the probes are not delayed by the
+    # client holding the GIL
+    client = httpclient.InferenceServerClient("localhost:{}".format(HTTP_PORT))
+    data = np.random.randint(0, 255, size=LOAD_BYTE_SIZE, dtype=np.uint8)
+    inputs = [httpclient.InferInput("INPUT0", data.shape, "UINT8")]
+    inputs[0].set_data_from_numpy(data, binary_data=True)
+    outputs = [httpclient.InferRequestedOutput("OUTPUT0", binary_data=True)]
+    while time.time() < deadline:
+        client.infer(MODEL, inputs, outputs=outputs)
+        with completed.get_lock():
+            completed.value += 1
+
+
+def percentile(latencies, p):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class HealthProbeTest(tu.TestResultCollector):
+    def _wait_for_status(self, path, status):
+        deadline = time.perf_counter() + 2 * REFRESH_MS / 1000 + 5
+        while time.perf_counter() < deadline:
+            if probe(HEALTH_PORT, path) == status:
+                return
+            time.sleep(0.05)
+        self.fail("'{}' did not return {}".format(path, status))
+
+    def test_probe_latency_under_load(self):
+        completed = multiprocessing.Value("i", 0)
+        deadline = time.time() + LOAD_SECONDS
+        load = [
+            multiprocessing.Process(target=run_load, args=(deadline, completed))
+            for _ in range(LOAD_CONCURRENCY)
+        ]
+        for p in load:
+            p.start()
+
+        # Probe both ports while the load runs, the HTTP port only to
+        # compare against
+        latencies = {HEALTH_PORT: [], HTTP_PORT: []}
+        failures = []
+        time.sleep(2)
+        while time.time() < deadline - 1:
+            for port in latencies:
+                for path in PROBE_PATHS:
+                    start = time.perf_counter()
+                    try:
+                        status = probe(port, path)
+                    except Exception as ex:
+                        status = str(ex)
+                    latencies[port].append((time.perf_counter() - start) * 1000)
+                    if status != 200 and port == HEALTH_PORT:
+                        failures.append((path, status))
+            time.sleep(PROBE_INTERVAL_S)
+
+        for p in load:
+            p.join()
+            self.assertEqual(p.exitcode, 0)
+        self.assertGreater(completed.value, 0)
+
+        with open(RESULTS, "a") as f:
+            for port, port_latencies in latencies.items():
+                csv.writer(f).writerow(
+                    [
+                        "health" if port == HEALTH_PORT else "http",
+                        len(port_latencies),
+                        "{:.2f}".format(percentile(port_latencies, 50)),
+                        "{:.2f}".format(percentile(port_latencies, 99)),
+                        "{:.2f}".format(max(port_latencies)),
+                    ]
+                )
+
+        self.assertEqual(failures, [])
+        self.assertLess(percentile(latencies[HEALTH_PORT], 99), PROBE_BOUND_MS)
+
+    def test_model_ready_follows_load_and_unload(self):
+        path = "/v2/models/{}/ready".format(MODEL)
+        version_path = "/v2/models/{}/versions/1/ready".format(MODEL)
+        self.assertEqual(probe(HEALTH_PORT, path), 200)
+        self.assertEqual(probe(HEALTH_PORT, version_path), 200)
+
+        client = httpclient.InferenceServerClient("localhost:{}".format(HTTP_PORT))
+        try:
+            client.unload_model(MODEL)
+            self._wait_for_status(path, 400)
+            self.assertEqual(probe(HEALTH_PORT, version_path), 400)
+        finally:
+            client.load_model(MODEL)
+        self._wait_for_status(path, 200)
+        self.assertEqual(probe(HEALTH_PORT, version_path), 200)
+
+    def test_other_requests(self):
+        self.assertEqual(probe(HEALTH_PORT, "/v2/models/unknown/ready"), 400)
+        self.assertEqual(
+            probe(HEALTH_PORT, "/v2/models/{}/versions/2/ready".format(MODEL)), 400
+        )
+        self.assertEqual(probe(HEALTH_PORT, "/v2/health/live", method="POST"), 405)
+        # Only the probes are served on the health port
+        self.assertEqual(probe(HEALTH_PORT, "/v2"), 404)
+        self.assertEqual(probe(HEALTH_PORT, "/v2/models/{}".format(MODEL)), 404)
+        self.assertEqual(probe(HEALTH_PORT, "/metrics"), 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
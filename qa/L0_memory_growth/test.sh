@@ -207,7 +207,7 @@ for MODEL in $(ls models); do
     ms_print ${MASSIF_LOG} | head -n35 >> ${GRAPH_LOG}
     cat ${GRAPH_LOG}
     # Check the massif output
-    python $MASSIF_TEST $MASSIF_LOG $MAX_ALLOWED_ALLOC --start-from-middle >> $CLIENT_LOG 2>&1
+    python $MASSIF_TEST $MASSIF_LOG $MAX_ALLOWED_ALLOC --start-from-middle --json-report ${MASSIF_LOG}.json >> $CLIENT_LOG 2>&1
     if [ $? -ne 0 ]; then
         cat $CLIENT_LOG
         echo -e "\n***\n*** Test for $MODEL Failed.\n***"
@@ -281,7 +281,7 @@ if [ $SKIP_BUSYOP -ne 1 ]; then
     ms_print ${MASSIF_LOG} | head -n35 >> ${GRAPH_LOG}
     cat ${GRAPH_LOG}
     # Check the massif output
-    python $MASSIF_TEST $MASSIF_LOG $MAX_ALLOWED_ALLOC --start-from-middle >> $CLIENT_LOG 2>&1
+    python $MASSIF_TEST $MASSIF_LOG $MAX_ALLOWED_ALLOC --start-from-middle --json-report ${MASSIF_LOG}.json >> $CLIENT_LOG 2>&1
     # This busyop test is expected to return a non-zero error since it is
     # intentionally testing unbounded growth. If it returns success for some
     # reason, raise error.
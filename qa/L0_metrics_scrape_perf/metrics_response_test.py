@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+sys.path.append("../common")
+
+import csv
+import os
+import time
+import unittest
+
+import numpy as np
+import requests
+import test_util as tu
+import tritonclient.http as httpclient
+
+METRICS_URL = "http://localhost:8002/metrics"
+MODEL_COUNT = int(os.environ.get("MODEL_COUNT", "1000"))
+VERSION_COUNT = int(os.environ.get("VERSION_COUNT", "3"))
+# Lifetime of a cached response, 0 if the server formats every response
+CACHE_TTL_MS = int(os.environ.get("CACHE_TTL_MS", "0"))
+SCRAPE_COUNT = int(os.environ.get("SCRAPE_COUNT", "50"))
+RESULTS = os.environ.get("RESULTS", "scrape_latency.csv")
+
+
+def scrape(params=None, encoding="identity"):
+    r = requests.get(METRICS_URL, params=params, headers={"Accept-Encoding": encoding})
+    r.raise_for_status()
+    return r
+
+
+def samples(text):
+    return [line for line in text.splitlines() if line and not line.startswith("#")]
+
+
+def inference_count(text, model, version):
+    prefix = 'nv_inference_count{{model="{}",version="{}"}} '.format(model, version)
+    for line in samples(text):
+        if line.startswith(prefix):
+            return int(float(line[len(prefix) :]))
+    raise Exception("no inference count for {} version {}".format(model, version))
+
+
+class MetricsResponseTest(tu.TestResultCollector):
+    def test_gzip(self):
+        r = scrape(encoding="gzip")
+        self.assertEqual(r.headers.get("Content-Encoding"), "gzip")
+        self.assertIn("Accept-Encoding", r.headers.get("Vary", ""))
+        identity = scrape()
+        self.assertIsNone(identity.headers.get("Content-Encoding"))
+        # 'requests' decompresses the body
+        self.assertLess(int(r.headers["Content-Length"]), len(identity.content))
+        if CACHE_TTL_MS > 0:
+            self.assertEqual(r.text, identity.text)
+
+    def test_model_filter(self):
+        text = scrape({"model": "identity_0,identity_1"}).text
+        lines = samples(text)
+        self.assertGreater(len(lines), 0)
+        for line in lines:
+            self.assertTrue(
+                ('model="identity_0"' in line) or ('model="identity_1"' in line),
+                line,
+            )
+        counts = [line for line in lines if line.startswith("nv_inference_count{")]
+        self.assertEqual(len(counts), 2 * VERSION_COUNT)
+
+    def test_family_filter(self):
+        families = ["nv_inference_count", "nv_inference_exec_count"]
+        text = scrape({"family": ",".join(families)}, encoding="gzip").text
+        seen = set()
+        for line in text.splitlines():
+            if line.startswith("# "):
+                family = line.split(" ")[2]
+            else:
+                family = line.split("{")[0]
+            self.assertIn(family, families)
+            seen.add(family)
+        self.assertEqual(seen, set(families))
+        self.assertEqual(len(samples(text)), 2 * MODEL_COUNT * VERSION_COUNT)
+
+        # Unknown families leave an empty body
+        self.assertEqual(scrape({"family": "nv_unknown"}, encoding="gzip").text, "")
+
+    def test_cache_ttl(self):
+        if CACHE_TTL_MS == 0:
+            self.skipTest("server does not cache metrics responses")
+        ttl_s = CACHE_TTL_MS / 1000.0
+
+        # Let any cached response expire so that the next scrape formats
+        # the metrics and the following one within the TTL reuses it
+        scrape()
+        time.sleep(ttl_s + 0.5)
+        before = inference_count(scrape().text, "identity_0", 1)
+
+        client = httpclient.InferenceServerClient("localhost:8000")
+        inputs = [httpclient.InferInput("INPUT0", [16], "FP32")]
+        inputs[0].set_data_from_numpy(np.ones([16], dtype=np.float32))
+        client.infer("identity_0", inputs, model_version="1")
+        self.assertEqual(inference_count(scrape().text, "identity_0", 1), before)
+
+        time.sleep(ttl_s + 0.5)
+        self.assertEqual(inference_count(scrape().text, "identity_0", 1), before + 1)
+
+    def test_scrape_latency(self):
+        cases = [
+            ("full", None),
+            ("model", {"model": "identity_0"}),
+            ("family", {"family": "nv_inference_count"}),
+        ]
+        with open(RESULTS, "a") as f:
+            writer = csv.writer(f)
+            for encoding in ["identity", "gzip"]:
+                for name, params in cases:
+                    latencies = []
+                    byte_size = 0
+                    for _ in range(SCRAPE_COUNT):
+                        start = time.perf_counter()
+                        r = scrape(params, encoding)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        byte_size = int(r.headers["Content-Length"])
+                    writer.writerow(
+                        [
+                            MODEL_COUNT * VERSION_COUNT,
+                            CACHE_TTL_MS,
+                            encoding,
+                            name,
+                            byte_size,
+                            "{:.2f}".format(np.percentile(latencies, 50)),
+                            "{:.2f}".format(np.percentile(latencies, 99)),
+                        ]
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/bin/bash
+# Copyright (c) 2024, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Loads thousands of model versions and measures the latency of scraping
+# the metrics endpoint, formatting the metrics on every scrape and with
+# '--metrics-response-cache', for identity and gzip encoded responses and
+# for the 'model' and 'family' filters. Also checks the encoding, the
+# filters and the cache lifetime. The latencies are written to
+# scrape_latency.csv.
+
+export CUDA_VISIBLE_DEVICES=""
+
+export MODEL_COUNT=${MODEL_COUNT:=1000}
+export VERSION_COUNT=${VERSION_COUNT:=3}
+export RESULTS=scrape_latency.csv
+METRICS_INTERVAL_MS=2000
+
+TEST_PY=metrics_response_test.py
+TEST_RESULT_FILE="test_results.txt"
+CLIENT_LOG="./client.log"
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+# Loading thousands of model versions takes a while
+SERVER_TIMEOUT=600
+source ../common/util.sh
+
+rm -fr *.log *.csv models
+
+for i in $(seq 0 $((MODEL_COUNT - 1))); do
+    MODEL=identity_${i}
+    for v in $(seq 1 $VERSION_COUNT); do
+        mkdir -p models/${MODEL}/${v}
+    done
+    cat > models/${MODEL}/config.pbtxt << EOF2
+name: "${MODEL}"
+backend: "identity"
+max_batch_size: 0
+version_policy: { all { }}
+input [
+  {
+    name: "INPUT0"
+    data_type: TYPE_FP32
+    dims: [ 16 ]
+  }
+]
+output [
+  {
+    name: "OUTPUT0"
+    data_type: TYPE_FP32
+    dims: [ 16 ]
+  }
+]
+EOF2
+done
+
+RET=0
+
+echo "model_versions,cache_ttl_ms,encoding,filter,byte_size,p50_ms,p99_ms" > $RESULTS
+
+# Run the checks and the benchmark with the response cache, then the
+# benchmark and the checks that don't depend on caching without it
+for CACHE in true false; do
+    if [ "$CACHE" == "true" ]; then
+        export CACHE_TTL_MS=$METRICS_INTERVAL_MS
+        TESTS=""
+    else
+        export CACHE_TTL_MS=0
+        TESTS="MetricsResponseTest.test_model_filter MetricsResponseTest.test_family_filter MetricsResponseTest.test_scrape_latency"
+    fi
+    SERVER_ARGS="--model-repository=`pwd`/models --model-load-thread-count=16 --metrics-interval-ms=${METRICS_INTERVAL_MS} --metrics-response-cache=${CACHE}"
+    SERVER_LOG="${SERVER_LOG_BASE}.cache_${CACHE}.log"
+    run_server
+    if [ "$SERVER_PID" == "0" ]; then
+        echo -e "\n***\n*** Failed to start $SERVER\n***"
+        cat $SERVER_LOG
+        exit 1
+    fi
+
+    set +e
+    python3 $TEST_PY $TESTS >> $CLIENT_LOG 2>&1
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** Test Failed with --metrics-response-cache=${CACHE}\n***"
+        RET=1
+    else
+        if [ "$CACHE" == "true" ]; then
+            EXPECTED_NUM_TESTS=5
+        else
+            EXPECTED_NUM_TESTS=3
+        fi
+        check_test_results $TEST_RESULT_FILE $EXPECTED_NUM_TESTS
+        if [ $? -ne 0 ]; then
+            cat $CLIENT_LOG
+            echo -e "\n***\n*** Test Result Verification Failed\n***"
+            RET=1
+        fi
+    fi
+    set -e
+
+    kill $SERVER_PID
+    wait $SERVER_PID
+done
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
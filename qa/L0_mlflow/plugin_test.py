@@ -34,6 +34,7 @@ import json
 import unittest
 
 import numpy as np
+import pandas as pd
 import test_util as tu
 from mlflow.deployments import get_deploy_client
 
@@ -74,6 +75,22 @@ class PluginTest(tu.TestResultCollector):
                     err_msg="Inference result is not correct",
                 )
 
+        # predict with more samples than the max batch size of the model,
+        # both as dict and as DataFrame with one column per input
+        input0 = np.arange(20 * 16, dtype=np.float32).reshape(20, 16)
+        input1 = np.ones((20, 16), dtype=np.float32)
+        for batched_inputs in (
+            {"INPUT0": input0, "INPUT1": input1},
+            pd.DataFrame({"INPUT0": list(input0), "INPUT1": list(input1)}),
+        ):
+            output = self.client_.predict(model_name, batched_inputs)
+            np.testing.assert_array_equal(
+                output["outputs"]["OUTPUT0"], (input0 + input1).astype(np.int32)
+            )
+            np.testing.assert_array_equal(
+                output["outputs"]["OUTPUT1"], (input0 - input1).astype(np.int32)
+            )
+
         # delete
         self.client_.delete_deployment(model_name)
 
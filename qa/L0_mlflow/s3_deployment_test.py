@@ -0,0 +1,158 @@
+#!/usr/bin/python
+
+# Copyright 2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+sys.path.append("../common")
+
+import json
+import os
+import unittest
+
+import test_util as tu
+from mlflow_triton.deployments import TritonPlugin
+from moto import mock_aws
+
+BUCKET = "triton-deployment-test"
+PREFIX = "models"
+
+
+class RepositoryIndex:
+    # Stands in for the Triton client, only the repository index is used by
+    # the calls under test
+    def __init__(self, names):
+        self.names = names
+
+    def get_model_repository_index(self):
+        return [{"name": n, "version": "1", "state": "READY"} for n in self.names]
+
+    def unload_model(self, name):
+        pass
+
+
+class S3DeploymentTest(tu.TestResultCollector):
+    def setUp(self):
+        os.environ["TRITON_MODEL_REPO"] = "s3://{}/{}".format(BUCKET, PREFIX)
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+        self.mock_ = mock_aws()
+        self.mock_.start()
+        self.plugin_ = TritonPlugin("triton")
+        self.s3_ = self.plugin_.server_config["s3"]
+        self.s3_.create_bucket(Bucket=BUCKET)
+
+        self.get_object_calls_ = 0
+        get_object = self.s3_.get_object
+
+        def counting_get_object(**kwargs):
+            self.get_object_calls_ += 1
+            return get_object(**kwargs)
+
+        self.s3_.get_object = counting_get_object
+
+    def tearDown(self):
+        self.mock_.stop()
+
+    def _put_meta(self, name, uri):
+        meta_dict = {
+            "name": name,
+            "triton_model_path": "s3://{}/{}/{}".format(BUCKET, PREFIX, name),
+            "mlflow_model_uri": uri,
+            "flavor": "onnx",
+        }
+        self.s3_.put_object(
+            Bucket=BUCKET,
+            Key="{}/{}/mlflow-meta.json".format(PREFIX, name),
+            Body=json.dumps(meta_dict).encode("utf-8"),
+        )
+
+    def test_list_deployments_cached(self):
+        names = ["model_{}".format(i) for i in range(20)]
+        for name in names:
+            self._put_meta(name, "models:/{}/1".format(name))
+        # Models without MLflow meta are not listed
+        self.plugin_.triton_client = RepositoryIndex(names + ["not_mlflow"])
+
+        deployments = self.plugin_.list_deployments()
+        self.assertEqual([d["name"] for d in deployments], names)
+        self.assertEqual(deployments[3]["mlflow_model_uri"], "models:/model_3/1")
+        self.assertEqual(self.get_object_calls_, 21)
+
+        # Served from the cache within the TTL
+        self.plugin_.server_config["meta_cache_ttl"] = 3600
+        self.assertEqual(len(self.plugin_.list_deployments()), 20)
+        self.assertEqual(
+            self.plugin_.get_deployment("model_5")["mlflow_model_uri"],
+            "models:/model_5/1",
+        )
+        self.assertEqual(self.get_object_calls_, 21)
+
+        # Revalidated after the TTL, picking up the modified meta
+        self.plugin_.server_config["meta_cache_ttl"] = 0
+        self._put_meta("model_5", "models:/model_5/2")
+        self.assertEqual(
+            self.plugin_.get_deployment("model_5")["mlflow_model_uri"],
+            "models:/model_5/2",
+        )
+        self.assertEqual(
+            self.plugin_.get_deployment("model_6")["mlflow_model_uri"],
+            "models:/model_6/1",
+        )
+        with self.assertRaises(ValueError):
+            self.plugin_.get_deployment("not_mlflow")
+
+    def test_delete_deployment_files(self):
+        self._put_meta("big_model", "models:/big_model/1")
+        self._put_meta("big_model_2", "models:/big_model_2/1")
+        for i in range(2500):
+            self.s3_.put_object(
+                Bucket=BUCKET, Key="{}/big_model/1/part_{}".format(PREFIX, i), Body=b""
+            )
+
+        delete_calls = []
+        delete_objects = self.s3_.delete_objects
+
+        def counting_delete_objects(**kwargs):
+            delete_calls.append(len(kwargs["Delete"]["Objects"]))
+            return delete_objects(**kwargs)
+
+        self.s3_.delete_objects = counting_delete_objects
+        self.plugin_.triton_client = RepositoryIndex(["big_model", "big_model_2"])
+        self.plugin_.delete_deployment("big_model")
+
+        self.assertEqual(sum(delete_calls), 2501)
+        self.assertTrue(all(n <= 1000 for n in delete_calls))
+        remaining = self.s3_.list_objects_v2(Bucket=BUCKET, Prefix=PREFIX)["Contents"]
+        # A model sharing the name prefix is left untouched
+        self.assertEqual(
+            [obj["Key"] for obj in remaining],
+            ["{}/big_model_2/mlflow-meta.json".format(PREFIX)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
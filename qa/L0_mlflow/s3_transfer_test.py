@@ -0,0 +1,151 @@
+#!/usr/bin/python
+
+# Copyright 2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+sys.path.append("../common")
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import boto3
+import test_util as tu
+from mlflow_triton.s3_transfer import S3Uploader
+from moto import mock_aws
+
+BUCKET = "triton-transfer-test"
+CHUNK_SIZE = 5 * 1024 * 1024
+
+
+class S3TransferTest(tu.TestResultCollector):
+    def setUp(self):
+        self.mock_ = mock_aws()
+        self.mock_.start()
+        self.client_ = boto3.client("s3", region_name="us-east-1")
+        self.client_.create_bucket(Bucket=BUCKET)
+        self.dir_ = tempfile.mkdtemp()
+
+        # Two small files and one file large enough for a 3 part upload
+        self.files_ = []
+        for name, size in (
+            ("config.pbtxt", 64),
+            ("1/labels.txt", 1024),
+            ("1/model.onnx", 2 * CHUNK_SIZE + 1234),
+        ):
+            path = os.path.join(self.dir_, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(os.urandom(size))
+            self.files_.append((path, os.path.join("models/mymodel", name)))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_)
+        self.mock_.stop()
+
+    def _uploader(self, **kwargs):
+        return S3Uploader(
+            self.client_,
+            BUCKET,
+            max_concurrency=4,
+            multipart_threshold=CHUNK_SIZE,
+            multipart_chunksize=CHUNK_SIZE,
+            **kwargs
+        )
+
+    def _assert_uploaded(self):
+        for path, key in self.files_:
+            body = self.client_.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+            with open(path, "rb") as f:
+                self.assertEqual(body, f.read(), "content mismatch for " + key)
+
+    def test_upload_and_skip(self):
+        uploader = self._uploader()
+        self.assertEqual(uploader.upload(self.files_), {"uploaded": 3, "skipped": 0})
+        self._assert_uploaded()
+
+        # Local ETags must match what S3 assigned, including the multipart one
+        for path, key in self.files_:
+            head = self.client_.head_object(Bucket=BUCKET, Key=key)
+            self.assertEqual(
+                uploader.local_etag(path, os.path.getsize(path)),
+                head["ETag"].strip('"'),
+            )
+
+        # Nothing changed, nothing is sent again
+        self.assertEqual(uploader.upload(self.files_), {"uploaded": 0, "skipped": 3})
+
+        # Only the modified file is sent again
+        with open(self.files_[1][0], "wb") as f:
+            f.write(os.urandom(1024))
+        self.assertEqual(uploader.upload(self.files_), {"uploaded": 1, "skipped": 2})
+        self._assert_uploaded()
+
+    def test_resume(self):
+        # Simulate an interrupted upload that sent the first part only
+        path, key = self.files_[2]
+        upload_id = self.client_.create_multipart_upload(Bucket=BUCKET, Key=key)[
+            "UploadId"
+        ]
+        with open(path, "rb") as f:
+            self.client_.upload_part(
+                Bucket=BUCKET,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=1,
+                Body=f.read(CHUNK_SIZE),
+            )
+
+        sent_parts = []
+        upload_part = self.client_.upload_part
+
+        def recording_upload_part(**kwargs):
+            sent_parts.append(kwargs["PartNumber"])
+            return upload_part(**kwargs)
+
+        self.client_.upload_part = recording_upload_part
+        self.assertEqual(
+            self._uploader().upload(self.files_), {"uploaded": 3, "skipped": 0}
+        )
+        self.assertEqual(sorted(sent_parts), [2, 3])
+        self.assertEqual(
+            len(self.client_.list_multipart_uploads(Bucket=BUCKET).get("Uploads", [])),
+            0,
+        )
+        self._assert_uploaded()
+
+    def test_invalid_config(self):
+        with self.assertRaises(Exception):
+            S3Uploader(self.client_, BUCKET, max_concurrency=0)
+        with self.assertRaises(Exception):
+            S3Uploader(self.client_, BUCKET, multipart_chunksize=1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -63,6 +63,42 @@ mkdir -p ./mlflow/artifacts
 
 pip install ./mlflow-triton-plugin/
 
+# S3 transfer engine against a local S3 stand-in
+set +e
+pip install moto
+TRANSFER_LOG=s3_transfer.log
+TRANSFER_TEST=s3_transfer_test.py
+TEST_RESULT_FILE='test_results.txt'
+python $TRANSFER_TEST >>$TRANSFER_LOG 2>&1
+if [ $? -ne 0 ]; then
+    cat $TRANSFER_LOG
+    echo -e "\n***\n*** S3 Transfer Test Failed\n***"
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE 3
+    if [ $? -ne 0 ]; then
+        cat $TRANSFER_LOG
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+
+DEPLOYMENT_TEST=s3_deployment_test.py
+python $DEPLOYMENT_TEST >>$TRANSFER_LOG 2>&1
+if [ $? -ne 0 ]; then
+    cat $TRANSFER_LOG
+    echo -e "\n***\n*** S3 Deployment Test Failed\n***"
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE 2
+    if [ $? -ne 0 ]; then
+        cat $TRANSFER_LOG
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+set -e
+
 # Clear mlflow registered models if any
 python - << EOF
 from mlflow.tracking import MlflowClient
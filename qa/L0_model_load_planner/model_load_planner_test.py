@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+
+sys.path.append("../common")
+
+import csv
+import json
+import os
+import time
+import unittest
+
+import test_util as tu
+import tritonclient.http as httpclient
+
+# "server" or "planner", which one ordered the startup model loads
+MODE = os.environ.get("MODE", "planner")
+# Time the server was started, in seconds since the epoch
+START_TIME = float(os.environ["START_TIME"])
+SMALL_MODEL_COUNT = int(os.environ.get("SMALL_MODEL_COUNT", "4"))
+TIMELINE = os.environ.get("TIMELINE", "load_timeline.json")
+RESULTS = os.environ.get("RESULTS", "load_planner.csv")
+READY_TIMEOUT_S = float(os.environ.get("READY_TIMEOUT_S", "120"))
+# Dedicated health probe listener, answered from the readiness cache
+HEALTH_PORT = int(os.environ.get("HEALTH_PORT", "8003"))
+
+LARGE_MODEL = "zz_large"
+ENSEMBLE_MODEL = "ensemble_large"
+SMALL_MODELS = ["small_{}".format(i) for i in range(SMALL_MODEL_COUNT)]
+MODELS = SMALL_MODELS + [LARGE_MODEL, ENSEMBLE_MODEL]
+
+
+def record(metric, value):
+    with open(RESULTS, "a") as f:
+        csv.writer(f).writerow([MODE, metric, value])
+
+
+def recorded(mode, metric):
+    with open(RESULTS) as f:
+        for row in csv.reader(f):
+            if row[0] == mode and row[1] == metric:
+                return float(row[2])
+    return None
+
+
+class ModelLoadPlannerTest(tu.TestResultCollector):
+    @classmethod
+    def setUpClass(cls):
+        # Poll the readiness of every model from server start, recording
+        # when each one became ready and whether the server was serving,
+        # or reported ready on the HTTP or the health port, while some were
+        # still loading. The server readiness is read first, so all models
+        # are ready if it was.
+        client = httpclient.InferenceServerClient("localhost:8000")
+        health_client = httpclient.InferenceServerClient(
+            "localhost:{}".format(HEALTH_PORT)
+        )
+        cls.ready_s = {}
+        cls.live_while_loading = False
+        cls.ready_while_loading = False
+        cls.health_ready_while_loading = False
+        cls.server_ready_s = None
+        while (len(cls.ready_s) < len(MODELS)) or (cls.server_ready_s is None):
+            elapsed_s = time.time() - START_TIME
+            if elapsed_s > READY_TIMEOUT_S:
+                break
+            try:
+                live = client.is_server_live()
+                ready = client.is_server_ready()
+                health_ready = health_client.is_server_ready()
+                for model in MODELS:
+                    if model not in cls.ready_s and client.is_model_ready(model):
+                        cls.ready_s[model] = elapsed_s
+                loading = len(cls.ready_s) < len(MODELS)
+                cls.live_while_loading |= live and loading
+                cls.ready_while_loading |= ready and loading
+                cls.health_ready_while_loading |= health_ready and loading
+                if ready and cls.server_ready_s is None:
+                    cls.server_ready_s = elapsed_s
+            except Exception:
+                # The endpoints are not started yet
+                pass
+            time.sleep(0.1)
+
+    def test_time_to_ready(self):
+        self.assertEqual(set(self.ready_s), set(MODELS))
+        time_to_ready_s = max(self.ready_s.values())
+        record("time_to_all_ready_s", time_to_ready_s)
+        if MODE == "planner":
+            server_s = recorded("server", "time_to_all_ready_s")
+            self.assertIsNotNone(server_s)
+            self.assertLess(time_to_ready_s, server_s)
+
+    def test_incremental_readiness(self):
+        if MODE != "planner":
+            self.skipTest("the server is started once all models are loaded")
+        self.assertTrue(self.live_while_loading)
+        self.assertEqual(set(self.ready_s), set(MODELS))
+        # The server is not ready until the plan completes
+        self.assertFalse(self.ready_while_loading)
+        self.assertFalse(self.health_ready_while_loading)
+        self.assertIsNotNone(self.server_ready_s)
+        self.assertGreaterEqual(self.server_ready_s, max(self.ready_s.values()))
+        # The small models load while the large one does and are ready
+        # before it, the ensemble is ready after its steps
+        for model in SMALL_MODELS:
+            self.assertLess(self.ready_s[model], self.ready_s[LARGE_MODEL], model)
+        self.assertGreaterEqual(self.ready_s[ENSEMBLE_MODEL], self.ready_s[LARGE_MODEL])
+
+    def test_timeline(self):
+        if MODE != "planner":
+            self.skipTest("the timeline is written by the planner")
+        with open(TIMELINE) as f:
+            timeline = json.load(f)
+        self.assertEqual(timeline["thread_count"], 2)
+        models = {model["name"]: model for model in timeline["models"]}
+        self.assertEqual(set(models), set(MODELS))
+        for model in models.values():
+            self.assertEqual(model["state"], "READY", model)
+            self.assertLessEqual(model["start_ms"], model["end_ms"], model)
+            self.assertLessEqual(model["end_ms"], timeline["total_ms"], model)
+
+        # The largest model is started first
+        self.assertGreaterEqual(models[LARGE_MODEL]["byte_size"], 1 << 30)
+        for model in SMALL_MODELS:
+            self.assertLessEqual(
+                models[LARGE_MODEL]["start_ms"], models[model]["start_ms"], model
+            )
+
+        # The ensemble is started once its steps are loaded
+        ensemble = models[ENSEMBLE_MODEL]
+        self.assertEqual(
+            sorted(ensemble["dependencies"]), sorted(["small_0", LARGE_MODEL])
+        )
+        for step in ensemble["dependencies"]:
+            self.assertGreaterEqual(ensemble["start_ms"], models[step]["end_ms"], step)
+
+
+if __name__ == "__main__":
+    unittest.main()
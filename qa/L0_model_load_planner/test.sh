@@ -0,0 +1,184 @@
+#!/bin/bash
+# Copyright (c) 2024, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Compares the time until all startup models are ready when the server
+# loads them with the time when '--model-load-planner' does. The
+# repository holds a large model that is slow to load and is last in
+# name order, several small models and an ensemble of the large and a
+# small model. The planner starts the large model first, so its load
+# overlaps the small ones instead of coming after them. Also checks the
+# planner's load timeline, that models become ready one by one, that the
+# server is not ready until all of them are, on the HTTP port and on the
+# dedicated health probe port, and that the planner is rejected without
+# explicit model control. The results are written to load_planner.csv.
+
+export CUDA_VISIBLE_DEVICES=""
+
+export MODEL_REPO=`pwd`/models
+export RESULTS=load_planner.csv
+export TIMELINE=`pwd`/load_timeline.json
+export SMALL_MODEL_COUNT=4
+export HEALTH_PORT=8003
+SMALL_DELAY_SEC=1
+LARGE_DELAY_SEC=10
+
+UNIT_TEST=./model_load_planner_test
+TEST_PY=model_load_planner_test.py
+TEST_RESULT_FILE="test_results.txt"
+CLIENT_LOG="./client.log"
+UNIT_TEST_LOG="./unit_test.log"
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+source ../common/util.sh
+
+function create_model() {
+    local name=$1
+    local delay=$2
+    mkdir -p $MODEL_REPO/${name}/1
+    cp ../python_models/delayed_load_model/model.py $MODEL_REPO/${name}/1/.
+    cp ../python_models/delayed_load_model/config.pbtxt $MODEL_REPO/${name}/.
+    sed -i "s/^name: .*/name: \"${name}\"/" $MODEL_REPO/${name}/config.pbtxt
+    sed -i "s/string_value: .*/string_value: \"${delay}\"/" \
+        $MODEL_REPO/${name}/config.pbtxt
+}
+
+rm -fr *.log *.csv *.json $MODEL_REPO
+
+RET=0
+
+set +e
+$UNIT_TEST >> $UNIT_TEST_LOG 2>&1
+if [ $? -ne 0 ]; then
+    cat $UNIT_TEST_LOG
+    echo -e "\n***\n*** Model Load Planner Unit Test Failed\n***"
+    RET=1
+fi
+set -e
+
+for i in $(seq 0 $((SMALL_MODEL_COUNT - 1))); do
+    create_model small_${i} ${SMALL_DELAY_SEC}
+done
+create_model zz_large ${LARGE_DELAY_SEC}
+# The planner orders loads by the byte size of the model directory, a
+# sparse file makes the model large without using disk space
+truncate -s 1G $MODEL_REPO/zz_large/1/weights.bin
+
+mkdir -p $MODEL_REPO/ensemble_large/1
+cat > $MODEL_REPO/ensemble_large/config.pbtxt << EOF2
+name: "ensemble_large"
+platform: "ensemble"
+max_batch_size: 0
+input [ { name: "IN", data_type: TYPE_FP32, dims: [ -1 ] } ]
+output [ { name: "OUT", data_type: TYPE_FP32, dims: [ -1 ] } ]
+ensemble_scheduling {
+  step [
+    {
+      model_name: "small_0"
+      model_version: -1
+      input_map { key: "IN" value: "IN" }
+      output_map { key: "OUT" value: "small_out" }
+    },
+    {
+      model_name: "zz_large"
+      model_version: -1
+      input_map { key: "IN" value: "small_out" }
+      output_map { key: "OUT" value: "OUT" }
+    }
+  ]
+}
+EOF2
+
+# The planner needs explicit model control, it does not switch to it
+SERVER_ARGS="--model-repository=${MODEL_REPO} --model-load-planner=true"
+SERVER_LOG="${SERVER_LOG_BASE}.none.log"
+run_server
+if [ "$SERVER_PID" != "0" ]; then
+    echo -e "\n***\n*** Unexpected success with --model-control-mode=none\n***"
+    cat $SERVER_LOG
+    kill $SERVER_PID
+    wait $SERVER_PID
+    RET=1
+fi
+set +e
+grep "requires setting '--model-control-mode=explicit'" $SERVER_LOG
+if [ $? -ne 0 ]; then
+    cat $SERVER_LOG
+    echo -e "\n***\n*** Expected the planner to be rejected\n***"
+    RET=1
+fi
+set -e
+
+echo "mode,metric,value" > $RESULTS
+
+# The server's own order first, the planner compares against it
+for MODE in server planner; do
+    export MODE
+    SERVER_ARGS="--model-repository=${MODEL_REPO} --model-load-thread-count=2"
+    SERVER_ARGS="${SERVER_ARGS} --http-health-port=${HEALTH_PORT}"
+    if [ "$MODE" == "planner" ]; then
+        SERVER_ARGS="${SERVER_ARGS} --model-control-mode=explicit --load-model=*"
+        SERVER_ARGS="${SERVER_ARGS} --model-load-planner=true --model-load-timeline=${TIMELINE}"
+    fi
+    export SERVER_LOG="${SERVER_LOG_BASE}.${MODE}.log"
+    export START_TIME=`date +%s.%N`
+    run_server_nowait
+    if [ "$SERVER_PID" == "0" ]; then
+        echo -e "\n***\n*** Failed to start $SERVER\n***"
+        cat $SERVER_LOG
+        exit 1
+    fi
+
+    set +e
+    python3 $TEST_PY >> $CLIENT_LOG 2>&1
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** Test Failed with ${MODE} load order\n***"
+        RET=1
+    else
+        check_test_results $TEST_RESULT_FILE 3
+        if [ $? -ne 0 ]; then
+            cat $CLIENT_LOG
+            echo -e "\n***\n*** Test Result Verification Failed\n***"
+            RET=1
+        fi
+    fi
+    set -e
+
+    kill $SERVER_PID
+    wait $SERVER_PID
+done
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
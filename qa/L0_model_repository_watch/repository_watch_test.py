@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+sys.path.append("../common")
+
+import csv
+import os
+import shutil
+import time
+import unittest
+
+import test_util as tu
+import tritonclient.http as httpclient
+
+# "watch" or "poll", the model control mode the server was started with
+MODE = os.environ.get("MODE", "watch")
+MODEL_REPO = os.environ["MODEL_REPO"]
+MODEL_COUNT = int(os.environ.get("MODEL_COUNT", "2000"))
+SERVER_PID = int(os.environ["SERVER_PID"])
+SERVER_LOG = os.environ.get("SERVER_LOG", "")
+# Longest time a change may take to be applied
+DETECTION_TIMEOUT_S = float(os.environ.get("DETECTION_TIMEOUT_S", "30"))
+IDLE_S = float(os.environ.get("IDLE_S", "30"))
+RESULTS = os.environ.get("RESULTS", "repository_watch.csv")
+
+MODEL_CONFIG = """
+name: "{}"
+backend: "identity"
+max_batch_size: 0
+version_policy: {{ all {{ }}}}
+input [ {{ name: "INPUT0", data_type: TYPE_FP32, dims: [ 16 ] }} ]
+output [ {{ name: "OUTPUT0", data_type: TYPE_FP32, dims: [ 16 ] }} ]
+"""
+
+
+def record(metric, value):
+    with open(RESULTS, "a") as f:
+        csv.writer(f).writerow([MODE, MODEL_COUNT, metric, value])
+
+
+def server_cpu_seconds():
+    # utime and stime of the server process, in clock ticks
+    with open("/proc/{}/stat".format(SERVER_PID)) as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class RepositoryWatchTest(tu.TestResultCollector):
+    def setUp(self):
+        self._client = httpclient.InferenceServerClient("localhost:8000")
+
+    def _wait_for(self, condition):
+        start = time.perf_counter()
+        while not condition():
+            if time.perf_counter() - start > DETECTION_TIMEOUT_S:
+                self.fail("change not applied within {}s".format(DETECTION_TIMEOUT_S))
+            time.sleep(0.01)
+        return (time.perf_counter() - start) * 1000
+
+    def test_add_model(self):
+        model_name = "added_model"
+        self.assertFalse(self._client.is_model_ready(model_name))
+        model_dir = os.path.join(MODEL_REPO, model_name)
+        os.makedirs(os.path.join(model_dir, "1"))
+        with open(os.path.join(model_dir, "config.pbtxt"), "w") as f:
+            f.write(MODEL_CONFIG.format(model_name))
+        latency_ms = self._wait_for(lambda: self._client.is_model_ready(model_name))
+        record("add_latency_ms", "{:.0f}".format(latency_ms))
+
+    def test_modify_model(self):
+        model_name = "identity_0"
+        self.assertTrue(self._client.is_model_ready(model_name, "1"))
+        self.assertFalse(self._client.is_model_ready(model_name, "2"))
+        os.makedirs(os.path.join(MODEL_REPO, model_name, "2"))
+        latency_ms = self._wait_for(
+            lambda: self._client.is_model_ready(model_name, "2")
+        )
+        record("modify_latency_ms", "{:.0f}".format(latency_ms))
+
+    def test_remove_model(self):
+        model_name = "identity_1"
+        self.assertTrue(self._client.is_model_ready(model_name))
+        shutil.rmtree(os.path.join(MODEL_REPO, model_name))
+        latency_ms = self._wait_for(lambda: not self._client.is_model_ready(model_name))
+        record("remove_latency_ms", "{:.0f}".format(latency_ms))
+
+    def test_debounce(self):
+        if MODE != "watch":
+            self.skipTest("only the watcher debounces changes")
+        model_name = "identity_2"
+        config_path = os.path.join(MODEL_REPO, model_name, "config.pbtxt")
+        # A burst of writes shorter than the debounce interval
+        for _ in range(10):
+            with open(config_path, "a") as f:
+                f.write("\n")
+            time.sleep(0.02)
+        time.sleep(2)
+        with open(SERVER_LOG) as f:
+            loads = f.read().count("loading '{}'".format(model_name))
+        self.assertEqual(loads, 1)
+        self.assertTrue(self._client.is_model_ready(model_name))
+
+    def test_idle_cpu(self):
+        # CPU used by the server while nothing changes, all of it goes to
+        # detecting changes
+        start = server_cpu_seconds()
+        time.sleep(IDLE_S)
+        cpu_percent = (server_cpu_seconds() - start) / IDLE_S * 100
+        record("idle_cpu_percent", "{:.2f}".format(cpu_percent))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/bin/bash
+# Copyright (c) 2024, NVIDIA CORPORATION. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Compares '--model-control-mode=watch' with polling on a repository of
+# thousands of models: the time from a model being added, changed or
+# removed until the server applies the change, and the CPU the server
+# uses while the repository is idle. Also checks that a burst of changes
+# to a watched model is applied with a single load. The results are
+# written to repository_watch.csv.
+
+export CUDA_VISIBLE_DEVICES=""
+
+export MODEL_COUNT=${MODEL_COUNT:=2000}
+export MODEL_REPO=`pwd`/models
+export RESULTS=repository_watch.csv
+POLL_SECS=${POLL_SECS:=5}
+DEBOUNCE_MS=200
+
+TEST_PY=repository_watch_test.py
+TEST_RESULT_FILE="test_results.txt"
+CLIENT_LOG="./client.log"
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+# Loading thousands of models takes a while
+SERVER_TIMEOUT=600
+source ../common/util.sh
+
+function setup_models() {
+    rm -rf $MODEL_REPO
+    for i in $(seq 0 $((MODEL_COUNT - 1))); do
+        MODEL=identity_${i}
+        mkdir -p $MODEL_REPO/${MODEL}/1
+        cat > $MODEL_REPO/${MODEL}/config.pbtxt << EOF2
+name: "${MODEL}"
+backend: "identity"
+max_batch_size: 0
+version_policy: { all { }}
+input [ { name: "INPUT0", data_type: TYPE_FP32, dims: [ 16 ] } ]
+output [ { name: "OUTPUT0", data_type: TYPE_FP32, dims: [ 16 ] } ]
+EOF2
+    done
+}
+
+rm -fr *.log *.csv
+
+RET=0
+
+echo "mode,models,metric,value" > $RESULTS
+
+for MODE in watch poll; do
+    export MODE
+    setup_models
+    if [ "$MODE" == "watch" ]; then
+        MODE_ARGS="--model-control-mode=watch --repository-watch-debounce-ms=${DEBOUNCE_MS}"
+    else
+        MODE_ARGS="--model-control-mode=poll --repository-poll-secs=${POLL_SECS}"
+    fi
+    SERVER_ARGS="--model-repository=${MODEL_REPO} --model-load-thread-count=16 ${MODE_ARGS}"
+    export SERVER_LOG="${SERVER_LOG_BASE}.${MODE}.log"
+    run_server
+    if [ "$SERVER_PID" == "0" ]; then
+        echo -e "\n***\n*** Failed to start $SERVER\n***"
+        cat $SERVER_LOG
+        exit 1
+    fi
+    export SERVER_PID
+
+    set +e
+    # The watcher falls back to polling on remote filesystems, which would
+    # make the comparison meaningless
+    if [ "$MODE" == "watch" ] && grep -q "Falling back to '--model-control-mode=poll'" $SERVER_LOG; then
+        cat $SERVER_LOG
+        echo -e "\n***\n*** Model repository is not on a local filesystem\n***"
+        RET=1
+    fi
+
+    python3 $TEST_PY >> $CLIENT_LOG 2>&1
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** Test Failed with --model-control-mode=${MODE}\n***"
+        RET=1
+    else
+        check_test_results $TEST_RESULT_FILE 5
+        if [ $? -ne 0 ]; then
+            cat $CLIENT_LOG
+            echo -e "\n***\n*** Test Result Verification Failed\n***"
+            RET=1
+        fi
+    fi
+    set -e
+
+    kill $SERVER_PID
+    wait $SERVER_PID
+done
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
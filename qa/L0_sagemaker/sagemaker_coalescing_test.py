@@ -0,0 +1,142 @@
+#!/usr/bin/python
+# Copyright (c) 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+
+sys.path.append("../common")
+
+import json
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import test_util as tu
+import tritonclient.grpc as grpcclient
+import tritonclient.http as httpclient
+
+MODEL_NAME = "sm_model"
+
+
+class SageMakerCoalescingTest(tu.TestResultCollector):
+    def setUp(self):
+        SAGEMAKER_BIND_TO_PORT = os.getenv("SAGEMAKER_BIND_TO_PORT", "8080")
+        self.url_ = "http://localhost:{}/invocations".format(SAGEMAKER_BIND_TO_PORT)
+        self.grpc_client_ = grpcclient.InferenceServerClient("localhost:8001")
+
+    def _stats(self):
+        stats = self.grpc_client_.get_inference_statistics(MODEL_NAME)
+        model_stats = stats.model_stats[0]
+        return model_stats.inference_count, model_stats.execution_count
+
+    def _infer(self, index, rows):
+        input0 = np.arange(index, index + rows * 16, dtype=np.int32).reshape(rows, 16)
+        input1 = np.full((rows, 16), index, dtype=np.int32)
+        request = {
+            "id": str(index),
+            "inputs": [
+                {
+                    "name": "INPUT0",
+                    "datatype": "INT32",
+                    "shape": [rows, 16],
+                    "data": input0.flatten().tolist(),
+                },
+                {
+                    "name": "INPUT1",
+                    "datatype": "INT32",
+                    "shape": [rows, 16],
+                    "data": input1.flatten().tolist(),
+                },
+            ],
+        }
+        headers = {"Content-Type": "application/json"}
+        r = requests.post(self.url_, data=json.dumps(request), headers=headers)
+        r.raise_for_status()
+
+        result = r.json()
+        self.assertEqual(result["id"], str(index))
+        self.assertEqual(result["model_name"], MODEL_NAME)
+        outputs = {output["name"]: output for output in result["outputs"]}
+        for name, expected in (
+            ("OUTPUT0", input0 + input1),
+            ("OUTPUT1", input0 - input1),
+        ):
+            self.assertEqual(outputs[name]["shape"], [rows, 16])
+            self.assertEqual(outputs[name]["data"], expected.flatten().tolist())
+
+    def test_concurrent_requests(self):
+        # Requests of varying size, some of which are spread over two
+        # batches as the model has a max_batch_size of 8
+        request_rows = [1, 2, 3, 1, 5, 1, 1, 4] * 4
+        inference_count, execution_count = self._stats()
+        with ThreadPoolExecutor(max_workers=len(request_rows)) as executor:
+            futures = [
+                executor.submit(self._infer, i, rows)
+                for i, rows in enumerate(request_rows)
+            ]
+            for future in futures:
+                future.result()
+
+        new_inference_count, new_execution_count = self._stats()
+        self.assertEqual(new_inference_count - inference_count, sum(request_rows))
+        self.assertLess(new_execution_count - execution_count, len(request_rows))
+
+    def test_single_request(self):
+        # A request alone is sent once the delay expires
+        self._infer(100, 2)
+
+    def test_binary_request(self):
+        # Requests with binary data are not coalesced but still served
+        input_data = np.arange(16, dtype=np.int32).reshape(1, 16)
+        inputs = [
+            httpclient.InferInput("INPUT0", [1, 16], "INT32"),
+            httpclient.InferInput("INPUT1", [1, 16], "INT32"),
+        ]
+        inputs[0].set_data_from_numpy(input_data)
+        inputs[1].set_data_from_numpy(input_data)
+        (
+            request_body,
+            header_length,
+        ) = httpclient.InferenceServerClient.generate_request_body(inputs)
+        headers = {
+            "Content-Type": "application/vnd.sagemaker-triton.binary+json;json-header-size={}".format(
+                header_length
+            )
+        }
+        r = requests.post(self.url_, data=request_body, headers=headers)
+        r.raise_for_status()
+
+        outputs = {output["name"]: output for output in r.json()["outputs"]}
+        self.assertEqual(
+            outputs["OUTPUT0"]["data"], (input_data + input_data).flatten().tolist()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
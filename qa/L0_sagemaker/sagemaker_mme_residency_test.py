@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# Copyright (c) 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+
+sys.path.append("../common")
+
+import json
+import os
+import unittest
+
+import numpy as np
+import requests
+import test_util as tu
+import tritonclient.http as httpclient
+
+MODEL_COUNT = int(os.getenv("MME_MODEL_COUNT", "6"))
+RESIDENT_COUNT = int(os.getenv("MME_RESIDENT_COUNT", "3"))
+
+
+class SageMakerControlPlane:
+    # Stands in for the SageMaker MME control plane. A model is loaded on its
+    # first invocation and loaded again whenever the server reports that it
+    # is not loaded, which is how a model evicted by the server comes back.
+    def __init__(self, url):
+        self.url_ = url
+        self.loads_ = 0
+
+    def load(self, name):
+        r = requests.post(
+            self.url_,
+            data=json.dumps(
+                {"model_name": name, "url": "/opt/ml/models/{}/model".format(name)}
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+        if r.status_code == 200:
+            self.loads_ += 1
+        return r
+
+    def unload(self, name):
+        return requests.delete("{}/{}".format(self.url_, name))
+
+    def invoke(self, name, request_body):
+        invoke_url = "{}/{}/invoke".format(self.url_, name)
+        headers = {"Content-Type": "application/json"}
+        r = requests.post(invoke_url, data=request_body, headers=headers)
+        if r.status_code == 404:
+            self.load(name).raise_for_status()
+            r = requests.post(invoke_url, data=request_body, headers=headers)
+        return r
+
+
+class SageMakerMMEResidencyTest(tu.TestResultCollector):
+    def setUp(self):
+        SAGEMAKER_BIND_TO_PORT = os.getenv("SAGEMAKER_BIND_TO_PORT", "8080")
+        self.url_ = "http://localhost:{}".format(SAGEMAKER_BIND_TO_PORT)
+        self.control_plane_ = SageMakerControlPlane(self.url_ + "/models")
+        self.model_names_ = ["mme_lru_{}".format(i) for i in range(MODEL_COUNT)]
+
+        self.input_data_ = np.arange(8, dtype=np.float32).reshape(1, 8)
+        inputs = [httpclient.InferInput("INPUT0", [1, 8], "FP32")]
+        inputs[0].set_data_from_numpy(self.input_data_, binary_data=False)
+        outputs = [httpclient.InferRequestedOutput("OUTPUT0", binary_data=False)]
+        self.request_body_, _ = httpclient.InferenceServerClient.generate_request_body(
+            inputs, outputs=outputs
+        )
+
+    def tearDown(self):
+        for name in self.model_names_ + ["mme_lru_big"]:
+            self.control_plane_.unload(name)
+
+    def _residency(self):
+        r = requests.get(self.url_ + "/residency")
+        r.raise_for_status()
+        return r.json()
+
+    def _invoke(self, name):
+        r = self.control_plane_.invoke(name, self.request_body_)
+        r.raise_for_status()
+        self.assertEqual(r.json()["outputs"][0]["data"], self.input_data_[0].tolist())
+
+        residency = self._residency()
+        self.assertLessEqual(len(residency["models"]), RESIDENT_COUNT)
+        self.assertLessEqual(
+            residency["hostMemoryUsage"], residency["hostMemoryBudget"]
+        )
+        self.assertEqual(residency["models"][0]["modelName"], name)
+        return residency
+
+    def test_lru_eviction(self):
+        # Cycling through more models than fit evicts the oldest ones
+        for name in self.model_names_:
+            residency = self._invoke(name)
+        self.assertEqual(self.control_plane_.loads_, MODEL_COUNT)
+        self.assertEqual(residency["evictions"], MODEL_COUNT - RESIDENT_COUNT)
+        resident = self.model_names_[-RESIDENT_COUNT:]
+        self.assertEqual(
+            [m["modelName"] for m in residency["models"]], list(reversed(resident))
+        )
+        for model in residency["models"]:
+            self.assertFalse(model["loading"])
+            self.assertGreater(model["hostMemoryBytes"], 0)
+            # CPU only models are not charged to the GPU budget
+            self.assertEqual(model["gpuMemoryBytes"], 0)
+        self.assertEqual(residency["models"][0]["useCount"], 1)
+
+        # The server no longer serves an evicted model until it is loaded again
+        r = requests.post(
+            "{}/models/{}/invoke".format(self.url_, self.model_names_[0]),
+            data=self.request_body_,
+            headers={"Content-Type": "application/json"},
+        )
+        self.assertEqual(r.status_code, 404)
+        r = requests.get(self.url_ + "/models")
+        listed = [m.get("modelName") for m in r.json()["models"]]
+        self.assertNotIn(self.model_names_[0], listed)
+
+        # Using the oldest resident model keeps it resident, the next oldest
+        # model is evicted instead
+        self._invoke(resident[0])
+        residency = self._invoke(self.model_names_[0])
+        self.assertEqual(
+            [m["modelName"] for m in residency["models"]],
+            [self.model_names_[0], resident[0], resident[2]],
+        )
+        self.assertEqual(residency["evictions"], MODEL_COUNT - RESIDENT_COUNT + 1)
+
+        # Unloading by the control plane releases the memory
+        self.control_plane_.unload(resident[2]).raise_for_status()
+        residency = self._residency()
+        self.assertEqual(len(residency["models"]), RESIDENT_COUNT - 1)
+
+        # Cycle a few more times, every request is served
+        for _ in range(2):
+            for name in self.model_names_:
+                self._invoke(name)
+
+    def test_model_exceeds_budget(self):
+        # A model larger than the whole budget is rejected without evicting
+        for name in self.model_names_[:RESIDENT_COUNT]:
+            residency = self._invoke(name)
+        evictions = residency["evictions"]
+        r = self.control_plane_.load("mme_lru_big")
+        self.assertEqual(r.status_code, 507)
+        residency = self._residency()
+        self.assertEqual(len(residency["models"]), RESIDENT_COUNT)
+        self.assertEqual(residency["evictions"], evictions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,13 +50,17 @@ export CUDA_VISIBLE_DEVICES=0
 
 RET=0
 
-rm -rf models
+rm -rf models mme_models
 rm -f *.log
 rm -f *.out
 
 SAGEMAKER_TEST=sagemaker_test.py
 SAGEMAKER_MULTI_MODEL_TEST=sagemaker_multi_model_test.py
 MULTI_MODEL_UNIT_TEST_COUNT=7
+SAGEMAKER_MME_RESIDENCY_TEST=sagemaker_mme_residency_test.py
+MME_RESIDENCY_UNIT_TEST_COUNT=2
+SAGEMAKER_COALESCING_TEST=sagemaker_coalescing_test.py
+COALESCING_UNIT_TEST_COUNT=3
 UNIT_TEST_COUNT=9
 CLIENT_LOG="./client.log"
 
@@ -194,6 +198,58 @@ unset SAGEMAKER_BIND_TO_PORT
 kill $SERVER_PID
 wait $SERVE_PID
 
+# Coalesce concurrent requests, the regular tests must pass as well
+export SAGEMAKER_TRITON_COALESCE_DELAY_US=5000
+export SAGEMAKER_TRITON_ALLOW_GRPC=true
+serve > $SERVER_LOG 2>&1 &
+SERVE_PID=$!
+# Obtain Triton PID in such way as $! will return the script PID
+sleep 1
+SERVER_PID=`ps | grep tritonserver | awk '{ printf $1 }'`
+sagemaker_wait_for_server_ready $SERVER_PID 10
+if [ "$WAIT_RET" != "0" ]; then
+    echo -e "\n***\n*** Failed to start $SERVER\n***"
+    kill $SERVER_PID || true
+    cat $SERVER_LOG
+    exit 1
+fi
+
+set +e
+python $SAGEMAKER_TEST SageMakerTest >>$CLIENT_LOG 2>&1
+if [ $? -ne 0 ]; then
+    echo -e "\n***\n*** Test Failed\n***"
+    cat $CLIENT_LOG
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE $UNIT_TEST_COUNT
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+
+python $SAGEMAKER_COALESCING_TEST SageMakerCoalescingTest >>$CLIENT_LOG 2>&1
+if [ $? -ne 0 ]; then
+    echo -e "\n***\n*** Test Failed\n***"
+    cat $CLIENT_LOG
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE $COALESCING_UNIT_TEST_COUNT
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+set -e
+
+unset SAGEMAKER_TRITON_COALESCE_DELAY_US
+unset SAGEMAKER_TRITON_ALLOW_GRPC
+
+kill $SERVER_PID
+wait $SERVE_PID
+
 # Set SageMaker safe port range
 export SAGEMAKER_SAFE_PORT_RANGE="8081-9000"
 
@@ -453,6 +509,79 @@ kill $SERVER_PID
 wait $SERVE_PID
 # MME end
 
+# MME LRU eviction begin
+# Cycle through more models than fit in the host memory budget
+rm -rf mme_models && mkdir mme_models
+ln -s `pwd`/mme_models /opt/ml/models
+export MME_MODEL_COUNT=6
+export MME_RESIDENT_COUNT=3
+for i in $(seq 0 $((MME_MODEL_COUNT - 1))); do
+    MODEL_PATH="mme_models/mme_lru_${i}/model"
+    mkdir -p ${MODEL_PATH}
+    cp -r $DATADIR/qa_identity_model_repository/onnx_zero_1_float32/* ${MODEL_PATH} && \
+        sed -i "s/onnx_zero_1_float32/mme_lru_${i}/" ${MODEL_PATH}/config.pbtxt && \
+        echo "instance_group [ { kind: KIND_CPU } ]" >> ${MODEL_PATH}/config.pbtxt
+done
+
+# Without memory usage reported by the backend, the size of the model files
+# is the footprint of a model, charged to the host memory budget for models
+# with CPU instances only
+MODEL_BYTES=`find mme_models/mme_lru_0/model -type f -printf "%s\n" | awk '{s+=$1} END {print s}'`
+export SAGEMAKER_TRITON_MME_HOST_MEMORY_BUDGET=$((MODEL_BYTES * MME_RESIDENT_COUNT))
+
+# A model that is larger than the whole budget
+mkdir -p mme_models/mme_lru_big/model
+cp -r mme_models/mme_lru_0/model/* mme_models/mme_lru_big/model/. && \
+    sed -i "s/mme_lru_0/mme_lru_big/" mme_models/mme_lru_big/model/config.pbtxt && \
+    head -c $((SAGEMAKER_TRITON_MME_HOST_MEMORY_BUDGET + 1)) /dev/zero > mme_models/mme_lru_big/model/1/padding.bin
+
+export SAGEMAKER_MULTI_MODEL=true
+serve > $SERVER_LOG 2>&1 &
+SERVE_PID=$!
+# Obtain Triton PID in such way as $! will return the script PID
+sleep 1
+SERVER_PID=`ps | grep tritonserver | awk '{ printf $1 }'`
+sagemaker_wait_for_server_ready $SERVER_PID 10
+if [ "$WAIT_RET" != "0" ]; then
+    echo -e "\n***\n*** Failed to start $SERVER\n***"
+    kill $SERVER_PID || true
+    cat $SERVER_LOG
+    exit 1
+fi
+
+set +e
+python $SAGEMAKER_MME_RESIDENCY_TEST SageMakerMMEResidencyTest >>$CLIENT_LOG 2>&1
+if [ $? -ne 0 ]; then
+    echo -e "\n***\n*** Test Failed\n***"
+    cat $CLIENT_LOG
+    RET=1
+else
+    check_test_results $TEST_RESULT_FILE $MME_RESIDENCY_UNIT_TEST_COUNT
+    if [ $? -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** Test Result Verification Failed\n***"
+        RET=1
+    fi
+fi
+
+grep "Evicting least recently used SageMaker TargetModel" $SERVER_LOG
+if [ $? -ne 0 ]; then
+    cat $SERVER_LOG
+    echo -e "\n***\n*** Failed. Expected models to be evicted\n***"
+    RET=1
+fi
+set -e
+
+unset SAGEMAKER_MULTI_MODEL
+unset SAGEMAKER_TRITON_MME_HOST_MEMORY_BUDGET
+
+unlink /opt/ml/models
+rm -rf /opt/ml/models
+
+kill $SERVER_PID
+wait $SERVE_PID
+# MME LRU eviction end
+
 unlink /opt/ml/model
 rm -rf /opt/ml/model
 
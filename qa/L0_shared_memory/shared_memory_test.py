@@ -31,6 +31,8 @@ import sys
 sys.path.append("../common")
 
 import os
+import threading
+import time
 import unittest
 
 import infer_util as iu
@@ -416,6 +418,74 @@ class SharedMemoryTest(tu.TestResultCollector):
                 register_offset=create_byte_size + 1,
             )
 
+    def test_register_unregister_during_inference(self):
+        # Unregister and register again the regions used by inferences in
+        # flight on other threads. Inferences may fail to find a region but
+        # the server must keep the regions they hold mapped until they
+        # complete, and must keep serving afterwards.
+        shm_handles = self._configure_server()
+        stop = threading.Event()
+        infer_counts = []
+        unexpected_errors = []
+
+        def infer_loop():
+            if self.protocol == "http":
+                client = httpclient.InferenceServerClient(self.url)
+            else:
+                client = grpcclient.InferenceServerClient(self.url)
+            count = 0
+            while not stop.is_set():
+                error_msg = []
+                iu.shm_basic_infer(
+                    self,
+                    client,
+                    shm_handles[0],
+                    shm_handles[1],
+                    shm_handles[2],
+                    shm_handles[3],
+                    error_msg,
+                    protocol=self.protocol,
+                    use_system_shared_memory=True,
+                )
+                for msg in error_msg:
+                    if "Unable to find shared memory region" not in msg:
+                        unexpected_errors.append(msg)
+                count += 1
+            infer_counts.append(count)
+
+        threads = [threading.Thread(target=infer_loop) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        end = time.time() + 10
+        while time.time() < end:
+            for name in ("input1_data", "output0_data"):
+                self.triton_client.unregister_system_shared_memory(name)
+                self.triton_client.register_system_shared_memory(
+                    name, "/" + name, self.DEFAULT_SHM_BYTE_SIZE
+                )
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(unexpected_errors, [])
+        self.assertGreater(sum(infer_counts), 0)
+        self.assertTrue(self.triton_client.is_server_live())
+        error_msg = []
+        iu.shm_basic_infer(
+            self,
+            self.triton_client,
+            shm_handles[0],
+            shm_handles[1],
+            shm_handles[2],
+            shm_handles[3],
+            error_msg,
+            protocol=self.protocol,
+            use_system_shared_memory=True,
+        )
+        self.assertEqual(error_msg, [])
+        self.triton_client.unregister_system_shared_memory()
+        self._cleanup_server(shm_handles)
+
     def test_python_client_leak(self):
         process = psutil.Process()
         initial_mem_usage = process.memory_info().rss / 1024**2
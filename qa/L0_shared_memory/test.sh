@@ -40,6 +40,20 @@ pip3 install psutil
 RET=0
 rm -fr *.log
 
+# Checks that references keep unregistered regions mapped and reports the
+# throughput of concurrent region lookups
+SHM_MANAGER_TEST=./shared_memory_manager_test
+SHM_MANAGER_TEST_LOG="./shared_memory_manager_test.log"
+set +e
+LD_LIBRARY_PATH=/opt/tritonserver/lib:${LD_LIBRARY_PATH} $SHM_MANAGER_TEST >>$SHM_MANAGER_TEST_LOG 2>&1
+if [ $? -ne 0 ]; then
+    cat $SHM_MANAGER_TEST_LOG
+    echo -e "\n***\n*** Shared Memory Manager Test Failed\n***"
+    RET=1
+fi
+grep "lookups" $SHM_MANAGER_TEST_LOG
+set -e
+
 for i in \
         test_invalid_create_shm \
         test_valid_create_set_register \
@@ -54,6 +68,7 @@ for i in \
         test_infer_offset_out_of_bound \
         test_infer_byte_size_out_of_bound \
         test_register_out_of_bound \
+        test_register_unregister_during_inference \
         test_python_client_leak; do
     for client_type in http grpc; do
         SERVER_ARGS="--model-repository=`pwd`/models --log-verbose=1 ${SERVER_ARGS_EXTRA}"
@@ -806,6 +806,98 @@ if [ `grep -c "CUSTOM_ACTIVITY_END" summary_custom_tracing_triton.log` != "1" ];
     RET=1
 fi
 
+# Binary trace file format, zstd compressed
+pip3 install zstandard
+
+SERVER_ARGS="--trace-config triton,file=binary_trace.log --trace-config triton,format=binary \
+             --trace-config triton,compression=zstd --trace-config level=TIMESTAMPS \
+             --trace-config rate=1 --model-repository=$MODELSDIR"
+SERVER_LOG="./inference_server_binary.log"
+run_server
+if [ "$SERVER_PID" == "0" ]; then
+    echo -e "\n***\n*** Failed to start $SERVER\n***"
+    cat $SERVER_LOG
+    exit 1
+fi
+
+set +e
+send_inference_requests "client_binary.log" 10
+set -e
+
+kill $SERVER_PID
+wait $SERVER_PID
+
+set +e
+
+if [ `head -c 8 binary_trace.log` != "TRTTRACE" ]; then
+    echo -e "\n***\n*** Test Failed, binary_trace.log is not a binary trace file\n***"
+    RET=1
+fi
+
+$TRACE_SUMMARY -t binary_trace.log > summary_binary_trace.log
+
+if [ `grep -c "COMPUTE_INPUT_END" summary_binary_trace.log` != "20" ]; then
+    cat summary_binary_trace.log
+    echo -e "\n***\n*** Test Failed\n***"
+    RET=1
+fi
+
+if [ `grep -c ^simple summary_binary_trace.log` != "20" ]; then
+    cat summary_binary_trace.log
+    echo -e "\n***\n*** Test Failed\n***"
+    RET=1
+fi
+
+set -e
+
+# Binary trace files rotated by size, only the last 2 files are kept
+SERVER_ARGS="--trace-config triton,file=rotated_trace.log --trace-config triton,format=binary \
+             --trace-config triton,max-file-size=4096 --trace-config triton,max-files=2 \
+             --trace-config level=TIMESTAMPS --trace-config rate=1 --model-repository=$MODELSDIR"
+SERVER_LOG="./inference_server_rotated.log"
+run_server
+if [ "$SERVER_PID" == "0" ]; then
+    echo -e "\n***\n*** Failed to start $SERVER\n***"
+    cat $SERVER_LOG
+    exit 1
+fi
+
+set +e
+send_inference_requests "client_rotated.log" 10
+set -e
+
+kill $SERVER_PID
+wait $SERVER_PID
+
+set +e
+
+if [ -f ./rotated_trace.log ] || [ -f ./rotated_trace.log.0 ]; then
+    echo -e "\n***\n*** Test Failed, unexpected rotated_trace.log or rotated_trace.log.0\n***"
+    RET=1
+fi
+
+if [ `ls rotated_trace.log.* | wc -l` != "2" ]; then
+    ls -l rotated_trace.log.*
+    echo -e "\n***\n*** Test Failed, expected 2 rotated trace files\n***"
+    RET=1
+fi
+
+for f in rotated_trace.log.*; do
+    if [ `stat -c %s $f` -gt 4096 ]; then
+        echo -e "\n***\n*** Test Failed, $f is larger than max-file-size\n***"
+        RET=1
+    fi
+done
+
+$TRACE_SUMMARY -s "rotated_trace.log.*" > summary_rotated_trace.log
+if [ $? -ne 0 ] || [ `grep -c "Summary for simple" summary_rotated_trace.log` == "0" ]; then
+    cat summary_rotated_trace.log
+    echo -e "\n***\n*** Test Failed\n***"
+    RET=1
+fi
+
+set -e
+
 # Check opentelemetry trace exporter sends proper info.
 # A helper python script starts listening on $OTLP_PORT, where
 # OTLP exporter sends traces.
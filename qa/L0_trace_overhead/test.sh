@@ -0,0 +1,185 @@
+#!/bin/bash
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Measures the overhead of Triton trace mode on HTTP inference throughput
+# of a trivial model at several sampling rates, and with an adaptive
+# 'traces-per-second' budget. The results are written to trace_overhead.csv.
+# The test fails if perf_analyzer fails, or if the adaptive run collects
+# more traces than its budget allows, the numbers are for reporting.
+
+export CUDA_VISIBLE_DEVICES=""
+
+PERF_ANALYZER=../clients/perf_analyzer
+MODEL=identity_fp32
+RESULTS=trace_overhead.csv
+CLIENT_LOG="./client.log"
+TRACES_PER_SECOND=100
+
+SERVER=/opt/tritonserver/bin/tritonserver
+SERVER_LOG_BASE="./inference_server"
+source ../common/util.sh
+
+rm -fr *.log *.csv *.json* models
+
+mkdir -p models/${MODEL}/1
+cat > models/${MODEL}/config.pbtxt << EOF2
+name: "${MODEL}"
+backend: "identity"
+max_batch_size: 0
+input [
+  {
+    name: "INPUT0"
+    data_type: TYPE_FP32
+    dims: [ 16 ]
+  }
+]
+output [
+  {
+    name: "OUTPUT0"
+    data_type: TYPE_FP32
+    dims: [ 16 ]
+  }
+]
+instance_group [
+  {
+    kind: KIND_CPU
+    count: 4
+  }
+]
+EOF2
+
+RET=0
+
+echo "name,trace_config,infer_per_sec,p99_latency_us,traces,seconds" > $RESULTS
+
+# <name>:<trace config>, the 'off' run is the baseline without tracing
+RUNS="off:level=OFF \
+      rate100000:rate=100000 \
+      rate1000:rate=1000 \
+      rate100:rate=100 \
+      rate1:rate=1 \
+      adaptive:traces-per-second=${TRACES_PER_SECOND}"
+
+for RUN in $RUNS; do
+    NAME=${RUN%%:*}
+    TRACE_CONFIG=${RUN#*:}
+    TRACE_FILE=`pwd`/${NAME}.json
+    SERVER_ARGS="--model-repository=`pwd`/models \
+                 --trace-config triton,file=${TRACE_FILE} \
+                 --trace-config level=TIMESTAMPS \
+                 --trace-config ${TRACE_CONFIG}"
+    SERVER_LOG="${SERVER_LOG_BASE}.${NAME}.log"
+    run_server
+    if [ "$SERVER_PID" == "0" ]; then
+        echo -e "\n***\n*** Failed to start $SERVER\n***"
+        cat $SERVER_LOG
+        exit 1
+    fi
+
+    set +e
+    START=`date +%s`
+    $PERF_ANALYZER -m $MODEL -i http --concurrency-range 16 \
+        --measurement-interval 5000 -f ${NAME}.csv >> $CLIENT_LOG 2>&1
+    PA_RET=$?
+    END=`date +%s`
+    set -e
+
+    # Traces are written when the server exits
+    kill $SERVER_PID
+    wait $SERVER_PID
+
+    if [ $PA_RET -ne 0 ]; then
+        cat $CLIENT_LOG
+        echo -e "\n***\n*** perf_analyzer failed for ${NAME}\n***"
+        RET=1
+        continue
+    fi
+
+    # Pick the throughput and p99 latency from the perf_analyzer CSV and
+    # count the traces collected while perf_analyzer was running
+    set +e
+    python3 - ${NAME}.csv ${NAME} ${TRACE_CONFIG} ${TRACE_FILE} \
+        $((END - START)) >> $RESULTS << EOF2
+import csv
+import json
+import os
+import sys
+
+with open(sys.argv[1]) as f:
+    row = next(csv.DictReader(f))
+traces = 0
+if os.path.exists(sys.argv[4]):
+    with open(sys.argv[4]) as f:
+        traces = len(set(entry["id"] for entry in json.load(f)))
+print(
+    ",".join(
+        sys.argv[2:4]
+        + [row["Inferences/Second"], row.get("p99 latency", ""), str(traces)]
+        + sys.argv[5:6]
+    )
+)
+EOF2
+    if [ $? -ne 0 ]; then
+        echo -e "\n***\n*** Failed to collect results for ${NAME}\n***"
+        RET=1
+    fi
+    set -e
+done
+
+# The adaptive run may sample at 'rate' until the first budget is used up,
+# allow one extra second of traces on top of the measured duration
+set +e
+python3 - $RESULTS $TRACES_PER_SECOND << EOF2
+import csv
+import sys
+
+with open(sys.argv[1]) as f:
+    for row in csv.DictReader(f):
+        if row["name"] == "adaptive":
+            limit = int(sys.argv[2]) * (int(row["seconds"]) + 1)
+            if int(row["traces"]) > limit:
+                sys.exit(
+                    "adaptive run collected {} traces, expected at most {}".format(
+                        row["traces"], limit
+                    )
+                )
+EOF2
+if [ $? -ne 0 ]; then
+    echo -e "\n***\n*** Adaptive trace sampling exceeded its budget\n***"
+    RET=1
+fi
+set -e
+
+cat $RESULTS
+
+if [ $RET -eq 0 ]; then
+    echo -e "\n***\n*** Test Passed\n***"
+else
+    echo -e "\n***\n*** Test FAILED\n***"
+fi
+
+exit $RET
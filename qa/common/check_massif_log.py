@@ -26,11 +26,57 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import argparse
+import json
 import math
 import re
 import sys
 from collections import defaultdict
 
+# Tree node line of a detailed snapshot, e.g.
+#   " n1: 600 0x4005E1: foo (a.c:10)"
+NODE_RE = re.compile(r"^( *)n\d+: (\d+) (.*)$")
+ADDRESS_RE = re.compile(r"^0x[0-9A-Fa-f]+: ")
+
+
+def parse_massif(filename):
+    """
+    Stream the massif output file line by line and return the time unit,
+    the snapshot columns and the bytes allocated by each allocation site
+    (the direct children of the heap tree root) in the detailed snapshots.
+
+    The sites are returned as a dictionary of site to a dictionary of
+    snapshot index to bytes.
+
+    """
+    time_unit = None
+    summary = defaultdict(list)
+    sites = defaultdict(dict)
+    snapshot = -1
+
+    with open(filename, "r") as f:
+        for line in f:
+            if line.startswith("snapshot="):
+                snapshot += 1
+                summary["snapshot"].append(int(line[len("snapshot=") :]))
+            elif line.startswith("time_unit:"):
+                time_unit = line.split(":", 1)[1].strip()
+            elif snapshot < 0 or line.startswith("#"):
+                continue
+            elif line.startswith(("time=", "mem_")):
+                k, v = line.split("=", 1)
+                summary[k].append(int(v))
+            elif line.startswith(" n"):
+                match = NODE_RE.match(line)
+                # Only record the direct children of the root
+                if match and len(match.group(1)) == 1:
+                    site = ADDRESS_RE.sub("", match.group(3).strip())
+                    sites[site][snapshot] = sites[site].get(snapshot, 0) + int(
+                        match.group(2)
+                    )
+
+    return time_unit, summary, sites
+
 
 def parse_massif_out(filename):
     """
@@ -38,30 +84,121 @@ def parse_massif_out(filename):
     it into a dictionary.
 
     """
-    # Read the file
-    with open(filename, "r") as f:
-        contents = f.read()
-        snapshots = re.findall("snapshot=(.*?)heap_tree", contents, flags=re.DOTALL)
+    return parse_massif(filename)[1]
 
-    # Create snapshot dictionary
-    summary = defaultdict(list)
 
-    for snapshot in snapshots:
-        # Split the record and ignore first two columns
-        columns = snapshot.split()[2:]
+def linear_fit(xs, ys):
+    """
+    Least-squares fit of ys against xs, return the slope and the
+    coefficient of determination.
+
+    """
+    n = len(xs)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    if sxx == 0:
+        return 0.0, 0.0
+    slope = sxy / sxx
+    r_squared = (sxy * sxy) / (sxx * syy) if syy else 0.0
+    return slope, r_squared
+
+
+# Fraction of the leading snapshots treated as warm-up and left out of the
+# linear trend, massif starts from an empty heap and the server allocates
+# most of its memory while it starts and loads models
+WARMUP_FRACTION = 0.1
+# Fraction of the largest and smallest snapshots dropped as outliers
+OUTLIER_FRACTION = 0.05
+
 
-        # Put columns and values into dictionary
-        for col in columns:
-            k, v = col.split("=")
-            summary[k].append(int(v))
+def trend_snapshots(totals, start_from_middle):
+    """
+    Return the indices of the snapshots the linear trend is fitted on, with
+    the warm-up snapshots and the outliers removed.
 
-    # Return dict
-    return summary
+    """
+    if start_from_middle:
+        start = len(totals) // 2
+    else:
+        start = math.ceil(WARMUP_FRACTION * len(totals))
+    # Never fit the empty heap massif records before the first allocation
+    while start < len(totals) and totals[start] == 0:
+        start += 1
+    indices = sorted(range(start, len(totals)), key=lambda i: totals[i])
+    dropout = math.ceil(OUTLIER_FRACTION * len(indices))
+    if len(indices) > 2 * dropout:
+        indices = indices[dropout : len(indices) - dropout]
+    return sorted(indices)
 
 
-def is_unbounded_growth(summary, max_allowed_alloc, start_from_middle):
+def growth_trend(summary, time_unit, start_from_middle):
     """
-    Check whether the heap allocations is increasing
+    Estimate the heap growth per snapshot and per time unit, and the growth
+    over the analyzed snapshots that the linear trend accounts for.
+
+    """
+    indices = trend_snapshots(summary["mem_heap_B"], start_from_middle)
+    totals = [summary["mem_heap_B"][i] for i in indices]
+    times = [summary["time"][i] for i in indices]
+
+    per_snapshot, r_squared = linear_fit(indices, totals)
+    per_time, _ = linear_fit(times, totals)
+    trend = {
+        "time_unit": time_unit,
+        "analyzed_snapshots": len(totals),
+        "bytes_per_snapshot": per_snapshot,
+        "bytes_per_time_unit": per_time,
+        "r_squared": r_squared,
+        "trend_growth_mb": (
+            per_snapshot * (indices[-1] - indices[0]) / 1e6 if indices else 0.0
+        ),
+    }
+    # Massif reports wall-clock time in milliseconds
+    if time_unit == "ms":
+        trend["bytes_per_second"] = per_time * 1000
+    return trend
+
+
+def site_growth(sites, summary, start_from_middle, top):
+    """
+    Return the allocation sites sorted by their heap growth per snapshot
+    over the detailed snapshots, limited to the 'top' fastest growing ones.
+
+    """
+    first = len(summary["mem_heap_B"]) // 2 if start_from_middle else 0
+    detailed = sorted({s for snapshots in sites.values() for s in snapshots})
+    detailed = [s for s in detailed if s >= first]
+
+    growth = []
+    for site, snapshots in sites.items():
+        ys = [snapshots.get(s, 0) for s in detailed]
+        slope, _ = linear_fit(detailed, ys)
+        growth.append(
+            {
+                "site": site,
+                "bytes_per_snapshot": slope,
+                "first_bytes": ys[0] if ys else 0,
+                "last_bytes": ys[-1] if ys else 0,
+            }
+        )
+    growth.sort(key=lambda g: g["bytes_per_snapshot"], reverse=True)
+    return growth[:top]
+
+
+def is_unbounded_growth(
+    summary, max_allowed_alloc, start_from_middle, trend=None, min_r_squared=0.8
+):
+    """
+    Check whether the heap allocations is increasing. If 'trend' is given,
+    the growth explained by the linear trend is checked as well, which
+    catches a slow steady growth that barely moves the mean away from the
+    maximum. The trend is only trusted if the line explains at least
+    'min_r_squared' of the variance, a flat but noisy heap has a slope too.
 
     """
     totals = summary["mem_heap_B"]
@@ -71,8 +208,9 @@ def is_unbounded_growth(summary, max_allowed_alloc, start_from_middle):
         return False
 
     # Measure difference between mean and maximum memory usage
-    processed_snapshot = totals[len(totals) // 2 :] if start_from_middle else totals
-    processed_snapshot.sort(reverse=True)
+    processed_snapshot = sorted(
+        totals[len(totals) // 2 :] if start_from_middle else totals, reverse=True
+    )
     # Remove 5% of the max value which will be treated as outlier
     num_max_min_dropout = math.ceil(0.05 * len(processed_snapshot))
     start = num_max_min_dropout
@@ -89,16 +227,104 @@ def is_unbounded_growth(summary, max_allowed_alloc, start_from_middle):
         "Change in memory allocation: %f MB, MAX ALLOWED: %f MB"
         % (memory_allocation_delta_mb, max_allowed_alloc)
     )
+    if trend is None:
+        return memory_allocation_delta_mb > max_allowed_alloc
 
-    return memory_allocation_delta_mb > max_allowed_alloc
+    print(
+        "Linear growth: %f B/snapshot over %d snapshots (R^2 %.3f), "
+        "%f MB, MAX ALLOWED: %f MB"
+        % (
+            trend["bytes_per_snapshot"],
+            trend["analyzed_snapshots"],
+            trend["r_squared"],
+            trend["trend_growth_mb"],
+            max_allowed_alloc,
+        )
+    )
+    if trend["r_squared"] < min_r_squared:
+        print(
+            "Linear growth ignored, R^2 below %.3f: the heap does not grow "
+            "steadily" % min_r_squared
+        )
+        return memory_allocation_delta_mb > max_allowed_alloc
+    return (
+        memory_allocation_delta_mb > max_allowed_alloc
+        or trend["trend_growth_mb"] > max_allowed_alloc
+    )
 
 
 if __name__ == "__main__":
-    # FIXME turn to proper argument handling
-    summary = parse_massif_out(sys.argv[1])
-    max_allowed_alloc = float(sys.argv[2])
-    start_from_middle = (len(sys.argv) == 4) and (sys.argv[3] == "--start-from-middle")
-    if is_unbounded_growth(summary, max_allowed_alloc, start_from_middle):
-        sys.exit(1)
-    else:
-        sys.exit(0)
+    parser = argparse.ArgumentParser(
+        description="Check a massif output file for unbounded heap growth."
+    )
+    parser.add_argument("massif_file", type=str, help="Massif output file.")
+    parser.add_argument(
+        "max_allowed_alloc",
+        type=float,
+        help="Maximum allowed growth in MB, both between the mean and the "
+        "maximum heap size and along the linear trend of the heap size.",
+    )
+    parser.add_argument(
+        "--start-from-middle",
+        action="store_true",
+        help="Only analyze the second half of the snapshots.",
+    )
+    parser.add_argument(
+        "--no-trend",
+        action="store_true",
+        help="Only compare the maximum with the mean heap size.",
+    )
+    parser.add_argument(
+        "--min-r-squared",
+        type=float,
+        default=0.8,
+        help="Minimum coefficient of determination of the linear trend for "
+        "its growth to be checked. Default is 0.8.",
+    )
+    parser.add_argument(
+        "--json-report",
+        type=str,
+        default=None,
+        help="Write the growth statistics and allocation sites to this file.",
+    )
+    parser.add_argument(
+        "--top-sites",
+        type=int,
+        default=10,
+        help="Number of fastest growing allocation sites to report. " "Default is 10.",
+    )
+    FLAGS = parser.parse_args()
+
+    time_unit, summary, sites = parse_massif(FLAGS.massif_file)
+    trend = growth_trend(summary, time_unit, FLAGS.start_from_middle)
+    growth = site_growth(sites, summary, FLAGS.start_from_middle, FLAGS.top_sites)
+    for g in growth:
+        if g["bytes_per_snapshot"] <= 0:
+            break
+        print(
+            "%12.1f B/snapshot %12d B -> %12d B  %s"
+            % (g["bytes_per_snapshot"], g["first_bytes"], g["last_bytes"], g["site"])
+        )
+
+    unbounded = is_unbounded_growth(
+        summary,
+        FLAGS.max_allowed_alloc,
+        FLAGS.start_from_middle,
+        None if FLAGS.no_trend else trend,
+        FLAGS.min_r_squared,
+    )
+    if FLAGS.json_report is not None:
+        with open(FLAGS.json_report, "w") as f:
+            json.dump(
+                {
+                    "snapshots": len(summary["mem_heap_B"]),
+                    "max_allowed_alloc_mb": FLAGS.max_allowed_alloc,
+                    "min_r_squared": FLAGS.min_r_squared,
+                    "trend": trend,
+                    "sites": growth,
+                    "unbounded_growth": unbounded,
+                },
+                f,
+                indent=2,
+            )
+    sys.exit(1 if unbounded else 0)
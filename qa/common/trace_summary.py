@@ -27,13 +27,118 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import argparse
+import collections
+import concurrent.futures
 import csv
+import glob
 import json
+import math
+import os
+import struct
 
 import numpy as np
 
 FLAGS = None
 
+# Binary trace file layout, all integers are little-endian uint32:
+#   header: "TRTTRACE", version, compression
+#   block:  payload size, record count, payload
+#   record: JSON array size, JSON array of the objects of one trace
+# The payload of a block is a zstd frame when compression is zstd.
+BINARY_TRACE_MAGIC = b"TRTTRACE"
+BINARY_TRACE_HEADER = struct.Struct("<8sII")
+BINARY_TRACE_BLOCK = struct.Struct("<II")
+BINARY_TRACE_RECORD = struct.Struct("<I")
+BINARY_TRACE_NONE = 0
+BINARY_TRACE_ZSTD = 1
+
+# Percentiles reported for each span, in addition to the average and max
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of latencies in nanoseconds. Bucket boundaries
+    grow by a constant ratio of (1 + precision), so a reported percentile is
+    within 'precision' of the recorded value over the whole range, and two
+    histograms with the same precision are merged by adding bucket counts."""
+
+    def __init__(self, precision=0.01, max_ns=10**12):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = np.zeros(
+            int(math.ceil(math.log(max_ns) / self._log_base)) + 1, dtype=np.int64
+        )
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, values):
+        values = np.asarray(values, dtype=np.int64)
+        if values.size == 0:
+            return
+        # Value 'v' falls in bucket 'i' when base^(i-1) < v <= base^i
+        idx = np.zeros(values.shape, dtype=np.int64)
+        positive = values > 1
+        idx[positive] = np.ceil(np.log(values[positive]) / self._log_base)
+        np.clip(idx, 0, len(self.counts) - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.count += int(values.size)
+        self.total += int(values.sum())
+        self.max = max(self.max, int(values.max()))
+
+    def merge(self, other):
+        if other.counts.shape != self.counts.shape:
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, percentiles=PERCENTILES):
+        """Return the value in nanoseconds at each of the 'percentiles'. The
+        upper bound of the bucket is reported, capped at the recorded max."""
+        if self.count == 0:
+            return np.zeros(len(percentiles))
+        ranks = np.maximum(np.ceil(np.asarray(percentiles) / 100 * self.count), 1)
+        idx = np.searchsorted(np.cumsum(self.counts), ranks)
+        return np.minimum(np.exp(idx * self._log_base), self.max)
+
+
+class SpanHistograms:
+    """Map from span name to LatencyHistogram. Durations are buffered and
+    bucketed in batches so that the per-span arithmetic runs in NumPy
+    instead of once per trace."""
+
+    BATCH_SIZE = 1 << 16
+
+    def __init__(self):
+        self.histograms = dict()
+        self._pending = dict()
+
+    def record(self, span_name, duration_ns):
+        if span_name not in self._pending:
+            self._pending[span_name] = list()
+            self.histograms[span_name] = LatencyHistogram()
+        pending = self._pending[span_name]
+        pending.append(duration_ns)
+        if len(pending) >= self.BATCH_SIZE:
+            self.histograms[span_name].record(pending)
+            pending.clear()
+
+    def flush(self):
+        for span_name, pending in self._pending.items():
+            self.histograms[span_name].record(pending)
+            pending.clear()
+        return self.histograms
+
+    def merge(self, other):
+        self.flush()
+        for span_name, histogram in other.flush().items():
+            if span_name not in self.histograms:
+                self._pending[span_name] = list()
+                self.histograms[span_name] = LatencyHistogram()
+            self.histograms[span_name].merge(histogram)
+
 
 def add_span(span_map, timestamps, span_name, ts_start, ts_end):
     for tag in (ts_start, ts_end):
@@ -49,6 +154,10 @@ def add_span(span_map, timestamps, span_name, ts_start, ts_end):
 
 
 class AbstractFrontend:
+    @property
+    def name(self):
+        return None
+
     @property
     def filter_timestamp(self):
         return None
@@ -61,6 +170,10 @@ class AbstractFrontend:
 
 
 class HttpFrontend(AbstractFrontend):
+    @property
+    def name(self):
+        return "HTTP"
+
     @property
     def filter_timestamp(self):
         return "HTTP_RECV_START"
@@ -101,6 +214,10 @@ class HttpFrontend(AbstractFrontend):
 
 
 class GrpcFrontend(AbstractFrontend):
+    @property
+    def name(self):
+        return "GRPC"
+
     @property
     def filter_timestamp(self):
         return "GRPC_WAITREAD_START"
@@ -129,11 +246,54 @@ class GrpcFrontend(AbstractFrontend):
             return None
 
 
+def add_trace_spans(frontend, model_span_map, timestamps, span_hists=None):
+    """Accumulate the spans of a single trace, given as a map from
+    timestamp name to nanoseconds, into 'model_span_map' and, if
+    provided, record each span duration in 'span_hists'."""
+    span_map = dict()
+    frontend.add_frontend_span(span_map, timestamps)
+
+    add_span(span_map, timestamps, "REQUEST", "REQUEST_START", "REQUEST_END")
+
+    # The tags below will be missing for ensemble model
+    if ("QUEUE_START" in timestamps) and ("COMPUTE_START" in timestamps):
+        add_span(span_map, timestamps, "QUEUE", "QUEUE_START", "COMPUTE_START")
+    if ("COMPUTE_START" in timestamps) and ("COMPUTE_END" in timestamps):
+        add_span(span_map, timestamps, "COMPUTE", "COMPUTE_START", "COMPUTE_END")
+    if ("COMPUTE_INPUT_END" in timestamps) and ("COMPUTE_OUTPUT_START" in timestamps):
+        add_span(
+            span_map, timestamps, "COMPUTE_INPUT", "COMPUTE_START", "COMPUTE_INPUT_END"
+        )
+        add_span(
+            span_map,
+            timestamps,
+            "COMPUTE_INFER",
+            "COMPUTE_INPUT_END",
+            "COMPUTE_OUTPUT_START",
+        )
+        add_span(
+            span_map,
+            timestamps,
+            "COMPUTE_OUTPUT",
+            "COMPUTE_OUTPUT_START",
+            "COMPUTE_END",
+        )
+
+    for span_name, duration in span_map.items():
+        if span_name not in model_span_map:
+            model_span_map[span_name] = 0
+        model_span_map[span_name] += duration
+        if span_hists is not None:
+            span_hists.record(span_name, duration)
+
+
 def summarize(frontend, traces):
     # map from (model_name, model_version) to # of traces
     model_count_map = dict()
     # map from (model_name, model_version) to map of span->total time
     model_span_map = dict()
+    # map from (model_name, model_version) to histograms of span durations
+    model_hist_map = dict()
 
     # Order traces by id to be more intuitive if 'show_trace'
     traces = sorted(traces, key=lambda t: t.get("id", -1))
@@ -189,60 +349,14 @@ def summarize(frontend, traces):
             if key not in model_count_map:
                 model_count_map[key] = 0
                 model_span_map[key] = dict()
+                model_hist_map[key] = SpanHistograms()
 
             model_count_map[key] += 1
 
-            frontend.add_frontend_span(model_span_map[key], timestamps)
-
-            add_span(
-                model_span_map[key],
-                timestamps,
-                "REQUEST",
-                "REQUEST_START",
-                "REQUEST_END",
+            add_trace_spans(
+                frontend, model_span_map[key], timestamps, model_hist_map[key]
             )
 
-            # The tags below will be missing for ensemble model
-            if ("QUEUE_START" in timestamps) and ("COMPUTE_START" in timestamps):
-                add_span(
-                    model_span_map[key],
-                    timestamps,
-                    "QUEUE",
-                    "QUEUE_START",
-                    "COMPUTE_START",
-                )
-            if ("COMPUTE_START" in timestamps) and ("COMPUTE_END" in timestamps):
-                add_span(
-                    model_span_map[key],
-                    timestamps,
-                    "COMPUTE",
-                    "COMPUTE_START",
-                    "COMPUTE_END",
-                )
-            if ("COMPUTE_INPUT_END" in timestamps) and (
-                "COMPUTE_OUTPUT_START" in timestamps
-            ):
-                add_span(
-                    model_span_map[key],
-                    timestamps,
-                    "COMPUTE_INPUT",
-                    "COMPUTE_START",
-                    "COMPUTE_INPUT_END",
-                )
-                add_span(
-                    model_span_map[key],
-                    timestamps,
-                    "COMPUTE_INFER",
-                    "COMPUTE_INPUT_END",
-                    "COMPUTE_OUTPUT_START",
-                )
-                add_span(
-                    model_span_map[key],
-                    timestamps,
-                    "COMPUTE_OUTPUT",
-                    "COMPUTE_OUTPUT_START",
-                    "COMPUTE_END",
-                )
             if FLAGS.show_trace:
                 print("{} ({}):".format(trace["model_name"], trace["model_version"]))
                 print("\tid: {}".format(trace["id"]))
@@ -262,6 +376,11 @@ def summarize(frontend, traces):
                     print("\t{}".format(ts[0]))
                     now = ts[1]
 
+    print_summary(frontend, model_count_map, model_span_map, model_hist_map)
+    return model_count_map, model_span_map, model_hist_map
+
+
+def print_summary(frontend, model_count_map, model_span_map, model_hist_map=None):
     for key, cnt in model_count_map.items():
         model_name, model_value = key
         print(
@@ -317,6 +436,328 @@ def summarize(frontend, traces):
                     model_span_map[key]["COMPUTE_OUTPUT"] / (cnt * 1000)
                 )
             )
+        if model_hist_map is not None:
+            print(
+                "\tLatency percentiles: {} / max".format(
+                    " / ".join("p{}".format(p) for p in PERCENTILES)
+                )
+            )
+            for span_name, histogram in model_hist_map[key].flush().items():
+                values = list(histogram.percentiles()) + [histogram.max]
+                print(
+                    "\t\t{}: {}".format(
+                        span_name,
+                        " / ".join("{}us".format(round(v / 1000, 3)) for v in values),
+                    )
+                )
+
+
+def summary_rows(filename, frontend, model_count_map, model_hist_map):
+    """Return one row per (model_name, model_version) and span with the
+    trace count, average, percentiles and max in microseconds, ordered so
+    that exports of different runs can be compared with diff."""
+    rows = list()
+    for key in sorted(model_count_map, key=lambda k: (str(k[0]), str(k[1]))):
+        model_name, model_version = key
+        histograms = model_hist_map[key].flush()
+        for span_name in sorted(histograms):
+            histogram = histograms[span_name]
+            row = collections.OrderedDict()
+            row["file"] = filename
+            row["frontend"] = frontend.name
+            row["model_name"] = model_name
+            row["model_version"] = model_version
+            row["span"] = span_name
+            row["count"] = histogram.count
+            row["avg_us"] = histogram.total / (histogram.count * 1000)
+            for p, v in zip(PERCENTILES, histogram.percentiles()):
+                row["p{}_us".format(p)] = round(float(v) / 1000, 3)
+            row["max_us"] = histogram.max / 1000
+            rows.append(row)
+    return rows
+
+
+def export_rows(rows, json_file, csv_file):
+    if json_file is not None:
+        with open(json_file, "w") as f:
+            json.dump(rows, f, indent=2)
+            f.write("\n")
+    if csv_file is not None:
+        with open(csv_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            if rows:
+                writer.writerow(rows[0].keys())
+            for row in rows:
+                writer.writerow(row.values())
+
+
+# Number of trace objects after which an idle trace id is considered complete
+# in streaming mode. Triton writes all objects belonging to one request
+# (including the traces of composing models) contiguously, so a trace that has
+# not been touched for this many objects will not be touched again.
+STREAM_WINDOW = 4096
+
+
+def is_binary_trace_file(filename):
+    """Return True if 'filename' was written in the binary trace format."""
+    with open(filename, "rb") as f:
+        return f.read(len(BINARY_TRACE_MAGIC)) == BINARY_TRACE_MAGIC
+
+
+def iter_binary_trace_objects(f):
+    """Yield the trace objects of a binary trace file from file object 'f'
+    opened in binary mode. The file is a header followed by blocks of
+    length-prefixed records, each record is a JSON array of the objects of
+    one trace. A truncated last block, as left behind by a server that did
+    not shut down cleanly, is ignored."""
+    header = f.read(BINARY_TRACE_HEADER.size)
+    if len(header) < BINARY_TRACE_HEADER.size:
+        return
+    magic, version, compression = BINARY_TRACE_HEADER.unpack(header)
+    if magic != BINARY_TRACE_MAGIC or version != 1:
+        raise ValueError("unsupported binary trace file version {}".format(version))
+    if compression == BINARY_TRACE_ZSTD:
+        # Only needed for compressed trace files
+        import zstandard
+
+        decompressor = zstandard.ZstdDecompressor()
+    elif compression != BINARY_TRACE_NONE:
+        raise ValueError("unsupported binary trace compression {}".format(compression))
+
+    while True:
+        block_header = f.read(BINARY_TRACE_BLOCK.size)
+        if len(block_header) < BINARY_TRACE_BLOCK.size:
+            return
+        size, count = BINARY_TRACE_BLOCK.unpack(block_header)
+        payload = f.read(size)
+        if len(payload) < size:
+            return
+        if compression == BINARY_TRACE_ZSTD:
+            payload = decompressor.decompress(payload)
+        offset = 0
+        for _ in range(count):
+            (length,) = BINARY_TRACE_RECORD.unpack_from(payload, offset)
+            offset += BINARY_TRACE_RECORD.size
+            yield from json.loads(payload[offset : offset + length])
+            offset += length
+
+
+def iter_trace_file(filename):
+    """Yield the trace objects of a JSON or binary trace file."""
+    if is_binary_trace_file(filename):
+        with open(filename, "rb") as f:
+            yield from iter_binary_trace_objects(f)
+    else:
+        with open(filename, "r") as f:
+            yield from iter_trace_objects(f)
+
+
+def iter_trace_objects(f, chunk_size=1 << 20):
+    """Incrementally yield the objects of a JSON array of traces from file
+    object 'f' without reading the whole file into memory. A missing
+    closing bracket, as left behind by a server that did not shut down
+    cleanly, is tolerated."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    while True:
+        # Skip array punctuation and whitespace between objects
+        while pos < len(buf) and buf[pos] in "[], \t\r\n":
+            pos += 1
+        if pos < len(buf):
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                pos = end
+                yield obj
+                continue
+        elif eof:
+            return
+
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+class StreamingSummary:
+    """Aggregate trace objects, in the order they appear in a trace file,
+    into the per (model_name, model_version) count and span maps that
+    summarize() produces for each frontend. Only traces that may still
+    receive objects are kept in memory."""
+
+    def __init__(self, frontends, window=STREAM_WINDOW):
+        self.frontends = frontends
+        self.window = window
+        # For each frontend, map from (model_name, model_version) to # of
+        # traces and map from (model_name, model_version) to map of
+        # span->total time
+        self.model_count_maps = [dict() for _ in frontends]
+        self.model_span_maps = [dict() for _ in frontends]
+        # For each frontend, map from (model_name, model_version) to the
+        # lowest trace id, so that the summary can be ordered by id like
+        # summarize() does
+        self.model_first_id_maps = [dict() for _ in frontends]
+        # For each frontend, map from (model_name, model_version) to
+        # histograms of span durations
+        self.model_hist_maps = [dict() for _ in frontends]
+        # map from trace id to the trace collected so far, least recently
+        # updated first
+        self._pending = collections.OrderedDict()
+        # map from trace id to per-frontend match of completed traces, only
+        # kept so that late child traces can resolve their parent
+        self._matched = collections.OrderedDict()
+        self._seen = 0
+
+    def add(self, trace):
+        if "id" not in trace:
+            return
+        self._seen += 1
+        rep_trace = self._pending.pop(trace["id"], None)
+        if rep_trace is None:
+            rep_trace = {"timestamps": dict()}
+        rep_trace["last_seen"] = self._seen
+        self._pending[trace["id"]] = rep_trace
+
+        for field in ("model_name", "model_version", "parent_id"):
+            if field in trace:
+                rep_trace[field] = trace[field]
+        for ts in trace.get("timestamps", []):
+            rep_trace["timestamps"][ts["name"]] = ts["ns"]
+
+        while self._pending:
+            trace_id, oldest = next(iter(self._pending.items()))
+            if self._seen - oldest["last_seen"] < self.window:
+                break
+            self._complete(trace_id)
+
+    def flush(self):
+        while self._pending:
+            self._complete(next(iter(self._pending)))
+
+    def _match(self, trace_id):
+        if trace_id in self._matched:
+            return self._matched[trace_id]
+        trace = self._pending.get(trace_id)
+        if trace is None:
+            return (False,) * len(self.frontends)
+        parent_match = None
+        if "parent_id" in trace:
+            parent_match = self._match(trace["parent_id"])
+        match = list()
+        for idx, frontend in enumerate(self.frontends):
+            if (parent_match is not None) and parent_match[idx]:
+                match.append(True)
+            elif frontend.filter_timestamp is None:
+                match.append(False)
+            else:
+                match.append(
+                    any(frontend.filter_timestamp in n for n in trace["timestamps"])
+                )
+        return tuple(match)
+
+    def _complete(self, trace_id):
+        match = self._match(trace_id)
+        trace = self._pending.pop(trace_id)
+        self._matched[trace_id] = match
+        while len(self._matched) > self.window:
+            self._matched.popitem(last=False)
+
+        timestamps = trace["timestamps"]
+        if ("REQUEST_START" not in timestamps) or ("REQUEST_END" not in timestamps):
+            return
+        key = (trace["model_name"], trace["model_version"])
+        for idx, frontend in enumerate(self.frontends):
+            if not match[idx]:
+                continue
+            model_count_map = self.model_count_maps[idx]
+            model_span_map = self.model_span_maps[idx]
+            model_first_id_map = self.model_first_id_maps[idx]
+            if key not in model_count_map:
+                model_count_map[key] = 0
+                model_span_map[key] = dict()
+                model_first_id_map[key] = trace_id
+                self.model_hist_maps[idx][key] = SpanHistograms()
+            model_first_id_map[key] = min(model_first_id_map[key], trace_id)
+
+            model_count_map[key] += 1
+
+            add_trace_spans(
+                frontend,
+                model_span_map[key],
+                timestamps,
+                self.model_hist_maps[idx][key],
+            )
+
+    def partial(self):
+        return (
+            self.model_count_maps,
+            self.model_span_maps,
+            self.model_first_id_maps,
+            self.model_hist_maps,
+        )
+
+    def merge(
+        self, model_count_maps, model_span_maps, model_first_id_maps, model_hist_maps
+    ):
+        """Merge the maps returned by partial() of another summary."""
+        for idx in range(len(self.frontends)):
+            for key, cnt in model_count_maps[idx].items():
+                first_id = model_first_id_maps[idx][key]
+                if key not in self.model_count_maps[idx]:
+                    self.model_count_maps[idx][key] = 0
+                    self.model_span_maps[idx][key] = dict()
+                    self.model_first_id_maps[idx][key] = first_id
+                    self.model_hist_maps[idx][key] = SpanHistograms()
+                self.model_count_maps[idx][key] += cnt
+                self.model_first_id_maps[idx][key] = min(
+                    self.model_first_id_maps[idx][key], first_id
+                )
+                self.model_hist_maps[idx][key].merge(model_hist_maps[idx][key])
+                span_map = self.model_span_maps[idx][key]
+                for span_name, total in model_span_maps[idx][key].items():
+                    span_map[span_name] = span_map.get(span_name, 0) + total
+
+
+def summarize_file_streaming(filename):
+    """Summarize one trace file for HTTP and GRPC frontends in streaming mode
+    and return the partial count and span maps so that they can be merged
+    with those of other files."""
+    summary = StreamingSummary([HttpFrontend(), GrpcFrontend()])
+    for trace in iter_trace_file(filename):
+        summary.add(trace)
+    summary.flush()
+    return summary.partial()
+
+
+def summarize_streaming(filenames, jobs):
+    summary = StreamingSummary([HttpFrontend(), GrpcFrontend()])
+    if jobs > 1 and len(filenames) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            for partial in pool.map(summarize_file_streaming, filenames):
+                summary.merge(*partial)
+    else:
+        for filename in filenames:
+            summary.merge(*summarize_file_streaming(filename))
+
+    for idx, frontend in enumerate(summary.frontends):
+        first_id_map = summary.model_first_id_maps[idx]
+        model_count_map = {
+            key: summary.model_count_maps[idx][key]
+            for key in sorted(first_id_map, key=first_id_map.get)
+        }
+        print_summary(
+            frontend,
+            model_count_map,
+            summary.model_span_maps[idx],
+            summary.model_hist_maps[idx],
+        )
+    return summary
 
 
 def summarize_dataflow(traces):
@@ -491,17 +932,83 @@ if __name__ == "__main__":
         default=False,
         help="Show timestamps for each individual trace",
     )
-    parser.add_argument("file", type=argparse.FileType("r"), nargs="+")
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        required=False,
+        default=False,
+        help="Parse trace files incrementally and aggregate the spans in "
+        "constant memory. Files are summarized together, the per-trace and "
+        "data flow output is not available in this mode",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        required=False,
+        default=os.cpu_count(),
+        help="Number of processes used to summarize files in streaming mode",
+    )
+    parser.add_argument(
+        "--export-json",
+        type=str,
+        required=False,
+        default=None,
+        help="Write the count, average, percentiles and max of each span to "
+        "this JSON file",
+    )
+    parser.add_argument(
+        "--export-csv",
+        type=str,
+        required=False,
+        default=None,
+        help="Write the count, average, percentiles and max of each span to "
+        "this CSV file",
+    )
+    parser.add_argument(
+        "file",
+        nargs="+",
+        help="Trace file, or glob pattern such as 'trace.log.*' to select the "
+        "indexed files written with --trace-log-frequency or the rotated "
+        "files of the binary trace format",
+    )
     FLAGS = parser.parse_args()
 
-    for f in FLAGS.file:
-        trace_data = json.loads(f.read())
-        if FLAGS.verbose:
-            print(json.dumps(trace_data, sort_keys=True, indent=2))
-
-        # Must summarize HTTP and GRPC separately since they have
-        # different ways of accumulating time.
-        print("File: {}".format(f.name))
-        summarize(HttpFrontend(), trace_data)
-        summarize(GrpcFrontend(), trace_data)
-        summarize_dataflow(trace_data)
+    filenames = list()
+    for pattern in FLAGS.file:
+        matches = sorted(glob.glob(pattern))
+        filenames += matches if matches else [pattern]
+
+    rows = list()
+    if FLAGS.stream:
+        print("File: {}".format(", ".join(filenames)))
+        summary = summarize_streaming(filenames, FLAGS.jobs)
+        for idx, frontend in enumerate(summary.frontends):
+            rows += summary_rows(
+                ";".join(filenames),
+                frontend,
+                summary.model_count_maps[idx],
+                summary.model_hist_maps[idx],
+            )
+    else:
+        for filename in filenames:
+            if is_binary_trace_file(filename):
+                trace_data = list(iter_trace_file(filename))
+            else:
+                with open(filename, "r") as f:
+                    trace_data = json.loads(f.read())
+            if FLAGS.verbose:
+                print(json.dumps(trace_data, sort_keys=True, indent=2))
+
+            # Must summarize HTTP and GRPC separately since they have
+            # different ways of accumulating time.
+            print("File: {}".format(filename))
+            for frontend in (HttpFrontend(), GrpcFrontend()):
+                model_count_map, _, model_hist_map = summarize(frontend, trace_data)
+                rows += summary_rows(
+                    filename, frontend, model_count_map, model_hist_map
+                )
+            summarize_dataflow(trace_data)
+
+    export_rows(rows, FLAGS.export_json, FLAGS.export_csv)
@@ -0,0 +1,62 @@
+# Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+#  * Neither the name of NVIDIA CORPORATION nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+import triton_python_backend_utils as pb_utils
+
+
+class TritonPythonModel:
+    """
+    Stand-in for a language model that streams tokens as fast as it can.
+    Each request produces 'max_tokens' responses, the i-th response holds
+    the token "<text_input>_<i>" in 'text_output'.
+    """
+
+    def execute(self, requests):
+        for request in requests:
+            text = (
+                pb_utils.get_input_tensor_by_name(request, "text_input")
+                .as_numpy()
+                .flatten()[0]
+            )
+            if isinstance(text, bytes):
+                text = text.decode("utf-8")
+            max_tokens = int(
+                pb_utils.get_input_tensor_by_name(request, "max_tokens")
+                .as_numpy()
+                .flatten()[0]
+            )
+
+            sender = request.get_response_sender()
+            for i in range(max_tokens):
+                if sender.is_cancelled():
+                    break
+                token = np.array(["{}_{}".format(text, i)], dtype=np.object_)
+                sender.send(
+                    pb_utils.InferenceResponse([pb_utils.Tensor("text_output", token)])
+                )
+            sender.send(flags=pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL)
+        return None
@@ -0,0 +1,371 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+#include "admission_control.h"
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <vector>
+
+#include "common.h"
+#include "triton/common/logging.h"
+
+namespace triton { namespace server {
+
+namespace {
+
+uint64_t
+SteadyNowNs()
+{
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+}  // namespace
+
+//
+// Limiter
+//
+// Enforces the limits of one scope. Requests are counted from Acquire()
+// until Release(), Cancel() undoes an Acquire() of a request that is
+// rejected by another scope.
+//
+class AdmissionController::Limiter {
+ public:
+  explicit Limiter(const Limits& limits)
+      : limits_(limits),
+        burst_(
+            (limits.burst_ != 0) ? limits.burst_
+                                 : std::max(1.0, std::ceil(limits.rate_))),
+        tokens_(burst_), refill_ns_(SteadyNowNs())
+  {
+  }
+
+  bool Acquire(const uint64_t now_ns, Reason* reason);
+  void Cancel();
+  void Release(const uint64_t now_ns, const uint64_t delay_ns);
+
+ private:
+  const Limits limits_;
+  const double burst_;
+
+  std::mutex mu_;
+  double tokens_;
+  uint64_t refill_ns_;
+  uint64_t inflight_{0};
+  // CoDel state, 'above_target_ns_' is when the delay will have been above
+  // the target for an interval and 0 if the last delay was below the target.
+  uint64_t above_target_ns_{0};
+  bool dropping_{false};
+  uint64_t drop_next_ns_{0};
+  uint64_t drop_count_{0};
+};
+
+bool
+AdmissionController::Limiter::Acquire(const uint64_t now_ns, Reason* reason)
+{
+  std::lock_guard<std::mutex> lk(mu_);
+  if ((limits_.max_inflight_ != 0) && (inflight_ >= limits_.max_inflight_)) {
+    *reason = Reason::INFLIGHT;
+    return false;
+  }
+
+  // As in CoDel, the interval between rejections shrinks with the square
+  // root of the number of rejections while the delay stays above target.
+  if (dropping_ && (now_ns >= drop_next_ns_)) {
+    ++drop_count_;
+    drop_next_ns_ =
+        now_ns + static_cast<uint64_t>(
+                     limits_.interval_us_ * 1000 / std::sqrt(drop_count_));
+    *reason = Reason::DELAY;
+    return false;
+  }
+
+  if (limits_.rate_ > 0) {
+    // 'now_ns' is read before taking the lock so it may be behind
+    if (now_ns > refill_ns_) {
+      tokens_ = std::min(
+          burst_, tokens_ + (now_ns - refill_ns_) * limits_.rate_ / 1e9);
+      refill_ns_ = now_ns;
+    }
+    if (tokens_ < 1) {
+      *reason = Reason::RATE;
+      return false;
+    }
+    tokens_ -= 1;
+  }
+
+  ++inflight_;
+  return true;
+}
+
+void
+AdmissionController::Limiter::Cancel()
+{
+  std::lock_guard<std::mutex> lk(mu_);
+  if (limits_.rate_ > 0) {
+    tokens_ = std::min(burst_, tokens_ + 1);
+  }
+  --inflight_;
+}
+
+void
+AdmissionController::Limiter::Release(
+    const uint64_t now_ns, const uint64_t delay_ns)
+{
+  std::lock_guard<std::mutex> lk(mu_);
+  --inflight_;
+  if (limits_.target_delay_us_ == 0) {
+    return;
+  }
+
+  if (delay_ns < (limits_.target_delay_us_ * 1000)) {
+    above_target_ns_ = 0;
+    dropping_ = false;
+  } else if (above_target_ns_ == 0) {
+    above_target_ns_ = now_ns + limits_.interval_us_ * 1000;
+  } else if (!dropping_ && (now_ns >= above_target_ns_)) {
+    dropping_ = true;
+    drop_count_ = 0;
+    drop_next_ns_ = now_ns;
+  }
+}
+
+//
+// Ticket
+//
+AdmissionController::Ticket&
+AdmissionController::Ticket::operator=(Ticket&& other)
+{
+  if (this != &other) {
+    Release();
+    global_ = std::move(other.global_);
+    model_ = std::move(other.model_);
+    admit_ns_ = other.admit_ns_;
+  }
+  return *this;
+}
+
+void
+AdmissionController::Ticket::Release()
+{
+  if ((global_ == nullptr) && (model_ == nullptr)) {
+    return;
+  }
+
+  const uint64_t now_ns = SteadyNowNs();
+  const uint64_t delay_ns = now_ns - admit_ns_;
+  if (global_ != nullptr) {
+    global_->Release(now_ns, delay_ns);
+    global_.reset();
+  }
+  if (model_ != nullptr) {
+    model_->Release(now_ns, delay_ns);
+    model_.reset();
+  }
+}
+
+//
+// AdmissionController
+//
+bool
+AdmissionController::Options::Enabled() const
+{
+  if (global_.Enabled()) {
+    return true;
+  }
+  for (const auto& model : models_) {
+    if (model.second.Enabled()) {
+      return true;
+    }
+  }
+  return false;
+}
+
+TRITONSERVER_Error*
+AdmissionController::Create(
+    const Options& options, std::shared_ptr<AdmissionController>* controller)
+{
+  auto check_limits = [](const std::string& scope,
+                         const Limits& limits) -> TRITONSERVER_Error* {
+    if ((limits.burst_ != 0) && (limits.rate_ <= 0)) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          ("admission control 'burst' requires 'rate' for " + scope).c_str());
+    }
+    if ((limits.target_delay_us_ != 0) && (limits.interval_us_ == 0)) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          ("admission control 'interval-us' must be positive for " + scope)
+              .c_str());
+    }
+    return nullptr;  // success
+  };
+
+  RETURN_IF_ERR(check_limits("all models", options.global_));
+  for (const auto& model : options.models_) {
+    RETURN_IF_ERR(check_limits("model '" + model.first + "'", model.second));
+  }
+
+  controller->reset(new AdmissionController(options));
+  return nullptr;  // success
+}
+
+AdmissionController::AdmissionController(const Options& options)
+{
+  if (options.global_.Enabled()) {
+    global_ = std::make_shared<Limiter>(options.global_);
+  }
+  for (const auto& model : options.models_) {
+    if (model.second.Enabled()) {
+      models_.emplace(model.first, std::make_shared<Limiter>(model.second));
+    }
+  }
+
+#ifdef TRITON_ENABLE_METRICS
+  TRITONSERVER_Error* err = TRITONSERVER_MetricFamilyNew(
+      &rejected_family_, TRITONSERVER_METRIC_KIND_COUNTER,
+      "nv_frontend_admission_rejected",
+      "Number of inference requests rejected by frontend admission control");
+  if (err != nullptr) {
+    LOG_TRITONSERVER_ERROR(err, "creating admission control metrics");
+    rejected_family_ = nullptr;
+  }
+#endif  // TRITON_ENABLE_METRICS
+}
+
+AdmissionController::~AdmissionController()
+{
+  for (auto& metric : rejected_metrics_) {
+    LOG_TRITONSERVER_ERROR(
+        TRITONSERVER_MetricDelete(metric.second),
+        "deleting admission control metric");
+  }
+  if (rejected_family_ != nullptr) {
+    LOG_TRITONSERVER_ERROR(
+        TRITONSERVER_MetricFamilyDelete(rejected_family_),
+        "deleting admission control metric family");
+  }
+}
+
+bool
+AdmissionController::Admit(
+    const std::string& model_name, const char* protocol, Ticket* ticket,
+    std::string* message)
+{
+  std::shared_ptr<Limiter> model;
+  const auto it = models_.find(model_name);
+  if (it != models_.end()) {
+    model = it->second;
+  }
+  if ((global_ == nullptr) && (model == nullptr)) {
+    return true;
+  }
+
+  const uint64_t now_ns = SteadyNowNs();
+  Reason reason;
+  bool admitted = true;
+  bool global_rejection = false;
+  if ((global_ != nullptr) && !global_->Acquire(now_ns, &reason)) {
+    admitted = false;
+    global_rejection = true;
+  } else if ((model != nullptr) && !model->Acquire(now_ns, &reason)) {
+    if (global_ != nullptr) {
+      global_->Cancel();
+    }
+    admitted = false;
+  }
+
+  if (!admitted) {
+    // Only models with their own limits are labeled by name, the name of a
+    // request rejected by the global limits has not been checked and would
+    // create a new metric for every name a client sends
+    CountRejection(global_rejection ? "" : model_name, protocol, reason);
+    *message = "inference request for model '" + model_name +
+               "' rejected by admission control, ";
+    switch (reason) {
+      case Reason::RATE:
+        *message += "request rate limit exceeded";
+        break;
+      case Reason::INFLIGHT:
+        *message += "too many requests in flight";
+        break;
+      case Reason::DELAY:
+        *message += "queue delay above target";
+        break;
+    }
+    return false;
+  }
+
+  ticket->Release();
+  ticket->global_ = global_;
+  ticket->model_ = std::move(model);
+  ticket->admit_ns_ = now_ns;
+  return true;
+}
+
+void
+AdmissionController::CountRejection(
+    const std::string& model_name, const char* protocol, const Reason reason)
+{
+  if (rejected_family_ == nullptr) {
+    return;
+  }
+
+  std::lock_guard<std::mutex> lk(metric_mu_);
+  auto& metric = rejected_metrics_[std::make_tuple(
+      model_name, std::string(protocol), reason)];
+  if (metric == nullptr) {
+    const char* reason_str = (reason == Reason::RATE)       ? "rate"
+                             : (reason == Reason::INFLIGHT) ? "inflight"
+                                                            : "delay";
+    std::vector<const TRITONSERVER_Parameter*> labels{
+        TRITONSERVER_ParameterNew(
+            "model", TRITONSERVER_PARAMETER_STRING, model_name.c_str()),
+        TRITONSERVER_ParameterNew(
+            "protocol", TRITONSERVER_PARAMETER_STRING, protocol),
+        TRITONSERVER_ParameterNew(
+            "reason", TRITONSERVER_PARAMETER_STRING, reason_str)};
+    TRITONSERVER_Error* err = TRITONSERVER_MetricNew(
+        &metric, rejected_family_, labels.data(), labels.size());
+    for (const auto label : labels) {
+      TRITONSERVER_ParameterDelete(const_cast<TRITONSERVER_Parameter*>(label));
+    }
+    if (err != nullptr) {
+      LOG_TRITONSERVER_ERROR(err, "creating admission control metric");
+      rejected_metrics_.erase(
+          std::make_tuple(model_name, std::string(protocol), reason));
+      return;
+    }
+  }
+  LOG_TRITONSERVER_ERROR(
+      TRITONSERVER_MetricIncrement(metric, 1),
+      "incrementing admission control metric");
+}
+
+}}  // namespace triton::server
@@ -0,0 +1,136 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#pragma once
+
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <tuple>
+
+#include "triton/core/tritonserver.h"
+
+namespace triton { namespace server {
+
+/// Admission control for inference requests received by the HTTP and GRPC
+/// endpoints. A request is admitted only if both the global limits and the
+/// limits of the requested model allow it. A rejected request is answered
+/// right away instead of waiting in the model queue until it times out.
+class AdmissionController {
+ public:
+  /// The limits of one scope, a limit of 0 is not enforced.
+  struct Limits {
+    bool Enabled() const
+    {
+      return (rate_ > 0) || (max_inflight_ > 0) || (target_delay_us_ > 0);
+    }
+
+    /// Token bucket, the number of requests admitted per second and the
+    /// bucket size. The bucket size defaults to one second of requests.
+    double rate_{0};
+    uint64_t burst_{0};
+    /// The maximum number of requests admitted and not yet released.
+    uint64_t max_inflight_{0};
+    /// CoDel style shedding on the delay from admission to release. Once
+    /// the delay has stayed above 'target_delay_us_' for 'interval_us_',
+    /// requests are rejected at a rate that grows until a request is
+    /// released within the target again.
+    uint64_t target_delay_us_{0};
+    uint64_t interval_us_{100000};
+  };
+
+  struct Options {
+    bool Enabled() const;
+
+    Limits global_;
+    std::map<std::string, Limits> models_;
+  };
+
+  class Limiter;
+
+  /// Held by an admitted request, the request is released when the ticket
+  /// is destroyed.
+  class Ticket {
+   public:
+    Ticket() = default;
+    Ticket(Ticket&& other) = default;
+    Ticket& operator=(Ticket&& other);
+    Ticket(const Ticket&) = delete;
+    Ticket& operator=(const Ticket&) = delete;
+    ~Ticket() { Release(); }
+
+    /// Release the request. Does nothing if already released.
+    void Release();
+
+   private:
+    friend class AdmissionController;
+    std::shared_ptr<Limiter> global_;
+    std::shared_ptr<Limiter> model_;
+    uint64_t admit_ns_{0};
+  };
+
+  /// Create an admission controller.
+  /// \param options The limits to enforce.
+  /// \param controller Returns the admission controller.
+  /// \return a TRITONSERVER_Error indicating success or failure.
+  static TRITONSERVER_Error* Create(
+      const Options& options, std::shared_ptr<AdmissionController>* controller);
+
+  ~AdmissionController();
+
+  /// Decide whether to admit a request. A rejection is counted in the
+  /// 'nv_frontend_admission_rejected' metric.
+  /// \param model_name The name of the requested model.
+  /// \param protocol The protocol the request is received on, used as a
+  /// metric label.
+  /// \param ticket Returns the ticket to hold until the request is
+  /// released, if admitted.
+  /// \param message Returns the reason for the client, if rejected.
+  /// \return true if the request is admitted.
+  bool Admit(
+      const std::string& model_name, const char* protocol, Ticket* ticket,
+      std::string* message);
+
+ private:
+  enum class Reason { RATE, INFLIGHT, DELAY };
+
+  explicit AdmissionController(const Options& options);
+  void CountRejection(
+      const std::string& model_name, const char* protocol, const Reason reason);
+
+  std::shared_ptr<Limiter> global_;
+  std::map<std::string, std::shared_ptr<Limiter>> models_;
+
+  // Rejection counters, created on the first rejection of each model,
+  // protocol and reason. Rejections by the global limits are counted with
+  // an empty model name, so only models in 'models_' have their own.
+  std::mutex metric_mu_;
+  TRITONSERVER_MetricFamily* rejected_family_{nullptr};
+  std::map<std::tuple<std::string, std::string, Reason>, TRITONSERVER_Metric*>
+      rejected_metrics_;
+};
+
+}}  // namespace triton::server
@@ -26,9 +26,6 @@
 
 #include "classification.h"
 
-#include <algorithm>
-#include <numeric>
-
 #include "common.h"
 
 namespace triton { namespace server {
@@ -44,24 +41,25 @@ AddClassResults(
 {
   const T* probs = reinterpret_cast<const T*>(base);
 
-  std::vector<size_t> idx(element_cnt);
-  iota(idx.begin(), idx.end(), 0);
-  sort(idx.begin(), idx.end(), [&probs](size_t i1, size_t i2) {
-    return probs[i1] > probs[i2];
-  });
-
-  const size_t class_cnt = std::min(element_cnt, (size_t)req_class_cnt);
-  for (size_t k = 0; k < class_cnt; ++k) {
-    class_strs->push_back(
-        std::to_string(probs[idx[k]]) + ":" + std::to_string(idx[k]));
+  // Reuse the index buffer across the outputs and requests handled by
+  // this thread
+  thread_local std::vector<size_t> idx;
+  TopkIndices(probs, element_cnt, req_class_cnt, &idx);
 
+  class_strs->reserve(class_strs->size() + idx.size());
+  for (const size_t i : idx) {
     const char* label;
     RETURN_IF_ERR(TRITONSERVER_InferenceResponseOutputClassificationLabel(
-        response, output_idx, idx[k], &label));
+        response, output_idx, i, &label));
+
+    std::string class_str = std::to_string(probs[i]);
+    class_str += ':';
+    class_str += std::to_string(i);
     if (label != nullptr) {
-      class_strs->back() += ":";
-      class_strs->back().append(label);
+      class_str += ':';
+      class_str.append(label);
     }
+    class_strs->emplace_back(std::move(class_str));
   }
 
   return nullptr;  // success
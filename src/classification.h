@@ -25,6 +25,8 @@
 // OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #pragma once
 
+#include <algorithm>
+#include <numeric>
 #include <string>
 #include <vector>
 
@@ -32,6 +34,74 @@
 
 namespace triton { namespace server {
 
+// Select the indices of the 'k' largest of the 'element_cnt' values into
+// 'idx', ordered by descending value and, for equal values, by ascending
+// index. 'idx' is cleared first so its capacity can be reused across calls.
+template <typename T>
+void
+TopkIndices(
+    const T* values, const size_t element_cnt, size_t k,
+    std::vector<size_t>* idx)
+{
+  constexpr size_t kHeapRatio = 16;
+  constexpr size_t kBlockSize = 16;
+
+  idx->clear();
+  k = std::min(k, element_cnt);
+  if (k == 0) {
+    return;
+  }
+
+  auto better = [values](const size_t a, const size_t b) {
+    return (values[a] > values[b]) || ((values[a] == values[b]) && (a < b));
+  };
+
+  if (k * kHeapRatio > element_cnt) {
+    // Selecting a large fraction of the values, partition all indices
+    idx->resize(element_cnt);
+    std::iota(idx->begin(), idx->end(), 0);
+    std::nth_element(idx->begin(), idx->begin() + (k - 1), idx->end(), better);
+    idx->resize(k);
+    std::sort(idx->begin(), idx->end(), better);
+    return;
+  }
+
+  // Keep the best 'k' indices seen so far in a heap with the worst one on
+  // top. Any later index must be strictly larger than the top to replace
+  // it, so blocks without such a value are skipped using a branch-free
+  // comparison that the compiler can vectorize.
+  idx->resize(k);
+  std::iota(idx->begin(), idx->end(), 0);
+  std::make_heap(idx->begin(), idx->end(), better);
+  T threshold = values[idx->front()];
+  auto consider = [&](const size_t i) {
+    if (values[i] > threshold) {
+      std::pop_heap(idx->begin(), idx->end(), better);
+      idx->back() = i;
+      std::push_heap(idx->begin(), idx->end(), better);
+      threshold = values[idx->front()];
+    }
+  };
+
+  size_t i = k;
+  for (; i + kBlockSize <= element_cnt; i += kBlockSize) {
+    int above = 0;
+    for (size_t j = 0; j < kBlockSize; ++j) {
+      above |= (values[i + j] > threshold);
+    }
+    if (above) {
+      for (size_t j = 0; j < kBlockSize; ++j) {
+        consider(i + j);
+      }
+    }
+  }
+  for (; i < element_cnt; ++i) {
+    consider(i);
+  }
+
+  std::sort_heap(idx->begin(), idx->end(), better);
+}
+
 TRITONSERVER_Error* TopkClassifications(
     TRITONSERVER_InferenceResponse* response, const uint32_t output_idx,
     const char* base, const size_t byte_size,
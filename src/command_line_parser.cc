@@ -298,6 +298,11 @@ enum TritonOptionId {
   OPTION_HTTP_ADDRESS,
   OPTION_HTTP_THREAD_COUNT,
   OPTION_HTTP_RESTRICTED_API,
+  OPTION_HTTP_COMPRESSION_LEVEL,
+  OPTION_HTTP_COMPRESSION_THRESHOLD,
+  OPTION_HTTP_GENERATE_STREAM_FLUSH_INTERVAL_US,
+  OPTION_HTTP_HEALTH_PORT,
+  OPTION_HTTP_HEALTH_REFRESH_MS,
 #endif  // TRITON_ENABLE_HTTP
 #if defined(TRITON_ENABLE_GRPC)
   OPTION_ALLOW_GRPC,
@@ -306,6 +311,8 @@ enum TritonOptionId {
   OPTION_GRPC_ADDRESS,
   OPTION_GRPC_HEADER_FORWARD_PATTERN,
   OPTION_GRPC_INFER_ALLOCATION_POOL_SIZE,
+  OPTION_GRPC_INFER_THREAD_COUNT,
+  OPTION_GRPC_CQ_COUNT,
   OPTION_GRPC_USE_SSL,
   OPTION_GRPC_USE_SSL_MUTUAL,
   OPTION_GRPC_SERVER_CERT,
@@ -327,12 +334,16 @@ enum TritonOptionId {
   OPTION_SAGEMAKER_PORT,
   OPTION_SAGEMAKER_SAFE_PORT_RANGE,
   OPTION_SAGEMAKER_THREAD_COUNT,
+  OPTION_SAGEMAKER_MME_HOST_MEMORY_BUDGET,
+  OPTION_SAGEMAKER_MME_GPU_MEMORY_BUDGET,
+  OPTION_SAGEMAKER_COALESCE_DELAY_US,
 #endif  // TRITON_ENABLE_SAGEMAKER
 #if defined(TRITON_ENABLE_VERTEX_AI)
   OPTION_ALLOW_VERTEX_AI,
   OPTION_VERTEX_AI_PORT,
   OPTION_VERTEX_AI_THREAD_COUNT,
   OPTION_VERTEX_AI_DEFAULT_MODEL,
+  OPTION_VERTEX_AI_COALESCE_DELAY_US,
 #endif  // TRITON_ENABLE_VERTEX_AI
 #ifdef TRITON_ENABLE_METRICS
   OPTION_ALLOW_METRICS,
@@ -342,6 +353,7 @@ enum TritonOptionId {
   OPTION_METRICS_PORT,
   OPTION_METRICS_INTERVAL_MS,
   OPTION_METRICS_CONFIG,
+  OPTION_METRICS_RESPONSE_CACHE,
 #endif  // TRITON_ENABLE_METRICS
 #ifdef TRITON_ENABLE_TRACING
   OPTION_TRACE_FILEPATH,
@@ -353,10 +365,12 @@ enum TritonOptionId {
 #endif  // TRITON_ENABLE_TRACING
   OPTION_MODEL_CONTROL_MODE,
   OPTION_POLL_REPO_SECS,
+  OPTION_REPOSITORY_WATCH_DEBOUNCE_MS,
   OPTION_STARTUP_MODEL,
   OPTION_CUSTOM_MODEL_CONFIG_NAME,
   OPTION_RATE_LIMIT,
   OPTION_RATE_LIMIT_RESOURCE,
+  OPTION_ADMISSION_CONTROL,
   OPTION_PINNED_MEMORY_POOL_BYTE_SIZE,
   OPTION_CUDA_MEMORY_POOL_BYTE_SIZE,
   OPTION_CUDA_VIRTUAL_ADDRESS_SIZE,
@@ -369,6 +383,8 @@ enum TritonOptionId {
   OPTION_REPOAGENT_DIR,
   OPTION_BUFFER_MANAGER_THREAD_COUNT,
   OPTION_MODEL_LOAD_THREAD_COUNT,
+  OPTION_MODEL_LOAD_PLANNER,
+  OPTION_MODEL_LOAD_TIMELINE,
   OPTION_MODEL_LOAD_RETRY_COUNT,
   OPTION_BACKEND_CONFIG,
   OPTION_HOST_POLICY,
@@ -418,13 +434,20 @@ TritonParser::SetupOptions()
        "even if some/all models are unavailable."});
   model_repo_options_.push_back(
       {OPTION_MODEL_CONTROL_MODE, "model-control-mode", Option::ArgStr,
-       "Specify the mode for model management. Options are \"none\", \"poll\" "
-       "and \"explicit\". The default is \"none\". "
+       "Specify the mode for model management. Options are \"none\", \"poll\", "
+       "\"watch\" and \"explicit\". The default is \"none\". "
        "For \"none\", the server will load all models in the model "
        "repository(s) at startup and will not make any changes to the load "
        "models after that. For \"poll\", the server will poll the model "
        "repository(s) to detect changes and will load/unload models based on "
        "those changes. The poll rate is controlled by 'repository-poll-secs'. "
+       "For \"watch\", the server will load all models at startup and watch "
+       "the model repository(s) with inotify, loading/unloading only the "
+       "models whose directories changed. \"watch\" uses explicit model "
+       "control internally, so the model control APIs stay available to "
+       "clients and a model they unload stays unloaded until its directory "
+       "changes. \"watch\" falls back to \"poll\" if a model repository is "
+       "not on a local filesystem. "
        "For \"explicit\", model load and unload is initiated by using the "
        "model control APIs, and only models specified with --load-model will "
        "be loaded at startup."});
@@ -433,6 +456,13 @@ TritonParser::SetupOptions()
        "Interval in seconds between each poll of the model repository to check "
        "for changes. Valid only when --model-control-mode=poll is "
        "specified."});
+  model_repo_options_.push_back(
+      {OPTION_REPOSITORY_WATCH_DEBOUNCE_MS, "repository-watch-debounce-ms",
+       Option::ArgInt,
+       "Time in milliseconds a model directory must go without changes "
+       "before the model is loaded, so that a model being copied into the "
+       "repository is loaded once it is complete. Valid only when "
+       "--model-control-mode=watch is specified. Default is 500."});
   model_repo_options_.push_back(
       {OPTION_STARTUP_MODEL, "load-model", Option::ArgStr,
        "Name of the model to be loaded on server startup. It may be specified "
@@ -454,6 +484,22 @@ TritonParser::SetupOptions()
        Option::ArgInt,
        "The number of threads used to concurrently load models in "
        "model repositories. Default is 4."});
+  model_repo_options_.push_back(
+      {OPTION_MODEL_LOAD_PLANNER, "model-load-planner", Option::ArgBool,
+       "Whether the models loaded at startup are loaded in a planned order. "
+       "If true, the model configurations in the model repository(s) are "
+       "read and the largest models are loaded first, with ensembles loaded "
+       "after the models of their steps. The models loaded at startup are "
+       "the ones specified with --load-model, use --load-model=* to load "
+       "all models. The endpoints are started before the models load and "
+       "each model is ready once its own load completes, while the server "
+       "is not ready until all of them complete. Requires "
+       "--model-control-mode=explicit. Default is false."});
+  model_repo_options_.push_back(
+      {OPTION_MODEL_LOAD_TIMELINE, "model-load-timeline", Option::ArgStr,
+       "Path of a JSON file to write the start and end time of each model "
+       "load to, once the models loaded at startup are loaded. Valid only "
+       "when --model-load-planner=true is specified."});
   model_repo_options_.push_back(
       {OPTION_MODEL_LOAD_RETRY_COUNT, "model-load-retry-count", Option::ArgInt,
        "The number of retry to load a model in "
@@ -505,6 +551,43 @@ TritonParser::SetupOptions()
        "is received, and <value> is the value expected to be matched."
        " Allowed APIs: " +
            Join(RESTRICTED_CATEGORY_NAMES, ", ")});
+  http_options_.push_back(
+      {OPTION_HTTP_COMPRESSION_LEVEL, "http-compression-level",
+       "<string>,<integer>",
+       "The compression level to use when an HTTP response is compressed "
+       "with the given algorithm. The format of this flag is "
+       "--http-compression-level=<algorithm>,<level>, for example "
+       "--http-compression-level=zstd,3. This flag can be specified "
+       "multiple times for different algorithms. Algorithms without a level "
+       "use the default level of the compression library. Supported "
+       "algorithms: " +
+           std::string(DataCompressor::SupportedTypesString())});
+  http_options_.push_back(
+      {OPTION_HTTP_COMPRESSION_THRESHOLD, "http-compression-threshold",
+       Option::ArgInt,
+       "HTTP responses smaller than this many bytes are sent uncompressed "
+       "even if the client accepts a compressed response. Default is 0."});
+  http_options_.push_back(
+      {OPTION_HTTP_GENERATE_STREAM_FLUSH_INTERVAL_US,
+       "http-generate-stream-flush-interval-us", Option::ArgInt,
+       "The time, in microseconds, a generate_stream response waits for "
+       "following responses so that they are sent to the client together. "
+       "Default is 0, which sends the responses as soon as possible."});
+  http_options_.push_back(
+      {OPTION_HTTP_HEALTH_PORT, "http-health-port", Option::ArgInt,
+       "The port for a dedicated listener to answer the HTTP health probes "
+       "on, /v2/health/live, /v2/health/ready and "
+       "/v2/models/<model>[/versions/<version>]/ready. The probes are "
+       "answered from cached state by their own thread, so they are not "
+       "delayed by inference requests. The listener binds to "
+       "--http-address. Default is -1, which disables the listener."});
+  http_options_.push_back(
+      {OPTION_HTTP_HEALTH_REFRESH_MS, "http-health-refresh-ms", Option::ArgInt,
+       "The longest time, in milliseconds, the state used to answer probes "
+       "on --http-health-port is kept before it is refreshed from the "
+       "server. The state is also refreshed when models are loaded or "
+       "unloaded by the server. If no refresh succeeds for three intervals "
+       "the probes report not live and not ready. Default is 1000."});
 #endif  // TRITON_ENABLE_HTTP
 
 #if defined(TRITON_ENABLE_GRPC)
@@ -536,6 +619,18 @@ TritonParser::SetupOptions()
        "allocated for reuse. As long as the number of in-flight requests "
        "doesn't exceed this value there will be no allocation/deallocation of "
        "request/response objects."});
+  grpc_options_.push_back(
+      {OPTION_GRPC_INFER_THREAD_COUNT, "grpc-infer-thread-count",
+       Option::ArgInt,
+       "Number of threads handling GRPC inference requests. The threads are "
+       "spread across the completion queues set by '--grpc-cq-count'. "
+       "Default is 2."});
+  grpc_options_.push_back(
+      {OPTION_GRPC_CQ_COUNT, "grpc-cq-count", Option::ArgInt,
+       "Number of completion queues that GRPC inference requests are "
+       "sharded across. Each completion queue also gets a thread handling "
+       "streaming inference requests. Must not exceed "
+       "'--grpc-infer-thread-count'. Default is 1."});
   grpc_options_.push_back(
       {OPTION_GRPC_USE_SSL, "grpc-use-ssl", Option::ArgBool,
        "Use SSL authentication for GRPC requests. Default is false."});
@@ -665,6 +760,27 @@ TritonParser::SetupOptions()
   sagemaker_options_.push_back(
       {OPTION_SAGEMAKER_THREAD_COUNT, "sagemaker-thread-count", Option::ArgInt,
        "Number of threads handling Sagemaker requests. Default is 8."});
+  sagemaker_options_.push_back(
+      {OPTION_SAGEMAKER_MME_HOST_MEMORY_BUDGET,
+       "sagemaker-mme-host-memory-budget", Option::ArgInt,
+       "The host memory, in bytes, available to models loaded through the "
+       "SageMaker multi-model endpoint. When a load would exceed the budget "
+       "the least recently used models are unloaded first. Default is 0, "
+       "which disables the budget."});
+  sagemaker_options_.push_back(
+      {OPTION_SAGEMAKER_MME_GPU_MEMORY_BUDGET,
+       "sagemaker-mme-gpu-memory-budget", Option::ArgInt,
+       "The GPU memory, in bytes and summed over all GPUs, available to models "
+       "loaded through the SageMaker multi-model endpoint. When a load would "
+       "exceed the budget the least recently used models are unloaded first. "
+       "Default is 0, which disables the budget."});
+  sagemaker_options_.push_back(
+      {OPTION_SAGEMAKER_COALESCE_DELAY_US, "sagemaker-coalesce-delay-us",
+       Option::ArgInt,
+       "The maximum time, in microseconds, a JSON inference request to a model "
+       "that supports batching but has no dynamic batcher is held so that it "
+       "can be merged with concurrent requests into a single batch. Default "
+       "is 0, which disables coalescing."});
 #endif  // TRITON_ENABLE_SAGEMAKER
 
 #if defined(TRITON_ENABLE_VERTEX_AI)
@@ -683,6 +799,13 @@ TritonParser::SetupOptions()
       {OPTION_VERTEX_AI_DEFAULT_MODEL, "vertex-ai-default-model",
        Option::ArgStr,
        "The name of the model to use for single-model inference requests."});
+  vertex_options_.push_back(
+      {OPTION_VERTEX_AI_COALESCE_DELAY_US, "vertex-ai-coalesce-delay-us",
+       Option::ArgInt,
+       "The maximum time, in microseconds, a JSON inference request to a model "
+       "that supports batching but has no dynamic batcher is held so that it "
+       "can be merged with concurrent requests into a single batch. Default "
+       "is 0, which disables coalescing."});
 #endif  // TRITON_ENABLE_VERTEX_AI
 
 #if defined(TRITON_ENABLE_METRICS)
@@ -714,6 +837,12 @@ TritonParser::SetupOptions()
        "Specify a metrics-specific configuration setting. The format of this "
        "flag is --metrics-config=<setting>=<value>. It can be specified "
        "multiple times."});
+  metric_options_.push_back(
+      {OPTION_METRICS_RESPONSE_CACHE, "metrics-response-cache", Option::ArgBool,
+       "Reuse the metrics response for <metrics-interval-ms> milliseconds "
+       "instead of formatting the metrics on every request to the metrics "
+       "endpoint. Enable when several scrapers poll a server with many "
+       "models. Default is false."});
 #endif  // TRITON_ENABLE_METRICS
 
 #ifdef TRITON_ENABLE_TRACING
@@ -724,7 +853,7 @@ TritonParser::SetupOptions()
        "<mode>,<setting>=<value>. "
        "Where <mode> is either \"triton\" or \"opentelemetry\". "
        "The default is \"triton\". To specify global trace settings "
-       "(level, rate, count, or mode), the format would be "
+       "(level, rate, count, traces-per-second, or mode), the format would be "
        "--trace-config <setting>=<value>. For \"triton\" mode, the server will "
        "use "
        "Triton's Trace APIs. For \"opentelemetry\" mode, the server will use "
@@ -771,6 +900,22 @@ TritonParser::SetupOptions()
        "and their availability. By default, the max across all instances that "
        "list the resource is selected as its availability. The values for this "
        "flag is case-insensitive."});
+  rate_limiter_options_.push_back(
+      {OPTION_ADMISSION_CONTROL, "admission-control",
+       "<string>,<string>=<string>",
+       "Limit the inference requests admitted by the HTTP and GRPC endpoints. "
+       "The format of this flag is --admission-control=<model_name>,<setting>="
+       "<value> for the requests of a model and "
+       "--admission-control=<setting>=<value> for all requests. Settings are "
+       "'rate' (requests per second), 'burst' (requests admitted at once by "
+       "'rate', default is one second of requests), 'max-inflight' (requests "
+       "admitted and not yet released), 'target-delay-us' and 'interval-us'. "
+       "Once the time from admission to release of a request has stayed above "
+       "'target-delay-us' for 'interval-us' (default 100000), requests are "
+       "rejected at an increasing rate until a request is released within "
+       "the target again. A rejected request gets HTTP status 429 or GRPC "
+       "status RESOURCE_EXHAUSTED. This flag can be specified multiple "
+       "times."});
 
   memory_device_options_.push_back(
       {OPTION_PINNED_MEMORY_POOL_BYTE_SIZE, "pinned-memory-pool-byte-size",
@@ -933,6 +1078,10 @@ TritonServerParameters::CheckPortCollision()
   if (allow_http_) {
     ports.emplace_back("HTTP", http_address_, http_port_, false, -1, -1);
   }
+  if (http_health_port_ >= 0) {
+    ports.emplace_back(
+        "HTTP health", http_address_, http_health_port_, false, -1, -1);
+  }
 #endif  // TRITON_ENABLE_HTTP
 #ifdef TRITON_ENABLE_GRPC
   if (allow_grpc_) {
@@ -1382,11 +1531,53 @@ TritonParser::Parse(int argc, char** argv)
         case OPTION_HTTP_THREAD_COUNT:
           lparams.http_thread_cnt_ = ParseOption<int>(optarg);
           break;
+        case OPTION_HTTP_HEALTH_PORT:
+          lparams.http_health_port_ = ParseOption<int>(optarg);
+          break;
+        case OPTION_HTTP_HEALTH_REFRESH_MS:
+          lparams.http_health_refresh_ms_ = ParseOption<int>(optarg);
+          break;
         case OPTION_HTTP_RESTRICTED_API:
           ParseRestrictedFeatureOption(
               optarg, long_options[option_index].name, "", "api",
               lparams.http_restricted_apis_);
           break;
+        case OPTION_HTTP_COMPRESSION_LEVEL: {
+          const std::string arg(optarg);
+          const size_t delim = arg.find(',');
+          if (delim == std::string::npos) {
+            throw ParseException(
+                "--http-compression-level argument requires format "
+                "<algorithm>,<level>. Found: " +
+                arg);
+          }
+          const auto type = DataCompressor::ParseType(arg.substr(0, delim));
+          if ((type == DataCompressor::Type::UNKNOWN) ||
+              (type == DataCompressor::Type::IDENTITY)) {
+            throw ParseException(
+                "unsupported compression algorithm for "
+                "--http-compression-level: " +
+                arg.substr(0, delim) + ". Supported algorithms: " +
+                DataCompressor::SupportedTypesString());
+          }
+          const int level = ParseOption<int>(arg.substr(delim + 1));
+          TRITONSERVER_Error* err = DataCompressor::CheckLevel(type, level);
+          if (err != nullptr) {
+            const std::string msg(TRITONSERVER_ErrorMessage(err));
+            TRITONSERVER_ErrorDelete(err);
+            throw ParseException(msg);
+          }
+          lparams.http_compression_options_.levels_[type] = level;
+          break;
+        }
+        case OPTION_HTTP_COMPRESSION_THRESHOLD:
+          lparams.http_compression_options_.threshold_ =
+              ParseOption<uint64_t>(optarg);
+          break;
+        case OPTION_HTTP_GENERATE_STREAM_FLUSH_INTERVAL_US:
+          lparams.http_generate_stream_flush_interval_us_ =
+              ParseOption<uint64_t>(optarg);
+          break;
 
 #endif  // TRITON_ENABLE_HTTP
 
@@ -1405,6 +1596,17 @@ TritonParser::Parse(int argc, char** argv)
         case OPTION_SAGEMAKER_THREAD_COUNT:
           lparams.sagemaker_thread_cnt_ = ParseOption<int>(optarg);
           break;
+        case OPTION_SAGEMAKER_MME_HOST_MEMORY_BUDGET:
+          lparams.sagemaker_mme_host_memory_budget_ =
+              ParseOption<uint64_t>(optarg);
+          break;
+        case OPTION_SAGEMAKER_MME_GPU_MEMORY_BUDGET:
+          lparams.sagemaker_mme_gpu_memory_budget_ =
+              ParseOption<uint64_t>(optarg);
+          break;
+        case OPTION_SAGEMAKER_COALESCE_DELAY_US:
+          lparams.sagemaker_coalesce_delay_us_ = ParseOption<uint64_t>(optarg);
+          break;
 #endif  // TRITON_ENABLE_SAGEMAKER
 
 #ifdef TRITON_ENABLE_VERTEX_AI
@@ -1420,6 +1622,9 @@ TritonParser::Parse(int argc, char** argv)
         case OPTION_VERTEX_AI_DEFAULT_MODEL:
           lparams.vertex_ai_default_model_ = optarg;
           break;
+        case OPTION_VERTEX_AI_COALESCE_DELAY_US:
+          lparams.vertex_ai_coalesce_delay_us_ = ParseOption<uint64_t>(optarg);
+          break;
 #endif  // TRITON_ENABLE_VERTEX_AI
 
 #ifdef TRITON_ENABLE_GRPC
@@ -1438,6 +1643,12 @@ TritonParser::Parse(int argc, char** argv)
         case OPTION_GRPC_INFER_ALLOCATION_POOL_SIZE:
           lgrpc_options.infer_allocation_pool_size_ = ParseOption<int>(optarg);
           break;
+        case OPTION_GRPC_INFER_THREAD_COUNT:
+          lgrpc_options.infer_thread_count_ = ParseOption<int>(optarg);
+          break;
+        case OPTION_GRPC_CQ_COUNT:
+          lgrpc_options.infer_cq_count_ = ParseOption<int>(optarg);
+          break;
         case OPTION_GRPC_USE_SSL:
           lgrpc_options.ssl_.use_ssl_ = ParseOption<bool>(optarg);
           break;
@@ -1543,6 +1754,9 @@ TritonParser::Parse(int argc, char** argv)
           lparams.metrics_config_settings_.push_back(
               ParseMetricsConfigOption(optarg));
           break;
+        case OPTION_METRICS_RESPONSE_CACHE:
+          lparams.metrics_response_cache_ = ParseOption<bool>(optarg);
+          break;
 #endif  // TRITON_ENABLE_METRICS
 
 #ifdef TRITON_ENABLE_TRACING
@@ -1613,6 +1827,9 @@ TritonParser::Parse(int argc, char** argv)
         case OPTION_POLL_REPO_SECS:
           lparams.repository_poll_secs_ = ParseOption<int>(optarg);
           break;
+        case OPTION_REPOSITORY_WATCH_DEBOUNCE_MS:
+          lparams.repository_watch_debounce_ms_ = ParseOption<int>(optarg);
+          break;
         case OPTION_STARTUP_MODEL:
           lparams.startup_models_.insert(optarg);
           break;
@@ -1627,10 +1844,16 @@ TritonParser::Parse(int argc, char** argv)
           std::string mode_str(optarg);
           std::transform(
               mode_str.begin(), mode_str.end(), mode_str.begin(), ::tolower);
+          lparams.repository_watch_ = false;
           if (mode_str == "none") {
             lparams.control_mode_ = TRITONSERVER_MODEL_CONTROL_NONE;
           } else if (mode_str == "poll") {
             lparams.control_mode_ = TRITONSERVER_MODEL_CONTROL_POLL;
+          } else if (mode_str == "watch") {
+            // Models are loaded individually as their directories
+            // change, which requires explicit model control
+            lparams.control_mode_ = TRITONSERVER_MODEL_CONTROL_EXPLICIT;
+            lparams.repository_watch_ = true;
           } else if (mode_str == "explicit") {
             lparams.control_mode_ = TRITONSERVER_MODEL_CONTROL_EXPLICIT;
           } else {
@@ -1661,6 +1884,10 @@ TritonParser::Parse(int argc, char** argv)
               ParseRateLimiterResourceOption(optarg));
           break;
         }
+        case OPTION_ADMISSION_CONTROL:
+          ParseAdmissionControlOption(
+              optarg, &lparams.admission_control_options_);
+          break;
         case OPTION_PINNED_MEMORY_POOL_BYTE_SIZE:
           lparams.pinned_memory_pool_byte_size_ = ParseOption<int64_t>(optarg);
           break;
@@ -1718,6 +1945,12 @@ TritonParser::Parse(int argc, char** argv)
         case OPTION_MODEL_LOAD_THREAD_COUNT:
           lparams.model_load_thread_count_ = ParseOption<int>(optarg);
           break;
+        case OPTION_MODEL_LOAD_PLANNER:
+          lparams.model_load_planner_ = ParseOption<bool>(optarg);
+          break;
+        case OPTION_MODEL_LOAD_TIMELINE:
+          lparams.model_load_timeline_ = optarg;
+          break;
         case OPTION_MODEL_LOAD_RETRY_COUNT:
           lparams.model_load_retry_count_ = ParseOption<int>(optarg);
           break;
@@ -1763,6 +1996,25 @@ TritonParser::Parse(int argc, char** argv)
   // others which are not determined until after parsing.
   //
 
+  if (lparams.repository_watch_) {
+    if (lparams.startup_models_.size() > 0) {
+      throw ParseException(
+          "Error: Use of '--load-model' requires setting "
+          "'--model-control-mode=explicit' as well.");
+    }
+    std::string reason;
+    if (RepositoryWatcher::Supported(
+            lparams.model_repository_paths_, &reason)) {
+      lparams.startup_models_.insert("*");
+    } else {
+      std::cerr << "Warning: unable to watch the model repository, " << reason
+                << ". Falling back to '--model-control-mode=poll'."
+                << std::endl;
+      lparams.control_mode_ = TRITONSERVER_MODEL_CONTROL_POLL;
+      lparams.repository_watch_ = false;
+    }
+  }
+
   if (lparams.control_mode_ != TRITONSERVER_MODEL_CONTROL_POLL) {
     lparams.repository_poll_secs_ = 0;
   }
@@ -1774,6 +2026,42 @@ TritonParser::Parse(int argc, char** argv)
         "'--model-control-mode=explicit' as well.");
   }
 
+  if (!lparams.model_load_timeline_.empty() && !lparams.model_load_planner_) {
+    throw ParseException(
+        "Error: Use of '--model-load-timeline' requires setting "
+        "'--model-load-planner=true' as well.");
+  }
+
+  // The planner loads the startup models through the model control API
+  // once the server is started, instead of the server loading them.
+  if (lparams.model_load_planner_) {
+    if (lparams.control_mode_ == TRITONSERVER_MODEL_CONTROL_POLL) {
+      std::cerr << "Warning: '--model-load-planner' is not supported with "
+                   "'--model-control-mode=poll', the models will be loaded "
+                   "by the server."
+                << std::endl;
+      lparams.model_load_planner_ = false;
+    } else if (lparams.control_mode_ == TRITONSERVER_MODEL_CONTROL_NONE) {
+      throw ParseException(
+          "Error: Use of '--model-load-planner=true' requires setting "
+          "'--model-control-mode=explicit' as well.");
+    } else {
+      lparams.planned_models_.swap(lparams.startup_models_);
+    }
+  }
+
+
+#ifdef TRITON_ENABLE_GRPC
+  if (lgrpc_options.infer_thread_count_ < 1) {
+    throw ParseException("Error: '--grpc-infer-thread-count' must be >= 1.");
+  }
+  if ((lgrpc_options.infer_cq_count_ < 1) ||
+      (lgrpc_options.infer_cq_count_ > lgrpc_options.infer_thread_count_)) {
+    throw ParseException(
+        "Error: '--grpc-cq-count' must be >= 1 and not exceed "
+        "'--grpc-infer-thread-count'.");
+  }
+#endif  // TRITON_ENABLE_GRPC
 
 #ifdef TRITON_ENABLE_VERTEX_AI
   // Set default model repository if specific flag is set, postpone the
@@ -2036,6 +2324,48 @@ TritonParser::ParseBackendConfigOption(const std::string& arg)
   return {name_string, setting_string, value_string};
 }
 
+void
+TritonParser::ParseAdmissionControlOption(
+    const std::string& arg, AdmissionController::Options* options)
+{
+  // Format is "<model_name>,<setting>=<value>" for the limits of a model
+  // and "<setting>=<value>" for the limits of all requests
+  int delim_name = arg.find(",");
+  int delim_setting = arg.find("=", delim_name + 1);
+
+  std::string error_string =
+      "--admission-control option format is '<model name>,<setting>=<value>' "
+      "or '<setting>=<value>'. Got " +
+      arg + "\n";
+  if ((delim_name == 0) || (delim_setting < 0)) {
+    throw ParseException(error_string);
+  }
+
+  const std::string setting =
+      arg.substr(delim_name + 1, delim_setting - delim_name - 1);
+  const std::string value = arg.substr(delim_setting + 1);
+  if (setting.empty() || value.empty()) {
+    throw ParseException(error_string);
+  }
+
+  auto& limits = (delim_name > 0) ? options->models_[arg.substr(0, delim_name)]
+                                  : options->global_;
+  if (setting == "rate") {
+    limits.rate_ = ParseOption<double>(value);
+  } else if (setting == "burst") {
+    limits.burst_ = ParseOption<uint64_t>(value);
+  } else if (setting == "max-inflight") {
+    limits.max_inflight_ = ParseOption<uint64_t>(value);
+  } else if (setting == "target-delay-us") {
+    limits.target_delay_us_ = ParseOption<uint64_t>(value);
+  } else if (setting == "interval-us") {
+    limits.interval_us_ = ParseOption<uint64_t>(value);
+  } else {
+    throw ParseException(
+        "unknown --admission-control setting '" + setting + "'\n");
+  }
+}
+
 void
 TritonParser::ParseRestrictedFeatureOption(
     const std::string& arg, const std::string& option_name,
@@ -2195,9 +2525,13 @@ TritonParser::SetGlobalTraceArgs(
     bool trace_rate_present, bool trace_count_present,
     bool explicit_disable_trace)
 {
-  for (const auto& [setting, value_variant] : lparams.trace_config_map_[""]) {
+  for (auto& [setting, value_variant] : lparams.trace_config_map_[""]) {
     auto value = std::get<std::string>(value_variant);
     try {
+      if (setting == "traces-per-second") {
+        // The tracer reads the parsed value from the config map
+        value_variant = ParseOption<uint32_t>(value);
+      }
       if (setting == "rate") {
         if (trace_rate_present) {
           std::cerr << "Warning: Overriding deprecated '--trace-rate' "
@@ -2262,6 +2596,24 @@ TritonParser::SetTritonTraceArgs(
                     << std::endl;
         }
         lparams.trace_log_frequency_ = ParseOption<int>(value);
+      } else if (setting == "format") {
+        if ((value != "json") && (value != "binary")) {
+          throw ParseException(
+              "invalid value for trace file format: " + value +
+              ". Available options are \"json\" and \"binary\"");
+        }
+      } else if (setting == "compression") {
+        if ((value != "none") && (value != "zstd")) {
+          throw ParseException(
+              "invalid value for trace file compression: " + value +
+              ". Available options are \"none\" and \"zstd\"");
+        }
+      } else if (
+          (setting == "max-file-size") || (setting == "rotation-interval")) {
+        // Kept as string, the values are read by the trace file
+        ParseOption<uint64_t>(value);
+      } else if (setting == "max-files") {
+        ParseOption<uint32_t>(value);
       }
     }
     catch (const ParseException& pe) {
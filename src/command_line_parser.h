@@ -35,6 +35,8 @@
 #include <unordered_map>
 #include <vector>
 
+#include "admission_control.h"
+#include "repository_watcher.h"
 #include "restricted_features.h"
 #include "triton/common/logging.h"
 #include "triton/core/tritonserver.h"
@@ -131,8 +133,19 @@ struct TritonServerParameters {
   std::set<std::string> startup_models_{};
   // Interval, in seconds, when the model repository is polled for changes.
   int32_t repository_poll_secs_{15};
+  // Whether the model repository is watched for changes, in which case
+  // 'control_mode_' is explicit. Changed models are loaded once their
+  // directory has been quiet for 'repository_watch_debounce_ms_'.
+  bool repository_watch_{false};
+  uint64_t repository_watch_debounce_ms_{500};
   // Number of threads to use for concurrently loading models
   uint32_t model_load_thread_count_{4};
+  // Whether the startup models are loaded by the model load planner, in
+  // which case they are moved from 'startup_models_' to 'planned_models_'
+  // and the timeline is written to 'model_load_timeline_' if not empty.
+  bool model_load_planner_{false};
+  std::set<std::string> planned_models_{};
+  std::string model_load_timeline_;
   uint32_t model_load_retry_count_{0};
   std::map<int, double> load_gpu_limit_;
   // Custom model configuration file. Fall back to default config.pbtxt if not
@@ -147,6 +160,9 @@ struct TritonServerParameters {
   TRITONSERVER_RateLimitMode rate_limit_mode_{TRITONSERVER_RATE_LIMIT_OFF};
   std::vector<std::tuple<std::string, int, int>> rate_limit_resources_;
 
+  // Frontend admission control configuration
+  AdmissionController::Options admission_control_options_;
+
   // memory pool configuration
   int64_t pinned_memory_pool_byte_size_{1 << 28};
   std::list<std::pair<int, uint64_t>> cuda_pools_;
@@ -197,6 +213,14 @@ struct TritonServerParameters {
   // The number of threads to initialize for the HTTP front-end.
   int http_thread_cnt_{8};
   RestrictedFeatures http_restricted_apis_{};
+  // Compression levels and threshold for HTTP responses
+  DataCompressor::Options http_compression_options_;
+  // How long generate_stream responses are held to be sent together
+  uint64_t http_generate_stream_flush_interval_us_{0};
+  // Port of the dedicated health probe listener, -1 if disabled, and the
+  // longest time the readiness it reports is cached.
+  int32_t http_health_port_{-1};
+  uint64_t http_health_refresh_ms_{1000};
 #endif  // TRITON_ENABLE_HTTP
 
 #ifdef TRITON_ENABLE_GRPC
@@ -216,6 +240,9 @@ struct TritonServerParameters {
   bool allow_cpu_metrics_{true};
   std::vector<std::tuple<std::string, std::string, std::string>>
       metrics_config_settings_;
+  // Whether the metrics endpoint reuses its response for
+  // 'metrics_interval_ms_'
+  bool metrics_response_cache_{false};
 #endif  // TRITON_ENABLE_METRICS
 
 #ifdef TRITON_ENABLE_SAGEMAKER
@@ -226,6 +253,11 @@ struct TritonServerParameters {
   std::pair<int32_t, int32_t> sagemaker_safe_range_{-1, -1};
   // The number of threads to initialize for the SageMaker HTTP front-end.
   int sagemaker_thread_cnt_{8};
+  // The memory budgets of the SageMaker multi-model endpoint, 0 is unlimited.
+  uint64_t sagemaker_mme_host_memory_budget_{0};
+  uint64_t sagemaker_mme_gpu_memory_budget_{0};
+  // The delay requests are held to be coalesced, 0 disables coalescing.
+  uint64_t sagemaker_coalesce_delay_us_{0};
 #endif  // TRITON_ENABLE_SAGEMAKER
 
 #ifdef TRITON_ENABLE_VERTEX_AI
@@ -235,6 +267,8 @@ struct TritonServerParameters {
   // The number of threads to initialize for the Vertex AI HTTP front-end.
   int vertex_ai_thread_cnt_{8};
   std::string vertex_ai_default_model_{};
+  // The delay requests are held to be coalesced, 0 disables coalescing.
+  uint64_t vertex_ai_coalesce_delay_us_{0};
 #endif  // TRITON_ENABLE_VERTEX_AI
 
   // [FIXME] who should call this function?
@@ -285,6 +319,8 @@ class TritonParser {
       const std::string& arg);
   std::tuple<std::string, std::string, std::string> ParseBackendConfigOption(
       const std::string& arg);
+  void ParseAdmissionControlOption(
+      const std::string& arg, AdmissionController::Options* options);
   std::tuple<std::string, std::string, std::string> ParseHostPolicyOption(
       const std::string& arg);
   std::tuple<std::string, std::string, std::string> ParseMetricsConfigOption(
@@ -40,6 +40,10 @@ constexpr char kAcceptEncodingHTTPHeader[] = "Accept-Encoding";
 constexpr char kContentEncodingHTTPHeader[] = "Content-Encoding";
 constexpr char kContentTypeHeader[] = "Content-Type";
 constexpr char kContentLengthHeader[] = "Content-Length";
+// Content type of inference requests and responses using the compact
+// binary framing instead of a JSON inference header
+constexpr char kInferCompactBinaryContentType[] =
+    "application/vnd.triton.infer-compact";
 
 constexpr int MAX_GRPC_MESSAGE_SIZE = INT32_MAX;
 
@@ -28,9 +28,19 @@
 #include <event2/buffer.h>
 #include <zlib.h>
 
+#ifdef TRITON_ENABLE_ZSTD
+#include <zstd.h>
+#endif  // TRITON_ENABLE_ZSTD
+#ifdef TRITON_ENABLE_LZ4
+#include <lz4frame.h>
+#endif  // TRITON_ENABLE_LZ4
+
+#include <algorithm>
 #include <cassert>
 #include <cstring>
 #include <iostream>
+#include <limits>
+#include <map>
 #include <memory>
 #include <string>
 #include <vector>
@@ -45,119 +55,258 @@ namespace triton { namespace server {
 //
 class DataCompressor {
  public:
-  enum class Type { UNKNOWN, IDENTITY, GZIP, DEFLATE };
+  enum class Type { UNKNOWN, IDENTITY, GZIP, DEFLATE, ZSTD, LZ4 };
 
-  // Specialization where the source and destination buffer are stored as
-  // evbuffer
-  static TRITONSERVER_Error* CompressData(
-      const Type type, evbuffer* source, evbuffer* compressed_data)
+  // Compression level that selects the default level of the codec
+  static constexpr int kDefaultLevel = std::numeric_limits<int>::min();
+
+  // Compression settings of an endpoint
+  struct Options {
+    // Return the compression level to use for 'type'
+    int Level(const Type type) const
+    {
+      auto it = levels_.find(type);
+      return (it == levels_.end()) ? kDefaultLevel : it->second;
+    }
+
+    // Compression level of each type, the codec default is used for types
+    // not in the map
+    std::map<Type, int> levels_;
+
+    // Data smaller than this byte size is not compressed
+    size_t threshold_{0};
+  };
+
+  // Return the type named 'name' in the HTTP Content-Encoding and
+  // Accept-Encoding headers, UNKNOWN if the type is not supported.
+  static Type ParseType(const std::string& name)
   {
-    size_t expected_compressed_size = evbuffer_get_length(source);
-    // nothing to be compressed
-    if (expected_compressed_size == 0) {
-      return TRITONSERVER_ErrorNew(
-          TRITONSERVER_ERROR_INVALID_ARG, "nothing to be compressed");
+    if (name == "identity") {
+      return Type::IDENTITY;
+    } else if (name == "gzip") {
+      return Type::GZIP;
+    } else if (name == "deflate") {
+      return Type::DEFLATE;
     }
+#ifdef TRITON_ENABLE_ZSTD
+    if (name == "zstd") {
+      return Type::ZSTD;
+    }
+#endif  // TRITON_ENABLE_ZSTD
+#ifdef TRITON_ENABLE_LZ4
+    if (name == "lz4") {
+      return Type::LZ4;
+    }
+#endif  // TRITON_ENABLE_LZ4
+    return Type::UNKNOWN;
+  }
 
-    z_stream stream;
-    stream.zalloc = Z_NULL;
-    stream.zfree = Z_NULL;
-    stream.opaque = Z_NULL;
+  static const char* TypeString(const Type type)
+  {
     switch (type) {
+      case Type::IDENTITY:
+        return "identity";
+      case Type::GZIP:
+        return "gzip";
+      case Type::DEFLATE:
+        return "deflate";
+      case Type::ZSTD:
+        return "zstd";
+      case Type::LZ4:
+        return "lz4";
       case Type::UNKNOWN:
-      case Type::IDENTITY: {
-        return TRITONSERVER_ErrorNew(
-            TRITONSERVER_ERROR_INVALID_ARG, "nothing to be compressed");
-      }
+        break;
+    }
+    return "<unknown>";
+  }
+
+  // Comma-separated list of the supported compression types, as sent in
+  // the Accept-Encoding header
+  static const char* SupportedTypesString()
+  {
+    return "gzip, deflate"
+#ifdef TRITON_ENABLE_ZSTD
+           ", zstd"
+#endif  // TRITON_ENABLE_ZSTD
+#ifdef TRITON_ENABLE_LZ4
+           ", lz4"
+#endif  // TRITON_ENABLE_LZ4
+        ;
+  }
+
+  // Return an error if 'level' is not a valid compression level for 'type'
+  static TRITONSERVER_Error* CheckLevel(const Type type, const int level)
+  {
+    int min_level = 0;
+    int max_level = 0;
+    switch (type) {
       case Type::GZIP:
-        if (deflateInit2(
-                &stream, Z_DEFAULT_COMPRESSION /* level */,
-                Z_DEFLATED /* method */, 15 | 16 /* windowBits */,
-                8 /* memLevel */, Z_DEFAULT_STRATEGY /* strategy */) != Z_OK) {
-          return TRITONSERVER_ErrorNew(
-              TRITONSERVER_ERROR_INTERNAL,
-              "failed to initialize state for gzip data compression");
-        }
+      case Type::DEFLATE:
+        min_level = Z_DEFAULT_COMPRESSION;
+        max_level = Z_BEST_COMPRESSION;
         break;
-      case Type::DEFLATE: {
-        if (deflateInit(&stream, Z_DEFAULT_COMPRESSION /* level */) != Z_OK) {
-          return TRITONSERVER_ErrorNew(
-              TRITONSERVER_ERROR_INTERNAL,
-              "failed to initialize state for deflate data compression");
-        }
+#ifdef TRITON_ENABLE_ZSTD
+      case Type::ZSTD:
+        min_level = ZSTD_minCLevel();
+        max_level = ZSTD_maxCLevel();
         break;
+#endif  // TRITON_ENABLE_ZSTD
+#ifdef TRITON_ENABLE_LZ4
+      case Type::LZ4:
+        min_level = 0;
+        max_level = LZ4F_compressionLevel_max();
+        break;
+#endif  // TRITON_ENABLE_LZ4
+      default:
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INVALID_ARG,
+            (std::string("compression type '") + TypeString(type) +
+             "' does not support compression levels")
+                .c_str());
+    }
+    if ((level < min_level) || (level > max_level)) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          (std::string("invalid compression level ") + std::to_string(level) +
+           " for " + TypeString(type) + ", expected a level between " +
+           std::to_string(min_level) + " and " + std::to_string(max_level))
+              .c_str());
+    }
+    return nullptr;  // success
+  }
+
+  //
+  // Stream
+  //
+  // Compresses data as it is appended. The compressed data is written to
+  // the destination evbuffer in chunks of bounded size so that neither the
+  // source nor the compressed data has to be contiguous.
+  //
+  class Stream {
+   public:
+    static TRITONSERVER_Error* Create(
+        const Type type, const int level, evbuffer* compressed_data,
+        std::unique_ptr<Stream>* stream);
+
+    virtual ~Stream() = default;
+
+    // Compress 'byte_size' bytes at 'base'.
+    TRITONSERVER_Error* Append(const void* base, size_t byte_size)
+    {
+      const char* cbase = reinterpret_cast<const char*>(base);
+      while (byte_size > 0) {
+        const size_t chunk_size = std::min(byte_size, MaxInputSize());
+        RETURN_IF_ERR(Compress(cbase, chunk_size, false /* finish */));
+        cbase += chunk_size;
+        byte_size -= chunk_size;
       }
+      return nullptr;  // success
     }
-    // ensure the internal state are cleaned up on function return
-    std::unique_ptr<z_stream, decltype(&deflateEnd)> managed_stream(
-        &stream, deflateEnd);
 
-    // Get the addr and size of each chunk of memory in 'source'
-    struct evbuffer_iovec* buffer_array = nullptr;
-    int buffer_count = evbuffer_peek(source, -1, NULL, NULL, 0);
-    if (buffer_count > 0) {
-      buffer_array = static_cast<struct evbuffer_iovec*>(
-          alloca(sizeof(struct evbuffer_iovec) * buffer_count));
-      if (evbuffer_peek(source, -1, NULL, buffer_array, buffer_count) !=
+    // Compress each chunk of 'source' in place, 'source' is not modified.
+    TRITONSERVER_Error* Append(evbuffer* source)
+    {
+      int buffer_count = evbuffer_peek(source, -1, NULL, NULL, 0);
+      if (buffer_count <= 0) {
+        return nullptr;  // success
+      }
+      std::vector<struct evbuffer_iovec> buffer_array(buffer_count);
+      if (evbuffer_peek(source, -1, NULL, buffer_array.data(), buffer_count) !=
           buffer_count) {
         return TRITONSERVER_ErrorNew(
             TRITONSERVER_ERROR_INTERNAL,
             "unexpected error getting buffers to be compressed");
       }
+      for (const auto& buffer : buffer_array) {
+        RETURN_IF_ERR(Append(buffer.iov_base, buffer.iov_len));
+      }
+      return nullptr;  // success
     }
-    // Reserve the same size as source for compressed data, it is less likely
-    // that a negative compression happens.
-    struct evbuffer_iovec current_reserved_space;
-    RETURN_MSG_IF_ERR(
-        AllocEVBuffer(
-            expected_compressed_size, compressed_data, &current_reserved_space),
-        "unexpected error allocating output buffer for compression: ");
-    stream.next_out =
-        reinterpret_cast<unsigned char*>(current_reserved_space.iov_base);
-    stream.avail_out = expected_compressed_size;
-
-    // Compress until end of 'source'
-    for (int idx = 0; idx < buffer_count; ++idx) {
-      stream.next_in =
-          reinterpret_cast<unsigned char*>(buffer_array[idx].iov_base);
-      stream.avail_in = buffer_array[idx].iov_len;
-
-      // run deflate() on input until source has been read in
-      do {
-        // Need additional buffer
-        if (stream.avail_out == 0) {
-          RETURN_MSG_IF_ERR(
-              CommitEVBuffer(
-                  compressed_data, &current_reserved_space,
-                  expected_compressed_size),
-              "unexpected error committing output buffer for compression: ");
-          RETURN_MSG_IF_ERR(
-              AllocEVBuffer(
-                  expected_compressed_size, compressed_data,
-                  &current_reserved_space),
-              "unexpected error allocating output buffer for compression: ");
-          stream.next_out =
-              reinterpret_cast<unsigned char*>(current_reserved_space.iov_base);
-          stream.avail_out = expected_compressed_size;
-        }
-        auto flush = ((idx + 1) != buffer_count) ? Z_NO_FLUSH : Z_FINISH;
-        auto ret = deflate(&stream, flush);
-        if (ret == Z_STREAM_ERROR) {
-          return TRITONSERVER_ErrorNew(
-              TRITONSERVER_ERROR_INTERNAL,
-              "encountered inconsistent stream state during compression");
-        }
-      } while (stream.avail_out == 0);
+
+    // Write the end of the compressed data. Nothing can be appended after
+    // the stream is finished.
+    TRITONSERVER_Error* Finish()
+    {
+      RETURN_IF_ERR(Compress(nullptr, 0, true /* finish */));
+      return CommitOutput();
     }
-    // Make sure the last buffer is committed
-    if (current_reserved_space.iov_base != nullptr) {
-      RETURN_MSG_IF_ERR(
-          CommitEVBuffer(
-              compressed_data, &current_reserved_space,
-              expected_compressed_size - stream.avail_out),
-          "unexpected error committing output buffer for compression: ");
+
+   protected:
+    explicit Stream(evbuffer* compressed_data)
+        : compressed_data_(compressed_data)
+    {
+      reserved_.iov_base = nullptr;
+      reserved_.iov_len = 0;
     }
-    return nullptr;  // success
+
+    // Compress 'byte_size' bytes at 'base', at most MaxInputSize(). If
+    // 'finish' is true all pending data is written along with the end of
+    // the compressed data.
+    virtual TRITONSERVER_Error* Compress(
+        const char* base, const size_t byte_size, const bool finish) = 0;
+
+    virtual size_t MaxInputSize() const { return 1 << 30 /* 1GB */; }
+
+    // Get the unused space of the current output chunk, starting a new
+    // chunk if less than 'min_byte_size' bytes are left.
+    TRITONSERVER_Error* NextOutput(
+        const size_t min_byte_size, char** base, size_t* byte_size)
+    {
+      if ((reserved_.iov_base != nullptr) &&
+          ((reserved_.iov_len - filled_byte_size_) < min_byte_size)) {
+        RETURN_IF_ERR(CommitOutput());
+      }
+      if (reserved_.iov_base == nullptr) {
+        RETURN_MSG_IF_ERR(
+            AllocEVBuffer(
+                std::max(kOutputChunkByteSize, min_byte_size), compressed_data_,
+                &reserved_),
+            "unexpected error allocating output buffer for compression");
+        filled_byte_size_ = 0;
+      }
+      *base = reinterpret_cast<char*>(reserved_.iov_base) + filled_byte_size_;
+      *byte_size = reserved_.iov_len - filled_byte_size_;
+      return nullptr;  // success
+    }
+
+    // Record that 'byte_size' bytes were written to the space returned by
+    // NextOutput()
+    void Produced(const size_t byte_size) { filled_byte_size_ += byte_size; }
+
+   private:
+    static constexpr size_t kOutputChunkByteSize = 256 * 1024;
+
+    TRITONSERVER_Error* CommitOutput()
+    {
+      if (reserved_.iov_base != nullptr) {
+        RETURN_MSG_IF_ERR(
+            CommitEVBuffer(compressed_data_, &reserved_, filled_byte_size_),
+            "unexpected error committing output buffer for compression");
+      }
+      return nullptr;  // success
+    }
+
+    evbuffer* compressed_data_;
+    struct evbuffer_iovec reserved_;
+    size_t filled_byte_size_{0};
+  };
+
+  // Specialization where the source and destination buffer are stored as
+  // evbuffer
+  static TRITONSERVER_Error* CompressData(
+      const Type type, evbuffer* source, evbuffer* compressed_data,
+      const int level = kDefaultLevel)
+  {
+    // nothing to be compressed
+    if (evbuffer_get_length(source) == 0) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG, "nothing to be compressed");
+    }
+
+    std::unique_ptr<Stream> stream;
+    RETURN_IF_ERR(Stream::Create(type, level, compressed_data, &stream));
+    RETURN_IF_ERR(stream->Append(source));
+    return stream->Finish();
   }
 
   static TRITONSERVER_Error* DecompressData(
@@ -180,6 +329,10 @@ class DataCompressor {
         return TRITONSERVER_ErrorNew(
             TRITONSERVER_ERROR_INVALID_ARG, "nothing to be decompressed");
       }
+      case Type::ZSTD:
+        return DecompressZstd(source, decompressed_data, output_buffer_size);
+      case Type::LZ4:
+        return DecompressLz4(source, decompressed_data, output_buffer_size);
       case Type::GZIP:
       case Type::DEFLATE:
         // zlib can automatically detect compression type
@@ -274,6 +427,7 @@ class DataCompressor {
     return nullptr;  // success
   }
 
+
  private:
   static TRITONSERVER_Error* AllocEVBuffer(
       const size_t byte_size, evbuffer* evb,
@@ -305,6 +459,438 @@ class DataCompressor {
     current_reserved_space->iov_base = nullptr;
     return nullptr;  // success
   }
+
+  // Get the addr and size of each chunk of memory in 'source'
+  static TRITONSERVER_Error* PeekEVBuffer(
+      evbuffer* source, std::vector<struct evbuffer_iovec>* buffer_array)
+  {
+    int buffer_count = evbuffer_peek(source, -1, NULL, NULL, 0);
+    if (buffer_count > 0) {
+      buffer_array->resize(buffer_count);
+      if (evbuffer_peek(source, -1, NULL, buffer_array->data(), buffer_count) !=
+          buffer_count) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INTERNAL,
+            "unexpected error getting buffers to be decompressed");
+      }
+    }
+    return nullptr;  // success
+  }
+
+  static TRITONSERVER_Error* DecompressZstd(
+      evbuffer* source, evbuffer* decompressed_data,
+      const size_t output_buffer_size)
+  {
+#ifdef TRITON_ENABLE_ZSTD
+    std::unique_ptr<ZSTD_DCtx, decltype(&ZSTD_freeDCtx)> dctx(
+        ZSTD_createDCtx(), ZSTD_freeDCtx);
+    if (dctx == nullptr) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          "failed to initialize state for zstd data decompression");
+    }
+    std::vector<struct evbuffer_iovec> buffer_array;
+    RETURN_IF_ERR(PeekEVBuffer(source, &buffer_array));
+
+    struct evbuffer_iovec current_reserved_space;
+    RETURN_MSG_IF_ERR(
+        AllocEVBuffer(
+            output_buffer_size, decompressed_data, &current_reserved_space),
+        "unexpected error allocating output buffer for decompression");
+    ZSTD_outBuffer output{
+        current_reserved_space.iov_base, output_buffer_size, 0};
+
+    // Decompress until end of 'source', the decoder may have more data to
+    // flush as long as it fills the output buffer
+    size_t ret = 0;
+    for (const auto& buffer : buffer_array) {
+      ZSTD_inBuffer input{buffer.iov_base, buffer.iov_len, 0};
+      do {
+        // Need additional buffer
+        if (output.pos == output.size) {
+          RETURN_MSG_IF_ERR(
+              CommitEVBuffer(
+                  decompressed_data, &current_reserved_space, output.pos),
+              "unexpected error committing output buffer for decompression");
+          RETURN_MSG_IF_ERR(
+              AllocEVBuffer(
+                  output_buffer_size, decompressed_data,
+                  &current_reserved_space),
+              "unexpected error allocating output buffer for decompression");
+          output = {current_reserved_space.iov_base, output_buffer_size, 0};
+        }
+        ret = ZSTD_decompressStream(dctx.get(), &output, &input);
+        if (ZSTD_isError(ret)) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INVALID_ARG,
+              (std::string("failed to decompress zstd data: ") +
+               ZSTD_getErrorName(ret))
+                  .c_str());
+        }
+      } while ((input.pos < input.size) || (output.pos == output.size));
+    }
+    if (ret != 0) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          "unexpected end of zstd compressed data");
+    }
+    RETURN_MSG_IF_ERR(
+        CommitEVBuffer(decompressed_data, &current_reserved_space, output.pos),
+        "unexpected error committing output buffer for decompression");
+    return nullptr;  // success
+#else
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_UNSUPPORTED,
+        "zstd decompression is not supported by this build");
+#endif  // TRITON_ENABLE_ZSTD
+  }
+
+  static TRITONSERVER_Error* DecompressLz4(
+      evbuffer* source, evbuffer* decompressed_data,
+      const size_t output_buffer_size)
+  {
+#ifdef TRITON_ENABLE_LZ4
+    LZ4F_dctx* raw_dctx = nullptr;
+    if (LZ4F_isError(
+            LZ4F_createDecompressionContext(&raw_dctx, LZ4F_VERSION))) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          "failed to initialize state for lz4 data decompression");
+    }
+    std::unique_ptr<LZ4F_dctx, decltype(&LZ4F_freeDecompressionContext)> dctx(
+        raw_dctx, LZ4F_freeDecompressionContext);
+    std::vector<struct evbuffer_iovec> buffer_array;
+    RETURN_IF_ERR(PeekEVBuffer(source, &buffer_array));
+
+    struct evbuffer_iovec current_reserved_space;
+    RETURN_MSG_IF_ERR(
+        AllocEVBuffer(
+            output_buffer_size, decompressed_data, &current_reserved_space),
+        "unexpected error allocating output buffer for decompression");
+    size_t filled_byte_size = 0;
+
+    // Decompress until end of 'source', the decoder may have more data to
+    // flush as long as it fills the output buffer
+    size_t ret = 0;
+    for (const auto& buffer : buffer_array) {
+      const char* next_in = reinterpret_cast<const char*>(buffer.iov_base);
+      size_t avail_in = buffer.iov_len;
+      do {
+        // Need additional buffer
+        if (filled_byte_size == output_buffer_size) {
+          RETURN_MSG_IF_ERR(
+              CommitEVBuffer(
+                  decompressed_data, &current_reserved_space, filled_byte_size),
+              "unexpected error committing output buffer for decompression");
+          RETURN_MSG_IF_ERR(
+              AllocEVBuffer(
+                  output_buffer_size, decompressed_data,
+                  &current_reserved_space),
+              "unexpected error allocating output buffer for decompression");
+          filled_byte_size = 0;
+        }
+        size_t consumed = avail_in;
+        size_t produced = output_buffer_size - filled_byte_size;
+        ret = LZ4F_decompress(
+            dctx.get(),
+            reinterpret_cast<char*>(current_reserved_space.iov_base) +
+                filled_byte_size,
+            &produced, next_in, &consumed, nullptr /* options */);
+        if (LZ4F_isError(ret)) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INVALID_ARG,
+              (std::string("failed to decompress lz4 data: ") +
+               LZ4F_getErrorName(ret))
+                  .c_str());
+        }
+        next_in += consumed;
+        avail_in -= consumed;
+        filled_byte_size += produced;
+      } while ((avail_in > 0) || (filled_byte_size == output_buffer_size));
+    }
+    if (ret != 0) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          "unexpected end of lz4 compressed data");
+    }
+    RETURN_MSG_IF_ERR(
+        CommitEVBuffer(
+            decompressed_data, &current_reserved_space, filled_byte_size),
+        "unexpected error committing output buffer for decompression");
+    return nullptr;  // success
+#else
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_UNSUPPORTED,
+        "lz4 decompression is not supported by this build");
+#endif  // TRITON_ENABLE_LZ4
+  }
+
+  //
+  // ZlibStream
+  //
+  // Stream for GZIP and DEFLATE compression
+  //
+  class ZlibStream : public Stream {
+   public:
+    explicit ZlibStream(evbuffer* compressed_data) : Stream(compressed_data)
+    {
+      stream_.zalloc = Z_NULL;
+      stream_.zfree = Z_NULL;
+      stream_.opaque = Z_NULL;
+    }
+
+    ~ZlibStream()
+    {
+      if (initialized_) {
+        deflateEnd(&stream_);
+      }
+    }
+
+    TRITONSERVER_Error* Init(const Type type, const int level)
+    {
+      const int zlib_level =
+          (level == kDefaultLevel) ? Z_DEFAULT_COMPRESSION : level;
+      if (type == Type::GZIP) {
+        if (deflateInit2(
+                &stream_, zlib_level, Z_DEFLATED /* method */,
+                15 | 16 /* windowBits */, 8 /* memLevel */,
+                Z_DEFAULT_STRATEGY /* strategy */) != Z_OK) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INTERNAL,
+              "failed to initialize state for gzip data compression");
+        }
+      } else if (deflateInit(&stream_, zlib_level) != Z_OK) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INTERNAL,
+            "failed to initialize state for deflate data compression");
+      }
+      initialized_ = true;
+      return nullptr;  // success
+    }
+
+   protected:
+    TRITONSERVER_Error* Compress(
+        const char* base, const size_t byte_size, const bool finish) override
+    {
+      stream_.next_in =
+          reinterpret_cast<unsigned char*>(const_cast<char*>(base));
+      stream_.avail_in = byte_size;
+
+      // run deflate() until all input is consumed and the output is not full
+      do {
+        char* output = nullptr;
+        size_t output_byte_size = 0;
+        RETURN_IF_ERR(NextOutput(1, &output, &output_byte_size));
+        stream_.next_out = reinterpret_cast<unsigned char*>(output);
+        stream_.avail_out = output_byte_size;
+        if (deflate(&stream_, finish ? Z_FINISH : Z_NO_FLUSH) ==
+            Z_STREAM_ERROR) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INTERNAL,
+              "encountered inconsistent stream state during compression");
+        }
+        Produced(output_byte_size - stream_.avail_out);
+      } while (stream_.avail_out == 0);
+      return nullptr;  // success
+    }
+
+   private:
+    z_stream stream_;
+    bool initialized_{false};
+  };
+
+#ifdef TRITON_ENABLE_ZSTD
+  //
+  // ZstdStream
+  //
+  class ZstdStream : public Stream {
+   public:
+    explicit ZstdStream(evbuffer* compressed_data)
+        : Stream(compressed_data), cctx_(ZSTD_createCCtx(), ZSTD_freeCCtx)
+    {
+    }
+
+    TRITONSERVER_Error* Init(const int level)
+    {
+      if (cctx_ == nullptr) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INTERNAL,
+            "failed to initialize state for zstd data compression");
+      }
+      if (level != kDefaultLevel) {
+        const size_t ret =
+            ZSTD_CCtx_setParameter(cctx_.get(), ZSTD_c_compressionLevel, level);
+        if (ZSTD_isError(ret)) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INVALID_ARG,
+              (std::string("failed to set zstd compression level: ") +
+               ZSTD_getErrorName(ret))
+                  .c_str());
+        }
+      }
+      return nullptr;  // success
+    }
+
+   protected:
+    TRITONSERVER_Error* Compress(
+        const char* base, const size_t byte_size, const bool finish) override
+    {
+      ZSTD_inBuffer input{base, byte_size, 0};
+      const ZSTD_EndDirective mode = finish ? ZSTD_e_end : ZSTD_e_continue;
+      bool done = false;
+      do {
+        char* output_base = nullptr;
+        size_t output_byte_size = 0;
+        RETURN_IF_ERR(NextOutput(1, &output_base, &output_byte_size));
+        ZSTD_outBuffer output{output_base, output_byte_size, 0};
+        const size_t remaining =
+            ZSTD_compressStream2(cctx_.get(), &output, &input, mode);
+        if (ZSTD_isError(remaining)) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INTERNAL,
+              (std::string("failed to compress zstd data: ") +
+               ZSTD_getErrorName(remaining))
+                  .c_str());
+        }
+        Produced(output.pos);
+        // When finishing, 'remaining' is the data still to be flushed
+        done = finish ? (remaining == 0) : (input.pos == input.size);
+      } while (!done);
+      return nullptr;  // success
+    }
+
+   private:
+    std::unique_ptr<ZSTD_CCtx, decltype(&ZSTD_freeCCtx)> cctx_;
+  };
+#endif  // TRITON_ENABLE_ZSTD
+
+#ifdef TRITON_ENABLE_LZ4
+  //
+  // Lz4Stream
+  //
+  // Writes the LZ4 frame format
+  //
+  class Lz4Stream : public Stream {
+   public:
+    explicit Lz4Stream(evbuffer* compressed_data)
+        : Stream(compressed_data), cctx_(nullptr, LZ4F_freeCompressionContext)
+    {
+      std::memset(&preferences_, 0, sizeof(preferences_));
+    }
+
+    TRITONSERVER_Error* Init(const int level)
+    {
+      LZ4F_cctx* cctx = nullptr;
+      if (LZ4F_isError(LZ4F_createCompressionContext(&cctx, LZ4F_VERSION))) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INTERNAL,
+            "failed to initialize state for lz4 data compression");
+      }
+      cctx_.reset(cctx);
+      preferences_.compressionLevel = (level == kDefaultLevel) ? 0 : level;
+
+      char* output = nullptr;
+      size_t output_byte_size = 0;
+      RETURN_IF_ERR(
+          NextOutput(LZ4F_HEADER_SIZE_MAX, &output, &output_byte_size));
+      const size_t written = LZ4F_compressBegin(
+          cctx_.get(), output, output_byte_size, &preferences_);
+      RETURN_IF_ERR(CheckResult(written));
+      Produced(written);
+      return nullptr;  // success
+    }
+
+   protected:
+    // LZ4F_compressUpdate() needs space for the worst case compressed size
+    // of its input, so keep each input small relative to an output chunk.
+    size_t MaxInputSize() const override { return 64 * 1024; }
+
+    TRITONSERVER_Error* Compress(
+        const char* base, const size_t byte_size, const bool finish) override
+    {
+      char* output = nullptr;
+      size_t output_byte_size = 0;
+      if (byte_size > 0) {
+        RETURN_IF_ERR(NextOutput(
+            LZ4F_compressBound(byte_size, &preferences_), &output,
+            &output_byte_size));
+        const size_t written = LZ4F_compressUpdate(
+            cctx_.get(), output, output_byte_size, base, byte_size,
+            nullptr /* options */);
+        RETURN_IF_ERR(CheckResult(written));
+        Produced(written);
+      }
+      if (finish) {
+        RETURN_IF_ERR(NextOutput(
+            LZ4F_compressBound(0, &preferences_), &output, &output_byte_size));
+        const size_t written = LZ4F_compressEnd(
+            cctx_.get(), output, output_byte_size, nullptr /* options */);
+        RETURN_IF_ERR(CheckResult(written));
+        Produced(written);
+      }
+      return nullptr;  // success
+    }
+
+   private:
+    static TRITONSERVER_Error* CheckResult(const size_t ret)
+    {
+      if (LZ4F_isError(ret)) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INTERNAL,
+            (std::string("failed to compress lz4 data: ") +
+             LZ4F_getErrorName(ret))
+                .c_str());
+      }
+      return nullptr;  // success
+    }
+
+    std::unique_ptr<LZ4F_cctx, decltype(&LZ4F_freeCompressionContext)> cctx_;
+    LZ4F_preferences_t preferences_;
+  };
+#endif  // TRITON_ENABLE_LZ4
 };
 
+inline TRITONSERVER_Error*
+DataCompressor::Stream::Create(
+    const Type type, const int level, evbuffer* compressed_data,
+    std::unique_ptr<Stream>* stream)
+{
+  switch (type) {
+    case Type::GZIP:
+    case Type::DEFLATE: {
+      std::unique_ptr<ZlibStream> zlib_stream(new ZlibStream(compressed_data));
+      RETURN_IF_ERR(zlib_stream->Init(type, level));
+      stream->reset(zlib_stream.release());
+      return nullptr;  // success
+    }
+#ifdef TRITON_ENABLE_ZSTD
+    case Type::ZSTD: {
+      std::unique_ptr<ZstdStream> zstd_stream(new ZstdStream(compressed_data));
+      RETURN_IF_ERR(zstd_stream->Init(level));
+      stream->reset(zstd_stream.release());
+      return nullptr;  // success
+    }
+#endif  // TRITON_ENABLE_ZSTD
+#ifdef TRITON_ENABLE_LZ4
+    case Type::LZ4: {
+      std::unique_ptr<Lz4Stream> lz4_stream(new Lz4Stream(compressed_data));
+      RETURN_IF_ERR(lz4_stream->Init(level));
+      stream->reset(lz4_stream.release());
+      return nullptr;  // success
+    }
+#endif  // TRITON_ENABLE_LZ4
+    case Type::UNKNOWN:
+    case Type::IDENTITY:
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG, "nothing to be compressed");
+    default:
+      break;
+  }
+  return TRITONSERVER_ErrorNew(
+      TRITONSERVER_ERROR_UNSUPPORTED,
+      (std::string(TypeString(type)) +
+       " compression is not supported by this build")
+          .c_str());
+}
+
 }}  // namespace triton::server
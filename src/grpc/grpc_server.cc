@@ -42,6 +42,7 @@
 
 #include "../classification.h"
 #include "../common.h"
+#include "../model_load_planner.h"
 #include "grpc++/grpc++.h"
 #include "grpc++/security/server_credentials.h"
 #include "grpc++/server.h"
@@ -62,8 +63,6 @@
 #include "../tracer.h"
 #endif  // TRITON_ENABLE_TRACING
 
-#define REGISTER_GRPC_INFER_THREAD_COUNT 2
-
 namespace triton { namespace server { namespace grpc {
 
 namespace {
@@ -484,6 +483,7 @@ CommonHandler::RegisterServerReady()
     bool ready = false;
     TRITONSERVER_Error* err =
         TRITONSERVER_ServerIsReady(tritonserver_.get(), &ready);
+    ready = ready && !ModelLoadPlanner::Loading();
 
     response->set_ready((err == nullptr) && ready);
 
@@ -523,6 +523,7 @@ CommonHandler::RegisterHealthCheck()
     bool live = false;
     TRITONSERVER_Error* err =
         TRITONSERVER_ServerIsReady(tritonserver_.get(), &live);
+    live = live && !ModelLoadPlanner::Loading();
 
     auto serving_status =
         ::grpc::health::v1::HealthCheckResponse_ServingStatus_UNKNOWN;
@@ -2253,11 +2254,13 @@ Server::Server(
     const std::shared_ptr<TRITONSERVER_Server>& tritonserver,
     triton::server::TraceManager* trace_manager,
     const std::shared_ptr<SharedMemoryManager>& shm_manager,
+    const std::shared_ptr<AdmissionController>& admission_controller,
     const Options& options)
     : tritonserver_(tritonserver), trace_manager_(trace_manager),
-      shm_manager_(shm_manager), server_addr_(
-                                     options.socket_.address_ + ":" +
-                                     std::to_string(options.socket_.port_))
+      shm_manager_(shm_manager), admission_controller_(admission_controller),
+      server_addr_(
+          options.socket_.address_ + ":" +
+          std::to_string(options.socket_.port_))
 {
   std::shared_ptr<::grpc::ServerCredentials> credentials;
   const auto& ssl_options = options.ssl_;
@@ -2371,8 +2374,10 @@ Server::Server(
   }
 
   common_cq_ = builder_.AddCompletionQueue();
-  model_infer_cq_ = builder_.AddCompletionQueue();
-  model_stream_infer_cq_ = builder_.AddCompletionQueue();
+  for (int i = 0; i < options.infer_cq_count_; ++i) {
+    model_infer_cqs_.emplace_back(builder_.AddCompletionQueue());
+    model_stream_infer_cqs_.emplace_back(builder_.AddCompletionQueue());
+  }
 
   // For testing purposes only, add artificial delay in grpc responses.
   const char* dstr = getenv("TRITONSERVER_SERVER_DELAY_GRPC_RESPONSE_SEC");
@@ -2390,23 +2395,34 @@ Server::Server(
   // Handler for model inference requests.
   std::pair<std::string, std::string> restricted_kv =
       options.restricted_protocols_.Get(RestrictedCategory::INFERENCE);
-  for (int i = 0; i < REGISTER_GRPC_INFER_THREAD_COUNT; ++i) {
+  // The handlers are spread round-robin across the completion queues, each
+  // handler keeps its own bucket of reusable request states.
+  for (int i = 0; i < options.infer_thread_count_; ++i) {
     model_infer_handlers_.emplace_back(new ModelInferHandler(
         "ModelInferHandler", tritonserver_, trace_manager_, shm_manager_,
-        &service_, model_infer_cq_.get(),
+        &service_, model_infer_cqs_[i % model_infer_cqs_.size()].get(),
         options.infer_allocation_pool_size_ /* max_state_bucket_count */,
         options.infer_compression_level_, restricted_kv,
-        options.forward_header_pattern_));
+        options.forward_header_pattern_, admission_controller_));
   }
 
-  // Handler for streaming inference requests. Keeps one handler for streaming
-  // to avoid possible concurrent writes which is not allowed
-  model_stream_infer_handlers_.emplace_back(new ModelStreamInferHandler(
-      "ModelStreamInferHandler", tritonserver_, trace_manager_, shm_manager_,
-      &service_, model_stream_infer_cq_.get(),
-      options.infer_allocation_pool_size_ /* max_state_bucket_count */,
-      options.infer_compression_level_, restricted_kv,
-      options.forward_header_pattern_));
+  // Handlers for streaming inference requests, one per completion queue. A
+  // stream is served entirely by the handler that accepted it and each
+  // handler polls its completion queue from a single thread, so the writes
+  // of a stream stay ordered and never run concurrently.
+  for (auto& cq : model_stream_infer_cqs_) {
+    model_stream_infer_handlers_.emplace_back(new ModelStreamInferHandler(
+        "ModelStreamInferHandler", tritonserver_, trace_manager_, shm_manager_,
+        &service_, cq.get(),
+        options.infer_allocation_pool_size_ /* max_state_bucket_count */,
+        options.infer_compression_level_, restricted_kv,
+        options.forward_header_pattern_));
+  }
+  LOG_VERBOSE(1) << "GRPC inference uses " << model_infer_handlers_.size()
+                 << " infer handler(s) and "
+                 << model_stream_infer_handlers_.size()
+                 << " stream infer handler(s) across "
+                 << model_infer_cqs_.size() << " completion queue(s)";
 }
 
 Server::~Server()
@@ -2419,13 +2435,15 @@ Server::Create(
     const std::shared_ptr<TRITONSERVER_Server>& tritonserver,
     triton::server::TraceManager* trace_manager,
     const std::shared_ptr<SharedMemoryManager>& shm_manager,
+    const std::shared_ptr<AdmissionController>& admission_controller,
     const Options& server_options, std::unique_ptr<Server>* server)
 {
   const std::string addr = server_options.socket_.address_ + ":" +
                            std::to_string(server_options.socket_.port_);
   try {
-    server->reset(
-        new Server(tritonserver, trace_manager, shm_manager, server_options));
+    server->reset(new Server(
+        tritonserver, trace_manager, shm_manager, admission_controller,
+        server_options));
   }
   catch (const std::invalid_argument& pe) {
     return TRITONSERVER_ErrorNew(TRITONSERVER_ERROR_INVALID_ARG, pe.what());
@@ -2476,8 +2494,12 @@ Server::Stop()
   server_->Shutdown();
 
   common_cq_->Shutdown();
-  model_infer_cq_->Shutdown();
-  model_stream_infer_cq_->Shutdown();
+  for (auto& cq : model_infer_cqs_) {
+    cq->Shutdown();
+  }
+  for (auto& cq : model_stream_infer_cqs_) {
+    cq->Shutdown();
+  }
 
   // Must stop all handlers explicitly to wait for all the handler
   // threads to join since they are referencing completion queue, etc.
@@ -29,6 +29,7 @@
 
 #include <vector>
 
+#include "../admission_control.h"
 #include "../restricted_features.h"
 #include "../shared_memory_manager.h"
 #include "../tracer.h"
@@ -88,6 +89,11 @@ struct Options {
   // requests doesn't exceed this value there will be no
   // allocation/deallocation of request/response objects.
   int infer_allocation_pool_size_{8};
+  // The number of threads handling inference requests and the number of
+  // completion queues they are spread across. Each completion queue also
+  // has its own thread handling streaming inference requests.
+  int infer_thread_count_{2};
+  int infer_cq_count_{1};
   RestrictedFeatures restricted_protocols_;
   std::string forward_header_pattern_;
 };
@@ -98,6 +104,7 @@ class Server {
       const std::shared_ptr<TRITONSERVER_Server>& tritonserver,
       triton::server::TraceManager* trace_manager,
       const std::shared_ptr<SharedMemoryManager>& shm_manager,
+      const std::shared_ptr<AdmissionController>& admission_controller,
       const Options& server_options, std::unique_ptr<Server>* server);
 
   ~Server();
@@ -110,11 +117,13 @@ class Server {
       const std::shared_ptr<TRITONSERVER_Server>& tritonserver,
       triton::server::TraceManager* trace_manager,
       const std::shared_ptr<SharedMemoryManager>& shm_manager,
+      const std::shared_ptr<AdmissionController>& admission_controller,
       const Options& server_options);
 
   std::shared_ptr<TRITONSERVER_Server> tritonserver_;
   TraceManager* trace_manager_;
   std::shared_ptr<SharedMemoryManager> shm_manager_;
+  std::shared_ptr<AdmissionController> admission_controller_;
   const std::string server_addr_;
 
   ::grpc::ServerBuilder builder_;
@@ -125,8 +134,9 @@ class Server {
   std::unique_ptr<::grpc::Server> server_;
 
   std::unique_ptr<::grpc::ServerCompletionQueue> common_cq_;
-  std::unique_ptr<::grpc::ServerCompletionQueue> model_infer_cq_;
-  std::unique_ptr<::grpc::ServerCompletionQueue> model_stream_infer_cq_;
+  std::vector<std::unique_ptr<::grpc::ServerCompletionQueue>> model_infer_cqs_;
+  std::vector<std::unique_ptr<::grpc::ServerCompletionQueue>>
+      model_stream_infer_cqs_;
 
   std::unique_ptr<HandlerBase> common_handler_;
   std::vector<std::unique_ptr<HandlerBase>> model_infer_handlers_;
@@ -26,6 +26,9 @@
 
 #include "infer_handler.h"
 
+#include <type_traits>
+#include <utility>
+
 #ifndef NDEBUG
 uint64_t
 NextUniqueId()
@@ -168,6 +171,8 @@ TRITONSERVER_Error* InferGRPCToInput(
     const std::shared_ptr<SharedMemoryManager>& shm_manager,
     const inference::ModelInferRequest& request,
     std::list<std::string>* serialized_data,
+    std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>*
+        shm_regions_info,
     TRITONSERVER_InferenceRequest* inference_request);
 
 TRITONSERVER_Error*
@@ -391,6 +396,8 @@ InferGRPCToInput(
     const std::shared_ptr<SharedMemoryManager>& shm_manager,
     const inference::ModelInferRequest& request,
     std::list<std::string>* serialized_data,
+    std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>*
+        shm_regions_info,
     TRITONSERVER_InferenceRequest* inference_request)
 {
   // Verify that the batch-byte-size of each input matches the size of
@@ -432,8 +439,11 @@ InferGRPCToInput(
                 .c_str());
       }
       void* tmp;
+      std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo> shm_info;
       RETURN_IF_ERR(shm_manager->GetMemoryInfo(
-          region_name, offset, byte_size, &tmp, &memory_type, &memory_type_id));
+          region_name, offset, byte_size, &tmp, &memory_type, &memory_type_id,
+          &shm_info));
+      shm_regions_info->emplace_back(std::move(shm_info));
       base = tmp;
       if (memory_type == TRITONSERVER_MEMORY_GPU) {
 #ifdef TRITON_ENABLE_GPU
@@ -789,6 +799,60 @@ ModelInferHandler::Process(InferHandler::State* state, bool rpc_ok)
   return !finished;
 }
 
+namespace {
+
+// Standard library hooks that grow a string without value-initializing
+// the new characters, in order of preference. 'resize_and_overwrite' is
+// C++23, '__resize_and_overwrite' is the libstdc++ (13+) extension
+// available in earlier modes and '__resize_default_init' is the libc++
+// extension.
+struct KeepSize {
+  size_t operator()(char*, size_t n) const { return n; }
+};
+
+template <typename S, typename = void>
+struct HasResizeAndOverwrite : std::false_type {};
+template <typename S>
+struct HasResizeAndOverwrite<
+    S, std::void_t<decltype(std::declval<S&>().resize_and_overwrite(
+           0, KeepSize()))>> : std::true_type {};
+
+template <typename S, typename = void>
+struct HasLibstdcxxResizeAndOverwrite : std::false_type {};
+template <typename S>
+struct HasLibstdcxxResizeAndOverwrite<
+    S, std::void_t<decltype(std::declval<S&>().__resize_and_overwrite(
+           0, KeepSize()))>> : std::true_type {};
+
+template <typename S, typename = void>
+struct HasResizeDefaultInit : std::false_type {};
+template <typename S>
+struct HasResizeDefaultInit<
+    S, std::void_t<decltype(std::declval<S&>().__resize_default_init(0))>>
+    : std::true_type {};
+
+// Resize 'str' to 'byte_size' leaving the contents unspecified. The
+// output buffers handed to the backend are overwritten entirely so
+// zero-filling them first, as std::string::resize() does, is wasted
+// work that becomes significant for multi-MB outputs. Falls back to
+// resize() if the standard library provides no way to skip the fill.
+template <typename S>
+void
+ResizeUninitialized(S* str, size_t byte_size)
+{
+  if constexpr (HasResizeAndOverwrite<S>::value) {
+    str->resize_and_overwrite(byte_size, KeepSize());
+  } else if constexpr (HasLibstdcxxResizeAndOverwrite<S>::value) {
+    str->__resize_and_overwrite(byte_size, KeepSize());
+  } else if constexpr (HasResizeDefaultInit<S>::value) {
+    str->__resize_default_init(byte_size);
+  } else {
+    str->resize(byte_size);
+  }
+}
+
+}  // namespace
+
 TRITONSERVER_Error*
 ResponseAllocatorHelper(
     TRITONSERVER_ResponseAllocator* allocator, const char* tensor_name,
@@ -849,7 +913,11 @@ ResponseAllocatorHelper(
       *actual_memory_type_id = 0;
     }
 
-    raw_output->resize(byte_size);
+    // The response object, and so 'raw_output', is reused across the
+    // requests handled by this state so the string usually already has
+    // enough capacity and growing it needs neither an allocation nor,
+    // with ResizeUninitialized(), a fill.
+    ResizeUninitialized(raw_output, byte_size);
     *buffer = static_cast<void*>(&((*raw_output)[0]));
 
     LOG_VERBOSE(1) << "GRPC: using buffer for '" << tensor_name
@@ -864,6 +932,30 @@ ModelInferHandler::Execute(InferHandler::State* state)
 {
   TRITONSERVER_Error* err = nullptr;
   const inference::ModelInferRequest& request = state->request_;
+
+  // Reject the request early if admission control doesn't admit it, the
+  // ticket is held until the request is released.
+  AdmissionController::Ticket admission_ticket;
+  if (admission_controller_ != nullptr) {
+    std::string message;
+    if (!admission_controller_->Admit(
+            request.model_name(), "grpc", &admission_ticket, &message)) {
+      LOG_VERBOSE(1) << "Infer rejected: " << message;
+
+#ifdef TRITON_ENABLE_TRACING
+      state->trace_timestamps_.emplace_back(
+          std::make_pair("GRPC_SEND_START", TraceManager::CaptureTimestamp()));
+#endif  // TRITON_ENABLE_TRACING
+
+      state->step_ = COMPLETE;
+      state->context_->responder_->Finish(
+          inference::ModelInferResponse(),
+          ::grpc::Status(::grpc::StatusCode::RESOURCE_EXHAUSTED, message),
+          state);
+      return;
+    }
+  }
+
   auto response_queue = state->response_queue_;
   int64_t requested_model_version;
   if (err == nullptr) {
@@ -910,19 +1002,24 @@ ModelInferHandler::Execute(InferHandler::State* state)
   // Will be used to hold the serialized data in case explicit string
   // tensors are present in the request.
   std::list<std::string> serialized_data;
+  // Will be used to keep the shared memory regions used by the request
+  // mapped until the request is released.
+  std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>
+      shm_regions_info;
 
   if (err == nullptr) {
     err = InferGRPCToInput(
-        tritonserver_, shm_manager_, request, &serialized_data, irequest);
+        tritonserver_, shm_manager_, request, &serialized_data,
+        &shm_regions_info, irequest);
   }
   if (err == nullptr) {
     err = InferAllocatorPayload<inference::ModelInferResponse>(
         tritonserver_, shm_manager_, request, std::move(serialized_data),
-        response_queue, &state->alloc_payload_);
+        std::move(shm_regions_info), response_queue, &state->alloc_payload_);
   }
 
-  auto request_release_payload =
-      std::make_unique<RequestReleasePayload>(state->inference_request_);
+  auto request_release_payload = std::make_unique<RequestReleasePayload>(
+      state->inference_request_, std::move(admission_ticket));
   if (err == nullptr) {
     err = TRITONSERVER_InferenceRequestSetReleaseCallback(
         irequest, InferRequestComplete,
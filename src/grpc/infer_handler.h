@@ -34,6 +34,7 @@
 #include <regex>
 #include <thread>
 
+#include "../admission_control.h"
 #include "../tracer.h"
 #include "grpc_handler.h"
 #include "grpc_service.grpc.pb.h"
@@ -92,11 +93,16 @@ class Barrier {
 // request release callback.
 struct RequestReleasePayload final {
   explicit RequestReleasePayload(
-      const std::shared_ptr<TRITONSERVER_InferenceRequest>& inference_request)
-      : inference_request_(inference_request){};
+      const std::shared_ptr<TRITONSERVER_InferenceRequest>& inference_request,
+      AdmissionController::Ticket&& admission_ticket =
+          AdmissionController::Ticket())
+      : inference_request_(inference_request),
+        admission_ticket_(std::move(admission_ticket)){};
 
  private:
   std::shared_ptr<TRITONSERVER_InferenceRequest> inference_request_ = nullptr;
+  // Releases the request from admission control
+  AdmissionController::Ticket admission_ticket_;
 };
 
 //
@@ -289,6 +295,12 @@ struct AllocPayload {
   // lifetime is that of a response... but it is convenient to keep it
   // here.
   std::list<std::string> serialized_data_;
+
+  // Shared memory regions used by the request, holding the references
+  // keeps the regions mapped until the request is released even if they
+  // are unregistered while the request is in flight.
+  std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>
+      shm_regions_info_;
 };
 
 template <typename ResponseType>
@@ -298,6 +310,8 @@ InferAllocatorPayload(
     const std::shared_ptr<SharedMemoryManager>& shm_manager,
     const inference::ModelInferRequest& request,
     std::list<std::string>&& serialized_data,
+    std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>&&
+        shm_regions_info,
     std::shared_ptr<ResponseQueue<ResponseType>> response_queue,
     AllocPayload<ResponseType>* alloc_payload)
 {
@@ -305,6 +319,7 @@ InferAllocatorPayload(
   alloc_payload->shm_map_.clear();
   alloc_payload->classification_map_.clear();
   alloc_payload->serialized_data_ = std::move(serialized_data);
+  alloc_payload->shm_regions_info_ = std::move(shm_regions_info);
 
   // If any of the outputs use shared memory, then we must calculate
   // the memory address for that output and store it in the allocator
@@ -335,9 +350,11 @@ InferAllocatorPayload(
       void* base;
       TRITONSERVER_MemoryType memory_type;
       int64_t memory_type_id;
+      std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo> shm_info;
       RETURN_IF_ERR(shm_manager->GetMemoryInfo(
-          region_name, offset, byte_size, &base, &memory_type,
-          &memory_type_id));
+          region_name, offset, byte_size, &base, &memory_type, &memory_type_id,
+          &shm_info));
+      alloc_payload->shm_regions_info_.emplace_back(std::move(shm_info));
 
       if (memory_type == TRITONSERVER_MEMORY_GPU) {
 #ifdef TRITON_ENABLE_GPU
@@ -373,6 +390,8 @@ TRITONSERVER_Error* InferGRPCToInput(
     const std::shared_ptr<SharedMemoryManager>& shm_manager,
     const inference::ModelInferRequest& request,
     std::list<std::string>* serialized_data,
+    std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>*
+        shm_regions_info,
     TRITONSERVER_InferenceRequest* inference_request);
 
 TRITONSERVER_Error* ResponseAllocatorHelper(
@@ -1104,6 +1123,8 @@ class InferHandlerState {
   {
     context_ = nullptr;
     inference_request_.reset();
+    // Don't keep shared memory regions mapped while the state is pooled
+    alloc_payload_.shm_regions_info_.clear();
     ClearTraceTimestamps();
   }
 
@@ -1443,11 +1464,13 @@ class ModelInferHandler
       ::grpc::ServerCompletionQueue* cq, size_t max_state_bucket_count,
       grpc_compression_level compression_level,
       std::pair<std::string, std::string> restricted_kv,
-      const std::string& forward_header_pattern)
+      const std::string& forward_header_pattern,
+      const std::shared_ptr<AdmissionController>& admission_controller)
       : InferHandler(
             name, tritonserver, service, cq, max_state_bucket_count,
             restricted_kv, forward_header_pattern),
         trace_manager_(trace_manager), shm_manager_(shm_manager),
+        admission_controller_(admission_controller),
         compression_level_(compression_level)
   {
     // Create the allocator that will be used to allocate buffers for
@@ -1486,6 +1509,8 @@ class ModelInferHandler
 
   TraceManager* trace_manager_;
   std::shared_ptr<SharedMemoryManager> shm_manager_;
+  // Set if admission control is enabled
+  std::shared_ptr<AdmissionController> admission_controller_;
   TRITONSERVER_ResponseAllocator* allocator_;
 
   grpc_compression_level compression_level_;
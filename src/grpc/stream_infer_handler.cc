@@ -281,15 +281,20 @@ ModelStreamInferHandler::Process(InferHandler::State* state, bool rpc_ok)
     // Will be used to hold the serialized data in case explicit string
     // tensors are present in the request.
     std::list<std::string> serialized_data;
+    // Will be used to keep the shared memory regions used by the request
+    // mapped until the request is released.
+    std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>
+        shm_regions_info;
 
     if (err == nullptr) {
       err = InferGRPCToInput(
-          tritonserver_, shm_manager_, request, &serialized_data, irequest);
+          tritonserver_, shm_manager_, request, &serialized_data,
+          &shm_regions_info, irequest);
     }
     if (err == nullptr) {
       err = InferAllocatorPayload<inference::ModelStreamInferResponse>(
           tritonserver_, shm_manager_, request, std::move(serialized_data),
-          response_queue_, &state->alloc_payload_);
+          std::move(shm_regions_info), response_queue_, &state->alloc_payload_);
     }
 
     auto request_release_payload =
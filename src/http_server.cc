@@ -31,14 +31,21 @@
 #include "http_server.h"
 
 #include <event2/buffer.h>
+#include <rapidjson/writer.h>
 #include <re2/re2.h>
 
 #include <algorithm>
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <limits>
 #include <list>
 #include <regex>
+#include <set>
 #include <thread>
 
 #include "classification.h"
+#include "model_load_planner.h"
 
 #define TRITONJSON_STATUSTYPE TRITONSERVER_Error*
 #define TRITONJSON_STATUSRETURN(M) \
@@ -94,6 +101,9 @@ namespace triton { namespace server {
 
 namespace {
 
+// Not defined by libevhtp
+constexpr evhtp_res kHttpTooManyRequests = 429;
+
 int
 HttpCodeFromError(TRITONSERVER_Error* error)
 {
@@ -199,6 +209,151 @@ SetTritonParameterFromJsonParameter(
   return nullptr;  // success
 }
 
+std::string
+CompressionTypeUsed(const std::string accept_encoding)
+{
+  std::vector<std::string> encodings;
+  size_t offset = 0;
+  size_t delimeter_pos = accept_encoding.find(',');
+  while (delimeter_pos != std::string::npos) {
+    encodings.emplace_back(
+        accept_encoding.substr(offset, delimeter_pos - offset));
+    offset = delimeter_pos + 1;
+    delimeter_pos = accept_encoding.find(',', offset);
+  }
+  std::string res = "identity";
+  double weight = 0;
+  encodings.emplace_back(accept_encoding.substr(offset));
+  for (const auto& encoding : encodings) {
+    auto start_pos = encoding.find_first_not_of(' ');
+    auto weight_pos = encoding.find(";q=");
+    // Skip if the encoding is malformed
+    if ((start_pos == std::string::npos) ||
+        ((weight_pos != std::string::npos) && (start_pos >= weight_pos))) {
+      continue;
+    }
+    const std::string type =
+        (weight_pos == std::string::npos)
+            ? encoding.substr(start_pos)
+            : encoding.substr(start_pos, weight_pos - start_pos);
+    double type_weight = 1;
+    if (weight_pos != std::string::npos) {
+      try {
+        type_weight = std::stod(encoding.substr(weight_pos + 3));
+      }
+      catch (const std::invalid_argument& ia) {
+        continue;
+      }
+    }
+    if ((DataCompressor::ParseType(type) != DataCompressor::Type::UNKNOWN) &&
+        (type_weight > weight)) {
+      res = type;
+      weight = type_weight;
+    }
+  }
+  return res;
+}
+
+#ifdef TRITON_ENABLE_METRICS
+// Split the comma-separated 'list' into 'items', ignoring empty items.
+void
+SplitList(const std::string& list, std::set<std::string>* items)
+{
+  size_t offset = 0;
+  while (offset <= list.size()) {
+    size_t delimiter_pos = list.find(',', offset);
+    if (delimiter_pos == std::string::npos) {
+      delimiter_pos = list.size();
+    }
+    if (delimiter_pos > offset) {
+      items->emplace(list.substr(offset, delimiter_pos - offset));
+    }
+    offset = delimiter_pos + 1;
+  }
+}
+
+// Return the value of the 'model' label of the Prometheus sample in
+// ['begin', 'end') of 'text', empty if the sample has no such label.
+std::string
+ModelLabel(const std::string& text, const size_t begin, const size_t end)
+{
+  static const std::string kModelLabel("model=\"");
+  size_t pos = text.find('{', begin);
+  while ((pos != std::string::npos) && (pos < end)) {
+    if (text.compare(pos + 1, kModelLabel.size(), kModelLabel) == 0) {
+      const size_t value_begin = pos + 1 + kModelLabel.size();
+      const size_t value_end = text.find('"', value_begin);
+      if ((value_end == std::string::npos) || (value_end > end)) {
+        break;
+      }
+      return text.substr(value_begin, value_end - value_begin);
+    }
+    pos = text.find(',', pos + 1);
+  }
+  return "";
+}
+
+// Return the part of the Prometheus 'text' that belongs to one of the
+// metric 'families' and, for samples, has a 'model' label in 'models'.
+// An empty set does not restrict. The HELP and TYPE lines of a family
+// are only kept if at least one of its samples is.
+std::string
+FilterPrometheusText(
+    const std::string& text, const std::set<std::string>& families,
+    const std::set<std::string>& models)
+{
+  std::string filtered;
+  std::string family;
+  bool family_selected = true;
+  // Range of the HELP and TYPE lines of 'family' not yet written
+  size_t header_begin = 0;
+  size_t header_end = 0;
+  size_t pos = 0;
+  while (pos < text.size()) {
+    size_t line_end = text.find('\n', pos);
+    line_end = (line_end == std::string::npos) ? text.size() : line_end + 1;
+    if (text.compare(pos, 2, "# ") == 0) {
+      // "# HELP <family> ..." or "# TYPE <family> ..."
+      size_t name_begin = text.find(' ', pos + 2);
+      name_begin =
+          ((name_begin == std::string::npos) || (name_begin > line_end))
+              ? line_end
+              : name_begin + 1;
+      const size_t name_end = text.find_first_of(" \n", name_begin);
+      const std::string name = text.substr(name_begin, name_end - name_begin);
+      if (name != family) {
+        family = name;
+        family_selected = families.empty() || (families.count(family) > 0);
+        header_begin = pos;
+      } else if (header_begin == header_end) {
+        // The earlier lines of the family were already written
+        header_begin = pos;
+      }
+      header_end = line_end;
+    } else if (
+        family_selected && (line_end > pos + 1) &&
+        (models.empty() ||
+         (models.count(ModelLabel(text, pos, line_end)) > 0))) {
+      if (header_end > header_begin) {
+        filtered.append(text, header_begin, header_end - header_begin);
+        header_begin = header_end;
+      }
+      filtered.append(text, pos, line_end - pos);
+    }
+    pos = line_end;
+  }
+  return filtered;
+}
+
+uint64_t
+SteadyClockMs()
+{
+  return std::chrono::duration_cast<std::chrono::milliseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+#endif  // TRITON_ENABLE_METRICS
+
 }  // namespace
 
 TRITONSERVER_Error*
@@ -328,35 +483,136 @@ HTTPMetricsServer::Handle(evhtp_request_t* req)
 
   // Call to metric endpoint should not have any trailing string
   if (RE2::FullMatch(std::string(req->uri->path->full), api_regex_)) {
+    // Optional '?family=<name>[,<name>...]&model=<name>[,<name>...]'
+    // restricting the metrics returned
+    std::string families, models;
+    if (req->uri->query != nullptr) {
+      const char* family_c_str = evhtp_kv_find(req->uri->query, "family");
+      if (family_c_str != nullptr) {
+        families = family_c_str;
+      }
+      const char* model_c_str = evhtp_kv_find(req->uri->query, "model");
+      if (model_c_str != nullptr) {
+        models = model_c_str;
+      }
+    }
+
+    DataCompressor::Type encoding = DataCompressor::Type::IDENTITY;
+    const char* accept_encoding_c_str =
+        evhtp_kv_find(req->headers_in, kAcceptEncodingHTTPHeader);
+    if (accept_encoding_c_str != nullptr) {
+      encoding =
+          DataCompressor::ParseType(CompressionTypeUsed(accept_encoding_c_str));
+    }
+
+    Body body;
+    RETURN_AND_RESPOND_IF_ERR(req, GetBody(families, models, encoding, &body));
+
+    evhtp_headers_add_header(
+        req->headers_out,
+        evhtp_header_new("Vary", kAcceptEncodingHTTPHeader, 1, 1));
+    if (body.first != DataCompressor::Type::IDENTITY) {
+      evhtp_headers_add_header(
+          req->headers_out, evhtp_header_new(
+                                kContentEncodingHTTPHeader,
+                                DataCompressor::TypeString(body.first), 1, 1));
+    }
+
+    // Reference the cached body instead of copying it, the reference is
+    // dropped once the response is written
+    auto holder = new std::shared_ptr<const std::string>(body.second);
+    evbuffer_add_reference(
+        req->buffer_out, body.second->data(), body.second->size(),
+        [](const void*, size_t, void* arg) {
+          delete static_cast<std::shared_ptr<const std::string>*>(arg);
+        },
+        holder);
+  }
+
+  evhtp_send_reply(req, EVHTP_RES_OK);
+}
+
+TRITONSERVER_Error*
+HTTPMetricsServer::GetBody(
+    const std::string& families, const std::string& models,
+    const DataCompressor::Type encoding, Body* body)
+{
+  std::lock_guard<std::mutex> lock(cache_mu_);
+
+  const uint64_t now_ms = SteadyClockMs();
+  if ((cache_text_ == nullptr) || (now_ms - cache_time_ms_ >= cache_ttl_ms_)) {
     TRITONSERVER_Metrics* metrics = nullptr;
+    RETURN_IF_ERR(TRITONSERVER_ServerMetrics(server_.get(), &metrics));
+    const char* base;
+    size_t byte_size;
+    TRITONSERVER_Error* err = TRITONSERVER_MetricsFormatted(
+        metrics, TRITONSERVER_METRIC_PROMETHEUS, &base, &byte_size);
+    if (err == nullptr) {
+      cache_text_ = std::make_shared<const std::string>(base, byte_size);
+      cache_time_ms_ = now_ms;
+      cache_bodies_.clear();
+    }
+    TRITONSERVER_MetricsDelete(metrics);
+    RETURN_IF_ERR(err);
+  }
+
+  const auto key = std::make_tuple(families, models, encoding);
+  auto it = cache_bodies_.find(key);
+  if (it != cache_bodies_.end()) {
+    *body = it->second;
+    return nullptr;  // success
+  }
+
+  std::shared_ptr<const std::string> text = cache_text_;
+  if (!families.empty() || !models.empty()) {
+    std::set<std::string> family_set, model_set;
+    SplitList(families, &family_set);
+    SplitList(models, &model_set);
+    text = std::make_shared<const std::string>(
+        FilterPrometheusText(*cache_text_, family_set, model_set));
+  }
+
+  // Nothing to compress in an empty body
+  if ((encoding == DataCompressor::Type::IDENTITY) || text->empty()) {
+    *body = Body(DataCompressor::Type::IDENTITY, text);
+  } else {
+    evbuffer* source = evbuffer_new();
+    evbuffer* compressed = evbuffer_new();
+    evbuffer_add_reference(
+        source, text->data(), text->size(), nullptr, nullptr);
     TRITONSERVER_Error* err =
-        TRITONSERVER_ServerMetrics(server_.get(), &metrics);
+        DataCompressor::CompressData(encoding, source, compressed);
     if (err == nullptr) {
-      const char* base;
-      size_t byte_size;
-      err = TRITONSERVER_MetricsFormatted(
-          metrics, TRITONSERVER_METRIC_PROMETHEUS, &base, &byte_size);
-      if (err == nullptr) {
-        evbuffer_add(req->buffer_out, base, byte_size);
-      }
+      auto compressed_text =
+          std::make_shared<std::string>(evbuffer_get_length(compressed), '\0');
+      evbuffer_copyout(
+          compressed, &(*compressed_text)[0], compressed_text->size());
+      *body = Body(encoding, std::move(compressed_text));
     }
+    evbuffer_free(source);
+    evbuffer_free(compressed);
+    RETURN_IF_ERR(err);
+  }
 
-    TRITONSERVER_MetricsDelete(metrics);
-    RETURN_AND_RESPOND_IF_ERR(req, err);
-    TRITONSERVER_ErrorDelete(err);
+  // Each distinct query adds an entry until the metrics are formatted
+  // again, bound the entries so that arbitrary queries can't grow the
+  // cache without limit.
+  constexpr size_t kMaxCachedBodies = 64;
+  if ((cache_ttl_ms_ > 0) && (cache_bodies_.size() < kMaxCachedBodies)) {
+    cache_bodies_.emplace(key, *body);
   }
 
-  evhtp_send_reply(req, EVHTP_RES_OK);
+  return nullptr;  // success
 }
 
 TRITONSERVER_Error*
 HTTPMetricsServer::Create(
     const std::shared_ptr<TRITONSERVER_Server>& server, const int32_t port,
-    std::string address, const int thread_cnt,
+    std::string address, const int thread_cnt, const uint64_t cache_ttl_ms,
     std::unique_ptr<HTTPServer>* metrics_server)
 {
   metrics_server->reset(
-      new HTTPMetricsServer(server, port, address, thread_cnt));
+      new HTTPMetricsServer(server, port, address, thread_cnt, cache_ttl_ms));
 
   const std::string addr = address + ":" + std::to_string(port);
   LOG_INFO << "Started Metrics Service at " << addr;
@@ -366,6 +622,54 @@ HTTPMetricsServer::Create(
 
 #endif  // TRITON_ENABLE_METRICS
 
+void
+HTTPHealthServer::Handle(evhtp_request_t* req)
+{
+  LOG_VERBOSE(1) << "HTTP request: " << req->method << " "
+                 << req->uri->path->full;
+
+  if (req->method != htp_method_GET) {
+    RETURN_AND_RESPOND_WITH_ERR(
+        req, EVHTP_RES_METHNALLOWED, "Method Not Allowed");
+  }
+
+  const std::string path(req->uri->path->full);
+  std::string kind, model_name, version;
+  if (RE2::FullMatch(path, health_regex_, &kind)) {
+    const bool ready =
+        (kind == "live") ? cache_->ServerLive() : cache_->ServerReady();
+    evhtp_send_reply(req, ready ? EVHTP_RES_OK : EVHTP_RES_BADREQ);
+    return;
+  }
+
+  if (RE2::FullMatch(path, model_ready_regex_, &model_name, &version)) {
+    int64_t requested_model_version;
+    RETURN_AND_RESPOND_IF_ERR(
+        req, GetModelVersionFromString(version, &requested_model_version));
+    if (!cache_->ModelReady(model_name, requested_model_version)) {
+      RETURN_AND_RESPOND_WITH_ERR(
+          req, EVHTP_RES_BADREQ, "Model version not ready");
+    }
+    evhtp_send_reply(req, EVHTP_RES_OK);
+    return;
+  }
+
+  RETURN_AND_RESPOND_WITH_ERR(req, EVHTP_RES_NOTFOUND, "Not Found");
+}
+
+TRITONSERVER_Error*
+HTTPHealthServer::Create(
+    const std::shared_ptr<ReadinessCache>& cache, const int32_t port,
+    std::string address, std::unique_ptr<HTTPServer>* health_server)
+{
+  health_server->reset(new HTTPHealthServer(cache, port, address));
+
+  const std::string addr = address + ":" + std::to_string(port);
+  LOG_INFO << "Started Health Service at " << addr;
+
+  return nullptr;
+}
+
 namespace {
 
 // Allocate an evbuffer of size 'byte_size'. Return the 'evb' and
@@ -845,6 +1149,147 @@ WriteDataToJson(
   return nullptr;  // success
 }
 
+// rapidjson output stream that appends to a string, so that responses can
+// be written without building a JSON document first.
+class StringOutputStream {
+ public:
+  typedef char Ch;
+  explicit StringOutputStream(std::string* str) : str_(str) {}
+  void Put(char c) { str_->push_back(c); }
+  void Flush() {}
+
+ private:
+  std::string* str_;
+};
+
+using StringJsonWriter = rapidjson::Writer<StringOutputStream>;
+
+TRITONSERVER_Error*
+JsonWriterCheck(const bool success)
+{
+  if (!success) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INTERNAL, "failed to write JSON response");
+  }
+  return nullptr;  // success
+}
+
+template <typename T, typename V>
+TRITONSERVER_Error*
+WriteNumbersToJsonWriter(
+    StringJsonWriter* writer, const std::string& output_name, const void* base,
+    const size_t byte_size, const size_t element_count,
+    bool (StringJsonWriter::*write)(V))
+{
+  RETURN_IF_ERR(
+      WriteDataToJsonCheck(output_name, byte_size, sizeof(T) * element_count));
+  const T* cbase = reinterpret_cast<const T*>(base);
+  for (size_t e = 0; e < element_count; ++e) {
+    RETURN_IF_ERR(JsonWriterCheck((writer->*write)(cbase[e])));
+  }
+  return nullptr;  // success
+}
+
+// Same as WriteDataToJson but writes the elements to 'writer'
+TRITONSERVER_Error*
+WriteDataToJsonWriter(
+    StringJsonWriter* writer, const std::string& output_name,
+    const TRITONSERVER_DataType datatype, const void* base,
+    const size_t byte_size, const size_t element_count)
+{
+  switch (datatype) {
+    case TRITONSERVER_TYPE_BOOL: {
+      RETURN_IF_ERR(WriteDataToJsonCheck(
+          output_name, byte_size, sizeof(uint8_t) * element_count));
+      const uint8_t* bool_base = reinterpret_cast<const uint8_t*>(base);
+      for (size_t e = 0; e < element_count; ++e) {
+        RETURN_IF_ERR(JsonWriterCheck(writer->Bool(bool_base[e] != 0)));
+      }
+      return nullptr;  // success
+    }
+    case TRITONSERVER_TYPE_UINT8:
+      return WriteNumbersToJsonWriter<uint8_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Uint64);
+    case TRITONSERVER_TYPE_UINT16:
+      return WriteNumbersToJsonWriter<uint16_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Uint64);
+    case TRITONSERVER_TYPE_UINT32:
+      return WriteNumbersToJsonWriter<uint32_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Uint64);
+    case TRITONSERVER_TYPE_UINT64:
+      return WriteNumbersToJsonWriter<uint64_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Uint64);
+    case TRITONSERVER_TYPE_INT8:
+      return WriteNumbersToJsonWriter<int8_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Int64);
+    case TRITONSERVER_TYPE_INT16:
+      return WriteNumbersToJsonWriter<int16_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Int64);
+    case TRITONSERVER_TYPE_INT32:
+      return WriteNumbersToJsonWriter<int32_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Int64);
+    case TRITONSERVER_TYPE_INT64:
+      return WriteNumbersToJsonWriter<int64_t>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Int64);
+    case TRITONSERVER_TYPE_FP32:
+      return WriteNumbersToJsonWriter<float>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Double);
+    case TRITONSERVER_TYPE_FP64:
+      return WriteNumbersToJsonWriter<double>(
+          writer, output_name, base, byte_size, element_count,
+          &StringJsonWriter::Double);
+
+    case TRITONSERVER_TYPE_BYTES: {
+      const char* cbase = reinterpret_cast<const char*>(base);
+      size_t offset = 0;
+      for (size_t e = 0; e < element_count; ++e) {
+        if ((offset + sizeof(uint32_t)) > byte_size) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INTERNAL,
+              std::string(
+                  "output tensor shape does not match size of output for '" +
+                  output_name + "'")
+                  .c_str());
+        }
+
+        const size_t len = *(reinterpret_cast<const uint32_t*>(cbase + offset));
+        offset += sizeof(uint32_t);
+
+        if ((offset + len) > byte_size) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INTERNAL,
+              std::string(
+                  "output tensor shape does not match size of output for '" +
+                  output_name + "'")
+                  .c_str());
+        }
+
+        RETURN_IF_ERR(JsonWriterCheck(writer->String(cbase + offset, len)));
+        offset += len;
+      }
+      return nullptr;  // success
+    }
+
+    default:
+      // FP16, BF16 and invalid data types are reported as usual
+      break;
+  }
+
+  triton::common::TritonJson::Value data_json(
+      triton::common::TritonJson::ValueType::ARRAY);
+  return WriteDataToJson(
+      &data_json, output_name, datatype, base, byte_size, element_count);
+}
+
 TRITONSERVER_Error*
 CheckBinaryInputData(
     triton::common::TritonJson::Value& request_input, bool* is_binary,
@@ -1078,52 +1523,109 @@ EVBufferToJson(
   return nullptr;  // success
 }
 
-std::string
-CompressionTypeUsed(const std::string accept_encoding)
+// Magic and version at the start of requests and responses using the
+// compact binary framing
+constexpr char kCompactBinaryMagic[4] = {'T', 'R', 'T', 'B'};
+constexpr uint16_t kCompactBinaryVersion = 1;
+
+bool
+IsCompactBinaryRequest(evhtp_request_t* req)
 {
-  std::vector<std::string> encodings;
-  size_t offset = 0;
-  size_t delimeter_pos = accept_encoding.find(',');
-  while (delimeter_pos != std::string::npos) {
-    encodings.emplace_back(
-        accept_encoding.substr(offset, delimeter_pos - offset));
-    offset = delimeter_pos + 1;
-    delimeter_pos = accept_encoding.find(',', offset);
-  }
-  std::string res = "identity";
-  double weight = 0;
-  encodings.emplace_back(accept_encoding.substr(offset));
-  for (const auto& encoding : encodings) {
-    auto start_pos = encoding.find_first_not_of(' ');
-    auto weight_pos = encoding.find(";q=");
-    // Skip if the encoding is malformed
-    if ((start_pos == std::string::npos) ||
-        ((weight_pos != std::string::npos) && (start_pos >= weight_pos))) {
-      continue;
+  const char* content_type = evhtp_kv_find(req->headers_in, kContentTypeHeader);
+  if (content_type == nullptr) {
+    return false;
+  }
+  // Ignore any parameters following the media type
+  const size_t len = strlen(kInferCompactBinaryContentType);
+  return (strncmp(content_type, kInferCompactBinaryContentType, len) == 0) &&
+         ((content_type[len] == '\0') || (content_type[len] == ';'));
+}
+
+// Sequential reader over the chunks of an HTTP body. Fixed-size fields
+// are copied out and may span chunks, tensor data is handed out as
+// references to the chunks.
+class EVBufferReader {
+ public:
+  EVBufferReader(evbuffer_iovec* v, int n) : v_(v), n_(n)
+  {
+    for (int i = 0; i < n_; ++i) {
+      remaining_ += v_[i].iov_len;
     }
-    const std::string type =
-        (weight_pos == std::string::npos)
-            ? encoding.substr(start_pos)
-            : encoding.substr(start_pos, weight_pos - start_pos);
-    double type_weight = 1;
-    if (weight_pos != std::string::npos) {
-      try {
-        type_weight = std::stod(encoding.substr(weight_pos + 3));
-      }
-      catch (const std::invalid_argument& ia) {
-        continue;
-      }
+  }
+
+  size_t Remaining() const { return remaining_; }
+
+  bool Read(void* dst, size_t byte_size)
+  {
+    if (byte_size > remaining_) {
+      return false;
     }
-    if (((type == "identity") || (type == "deflate") || (type == "gzip")) &&
-        (type_weight > weight)) {
-      res = type;
-      weight = type_weight;
+    char* out = static_cast<char*>(dst);
+    while (byte_size > 0) {
+      const size_t len = std::min(byte_size, v_[v_idx_].iov_len);
+      memcpy(out, v_[v_idx_].iov_base, len);
+      Advance(len);
+      out += len;
+      byte_size -= len;
     }
+    return true;
   }
-  return res;
-}
 
-}  // namespace
+  template <typename T>
+  bool Read(T* value)
+  {
+    return Read(reinterpret_cast<void*>(value), sizeof(T));
+  }
+
+  bool Read(std::string* str, size_t byte_size)
+  {
+    if (byte_size > remaining_) {
+      return false;
+    }
+    str->resize(byte_size);
+    return Read(&(*str)[0], byte_size);
+  }
+
+  // Call 'fn(base, len)' for each chunk holding the next 'byte_size' bytes
+  template <typename F>
+  TRITONSERVER_Error* ForEachChunk(size_t byte_size, F fn)
+  {
+    while (byte_size > 0) {
+      const size_t len = std::min(byte_size, v_[v_idx_].iov_len);
+      if (len > 0) {
+        RETURN_IF_ERR(fn(static_cast<const char*>(v_[v_idx_].iov_base), len));
+      }
+      Advance(len);
+      byte_size -= len;
+    }
+    return nullptr;  // success
+  }
+
+ private:
+  void Advance(size_t len)
+  {
+    v_[v_idx_].iov_base = static_cast<char*>(v_[v_idx_].iov_base) + len;
+    v_[v_idx_].iov_len -= len;
+    remaining_ -= len;
+    if (v_[v_idx_].iov_len == 0) {
+      ++v_idx_;
+    }
+  }
+
+  evbuffer_iovec* v_;
+  int n_;
+  int v_idx_{0};
+  size_t remaining_{0};
+};
+
+template <typename T>
+void
+AppendValue(std::string* buffer, const T value)
+{
+  buffer->append(reinterpret_cast<const char*>(&value), sizeof(T));
+}
+
+}  // namespace
 
 HTTPAPIServer::HTTPAPIServer(
     const std::shared_ptr<TRITONSERVER_Server>& server,
@@ -1131,7 +1633,8 @@ HTTPAPIServer::HTTPAPIServer(
     const std::shared_ptr<SharedMemoryManager>& shm_manager, const int32_t port,
     const bool reuse_port, const std::string& address,
     const std::string& header_forward_pattern, const int thread_cnt,
-    const RestrictedFeatures& restricted_apis)
+    const RestrictedFeatures& restricted_apis,
+    const DataCompressor::Options& compression_options)
     : HTTPServer(port, reuse_port, address, header_forward_pattern, thread_cnt),
       server_(server), trace_manager_(trace_manager), shm_manager_(shm_manager),
       allocator_(nullptr), server_regex_(R"(/v2(?:/health/(live|ready))?)"),
@@ -1143,7 +1646,8 @@ HTTPAPIServer::HTTPAPIServer(
           R"(/v2/systemsharedmemory(?:/region/([^/]+))?/(status|register|unregister))"),
       cudasharedmemory_regex_(
           R"(/v2/cudasharedmemory(?:/region/([^/]+))?/(status|register|unregister))"),
-      trace_regex_(R"(/v2/trace/setting)"), restricted_apis_(restricted_apis)
+      trace_regex_(R"(/v2/trace/setting)"), restricted_apis_(restricted_apis),
+      compression_options_(compression_options)
 {
   // FIXME, don't cache server metadata. The http endpoint should
   // not be deciding that server metadata will not change during
@@ -1181,6 +1685,8 @@ HTTPAPIServer::HTTPAPIServer(
 
 HTTPAPIServer::~HTTPAPIServer()
 {
+  // Flush the requests held for coalescing while the allocator is valid
+  coalescer_.reset();
   if (server_metadata_err_ != nullptr) {
     TRITONSERVER_ErrorDelete(server_metadata_err_);
   }
@@ -1379,6 +1885,7 @@ HTTPAPIServer::HandleServerHealth(evhtp_request_t* req, const std::string& kind)
     err = TRITONSERVER_ServerIsLive(server_.get(), &ready);
   } else {
     err = TRITONSERVER_ServerIsReady(server_.get(), &ready);
+    ready = ready && !ModelLoadPlanner::Loading();
   }
 
   RETURN_AND_RESPOND_IF_ERR(req, err);
@@ -2544,12 +3051,8 @@ HTTPAPIServer::GetRequestCompressionType(evhtp_request_t* req)
       evhtp_kv_find(req->headers_in, kContentEncodingHTTPHeader);
   if (content_encoding_c_str != NULL) {
     std::string content_encoding(content_encoding_c_str);
-    if (content_encoding == "deflate") {
-      return DataCompressor::Type::DEFLATE;
-    } else if (content_encoding == "gzip") {
-      return DataCompressor::Type::GZIP;
-    } else if (!content_encoding.empty() && (content_encoding != "identity")) {
-      return DataCompressor::Type::UNKNOWN;
+    if (!content_encoding.empty()) {
+      return DataCompressor::ParseType(content_encoding);
     }
   }
   return DataCompressor::Type::IDENTITY;
@@ -2562,12 +3065,8 @@ HTTPAPIServer::GetResponseCompressionType(evhtp_request_t* req)
   const char* accept_encoding_c_str =
       evhtp_kv_find(req->headers_in, kAcceptEncodingHTTPHeader);
   if (accept_encoding_c_str != NULL) {
-    std::string accept_encoding = CompressionTypeUsed(accept_encoding_c_str);
-    if (accept_encoding == "deflate") {
-      return DataCompressor::Type::DEFLATE;
-    } else if (accept_encoding == "gzip") {
-      return DataCompressor::Type::GZIP;
-    }
+    return DataCompressor::ParseType(
+        CompressionTypeUsed(accept_encoding_c_str));
   }
   return DataCompressor::Type::IDENTITY;
 }
@@ -2680,9 +3179,11 @@ HTTPAPIServer::ParseJsonTritonIO(
         void* base;
         TRITONSERVER_MemoryType memory_type;
         int64_t memory_type_id;
+        std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo> shm_info;
         RETURN_IF_ERR(shm_manager_->GetMemoryInfo(
             shm_region, shm_offset, byte_size, &base, &memory_type,
-            &memory_type_id));
+            &memory_type_id, &shm_info));
+        infer_req->shm_regions_info_.emplace_back(std::move(shm_info));
         if (memory_type == TRITONSERVER_MEMORY_GPU) {
 #ifdef TRITON_ENABLE_GPU
           cudaIpcMemHandle_t* cuda_handle;
@@ -2795,9 +3296,11 @@ HTTPAPIServer::ParseJsonTritonIO(
         void* base;
         TRITONSERVER_MemoryType memory_type;
         int64_t memory_type_id;
+        std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo> shm_info;
         RETURN_IF_ERR(shm_manager_->GetMemoryInfo(
-            shm_region, offset, byte_size, &base, &memory_type,
-            &memory_type_id));
+            shm_region, offset, byte_size, &base, &memory_type, &memory_type_id,
+            &shm_info));
+        infer_req->shm_regions_info_.emplace_back(std::move(shm_info));
 
         if (memory_type == TRITONSERVER_MEMORY_GPU) {
 #ifdef TRITON_ENABLE_GPU
@@ -3056,6 +3559,163 @@ HTTPAPIServer::EVBufferToRawInput(
   return nullptr;  // success
 }
 
+TRITONSERVER_Error*
+HTTPAPIServer::EVBufferToCompactInput(
+    const std::string& model_name, TRITONSERVER_InferenceRequest* irequest,
+    evbuffer* input_buffer, InferRequestClass* infer_req)
+{
+  // The body is a fixed-layout header describing the request followed by
+  // the data of each input, see the compact binary framing in
+  // docs/protocol/extension_binary_data.md. The input data is referenced
+  // from the HTTP body chunks without copying.
+  struct evbuffer_iovec* v = nullptr;
+  int n = evbuffer_peek(input_buffer, -1, NULL, NULL, 0);
+  if (n > 0) {
+    v = static_cast<struct evbuffer_iovec*>(
+        alloca(sizeof(struct evbuffer_iovec) * n));
+    if (evbuffer_peek(input_buffer, -1, NULL, v, n) != n) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          "unexpected error getting input buffers");
+    }
+  }
+  EVBufferReader reader(v, n);
+
+  const auto truncated_err = [&model_name]() {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INVALID_ARG,
+        std::string(
+            "unexpected end of compact binary inference request for model '" +
+            model_name + "'")
+            .c_str());
+  };
+
+  char magic[sizeof(kCompactBinaryMagic)];
+  uint16_t version, flags;
+  uint32_t input_count, output_count, id_size;
+  if (!reader.Read(magic, sizeof(magic)) || !reader.Read(&version) ||
+      !reader.Read(&flags) || !reader.Read(&input_count) ||
+      !reader.Read(&output_count) || !reader.Read(&id_size)) {
+    return truncated_err();
+  }
+  if (memcmp(magic, kCompactBinaryMagic, sizeof(magic)) != 0) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INVALID_ARG,
+        "invalid compact binary inference request, unexpected magic");
+  }
+  if (version != kCompactBinaryVersion) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_UNSUPPORTED,
+        std::string(
+            "unsupported compact binary inference request version " +
+            std::to_string(version) + ", expecting " +
+            std::to_string(kCompactBinaryVersion))
+            .c_str());
+  }
+  // Reserved so that later versions can use the bits, a request setting
+  // them must not be served by a server that ignores them
+  if (flags != 0) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INVALID_ARG,
+        std::string(
+            "invalid compact binary inference request, reserved flags " +
+            std::to_string(flags) + " must be 0")
+            .c_str());
+  }
+
+  std::string str;
+  if (!reader.Read(&str, id_size)) {
+    return truncated_err();
+  }
+  if (!str.empty()) {
+    RETURN_IF_ERR(TRITONSERVER_InferenceRequestSetId(irequest, str.c_str()));
+  }
+
+  std::vector<std::pair<std::string, uint64_t>> input_sizes;
+  input_sizes.reserve(input_count);
+  std::vector<int64_t> shape;
+  for (uint32_t i = 0; i < input_count; ++i) {
+    uint8_t datatype, dim_count;
+    uint16_t name_size;
+    uint64_t byte_size;
+    if (!reader.Read(&datatype) || !reader.Read(&dim_count) ||
+        !reader.Read(&name_size) || !reader.Read(&byte_size)) {
+      return truncated_err();
+    }
+    shape.resize(dim_count);
+    if (!reader.Read(shape.data(), dim_count * sizeof(int64_t)) ||
+        !reader.Read(&str, name_size)) {
+      return truncated_err();
+    }
+    const auto dtype = static_cast<TRITONSERVER_DataType>(datatype);
+    if ((dtype == TRITONSERVER_TYPE_INVALID) ||
+        (TRITONSERVER_DataTypeByteSize(dtype) == 0 &&
+         dtype != TRITONSERVER_TYPE_BYTES)) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          std::string(
+              "invalid datatype " + std::to_string(datatype) + " for input '" +
+              str + "' for model '" + model_name + "'")
+              .c_str());
+    }
+    RETURN_IF_ERR(TRITONSERVER_InferenceRequestAddInput(
+        irequest, str.c_str(), dtype, shape.data(), dim_count));
+    input_sizes.emplace_back(std::move(str), byte_size);
+  }
+
+  for (uint32_t i = 0; i < output_count; ++i) {
+    uint16_t name_size;
+    if (!reader.Read(&name_size) || !reader.Read(&str, name_size)) {
+      return truncated_err();
+    }
+    RETURN_IF_ERR(
+        TRITONSERVER_InferenceRequestAddRequestedOutput(irequest, str.c_str()));
+    infer_req->alloc_payload_.output_map_.emplace(
+        std::piecewise_construct, std::forward_as_tuple(str),
+        std::forward_as_tuple(new AllocPayload::OutputInfo(
+            AllocPayload::OutputInfo::BINARY, 0 /* class_cnt */)));
+  }
+  infer_req->alloc_payload_.default_output_kind_ =
+      AllocPayload::OutputInfo::BINARY;
+
+  for (const auto& input : input_sizes) {
+    if (input.second > reader.Remaining()) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INVALID_ARG,
+          std::string(
+              "unexpected size for input '" + input.first + "', expecting " +
+              std::to_string(input.second) + " bytes but only " +
+              std::to_string(reader.Remaining()) +
+              " bytes remain in the request for model '" + model_name + "'")
+              .c_str());
+    }
+    if (input.second == 0) {
+      RETURN_IF_ERR(TRITONSERVER_InferenceRequestAppendInputData(
+          irequest, input.first.c_str(), nullptr, 0 /* byte_size */,
+          TRITONSERVER_MEMORY_CPU, 0 /* memory_type_id */));
+      continue;
+    }
+    RETURN_IF_ERR(reader.ForEachChunk(
+        input.second, [&irequest, &input](const char* base, size_t len) {
+          return TRITONSERVER_InferenceRequestAppendInputData(
+              irequest, input.first.c_str(), base, len, TRITONSERVER_MEMORY_CPU,
+              0 /* memory_type_id */);
+        }));
+  }
+
+  if (reader.Remaining() != 0) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INVALID_ARG,
+        std::string(
+            "unexpected additional " + std::to_string(reader.Remaining()) +
+            " bytes in compact binary inference request for model '" +
+            model_name + "'")
+            .c_str());
+  }
+
+  return nullptr;  // success
+}
+
 struct HeaderSearchPayload {
   HeaderSearchPayload(
       const re2::RE2& regex, TRITONSERVER_InferenceRequest* request)
@@ -3142,7 +3802,9 @@ HTTPAPIServer::DecompressBuffer(
   auto compression_type = GetRequestCompressionType(req);
   switch (compression_type) {
     case DataCompressor::Type::DEFLATE:
-    case DataCompressor::Type::GZIP: {
+    case DataCompressor::Type::GZIP:
+    case DataCompressor::Type::ZSTD:
+    case DataCompressor::Type::LZ4: {
       *decompressed_buffer = evbuffer_new();
       RETURN_IF_ERR(DataCompressor::DecompressData(
           compression_type, req->buffer_in, *decompressed_buffer));
@@ -3152,8 +3814,9 @@ HTTPAPIServer::DecompressBuffer(
       // Encounter unsupported compressed type, send error with supported types
       // in Accept-Encoding
       evhtp_headers_add_header(
-          req->headers_out,
-          evhtp_header_new(kAcceptEncodingHTTPHeader, "gzip, deflate", 1, 1));
+          req->headers_out, evhtp_header_new(
+                                kAcceptEncodingHTTPHeader,
+                                DataCompressor::SupportedTypesString(), 1, 1));
       // FIXME: Map TRITONSERVER_ERROR_UNSUPPORTED to EVHTP_RES_UNSUPPORTED
       return TRITONSERVER_ErrorNew(
           TRITONSERVER_ERROR_UNSUPPORTED, "Unsupported compression type");
@@ -3172,7 +3835,12 @@ HTTPAPIServer::EVRequestToTritonRequest(
     TRITONSERVER_InferenceRequest* irequest, evbuffer* decompressed_buffer,
     InferRequestClass* infer_req, size_t header_length)
 {
-  if (header_length != 0) {
+  if (infer_req->compact_binary_) {
+    RETURN_IF_ERR(EVBufferToCompactInput(
+        model_name, irequest,
+        (decompressed_buffer == nullptr) ? req->buffer_in : decompressed_buffer,
+        infer_req));
+  } else if (header_length != 0) {
     RETURN_IF_ERR(EVBufferToInput(
         model_name, irequest,
         (decompressed_buffer == nullptr) ? req->buffer_in : decompressed_buffer,
@@ -3223,6 +3891,17 @@ HTTPAPIServer::HandleGenerate(
       req,
       GetModelVersionFromString(model_version_str, &requested_model_version));
 
+  // Reject the request early if admission control doesn't admit it, the
+  // ticket is held until the request is released.
+  AdmissionController::Ticket admission_ticket;
+  if (admission_controller_ != nullptr) {
+    std::string message;
+    if (!admission_controller_->Admit(
+            model_name, "http", &admission_ticket, &message)) {
+      RETURN_AND_RESPOND_WITH_ERR(req, kHttpTooManyRequests, message.c_str());
+    }
+  }
+
   // If tracing is enabled see if this request should be traced.
   TRITONSERVER_InferenceTrace* triton_trace = nullptr;
   std::shared_ptr<TraceManager::Trace> trace =
@@ -3268,7 +3947,8 @@ HTTPAPIServer::HandleGenerate(
     generate_request.reset(new GenerateRequestClass(
         server_.get(), req, GetResponseCompressionType(req),
         generate_stream_request_schema_.get(),
-        generate_stream_response_schema_.get(), streaming, irequest_shared));
+        generate_stream_response_schema_.get(), streaming, irequest_shared,
+        generate_stream_flush_interval_us_));
   } else {
     generate_request.reset(new GenerateRequestClass(
         server_.get(), req, GetResponseCompressionType(req),
@@ -3335,8 +4015,8 @@ HTTPAPIServer::HandleGenerate(
           input_metadata, generate_request->RequestSchema(), request),
       error_callback);
 
-  auto request_release_payload =
-      std::make_unique<RequestReleasePayload>(irequest_shared, nullptr);
+  auto request_release_payload = std::make_unique<RequestReleasePayload>(
+      irequest_shared, nullptr, std::move(admission_ticket));
   // [FIXME] decompression..
   RETURN_AND_CALLBACK_IF_ERR(
       TRITONSERVER_InferenceRequestSetReleaseCallback(
@@ -3586,6 +4266,24 @@ HTTPAPIServer::HandleInfer(
   RETURN_AND_RESPOND_IF_ERR(
       req, CheckTransactionPolicy(req, model_name, requested_model_version));
 
+  // Eligible requests are merged with others and responded to once their
+  // batch completes.
+  if ((coalescer_ != nullptr) &&
+      coalescer_->Enqueue(req, model_name, requested_model_version)) {
+    return;
+  }
+
+  // Reject the request early if admission control doesn't admit it, the
+  // ticket is held until the request is released.
+  AdmissionController::Ticket admission_ticket;
+  if (admission_controller_ != nullptr) {
+    std::string message;
+    if (!admission_controller_->Admit(
+            model_name, "http", &admission_ticket, &message)) {
+      RETURN_AND_RESPOND_WITH_ERR(req, kHttpTooManyRequests, message.c_str());
+    }
+  }
+
   // If tracing is enabled see if this request should be traced.
   TRITONSERVER_InferenceTrace* triton_trace = nullptr;
   std::shared_ptr<TraceManager::Trace> trace =
@@ -3600,10 +4298,14 @@ HTTPAPIServer::HandleInfer(
   RETURN_AND_RESPOND_IF_ERR(
       req, GetContentLength(req, decompressed_buffer, &content_length));
 
-  // Get the header length
+  // Get the header length, requests using the compact binary framing
+  // describe the inputs in a header of their own.
+  const bool compact_binary = IsCompactBinaryRequest(req);
   size_t header_length = 0;
-  RETURN_AND_RESPOND_IF_ERR(
-      req, GetInferenceHeaderLength(req, content_length, &header_length));
+  if (!compact_binary) {
+    RETURN_AND_RESPOND_IF_ERR(
+        req, GetInferenceHeaderLength(req, content_length, &header_length));
+  }
 
   // Create the inference request object which provides all information needed
   // for an inference. Make sure it is cleaned up on early error.
@@ -3623,6 +4325,7 @@ HTTPAPIServer::HandleInfer(
   bool connection_paused = true;
   auto infer_request = CreateInferRequest(req, irequest_shared);
   infer_request->trace_ = trace;
+  infer_request->compact_binary_ = compact_binary;
 
   const char* request_id = "<id_unknown>";
   // Callback to cleanup on any errors encountered below. Capture everything
@@ -3666,7 +4369,7 @@ HTTPAPIServer::HandleInfer(
   RETURN_AND_CALLBACK_IF_ERR(ForwardHeaders(req, irequest), error_callback);
 
   auto request_release_payload = std::make_unique<RequestReleasePayload>(
-      irequest_shared, decompressed_buffer);
+      irequest_shared, decompressed_buffer, std::move(admission_ticket));
   RETURN_AND_CALLBACK_IF_ERR(
       TRITONSERVER_InferenceRequestSetReleaseCallback(
           irequest, InferRequestClass::InferRequestComplete,
@@ -3695,122 +4398,921 @@ HTTPAPIServer::HandleInfer(
   request_release_payload.release();
 }
 
-void
-HTTPAPIServer::InferRequestClass::ReplyCallback(
-    evthr_t* thr, void* arg, void* shared)
-{
-  HTTPAPIServer::InferRequestClass* infer_request =
-      reinterpret_cast<HTTPAPIServer::InferRequestClass*>(arg);
+//
+// RequestCoalescer
+//
+// Requests are split into rows along the batch dimension so a request can
+// be spread over consecutive batches, and a batch never exceeds the
+// 'max_batch_size' of the model. Only requests with JSON inputs and outputs
+// and without parameters are coalesced, everything else takes the regular
+// inference path.
+//
+class HTTPAPIServer::RequestCoalescer {
+ public:
+  RequestCoalescer(HTTPAPIServer* server, const uint64_t max_delay_us);
+  ~RequestCoalescer();
+
+  // Return true if 'req' is taken over and will be responded to once all
+  // its rows are computed, false if 'req' must be handled as usual.
+  bool Enqueue(
+      evhtp_request_t* req, const std::string& model_name,
+      const int64_t model_version);
+
+ private:
+  // An HTTP request waiting for its rows to be computed
+  struct Member : public std::enable_shared_from_this<Member> {
+    struct Input {
+      std::string name_;
+      TRITONSERVER_DataType datatype_;
+      std::vector<int64_t> shape_;
+      std::vector<char> data_;
+      // Byte offset of each row in 'data_', plus the end offset
+      std::vector<size_t> row_offsets_;
+    };
+    struct Output {
+      std::string name_;
+      TRITONSERVER_DataType datatype_;
+      // Shape without the batch dimension
+      std::vector<int64_t> shape_;
+      // The data of each part of the request keyed by its first row
+      std::map<size_t, std::string> data_;
+    };
+
+    TRITONSERVER_Error* AddOutputs(
+        TRITONSERVER_InferenceResponse* response, const size_t batch_row,
+        const size_t row_begin, const size_t row_cnt);
+    void RowsDone(const size_t row_cnt, TRITONSERVER_Error* err);
+    TRITONSERVER_Error* WriteResponse();
+    static void ReplyCallback(evthr_t* thr, void* arg, void* shared);
+    static evhtp_res RequestFiniHook(evhtp_request* req, void* arg);
+
+    evhtp_request_t* req_{nullptr};
+    evthr_t* thread_{nullptr};
+    std::string id_;
+    size_t rows_{0};
+    std::vector<Input> inputs_;
+    std::vector<std::string> requested_outputs_;
+
+    std::mutex mu_;
+    size_t rows_done_{0};
+    TRITONSERVER_Error* err_{nullptr};
+    std::string model_name_;
+    int64_t model_version_{0};
+    std::vector<Output> outputs_;
+    std::string response_body_;
+    evhtp_res response_code_{EVHTP_RES_OK};
+  };
 
-  evhtp_request_t* request = infer_request->EvHtpRequest();
+  // Rows of a member scheduled together
+  struct Part {
+    std::shared_ptr<Member> member_;
+    size_t row_begin_;
+    size_t row_cnt_;
+    uint64_t deadline_ns_;
+  };
 
-  if (request != nullptr) {
-    evhtp_send_reply(request, infer_request->response_code_);
-    evhtp_request_resume(request);
-  }
+  // Requests to the same model with the same input signature
+  struct Queue {
+    std::string model_name_;
+    int64_t model_version_;
+    size_t max_rows_;
+    std::deque<Part> parts_;
+    size_t rows_{0};
+  };
 
-#ifdef TRITON_ENABLE_TRACING
-  if (infer_request->trace_ != nullptr) {
-    infer_request->trace_->CaptureTimestamp(
-        "HTTP_SEND_START", request->send_start_ns);
-    infer_request->trace_->CaptureTimestamp(
-        "HTTP_SEND_END", request->send_end_ns);
-  }
-#endif  // TRITON_ENABLE_TRACING
+  // Rows of one or more members sent as a single inference request. The
+  // members are notified once the request is released and its response is
+  // complete.
+  struct Batch {
+    ~Batch()
+    {
+      for (auto& part : parts_) {
+        part.member_->RowsDone(
+            part.row_cnt_, (err_ == nullptr)
+                               ? nullptr
+                               : TRITONSERVER_ErrorNew(
+                                     TRITONSERVER_ErrorCode(err_),
+                                     TRITONSERVER_ErrorMessage(err_)));
+      }
+      if (err_ != nullptr) {
+        TRITONSERVER_ErrorDelete(err_);
+      }
+    }
+    void SetError(TRITONSERVER_Error* err)
+    {
+      if (err_ == nullptr) {
+        err_ = err;
+      } else {
+        TRITONSERVER_ErrorDelete(err);
+      }
+    }
+    std::string model_name_;
+    int64_t model_version_;
+    std::vector<Part> parts_;
+    size_t rows_{0};
+    TRITONSERVER_Error* err_{nullptr};
+    AllocPayload alloc_payload_;
+  };
 
-  delete infer_request;
+  struct ModelInfo {
+    // 0 if requests to the model are not coalesced
+    size_t max_rows_;
+    uint64_t refresh_ns_;
+  };
+
+  size_t MaxRows(const std::string& model_name, const int64_t model_version);
+  TRITONSERVER_Error* ParseRequest(
+      evhtp_request_t* req, Member* member, std::string* signature);
+  void Dispatch();
+  void Execute(std::unique_ptr<Batch>&& batch);
+  static void BatchRequestComplete(
+      TRITONSERVER_InferenceRequest* request, const uint32_t flags,
+      void* userp);
+  static void BatchResponseComplete(
+      TRITONSERVER_InferenceResponse* response, const uint32_t flags,
+      void* userp);
+
+  HTTPAPIServer* server_;
+  const uint64_t max_delay_ns_;
+
+  std::mutex models_mu_;
+  std::unordered_map<std::string, ModelInfo> models_;
+
+  std::mutex mu_;
+  std::condition_variable cv_;
+  std::unordered_map<std::string, Queue> queues_;
+  bool exiting_{false};
+  std::thread dispatcher_;
+};
+
+namespace {
+
+// How long the coalescing eligibility of a model is cached, so that
+// requests pick up a changed model configuration
+constexpr uint64_t kCoalescingModelRefreshNs = 1000000000;
+
+uint64_t
+SteadyNowNs()
+{
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
 }
 
-evhtp_res
-HTTPAPIServer::InferRequestClass::RequestFiniHook(
-    evhtp_request* request, void* arg)
+// Byte offset of each row of 'data', which holds 'rows' rows of
+// 'row_element_cnt' elements, plus the end offset.
+TRITONSERVER_Error*
+RowOffsets(
+    const TRITONSERVER_DataType datatype, const char* data,
+    const size_t byte_size, const size_t rows, const size_t row_element_cnt,
+    std::vector<size_t>* row_offsets)
 {
-  HTTPAPIServer::InferRequestClass* infer_request =
-      reinterpret_cast<HTTPAPIServer::InferRequestClass*>(arg);
-  if (infer_request->req_ != request) {
-    LOG_ERROR << "[INTERNAL] mismatched request in fini hook";
-    return EVHTP_RES_ERROR;
-  } else {
-    LOG_TRITONSERVER_ERROR(
-        TRITONSERVER_InferenceRequestCancel(
-            infer_request->triton_request_.get()),
-        "cancelling request");
-    infer_request->req_ = nullptr;
+  row_offsets->clear();
+  row_offsets->reserve(rows + 1);
+  if (datatype != TRITONSERVER_TYPE_BYTES) {
+    const size_t row_byte_size =
+        row_element_cnt * TRITONSERVER_DataTypeByteSize(datatype);
+    if (byte_size != rows * row_byte_size) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          "tensor size does not match its batch size");
+    }
+    for (size_t r = 0; r <= rows; ++r) {
+      row_offsets->push_back(r * row_byte_size);
+    }
+    return nullptr;  // success
   }
-  return EVHTP_RES_OK;
+
+  // Each element is a 4 byte length followed by the bytes
+  size_t offset = 0;
+  row_offsets->push_back(offset);
+  for (size_t r = 0; r < rows; ++r) {
+    for (size_t e = 0; e < row_element_cnt; ++e) {
+      uint32_t len;
+      if ((offset + sizeof(len)) > byte_size) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_INTERNAL,
+            "tensor size does not match its batch size");
+      }
+      memcpy(&len, data + offset, sizeof(len));
+      offset += sizeof(len) + len;
+    }
+    if (offset > byte_size) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          "tensor size does not match its batch size");
+    }
+    row_offsets->push_back(offset);
+  }
+  return nullptr;  // success
 }
 
-HTTPAPIServer::InferRequestClass::InferRequestClass(
-    TRITONSERVER_Server* server, evhtp_request_t* req,
-    DataCompressor::Type response_compression_type,
-    const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request)
-    : server_(server), req_(req),
-      response_compression_type_(response_compression_type), response_count_(0),
-      triton_request_(triton_request)
+}  // namespace
+
+HTTPAPIServer::RequestCoalescer::RequestCoalescer(
+    HTTPAPIServer* server, const uint64_t max_delay_us)
+    : server_(server), max_delay_ns_(max_delay_us * 1000)
 {
-  evhtp_connection_t* htpconn = evhtp_request_get_connection(req);
-  thread_ = htpconn->thread;
-  evhtp_request_pause(req);
-  evhtp_request_set_hook(
-      req_, evhtp_hook_on_request_fini, (evhtp_hook)(void*)RequestFiniHook,
-      reinterpret_cast<void*>(this));
+  dispatcher_ = std::thread([this] { Dispatch(); });
 }
 
-void
-HTTPAPIServer::InferRequestClass::InferRequestComplete(
-    TRITONSERVER_InferenceRequest* request, const uint32_t flags, void* userp)
+HTTPAPIServer::RequestCoalescer::~RequestCoalescer()
 {
-  // FIXME need to manage the lifetime of InferRequestClass so that we
-  // delete it here.
-
-  RequestReleasePayload* request_release_payload =
-      reinterpret_cast<RequestReleasePayload*>(userp);
-
-  if ((flags & TRITONSERVER_REQUEST_RELEASE_ALL) != 0) {
-    delete request_release_payload;
+  {
+    std::lock_guard<std::mutex> lk(mu_);
+    exiting_ = true;
   }
+  cv_.notify_all();
+  dispatcher_.join();
 }
 
-void
-HTTPAPIServer::InferRequestClass::InferResponseComplete(
-    TRITONSERVER_InferenceResponse* response, const uint32_t flags, void* userp)
+size_t
+HTTPAPIServer::RequestCoalescer::MaxRows(
+    const std::string& model_name, const int64_t model_version)
 {
-  // FIXME can't use InferRequestClass object here since it's lifetime
-  // is different than response. For response we need to know how to
-  // send each output (as json, shm, or binary) and that information
-  // has to be maintained in a way that allows us to clean it up
-  // appropriately if connection closed or last response sent.
-  //
-  // But for now userp is the InferRequestClass object and the end of
-  // its life is in the ReplyCallback.
-
-  HTTPAPIServer::InferRequestClass* infer_request =
-      reinterpret_cast<HTTPAPIServer::InferRequestClass*>(userp);
-
-  if (response != nullptr) {
-    ++infer_request->response_count_;
+  const std::string key = model_name + ":" + std::to_string(model_version);
+  const uint64_t now_ns = SteadyNowNs();
+  {
+    std::lock_guard<std::mutex> lk(models_mu_);
+    auto it = models_.find(key);
+    if ((it != models_.end()) && (it->second.refresh_ns_ > now_ns)) {
+      return it->second.max_rows_;
+    }
   }
 
-  TRITONSERVER_Error* err = nullptr;
-  if (infer_request->response_count_ != 1) {
-    err = TRITONSERVER_ErrorNew(
-        TRITONSERVER_ERROR_INTERNAL,
-        std::string(
-            "expected a single response, got " +
-            std::to_string(infer_request->response_count_))
-            .c_str());
-  } else if (response != nullptr) {
-    err = infer_request->FinalizeResponse(response);
-#ifdef TRITON_ENABLE_TRACING
-    if (infer_request->trace_ != nullptr) {
-      infer_request->trace_->CaptureTimestamp(
-          "INFER_RESPONSE_COMPLETE", TraceManager::CaptureTimestamp());
+  // Models that batch on their own through a scheduler are left alone
+  size_t max_rows = 0;
+  std::string config_json_str;
+  TRITONSERVER_Error* err =
+      server_->GetModelConfig(model_name, model_version, &config_json_str);
+  if (err == nullptr) {
+    triton::common::TritonJson::Value config_json;
+    int64_t max_batch_size = 0;
+    err = config_json.Parse(config_json_str);
+    if (err == nullptr) {
+      err = config_json.MemberAsInt("max_batch_size", &max_batch_size);
     }
-#endif  // TRITON_ENABLE_TRACING
+    if ((err == nullptr) && (max_batch_size > 0) &&
+        !config_json.Find("dynamic_batching") &&
+        !config_json.Find("sequence_batching")) {
+      max_rows = max_batch_size;
+    }
+  }
+  if (err != nullptr) {
+    TRITONSERVER_ErrorDelete(err);
   }
 
+  std::lock_guard<std::mutex> lk(models_mu_);
+  models_[key] = ModelInfo{max_rows, now_ns + kCoalescingModelRefreshNs};
+  return max_rows;
+}
 
-  LOG_TRITONSERVER_ERROR(
+TRITONSERVER_Error*
+HTTPAPIServer::RequestCoalescer::ParseRequest(
+    evhtp_request_t* req, Member* member, std::string* signature)
+{
+  triton::common::TritonJson::Value request_json;
+  RETURN_IF_ERR(server_->EVRequestToJson(req, &request_json));
+  if (request_json.Find("parameters")) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_UNSUPPORTED, "request has parameters");
+  }
+
+  triton::common::TritonJson::Value id_json;
+  if (request_json.Find("id", &id_json)) {
+    RETURN_IF_ERR(id_json.AsString(&member->id_));
+  }
+
+  triton::common::TritonJson::Value inputs_json;
+  RETURN_IF_ERR(request_json.MemberAsArray("inputs", &inputs_json));
+  for (size_t i = 0; i < inputs_json.ArraySize(); ++i) {
+    triton::common::TritonJson::Value input_json;
+    RETURN_IF_ERR(inputs_json.IndexAsObject(i, &input_json));
+    if (input_json.Find("parameters")) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_UNSUPPORTED, "input has parameters");
+    }
+
+    member->inputs_.emplace_back();
+    auto& input = member->inputs_.back();
+    std::string datatype;
+    RETURN_IF_ERR(input_json.MemberAsString("name", &input.name_));
+    RETURN_IF_ERR(input_json.MemberAsString("datatype", &datatype));
+    input.datatype_ = TRITONSERVER_StringToDataType(datatype.c_str());
+
+    triton::common::TritonJson::Value shape_json;
+    RETURN_IF_ERR(input_json.MemberAsArray("shape", &shape_json));
+    for (size_t d = 0; d < shape_json.ArraySize(); ++d) {
+      uint64_t dim;
+      RETURN_IF_ERR(shape_json.IndexAsUInt(d, &dim));
+      input.shape_.push_back(dim);
+    }
+    if (input.shape_.empty() || (input.shape_[0] == 0) ||
+        ((i > 0) && (static_cast<size_t>(input.shape_[0]) != member->rows_))) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_UNSUPPORTED,
+          "inputs do not share a batch dimension");
+    }
+    member->rows_ = input.shape_[0];
+
+    const int64_t element_cnt = GetElementCount(input.shape_);
+    triton::common::TritonJson::Value data_json;
+    RETURN_IF_ERR(input_json.MemberAsArray("data", &data_json));
+    size_t byte_size;
+    if (input.datatype_ == TRITONSERVER_TYPE_BYTES) {
+      RETURN_IF_ERR(JsonBytesArrayByteSize(data_json, &byte_size));
+    } else {
+      byte_size = element_cnt * TRITONSERVER_DataTypeByteSize(input.datatype_);
+    }
+    input.data_.resize(byte_size);
+    RETURN_IF_ERR(ReadDataFromJson(
+        input.name_.c_str(), data_json, input.data_.data(), input.datatype_,
+        (input.datatype_ == TRITONSERVER_TYPE_BYTES) ? byte_size
+                                                     : element_cnt));
+    RETURN_IF_ERR(RowOffsets(
+        input.datatype_, input.data_.data(), input.data_.size(), member->rows_,
+        element_cnt / member->rows_, &input.row_offsets_));
+
+    // Only requests whose inputs differ in the batch dimension alone can be
+    // merged
+    *signature += input.name_ + "," + datatype;
+    for (size_t d = 1; d < input.shape_.size(); ++d) {
+      *signature += "," + std::to_string(input.shape_[d]);
+    }
+    *signature += ";";
+  }
+
+  // outputs is optional
+  triton::common::TritonJson::Value outputs_json;
+  if (request_json.Find("outputs", &outputs_json)) {
+    *signature += "|";
+    for (size_t i = 0; i < outputs_json.ArraySize(); ++i) {
+      triton::common::TritonJson::Value output_json;
+      RETURN_IF_ERR(outputs_json.IndexAsObject(i, &output_json));
+      if (output_json.Find("parameters")) {
+        return TRITONSERVER_ErrorNew(
+            TRITONSERVER_ERROR_UNSUPPORTED, "output has parameters");
+      }
+      std::string name;
+      RETURN_IF_ERR(output_json.MemberAsString("name", &name));
+      *signature += name + ";";
+      member->requested_outputs_.emplace_back(std::move(name));
+    }
+  }
+
+  return nullptr;  // success
+}
+
+bool
+HTTPAPIServer::RequestCoalescer::Enqueue(
+    evhtp_request_t* req, const std::string& model_name,
+    const int64_t model_version)
+{
+  if ((evhtp_kv_find(req->headers_in, kContentEncodingHTTPHeader) != nullptr) ||
+      IsCompactBinaryRequest(req)) {
+    return false;
+  }
+
+  // Binary inputs are not coalesced, their data would have to be copied
+  const int32_t content_length = evbuffer_get_length(req->buffer_in);
+  size_t header_length = 0;
+  TRITONSERVER_Error* err =
+      server_->GetInferenceHeaderLength(req, content_length, &header_length);
+  if (err != nullptr) {
+    TRITONSERVER_ErrorDelete(err);
+    return false;
+  }
+  if (header_length != static_cast<size_t>(content_length)) {
+    return false;
+  }
+
+  const size_t max_rows = MaxRows(model_name, model_version);
+  if (max_rows == 0) {
+    return false;
+  }
+
+  // Requests that are not eligible, or not valid, are left to the regular
+  // path which reports any error
+  auto member = std::make_shared<Member>();
+  std::string signature = model_name + ":" + std::to_string(model_version) +
+                          ":" + std::to_string(max_rows) + ":";
+  err = ParseRequest(req, member.get(), &signature);
+  if (err != nullptr) {
+    LOG_VERBOSE(1) << "HTTP request to '" << model_name
+                   << "' is not coalesced: " << TRITONSERVER_ErrorMessage(err);
+    TRITONSERVER_ErrorDelete(err);
+    return false;
+  }
+
+  member->req_ = req;
+  member->thread_ = evhtp_request_get_connection(req)->thread;
+  evhtp_request_pause(req);
+  evhtp_request_set_hook(
+      req, evhtp_hook_on_request_fini,
+      (evhtp_hook)(void*)Member::RequestFiniHook,
+      reinterpret_cast<void*>(member.get()));
+
+  bool notify = false;
+  {
+    std::lock_guard<std::mutex> lk(mu_);
+    auto& queue = queues_[signature];
+    if (queue.parts_.empty()) {
+      queue.model_name_ = model_name;
+      queue.model_version_ = model_version;
+      queue.max_rows_ = max_rows;
+      notify = true;
+    }
+    queue.rows_ += member->rows_;
+    notify |= (queue.rows_ >= queue.max_rows_);
+    queue.parts_.emplace_back(
+        Part{member, 0, member->rows_, SteadyNowNs() + max_delay_ns_});
+  }
+  if (notify) {
+    cv_.notify_one();
+  }
+
+  return true;
+}
+
+void
+HTTPAPIServer::RequestCoalescer::Dispatch()
+{
+  std::unique_lock<std::mutex> lk(mu_);
+  while (true) {
+    // Form the batches that are full or have waited long enough, flush
+    // everything when exiting
+    const uint64_t now_ns = SteadyNowNs();
+    uint64_t next_deadline_ns = std::numeric_limits<uint64_t>::max();
+    std::vector<std::unique_ptr<Batch>> batches;
+    for (auto it = queues_.begin(); it != queues_.end();) {
+      auto& queue = it->second;
+      while (!queue.parts_.empty() &&
+             (exiting_ || (queue.rows_ >= queue.max_rows_) ||
+              (queue.parts_.front().deadline_ns_ <= now_ns))) {
+        std::unique_ptr<Batch> batch(new Batch());
+        batch->model_name_ = queue.model_name_;
+        batch->model_version_ = queue.model_version_;
+        while (!queue.parts_.empty() && (batch->rows_ < queue.max_rows_)) {
+          auto& part = queue.parts_.front();
+          const size_t row_cnt =
+              std::min(part.row_cnt_, queue.max_rows_ - batch->rows_);
+          batch->parts_.emplace_back(
+              Part{part.member_, part.row_begin_, row_cnt, part.deadline_ns_});
+          batch->rows_ += row_cnt;
+          queue.rows_ -= row_cnt;
+          if (row_cnt == part.row_cnt_) {
+            queue.parts_.pop_front();
+          } else {
+            part.row_begin_ += row_cnt;
+            part.row_cnt_ -= row_cnt;
+          }
+        }
+        batches.emplace_back(std::move(batch));
+      }
+      if (queue.parts_.empty()) {
+        it = queues_.erase(it);
+      } else {
+        next_deadline_ns =
+            std::min(next_deadline_ns, queue.parts_.front().deadline_ns_);
+        ++it;
+      }
+    }
+
+    if (!batches.empty()) {
+      lk.unlock();
+      for (auto& batch : batches) {
+        Execute(std::move(batch));
+      }
+      lk.lock();
+      continue;
+    }
+    if (exiting_) {
+      break;
+    }
+    if (next_deadline_ns == std::numeric_limits<uint64_t>::max()) {
+      cv_.wait(lk);
+    } else {
+      cv_.wait_for(lk, std::chrono::nanoseconds(next_deadline_ns - now_ns));
+    }
+  }
+}
+
+void
+HTTPAPIServer::RequestCoalescer::Execute(std::unique_ptr<Batch>&& unique_batch)
+{
+  std::shared_ptr<Batch> batch(std::move(unique_batch));
+  const auto& first = batch->parts_.front().member_;
+
+  TRITONSERVER_InferenceRequest* irequest = nullptr;
+  TRITONSERVER_Error* err = TRITONSERVER_InferenceRequestNew(
+      &irequest, server_->server_.get(), batch->model_name_.c_str(),
+      batch->model_version_);
+  for (size_t i = 0; (err == nullptr) && (i < first->inputs_.size()); ++i) {
+    const auto& input = first->inputs_[i];
+    std::vector<int64_t> shape(input.shape_);
+    shape[0] = batch->rows_;
+    err = TRITONSERVER_InferenceRequestAddInput(
+        irequest, input.name_.c_str(), input.datatype_, shape.data(),
+        shape.size());
+    // The rows are referenced in place, members outlive the request
+    for (size_t p = 0; (err == nullptr) && (p < batch->parts_.size()); ++p) {
+      const auto& part = batch->parts_[p];
+      const auto& member_input = part.member_->inputs_[i];
+      const size_t begin = member_input.row_offsets_[part.row_begin_];
+      const size_t end =
+          member_input.row_offsets_[part.row_begin_ + part.row_cnt_];
+      err = TRITONSERVER_InferenceRequestAppendInputData(
+          irequest, input.name_.c_str(), member_input.data_.data() + begin,
+          end - begin, TRITONSERVER_MEMORY_CPU, 0 /* memory_type_id */);
+    }
+  }
+  for (size_t i = 0; (err == nullptr) && (i < first->requested_outputs_.size());
+       ++i) {
+    err = TRITONSERVER_InferenceRequestAddRequestedOutput(
+        irequest, first->requested_outputs_[i].c_str());
+  }
+  if (err == nullptr) {
+    err = TRITONSERVER_InferenceRequestSetReleaseCallback(
+        irequest, BatchRequestComplete, new std::shared_ptr<Batch>(batch));
+  }
+  if (err == nullptr) {
+    err = TRITONSERVER_InferenceRequestSetResponseCallback(
+        irequest, server_->allocator_,
+        reinterpret_cast<void*>(&batch->alloc_payload_), BatchResponseComplete,
+        new std::shared_ptr<Batch>(batch));
+  }
+  if (err == nullptr) {
+    err = TRITONSERVER_ServerInferAsync(
+        server_->server_.get(), irequest, nullptr /* trace */);
+  }
+
+  // The callbacks are only invoked if the request was sent, the batch is
+  // released along with the local reference otherwise.
+  if (err != nullptr) {
+    batch->SetError(err);
+    if (irequest != nullptr) {
+      LOG_TRITONSERVER_ERROR(
+          TRITONSERVER_InferenceRequestDelete(irequest),
+          "deleting coalesced inference request");
+    }
+  }
+}
+
+void
+HTTPAPIServer::RequestCoalescer::BatchRequestComplete(
+    TRITONSERVER_InferenceRequest* request, const uint32_t flags, void* userp)
+{
+  if ((flags & TRITONSERVER_REQUEST_RELEASE_ALL) != 0) {
+    LOG_TRITONSERVER_ERROR(
+        TRITONSERVER_InferenceRequestDelete(request),
+        "deleting coalesced inference request");
+    delete reinterpret_cast<std::shared_ptr<Batch>*>(userp);
+  }
+}
+
+void
+HTTPAPIServer::RequestCoalescer::BatchResponseComplete(
+    TRITONSERVER_InferenceResponse* response, const uint32_t flags, void* userp)
+{
+  auto batch_ptr = reinterpret_cast<std::shared_ptr<Batch>*>(userp);
+  auto& batch = *batch_ptr;
+
+  if (response != nullptr) {
+    TRITONSERVER_Error* err = TRITONSERVER_InferenceResponseError(response);
+    size_t batch_row = 0;
+    for (size_t p = 0; (err == nullptr) && (p < batch->parts_.size()); ++p) {
+      const auto& part = batch->parts_[p];
+      err = part.member_->AddOutputs(
+          response, batch_row, part.row_begin_, part.row_cnt_);
+      batch_row += part.row_cnt_;
+    }
+    if (err != nullptr) {
+      batch->SetError(err);
+    }
+    LOG_TRITONSERVER_ERROR(
+        TRITONSERVER_InferenceResponseDelete(response),
+        "deleting inference response");
+  }
+
+  if ((flags & TRITONSERVER_RESPONSE_COMPLETE_FINAL) != 0) {
+    delete batch_ptr;
+  }
+}
+
+TRITONSERVER_Error*
+HTTPAPIServer::RequestCoalescer::Member::AddOutputs(
+    TRITONSERVER_InferenceResponse* response, const size_t batch_row,
+    const size_t row_begin, const size_t row_cnt)
+{
+  const char* model_name;
+  int64_t model_version;
+  RETURN_IF_ERR(TRITONSERVER_InferenceResponseModel(
+      response, &model_name, &model_version));
+
+  uint32_t output_count;
+  RETURN_IF_ERR(
+      TRITONSERVER_InferenceResponseOutputCount(response, &output_count));
+
+  std::lock_guard<std::mutex> lk(mu_);
+  model_name_ = model_name;
+  model_version_ = model_version;
+  for (uint32_t idx = 0; idx < output_count; ++idx) {
+    const char* cname;
+    TRITONSERVER_DataType datatype;
+    const int64_t* shape;
+    uint64_t dim_count;
+    const void* base;
+    size_t byte_size;
+    TRITONSERVER_MemoryType memory_type;
+    int64_t memory_type_id;
+    void* userp;
+    RETURN_IF_ERR(TRITONSERVER_InferenceResponseOutput(
+        response, idx, &cname, &datatype, &shape, &dim_count, &base, &byte_size,
+        &memory_type, &memory_type_id, &userp));
+
+    // Outputs are expected to be batched like the inputs
+    std::vector<int64_t> dims(shape, shape + dim_count);
+    const size_t batch_rows = (dim_count == 0) ? 0 : shape[0];
+    if ((batch_rows == 0) || (batch_rows < (batch_row + row_cnt))) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          std::string(
+              "output '" + std::string(cname) +
+              "' of a coalesced request does not have a batch dimension")
+              .c_str());
+    }
+    std::vector<size_t> row_offsets;
+    RETURN_IF_ERR(RowOffsets(
+        datatype, reinterpret_cast<const char*>(base), byte_size, batch_rows,
+        GetElementCount(dims) / batch_rows, &row_offsets));
+
+    Output* output = nullptr;
+    for (auto& o : outputs_) {
+      if (o.name_ == cname) {
+        output = &o;
+        break;
+      }
+    }
+    if (output == nullptr) {
+      outputs_.emplace_back();
+      output = &outputs_.back();
+      output->name_ = cname;
+      output->datatype_ = datatype;
+      output->shape_.assign(dims.begin() + 1, dims.end());
+    }
+    const size_t begin = row_offsets[batch_row];
+    const size_t end = row_offsets[batch_row + row_cnt];
+    output->data_[row_begin].assign(
+        reinterpret_cast<const char*>(base) + begin, end - begin);
+  }
+
+  return nullptr;  // success
+}
+
+void
+HTTPAPIServer::RequestCoalescer::Member::RowsDone(
+    const size_t row_cnt, TRITONSERVER_Error* err)
+{
+  {
+    std::lock_guard<std::mutex> lk(mu_);
+    if ((err != nullptr) && (err_ == nullptr)) {
+      err_ = err;
+    } else if (err != nullptr) {
+      TRITONSERVER_ErrorDelete(err);
+    }
+    rows_done_ += row_cnt;
+    if (rows_done_ < rows_) {
+      return;
+    }
+
+    if (err_ == nullptr) {
+      err_ = WriteResponse();
+    }
+    if (err_ != nullptr) {
+      evbuffer* buffer = evbuffer_new();
+      EVBufferAddErrorJson(buffer, err_);
+      response_body_.resize(evbuffer_get_length(buffer));
+      evbuffer_copyout(buffer, &response_body_[0], response_body_.size());
+      evbuffer_free(buffer);
+      response_code_ = HttpCodeFromError(err_);
+      TRITONSERVER_ErrorDelete(err_);
+      err_ = nullptr;
+    }
+  }
+
+  evthr_defer(
+      thread_, ReplyCallback, new std::shared_ptr<Member>(shared_from_this()));
+}
+
+TRITONSERVER_Error*
+HTTPAPIServer::RequestCoalescer::Member::WriteResponse()
+{
+  triton::common::TritonJson::Value response_json(
+      triton::common::TritonJson::ValueType::OBJECT);
+  if (!id_.empty()) {
+    RETURN_IF_ERR(response_json.AddStringRef("id", id_.c_str()));
+  }
+  RETURN_IF_ERR(response_json.AddStringRef("model_name", model_name_.c_str()));
+  RETURN_IF_ERR(response_json.AddString(
+      "model_version", std::move(std::to_string(model_version_))));
+
+  triton::common::TritonJson::Value response_outputs(
+      response_json, triton::common::TritonJson::ValueType::ARRAY);
+  for (const auto& output : outputs_) {
+    triton::common::TritonJson::Value output_json(
+        response_json, triton::common::TritonJson::ValueType::OBJECT);
+    RETURN_IF_ERR(output_json.AddStringRef("name", output.name_.c_str()));
+    RETURN_IF_ERR(output_json.AddStringRef(
+        "datatype", TRITONSERVER_DataTypeString(output.datatype_)));
+
+    triton::common::TritonJson::Value shape_json(
+        response_json, triton::common::TritonJson::ValueType::ARRAY);
+    RETURN_IF_ERR(shape_json.AppendUInt(rows_));
+    size_t element_count = rows_;
+    for (const auto dim : output.shape_) {
+      RETURN_IF_ERR(shape_json.AppendUInt(dim));
+      element_count *= dim;
+    }
+    RETURN_IF_ERR(output_json.Add("shape", std::move(shape_json)));
+
+    // Parts are keyed by their first row so they are joined in order
+    std::string data;
+    for (const auto& part : output.data_) {
+      data.append(part.second);
+    }
+    triton::common::TritonJson::Value data_json(
+        response_json, triton::common::TritonJson::ValueType::ARRAY);
+    RETURN_IF_ERR(WriteDataToJson(
+        &data_json, output.name_, output.datatype_, data.data(), data.size(),
+        element_count));
+    RETURN_IF_ERR(output_json.Add("data", std::move(data_json)));
+
+    RETURN_IF_ERR(response_outputs.Append(std::move(output_json)));
+  }
+  RETURN_IF_ERR(response_json.Add("outputs", std::move(response_outputs)));
+
+  triton::common::TritonJson::WriteBuffer buffer;
+  RETURN_IF_ERR(response_json.Write(&buffer));
+  response_body_ = buffer.Contents();
+  return nullptr;  // success
+}
+
+void
+HTTPAPIServer::RequestCoalescer::Member::ReplyCallback(
+    evthr_t* thr, void* arg, void* shared)
+{
+  auto member_ptr = reinterpret_cast<std::shared_ptr<Member>*>(arg);
+  auto& member = *member_ptr;
+  if (member->req_ != nullptr) {
+    evhtp_request_t* req = member->req_;
+    evhtp_request_unset_hook(req, evhtp_hook_on_request_fini);
+    member->req_ = nullptr;
+    evbuffer_add(
+        req->buffer_out, member->response_body_.data(),
+        member->response_body_.size());
+    AddContentTypeHeader(req, "application/json");
+    evhtp_send_reply(req, member->response_code_);
+    evhtp_request_resume(req);
+  }
+  delete member_ptr;
+}
+
+evhtp_res
+HTTPAPIServer::RequestCoalescer::Member::RequestFiniHook(
+    evhtp_request* req, void* arg)
+{
+  // The connection is gone, the rows are still computed as they may share
+  // a batch with other requests but no response is sent.
+  reinterpret_cast<Member*>(arg)->req_ = nullptr;
+  return EVHTP_RES_OK;
+}
+
+void
+HTTPAPIServer::EnableRequestCoalescing(const uint64_t max_delay_us)
+{
+  coalescer_.reset(new RequestCoalescer(this, max_delay_us));
+}
+
+void
+HTTPAPIServer::InferRequestClass::ReplyCallback(
+    evthr_t* thr, void* arg, void* shared)
+{
+  HTTPAPIServer::InferRequestClass* infer_request =
+      reinterpret_cast<HTTPAPIServer::InferRequestClass*>(arg);
+
+  evhtp_request_t* request = infer_request->EvHtpRequest();
+
+  if (request != nullptr) {
+    evhtp_send_reply(request, infer_request->response_code_);
+    evhtp_request_resume(request);
+  }
+
+#ifdef TRITON_ENABLE_TRACING
+  if (infer_request->trace_ != nullptr) {
+    infer_request->trace_->CaptureTimestamp(
+        "HTTP_SEND_START", request->send_start_ns);
+    infer_request->trace_->CaptureTimestamp(
+        "HTTP_SEND_END", request->send_end_ns);
+  }
+#endif  // TRITON_ENABLE_TRACING
+
+  delete infer_request;
+}
+
+evhtp_res
+HTTPAPIServer::InferRequestClass::RequestFiniHook(
+    evhtp_request* request, void* arg)
+{
+  HTTPAPIServer::InferRequestClass* infer_request =
+      reinterpret_cast<HTTPAPIServer::InferRequestClass*>(arg);
+  if (infer_request->req_ != request) {
+    LOG_ERROR << "[INTERNAL] mismatched request in fini hook";
+    return EVHTP_RES_ERROR;
+  } else {
+    LOG_TRITONSERVER_ERROR(
+        TRITONSERVER_InferenceRequestCancel(
+            infer_request->triton_request_.get()),
+        "cancelling request");
+    infer_request->req_ = nullptr;
+  }
+  return EVHTP_RES_OK;
+}
+
+HTTPAPIServer::InferRequestClass::InferRequestClass(
+    TRITONSERVER_Server* server, evhtp_request_t* req,
+    DataCompressor::Type response_compression_type,
+    const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request,
+    const DataCompressor::Options& compression_options)
+    : server_(server), req_(req),
+      response_compression_type_(response_compression_type),
+      response_compression_level_(
+          compression_options.Level(response_compression_type)),
+      response_compression_threshold_(compression_options.threshold_),
+      response_count_(0), triton_request_(triton_request)
+{
+  evhtp_connection_t* htpconn = evhtp_request_get_connection(req);
+  thread_ = htpconn->thread;
+  evhtp_request_pause(req);
+  evhtp_request_set_hook(
+      req_, evhtp_hook_on_request_fini, (evhtp_hook)(void*)RequestFiniHook,
+      reinterpret_cast<void*>(this));
+}
+
+void
+HTTPAPIServer::InferRequestClass::InferRequestComplete(
+    TRITONSERVER_InferenceRequest* request, const uint32_t flags, void* userp)
+{
+  // FIXME need to manage the lifetime of InferRequestClass so that we
+  // delete it here.
+
+  RequestReleasePayload* request_release_payload =
+      reinterpret_cast<RequestReleasePayload*>(userp);
+
+  if ((flags & TRITONSERVER_REQUEST_RELEASE_ALL) != 0) {
+    delete request_release_payload;
+  }
+}
+
+void
+HTTPAPIServer::InferRequestClass::InferResponseComplete(
+    TRITONSERVER_InferenceResponse* response, const uint32_t flags, void* userp)
+{
+  // FIXME can't use InferRequestClass object here since it's lifetime
+  // is different than response. For response we need to know how to
+  // send each output (as json, shm, or binary) and that information
+  // has to be maintained in a way that allows us to clean it up
+  // appropriately if connection closed or last response sent.
+  //
+  // But for now userp is the InferRequestClass object and the end of
+  // its life is in the ReplyCallback.
+
+  HTTPAPIServer::InferRequestClass* infer_request =
+      reinterpret_cast<HTTPAPIServer::InferRequestClass*>(userp);
+
+  if (response != nullptr) {
+    ++infer_request->response_count_;
+  }
+
+  TRITONSERVER_Error* err = nullptr;
+  if (infer_request->response_count_ != 1) {
+    err = TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INTERNAL,
+        std::string(
+            "expected a single response, got " +
+            std::to_string(infer_request->response_count_))
+            .c_str());
+  } else if (response != nullptr) {
+    err = infer_request->FinalizeResponse(response);
+#ifdef TRITON_ENABLE_TRACING
+    if (infer_request->trace_ != nullptr) {
+      infer_request->trace_->CaptureTimestamp(
+          "INFER_RESPONSE_COMPLETE", TraceManager::CaptureTimestamp());
+    }
+#endif  // TRITON_ENABLE_TRACING
+  }
+
+
+  LOG_TRITONSERVER_ERROR(
       TRITONSERVER_InferenceResponseDelete(response),
       "deleting inference response");
 
@@ -3834,6 +5336,10 @@ HTTPAPIServer::InferRequestClass::FinalizeResponse(
 {
   RETURN_IF_ERR(TRITONSERVER_InferenceResponseError(response));
 
+  if (compact_binary_) {
+    return FinalizeCompactResponse(response);
+  }
+
   triton::common::TritonJson::Value response_json(
       triton::common::TritonJson::ValueType::OBJECT);
 
@@ -4049,36 +5555,137 @@ HTTPAPIServer::InferRequestClass::FinalizeResponse(
 
   RETURN_IF_ERR(response_json.Add("outputs", std::move(response_outputs)));
 
-  evbuffer* response_placeholder = evbuffer_new();
-  // Write json metadata into response evbuffer
+  // Write json metadata followed by the binary data, if any, in the
+  // appropriate order... also need the HTTP header when returning binary
+  // data.
   triton::common::TritonJson::WriteBuffer buffer;
   RETURN_IF_ERR(response_json.Write(&buffer));
-  evbuffer_add(response_placeholder, buffer.Base(), buffer.Size());
+  WriteResponseBody(
+      buffer.Base(), buffer.Size(), ordered_buffers, !ordered_buffers.empty(),
+      buffer.Size());
 
-  // If there is binary data write it next in the appropriate
-  // order... also need the HTTP header when returning binary data.
-  if (!ordered_buffers.empty()) {
-    for (evbuffer* b : ordered_buffers) {
-      evbuffer_add_buffer(response_placeholder, b);
+  return nullptr;  // success
+}
+
+TRITONSERVER_Error*
+HTTPAPIServer::InferRequestClass::FinalizeCompactResponse(
+    TRITONSERVER_InferenceResponse* response)
+{
+  // Response header, with the same layout as the request header apart
+  // from the model name and version following the request id, then the
+  // data of each output. The output data is moved from the evbuffers the
+  // outputs were allocated in, without copying.
+  const char* request_id = "";
+  RETURN_IF_ERR(TRITONSERVER_InferenceResponseId(response, &request_id));
+  const char* model_name;
+  int64_t model_version;
+  RETURN_IF_ERR(TRITONSERVER_InferenceResponseModel(
+      response, &model_name, &model_version));
+  uint32_t output_count;
+  RETURN_IF_ERR(
+      TRITONSERVER_InferenceResponseOutputCount(response, &output_count));
+
+  std::string header;
+  header.reserve(64 + output_count * 64);
+  header.append(kCompactBinaryMagic, sizeof(kCompactBinaryMagic));
+  AppendValue(&header, kCompactBinaryVersion);
+  AppendValue(&header, uint16_t(0) /* flags */);
+  AppendValue(&header, output_count);
+  const uint32_t id_size = strlen(request_id);
+  AppendValue(&header, id_size);
+  header.append(request_id, id_size);
+  const uint32_t model_name_size = strlen(model_name);
+  AppendValue(&header, model_name_size);
+  header.append(model_name, model_name_size);
+  AppendValue(&header, model_version);
+
+  std::vector<evbuffer*> ordered_buffers;
+  ordered_buffers.reserve(output_count);
+  for (uint32_t idx = 0; idx < output_count; ++idx) {
+    const char* cname;
+    TRITONSERVER_DataType datatype;
+    const int64_t* shape;
+    uint64_t dim_count;
+    const void* base;
+    size_t byte_size;
+    TRITONSERVER_MemoryType memory_type;
+    int64_t memory_type_id;
+    void* userp;
+
+    RETURN_IF_ERR(TRITONSERVER_InferenceResponseOutput(
+        response, idx, &cname, &datatype, &shape, &dim_count, &base, &byte_size,
+        &memory_type, &memory_type_id, &userp));
+
+    auto info = reinterpret_cast<AllocPayload::OutputInfo*>(userp);
+    if ((info == nullptr) ||
+        (info->kind_ != AllocPayload::OutputInfo::BINARY)) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL,
+          std::string(
+              "unexpected non-binary output '" + std::string(cname) +
+              "' in compact binary inference response")
+              .c_str());
+    }
+    const size_t name_size = strlen(cname);
+    if ((dim_count > UINT8_MAX) || (name_size > UINT16_MAX)) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_UNSUPPORTED,
+          std::string(
+              "output '" + std::string(cname) +
+              "' can't be represented in compact binary inference response")
+              .c_str());
+    }
+
+    AppendValue(&header, static_cast<uint8_t>(datatype));
+    AppendValue(&header, static_cast<uint8_t>(dim_count));
+    AppendValue(&header, static_cast<uint16_t>(name_size));
+    AppendValue(&header, static_cast<uint64_t>(byte_size));
+    header.append(
+        reinterpret_cast<const char*>(shape), dim_count * sizeof(int64_t));
+    header.append(cname, name_size);
+    if (byte_size > 0) {
+      ordered_buffers.push_back(info->evbuffer_);
     }
   }
 
-  evbuffer* response_body = response_placeholder;
+  WriteResponseBody(
+      header.data(), header.size(), ordered_buffers, true /* has_binary_data */,
+      0);
+
+  return nullptr;  // success
+}
+
+void
+HTTPAPIServer::InferRequestClass::WriteResponseBody(
+    const char* header_base, const size_t header_byte_size,
+    const std::vector<evbuffer*>& ordered_buffers, const bool has_binary_data,
+    const size_t header_length)
+{
+  evbuffer* compressed_body = nullptr;
   switch (response_compression_type_) {
     case DataCompressor::Type::DEFLATE:
-    case DataCompressor::Type::GZIP: {
-      auto compressed_buffer = evbuffer_new();
-      auto err = DataCompressor::CompressData(
-          response_compression_type_, response_placeholder, compressed_buffer);
-      if (err == nullptr) {
-        response_body = compressed_buffer;
-        evbuffer_free(response_placeholder);
-      } else {
+    case DataCompressor::Type::GZIP:
+    case DataCompressor::Type::ZSTD:
+    case DataCompressor::Type::LZ4: {
+      size_t byte_size = header_byte_size;
+      for (evbuffer* b : ordered_buffers) {
+        byte_size += evbuffer_get_length(b);
+      }
+      // Small responses are not worth the compression overhead
+      if (byte_size < response_compression_threshold_) {
+        response_compression_type_ = DataCompressor::Type::IDENTITY;
+        break;
+      }
+      compressed_body = evbuffer_new();
+      auto err = CompressResponseBody(
+          header_base, header_byte_size, ordered_buffers, compressed_body);
+      if (err != nullptr) {
         // just log the compression error and return the uncompressed data
         LOG_VERBOSE(1) << "unable to compress response: "
                        << TRITONSERVER_ErrorMessage(err);
         TRITONSERVER_ErrorDelete(err);
-        evbuffer_free(compressed_buffer);
+        evbuffer_free(compressed_body);
+        compressed_body = nullptr;
         response_compression_type_ = DataCompressor::Type::IDENTITY;
       }
       break;
@@ -4088,20 +5695,43 @@ HTTPAPIServer::InferRequestClass::FinalizeResponse(
       // Do nothing for other cases
       break;
   }
-  SetResponseHeader(!ordered_buffers.empty(), buffer.Size());
-  evbuffer_add_buffer(req_->buffer_out, response_body);
-  // Destroy the evbuffer object as the data has been moved
-  // to HTTP response buffer
-  evbuffer_free(response_body);
+  SetResponseHeader(has_binary_data, header_length);
+  if (compressed_body != nullptr) {
+    evbuffer_add_buffer(req_->buffer_out, compressed_body);
+    // Destroy the evbuffer object as the data has been moved
+    // to HTTP response buffer
+    evbuffer_free(compressed_body);
+  } else {
+    evbuffer_add(req_->buffer_out, header_base, header_byte_size);
+    for (evbuffer* b : ordered_buffers) {
+      evbuffer_add_buffer(req_->buffer_out, b);
+    }
+  }
+}
 
-  return nullptr;  // success
+TRITONSERVER_Error*
+HTTPAPIServer::InferRequestClass::CompressResponseBody(
+    const char* header_base, const size_t header_byte_size,
+    const std::vector<evbuffer*>& ordered_buffers, evbuffer* compressed_body)
+{
+  std::unique_ptr<DataCompressor::Stream> stream;
+  RETURN_IF_ERR(DataCompressor::Stream::Create(
+      response_compression_type_, response_compression_level_, compressed_body,
+      &stream));
+  RETURN_IF_ERR(stream->Append(header_base, header_byte_size));
+  for (evbuffer* b : ordered_buffers) {
+    RETURN_IF_ERR(stream->Append(b));
+  }
+  return stream->Finish();
 }
 
 void
 HTTPAPIServer::InferRequestClass::SetResponseHeader(
     bool has_binary_data, size_t header_length)
 {
-  if (has_binary_data) {
+  if (compact_binary_) {
+    AddContentTypeHeader(req_, kInferCompactBinaryContentType);
+  } else if (has_binary_data) {
     AddContentTypeHeader(req_, "application/octet-stream");
     evhtp_headers_add_header(
         req_->headers_out, evhtp_header_new(
@@ -4113,14 +5743,14 @@ HTTPAPIServer::InferRequestClass::SetResponseHeader(
 
   switch (response_compression_type_) {
     case DataCompressor::Type::DEFLATE:
-      evhtp_headers_add_header(
-          req_->headers_out,
-          evhtp_header_new(kContentEncodingHTTPHeader, "deflate", 1, 1));
-      break;
     case DataCompressor::Type::GZIP:
+    case DataCompressor::Type::ZSTD:
+    case DataCompressor::Type::LZ4:
       evhtp_headers_add_header(
           req_->headers_out,
-          evhtp_header_new(kContentEncodingHTTPHeader, "gzip", 1, 1));
+          evhtp_header_new(
+              kContentEncodingHTTPHeader,
+              DataCompressor::TypeString(response_compression_type_), 1, 1));
       break;
     case DataCompressor::Type::IDENTITY:
     case DataCompressor::Type::UNKNOWN:
@@ -4136,10 +5766,8 @@ HTTPAPIServer::InferRequestClass::IncrementResponseCount()
 
 HTTPAPIServer::GenerateRequestClass::~GenerateRequestClass()
 {
-  while (!pending_http_responses_.empty()) {
-    evbuffer_free(pending_http_responses_.front());
-    pending_http_responses_.pop();
-  }
+  evbuffer_free(pending_http_responses_);
+  evbuffer_free(sending_http_responses_);
 }
 
 void
@@ -4153,7 +5781,7 @@ HTTPAPIServer::GenerateRequestClass::InferResponseComplete(
   // appropriately if connection closed or last response sent.
   //
   // But for now userp is the InferRequestClass object and the end of
-  // its life is in the ReplyCallback.
+  // its life is in the FlushCallback.
 
   auto infer_request =
       reinterpret_cast<HTTPAPIServer::GenerateRequestClass*>(userp);
@@ -4168,7 +5796,6 @@ HTTPAPIServer::GenerateRequestClass::InferResponseComplete(
     infer_request->AddErrorJson(err);
   }
 
-
   // First response starts the chunked response, the response code is set here
   // so user should check response body in case of error at later time.
   if (infer_request->IncrementResponseCount() == 0) {
@@ -4183,16 +5810,30 @@ HTTPAPIServer::GenerateRequestClass::InferResponseComplete(
   }
 #endif  // TRITON_ENABLE_TRACING
 
-  // Final flag indicates there is no more responses, ending chunked response.
-  if ((flags & TRITONSERVER_RESPONSE_COMPLETE_FINAL) != 0) {
-    evthr_defer(infer_request->thread_, EndResponseCallback, infer_request);
-  } else {
-    evthr_defer(infer_request->thread_, ChunkResponseCallback, infer_request);
-  }
-
   LOG_TRITONSERVER_ERROR(
       TRITONSERVER_InferenceResponseDelete(response),
       "deleting inference response");
+
+  // Final flag indicates there is no more responses, ending chunked response.
+  // Non-streaming responses are only sent at the end.
+  const bool end = ((flags & TRITONSERVER_RESPONSE_COMPLETE_FINAL) != 0);
+  bool schedule = false;
+  {
+    std::lock_guard<std::mutex> lk(infer_request->res_mtx_);
+    infer_request->end_ = end;
+    if (!infer_request->flush_scheduled_ &&
+        (end || infer_request->streaming_)) {
+      infer_request->flush_scheduled_ = true;
+      schedule = true;
+    }
+  }
+  if (schedule) {
+    if (end || (infer_request->flush_interval_us_ == 0)) {
+      evthr_defer(infer_request->thread_, FlushCallback, infer_request);
+    } else {
+      evthr_defer(infer_request->thread_, ScheduleFlush, infer_request);
+    }
+  }
 }
 
 void
@@ -4217,69 +5858,83 @@ HTTPAPIServer::GenerateRequestClass::StartResponse(
 }
 
 void
-HTTPAPIServer::GenerateRequestClass::ChunkResponseCallback(
+HTTPAPIServer::GenerateRequestClass::ScheduleFlush(
     evthr_t* thr, void* arg, void* shared)
 {
   auto infer_request =
       reinterpret_cast<HTTPAPIServer::GenerateRequestClass*>(arg);
 
-  if (infer_request->req_ == nullptr) {
-    return;
+  // The event base of the connection thread may only be used from that
+  // thread
+  struct timeval delay;
+  delay.tv_sec = infer_request->flush_interval_us_ / 1000000;
+  delay.tv_usec = infer_request->flush_interval_us_ % 1000000;
+  if (event_base_once(
+          evthr_get_base(thr), -1, EV_TIMEOUT, FlushTimeout, infer_request,
+          &delay) != 0) {
+    FlushCallback(thr, arg, shared);
   }
+}
 
-  infer_request->SendChunkResponse(false /* end */);
+void
+HTTPAPIServer::GenerateRequestClass::FlushTimeout(
+    evutil_socket_t fd, short events, void* arg)
+{
+  FlushCallback(nullptr, arg, nullptr);
 }
 
 void
-HTTPAPIServer::GenerateRequestClass::EndResponseCallback(
+HTTPAPIServer::GenerateRequestClass::FlushCallback(
     evthr_t* thr, void* arg, void* shared)
 {
   auto infer_request =
       reinterpret_cast<HTTPAPIServer::GenerateRequestClass*>(arg);
 
+  bool end;
+  {
+    std::lock_guard<std::mutex> lk(infer_request->res_mtx_);
+    evbuffer_add_buffer(
+        infer_request->sending_http_responses_,
+        infer_request->pending_http_responses_);
+    infer_request->flush_scheduled_ = false;
+    end = infer_request->end_;
+  }
+
   if (infer_request->EvHtpRequest() != nullptr) {
-    infer_request->SendChunkResponse(true /* end */);
-    evhtp_send_reply_chunk_end(infer_request->EvHtpRequest());
+    infer_request->Flush();
+    if (end) {
+      evhtp_send_reply_chunk_end(infer_request->EvHtpRequest());
+    }
   }
 
-  delete infer_request;
+  if (end) {
+    delete infer_request;
+  }
 }
 
 void
-HTTPAPIServer::GenerateRequestClass::SendChunkResponse(bool end)
+HTTPAPIServer::GenerateRequestClass::Flush()
 {
   // check if response count in the case of non-streaming
-  if (!streaming_) {
-    std::lock_guard<std::mutex> lk(res_mtx_);
-    // For non-streaming, wait until end
-    if (!end) {
-      return;
-    }
-    if (pending_http_responses_.size() != 1) {
-      EVBufferAddErrorJson(
-          req_->buffer_out, TRITONSERVER_ErrorNew(
-                                TRITONSERVER_ERROR_INTERNAL,
-                                "generate expects model to produce exactly 1 "
-                                "response, use generate stream for model that "
-                                "generates various number of responses"));
-      evhtp_send_reply_chunk(req_, req_->buffer_out);
-      return;
-    }
+  if (!streaming_ && (pending_response_count_ != 1)) {
+    EVBufferAddErrorJson(
+        req_->buffer_out, TRITONSERVER_ErrorNew(
+                              TRITONSERVER_ERROR_INTERNAL,
+                              "generate expects model to produce exactly 1 "
+                              "response, use generate stream for model that "
+                              "generates various number of responses"));
+    evhtp_send_reply_chunk(req_, req_->buffer_out);
+    return;
   }
 
-  evbuffer* buffer = nullptr;
-  {
-    std::lock_guard<std::mutex> lk(res_mtx_);
-    // This function may be called with no pending responses when
-    // response complete callback is invoked with flag-only
-    if (pending_http_responses_.empty()) {
-      return;
-    }
-    buffer = pending_http_responses_.front();
-    pending_http_responses_.pop();
+  // This function may be called with no pending responses when
+  // response complete callback is invoked with flag-only
+  if (evbuffer_get_length(sending_http_responses_) == 0) {
+    return;
   }
-  evhtp_send_reply_chunk(req_, buffer);
-  evbuffer_free(buffer);
+  evhtp_send_reply_chunk(req_, sending_http_responses_);
+  evbuffer_drain(
+      sending_http_responses_, evbuffer_get_length(sending_http_responses_));
 
 #ifdef TRITON_ENABLE_TRACING
   if (trace_ != nullptr) {
@@ -4376,37 +6031,33 @@ HTTPAPIServer::GenerateRequestClass::FinalizeResponse(
         cname, TritonOutput(TritonOutput::Type::TENSOR, idx));
   }
 
-  std::set<std::string> mapped_outputs;
-  RETURN_IF_ERR(ConvertGenerateResponse(
-      triton_outputs, response_schema_, &response_json, &mapped_outputs));
-  if (response_schema_->allow_unspecified_) {
-    for (const auto& to : triton_outputs) {
-      if (mapped_outputs.find(to.first) == mapped_outputs.end()) {
-        RETURN_IF_ERR(ExactMappingOutput(
-            to.first, to.second, &response_json, &mapped_outputs));
+  // Responses are serialized into a per-thread buffer that is reused across
+  // responses, most responses of a stream carry a few tokens only.
+  thread_local std::string response_body;
+  response_body.clear();
+  if (response_schema_->children_.empty() &&
+      response_schema_->allow_unspecified_) {
+    RETURN_IF_ERR(WriteExactMappingResponse(triton_outputs, &response_body));
+  } else {
+    std::set<std::string> mapped_outputs;
+    RETURN_IF_ERR(ConvertGenerateResponse(
+        triton_outputs, response_schema_, &response_json, &mapped_outputs));
+    if (response_schema_->allow_unspecified_) {
+      for (const auto& to : triton_outputs) {
+        if (mapped_outputs.find(to.first) == mapped_outputs.end()) {
+          RETURN_IF_ERR(ExactMappingOutput(
+              to.first, to.second, &response_json, &mapped_outputs));
+        }
       }
     }
-  }
 
-  // [FIXME] compression
-  evbuffer* response_body = evbuffer_new();
-  if (streaming_) {
-    static std::string sse_prefix = "data: ";
-    evbuffer_add(response_body, sse_prefix.c_str(), sse_prefix.length());
-  }
-  // Write json metadata into response evbuffer
-  triton::common::TritonJson::WriteBuffer buffer;
-  RETURN_IF_ERR(response_json.Write(&buffer));
-  evbuffer_add(response_body, buffer.Base(), buffer.Size());
-  if (streaming_) {
-    static std::string sse_suffix = "\n\n";
-    evbuffer_add(response_body, sse_suffix.c_str(), sse_suffix.length());
+    triton::common::TritonJson::WriteBuffer buffer;
+    RETURN_IF_ERR(response_json.Write(&buffer));
+    response_body.assign(buffer.Base(), buffer.Size());
   }
 
-  {
-    std::lock_guard<std::mutex> lk(res_mtx_);
-    pending_http_responses_.emplace(response_body);
-  }
+  // [FIXME] compression
+  AddPendingResponse(response_body.data(), response_body.size());
 
   return nullptr;  // success
 }
@@ -4414,21 +6065,35 @@ HTTPAPIServer::GenerateRequestClass::FinalizeResponse(
 void
 HTTPAPIServer::GenerateRequestClass::AddErrorJson(TRITONSERVER_Error* error)
 {
+  // Errors are rare, the error JSON is not worth a dedicated writer
   evbuffer* buffer = evbuffer_new();
-  if (streaming_) {
-    static std::string sse_prefix = "data: ";
-    evbuffer_add(buffer, sse_prefix.c_str(), sse_prefix.length());
-  }
   EVBufferAddErrorJson(buffer, error);
+  AddPendingResponse(
+      reinterpret_cast<const char*>(evbuffer_pullup(buffer, -1)),
+      evbuffer_get_length(buffer));
+  evbuffer_free(buffer);
+  TRITONSERVER_ErrorDelete(error);
+}
+
+void
+HTTPAPIServer::GenerateRequestClass::AddPendingResponse(
+    const char* base, const size_t byte_size)
+{
+  // Each streaming response is a server-sent event
+  static const std::string sse_prefix = "data: ";
+  static const std::string sse_suffix = "\n\n";
+
+  std::lock_guard<std::mutex> lk(res_mtx_);
   if (streaming_) {
-    static std::string sse_suffix = "\n\n";
-    evbuffer_add(buffer, sse_suffix.c_str(), sse_suffix.length());
+    evbuffer_add(
+        pending_http_responses_, sse_prefix.c_str(), sse_prefix.length());
   }
-  TRITONSERVER_ErrorDelete(error);
-  {
-    std::lock_guard<std::mutex> lk(res_mtx_);
-    pending_http_responses_.emplace(buffer);
+  evbuffer_add(pending_http_responses_, base, byte_size);
+  if (streaming_) {
+    evbuffer_add(
+        pending_http_responses_, sse_suffix.c_str(), sse_suffix.length());
   }
+  ++pending_response_count_;
 }
 
 TRITONSERVER_Error*
@@ -4574,6 +6239,108 @@ HTTPAPIServer::GenerateRequestClass::ExactMappingOutput(
   return nullptr;  // success
 }
 
+TRITONSERVER_Error*
+HTTPAPIServer::GenerateRequestClass::WriteExactMappingResponse(
+    const std::map<std::string, TritonOutput>& output_metadata,
+    std::string* response_body)
+{
+  // Same output as ExactMappingOutput() for every output, in the same order
+  StringOutputStream stream(response_body);
+  StringJsonWriter writer(stream);
+  RETURN_IF_ERR(JsonWriterCheck(writer.StartObject()));
+  for (const auto& to : output_metadata) {
+    const TritonOutput& triton_output = to.second;
+    switch (triton_output.type) {
+      case TritonOutput::Type::RESERVED: {
+        RETURN_IF_ERR(
+            JsonWriterCheck(writer.Key(to.first.c_str(), to.first.size())));
+        RETURN_IF_ERR(JsonWriterCheck(writer.String(
+            triton_output.value.c_str(), triton_output.value.size())));
+        break;
+      }
+      case TritonOutput::Type::PARAMETER: {
+        const char* name;
+        TRITONSERVER_ParameterType type;
+        const void* vvalue;
+        RETURN_IF_ERR(TRITONSERVER_InferenceResponseParameter(
+            triton_response_, triton_output.index, &name, &type, &vvalue));
+        RETURN_IF_ERR(JsonWriterCheck(writer.Key(name)));
+        switch (type) {
+          case TRITONSERVER_PARAMETER_BOOL:
+            RETURN_IF_ERR(JsonWriterCheck(
+                writer.Bool(*(reinterpret_cast<const bool*>(vvalue)))));
+            break;
+          case TRITONSERVER_PARAMETER_INT:
+            RETURN_IF_ERR(JsonWriterCheck(
+                writer.Int64(*(reinterpret_cast<const int64_t*>(vvalue)))));
+            break;
+          case TRITONSERVER_PARAMETER_STRING:
+            RETURN_IF_ERR(JsonWriterCheck(
+                writer.String(reinterpret_cast<const char*>(vvalue))));
+            break;
+          case TRITONSERVER_PARAMETER_DOUBLE:
+            RETURN_IF_ERR(JsonWriterCheck(
+                writer.Double(*(reinterpret_cast<const double*>(vvalue)))));
+            break;
+          case TRITONSERVER_PARAMETER_BYTES:
+            return TRITONSERVER_ErrorNew(
+                TRITONSERVER_ERROR_UNSUPPORTED,
+                (std::string("Response parameter '") + name +
+                 "' has type 'TRITONSERVER_PARAMETER_BYTES' which is "
+                 "not currently supported")
+                    .c_str());
+        }
+        break;
+      }
+      case TritonOutput::Type::TENSOR: {
+        const char* cname;
+        TRITONSERVER_DataType datatype;
+        const int64_t* shape;
+        uint64_t dim_count;
+        const void* base;
+        size_t byte_size;
+        TRITONSERVER_MemoryType memory_type;
+        int64_t memory_type_id;
+        void* userp;
+
+        RETURN_IF_ERR(TRITONSERVER_InferenceResponseOutput(
+            triton_response_, triton_output.index, &cname, &datatype, &shape,
+            &dim_count, &base, &byte_size, &memory_type, &memory_type_id,
+            &userp));
+
+        auto info = reinterpret_cast<AllocPayload::OutputInfo*>(userp);
+        // sanity check
+        if (info->kind_ != AllocPayload::OutputInfo::JSON) {
+          return TRITONSERVER_ErrorNew(
+              TRITONSERVER_ERROR_INTERNAL,
+              (std::string("non-JSON output response type is requested for '") +
+               cname + "'")
+                  .c_str());
+        }
+
+        size_t element_count = 1;
+        for (size_t j = 0; j < dim_count; j++) {
+          element_count *= shape[j];
+        }
+
+        // if only 1 element, strip out the array
+        RETURN_IF_ERR(JsonWriterCheck(writer.Key(cname)));
+        if (element_count != 1) {
+          RETURN_IF_ERR(JsonWriterCheck(writer.StartArray()));
+        }
+        RETURN_IF_ERR(WriteDataToJsonWriter(
+            &writer, cname, datatype, base, byte_size, element_count));
+        if (element_count != 1) {
+          RETURN_IF_ERR(JsonWriterCheck(writer.EndArray()));
+        }
+        break;
+      }
+    }
+  }
+  RETURN_IF_ERR(JsonWriterCheck(writer.EndObject()));
+  return nullptr;  // success
+}
+
 void
 HTTPAPIServer::Handle(evhtp_request_t* req)
 {
@@ -4684,11 +6451,19 @@ HTTPAPIServer::Create(
     const bool reuse_port, const std::string& address,
     const std::string& header_forward_pattern, const int thread_cnt,
     const RestrictedFeatures& restricted_features,
+    const DataCompressor::Options& compression_options,
+    const uint64_t generate_stream_flush_interval_us,
+    const std::shared_ptr<AdmissionController>& admission_controller,
     std::unique_ptr<HTTPServer>* http_server)
 {
-  http_server->reset(new HTTPAPIServer(
+  auto http_api_server = new HTTPAPIServer(
       server, trace_manager, shm_manager, port, reuse_port, address,
-      header_forward_pattern, thread_cnt, restricted_features));
+      header_forward_pattern, thread_cnt, restricted_features,
+      compression_options);
+  http_api_server->generate_stream_flush_interval_us_ =
+      generate_stream_flush_interval_us;
+  http_api_server->admission_controller_ = admission_controller;
+  http_server->reset(http_api_server);
 
   const std::string addr = address + ":" + std::to_string(port);
   LOG_INFO << "Started HTTPService at " << addr;
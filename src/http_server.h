@@ -32,13 +32,16 @@
 #include <map>
 #include <memory>
 #include <mutex>
-#include <queue>
 #include <string>
 #include <thread>
+#include <tuple>
 #include <unordered_map>
+#include <utility>
 
+#include "admission_control.h"
 #include "common.h"
 #include "data_compressor.h"
+#include "readiness_cache.h"
 #include "restricted_features.h"
 #include "shared_memory_manager.h"
 #include "tracer.h"
@@ -131,7 +134,7 @@ class HTTPMetricsServer : public HTTPServer {
  public:
   static TRITONSERVER_Error* Create(
       const std::shared_ptr<TRITONSERVER_Server>& server, int32_t port,
-      std::string address, int thread_cnt,
+      std::string address, int thread_cnt, uint64_t cache_ttl_ms,
       std::unique_ptr<HTTPServer>* metrics_server);
 
   ~HTTPMetricsServer() = default;
@@ -139,20 +142,74 @@ class HTTPMetricsServer : public HTTPServer {
  private:
   explicit HTTPMetricsServer(
       const std::shared_ptr<TRITONSERVER_Server>& server, const int32_t port,
-      std::string address, const int thread_cnt)
+      std::string address, const int thread_cnt, const uint64_t cache_ttl_ms)
       : HTTPServer(
             port, false /* reuse_port */, address,
             "" /* header_forward_pattern */, thread_cnt),
-        server_(server), api_regex_(R"(/metrics/?)")
+        server_(server), api_regex_(R"(/metrics/?)"),
+        cache_ttl_ms_(cache_ttl_ms), cache_time_ms_(0)
   {
   }
   void Handle(evhtp_request_t* req) override;
 
+  // A response body and the encoding it was compressed with.
+  using Body =
+      std::pair<DataCompressor::Type, std::shared_ptr<const std::string>>;
+
+  // Get the Prometheus text restricted to the comma-separated metric
+  // 'families' and 'models' (empty for no restriction), compressed with
+  // 'encoding' if it is not empty. The body is served from the cache if
+  // the metrics were formatted less than 'cache_ttl_ms_' ago.
+  TRITONSERVER_Error* GetBody(
+      const std::string& families, const std::string& models,
+      const DataCompressor::Type encoding, Body* body);
+
   std::shared_ptr<TRITONSERVER_Server> server_;
   re2::RE2 api_regex_;
+
+  // How long a formatted response is reused, 0 to format the metrics
+  // on every scrape.
+  const uint64_t cache_ttl_ms_;
+
+  // Metrics text formatted at 'cache_time_ms_' and the bodies derived
+  // from it, keyed by families, models and requested encoding.
+  std::mutex cache_mu_;
+  uint64_t cache_time_ms_;
+  std::shared_ptr<const std::string> cache_text_;
+  std::map<std::tuple<std::string, std::string, DataCompressor::Type>, Body>
+      cache_bodies_;
 };
 #endif  // TRITON_ENABLE_METRICS
 
+// Handle the HTTP health probes, server liveness and readiness and model
+// readiness, on a dedicated listener so that probes are not queued behind
+// inference requests. Probes are answered from the readiness cache.
+class HTTPHealthServer : public HTTPServer {
+ public:
+  static TRITONSERVER_Error* Create(
+      const std::shared_ptr<ReadinessCache>& cache, int32_t port,
+      std::string address, std::unique_ptr<HTTPServer>* health_server);
+
+  ~HTTPHealthServer() = default;
+
+ private:
+  explicit HTTPHealthServer(
+      const std::shared_ptr<ReadinessCache>& cache, const int32_t port,
+      std::string address)
+      : HTTPServer(
+            port, false /* reuse_port */, address,
+            "" /* header_forward_pattern */, 1 /* thread_cnt */),
+        cache_(cache), health_regex_(R"(/v2/health/(live|ready))"),
+        model_ready_regex_(R"(/v2/models/([^/]+)(?:/versions/([0-9]+))?/ready)")
+  {
+  }
+  void Handle(evhtp_request_t* req) override;
+
+  std::shared_ptr<ReadinessCache> cache_;
+  re2::RE2 health_regex_;
+  re2::RE2 model_ready_regex_;
+};
+
 #if !defined(_WIN32) && defined(TRITON_ENABLE_TRACING)
 class HttpTextMapCarrier : public otel_cntxt::propagation::TextMapCarrier {
  public:
@@ -194,6 +251,9 @@ class HTTPAPIServer : public HTTPServer {
       const int32_t port, const bool reuse_port, const std::string& address,
       const std::string& header_forward_pattern, const int thread_cnt,
       const RestrictedFeatures& restricted_apis,
+      const DataCompressor::Options& compression_options,
+      const uint64_t generate_stream_flush_interval_us,
+      const std::shared_ptr<AdmissionController>& admission_controller,
       std::unique_ptr<HTTPServer>* http_server);
 
   virtual ~HTTPAPIServer();
@@ -264,7 +324,8 @@ class HTTPAPIServer : public HTTPServer {
     explicit InferRequestClass(
         TRITONSERVER_Server* server, evhtp_request_t* req,
         DataCompressor::Type response_compression_type,
-        const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request);
+        const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request,
+        const DataCompressor::Options& compression_options = {});
     virtual ~InferRequestClass()
     {
       if (req_ != nullptr) {
@@ -283,6 +344,9 @@ class HTTPAPIServer : public HTTPServer {
         void* userp);
     virtual TRITONSERVER_Error* FinalizeResponse(
         TRITONSERVER_InferenceResponse* response);
+    // Writes the response using the compact binary framing
+    TRITONSERVER_Error* FinalizeCompactResponse(
+        TRITONSERVER_InferenceResponse* response);
 
     // Helper function to set infer response header in the form specified by
     // the endpoint protocol
@@ -301,15 +365,40 @@ class HTTPAPIServer : public HTTPServer {
     // lifetime of the request.
     std::list<std::vector<char>> serialized_data_;
 
+    // Shared memory regions used by the request. Holding the references
+    // keeps the regions mapped for the lifetime of the request even if
+    // they are unregistered while the request is in flight.
+    std::list<std::shared_ptr<const SharedMemoryManager::SharedMemoryInfo>>
+        shm_regions_info_;
+
+    // Whether the request uses the compact binary framing, the response
+    // then uses the same framing.
+    bool compact_binary_{false};
+
     static void ReplyCallback(evthr_t* thr, void* arg, void* shared);
 
    protected:
+    // Writes 'header' followed by the data of 'ordered_buffers' as the HTTP
+    // response body along with the response headers. If compression is
+    // requested each part is compressed as it is appended, so the
+    // uncompressed body is never assembled.
+    void WriteResponseBody(
+        const char* header_base, const size_t header_byte_size,
+        const std::vector<evbuffer*>& ordered_buffers,
+        const bool has_binary_data, const size_t header_length);
+    TRITONSERVER_Error* CompressResponseBody(
+        const char* header_base, const size_t header_byte_size,
+        const std::vector<evbuffer*>& ordered_buffers,
+        evbuffer* compressed_body);
+
     TRITONSERVER_Server* server_{nullptr};
     evhtp_request_t* req_{nullptr};
     evthr_t* thread_{nullptr};
 
     DataCompressor::Type response_compression_type_{
         DataCompressor::Type::IDENTITY};
+    int response_compression_level_{DataCompressor::kDefaultLevel};
+    size_t response_compression_threshold_{0};
 
     // Counter to keep track of number of responses generated.
     std::atomic<uint32_t> response_count_{0};
@@ -332,11 +421,14 @@ class HTTPAPIServer : public HTTPServer {
         DataCompressor::Type response_compression_type,
         const MappingSchema* request_schema,
         const MappingSchema* response_schema, bool streaming,
-        const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request)
+        const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request,
+        const uint64_t flush_interval_us = 0)
         : InferRequestClass(
               server, req, response_compression_type, triton_request),
           request_schema_(request_schema), response_schema_(response_schema),
-          streaming_(streaming)
+          streaming_(streaming), flush_interval_us_(flush_interval_us),
+          pending_http_responses_(evbuffer_new()),
+          sending_http_responses_(evbuffer_new())
     {
     }
     virtual ~GenerateRequestClass();
@@ -346,10 +438,14 @@ class HTTPAPIServer : public HTTPServer {
     static void InferResponseComplete(
         TRITONSERVER_InferenceResponse* response, const uint32_t flags,
         void* userp);
-    static void ChunkResponseCallback(evthr_t* thr, void* arg, void* shared);
-    static void EndResponseCallback(evthr_t* thr, void* arg, void* shared);
-    // Return whether the response is ending
-    void SendChunkResponse(bool end);
+    // Send the pending responses, on the connection thread. At most one
+    // flush is outstanding so responses arriving in the meantime are sent
+    // together, the flush that sees the final response ends the response
+    // and releases this object.
+    static void ScheduleFlush(evthr_t* thr, void* arg, void* shared);
+    static void FlushTimeout(evutil_socket_t fd, short events, void* arg);
+    static void FlushCallback(evthr_t* thr, void* arg, void* shared);
+    void Flush();
 
     // Response preparation
     TRITONSERVER_Error* FinalizeResponse(
@@ -397,18 +493,30 @@ class HTTPAPIServer : public HTTPServer {
         const std::string& name, const TritonOutput& triton_output,
         triton::common::TritonJson::Value* generate_response,
         std::set<std::string>* mapped_outputs);
+    // Write the response without building a JSON document, only for a
+    // response schema that maps every output exactly.
+    TRITONSERVER_Error* WriteExactMappingResponse(
+        const std::map<std::string, TritonOutput>& output_metadata,
+        std::string* response_body);
+    void AddPendingResponse(const char* base, const size_t byte_size);
 
     const MappingSchema* request_schema_{nullptr};
     const MappingSchema* response_schema_{nullptr};
     const bool streaming_{false};
+    // How long a flush waits for more responses to send them together
+    const uint64_t flush_interval_us_{0};
     // Placeholder to completing response, this class does not own
     // the response.
     TRITONSERVER_InferenceResponse* triton_response_{nullptr};
-    // As InferResponseComplete and ChunkResponseCallback are called in
-    // different threads, need to have dedicated buffers for each response and
-    // ensure mutual exclusive access.
+    // As InferResponseComplete and FlushCallback are called in different
+    // threads, responses are appended to 'pending_http_responses_' which is
+    // moved to 'sending_http_responses_' under the lock to be sent. Both
+    // buffers are reused for all the responses of the request.
     std::mutex res_mtx_;
-    std::queue<evbuffer*> pending_http_responses_;
+    evbuffer* pending_http_responses_;
+    evbuffer* sending_http_responses_;
+    size_t pending_response_count_{0};
+    bool flush_scheduled_{false};
     bool end_{false};
   };
 
@@ -417,8 +525,11 @@ class HTTPAPIServer : public HTTPServer {
   struct RequestReleasePayload final {
     RequestReleasePayload(
         const std::shared_ptr<TRITONSERVER_InferenceRequest>& inference_request,
-        evbuffer* buffer)
-        : inference_request_(inference_request), buffer_(buffer){};
+        evbuffer* buffer,
+        AdmissionController::Ticket&& admission_ticket =
+            AdmissionController::Ticket())
+        : inference_request_(inference_request), buffer_(buffer),
+          admission_ticket_(std::move(admission_ticket)){};
 
     ~RequestReleasePayload()
     {
@@ -430,6 +541,8 @@ class HTTPAPIServer : public HTTPServer {
    private:
     std::shared_ptr<TRITONSERVER_InferenceRequest> inference_request_ = nullptr;
     evbuffer* buffer_ = nullptr;
+    // Releases the request from admission control
+    AdmissionController::Ticket admission_ticket_;
   };
 
  protected:
@@ -439,7 +552,8 @@ class HTTPAPIServer : public HTTPServer {
       const std::shared_ptr<SharedMemoryManager>& shm_manager,
       const int32_t port, const bool reuse_port, const std::string& address,
       const std::string& header_forward_pattern, const int thread_cnt,
-      const RestrictedFeatures& restricted_apis = {});
+      const RestrictedFeatures& restricted_apis = {},
+      const DataCompressor::Options& compression_options = {});
 
   virtual void Handle(evhtp_request_t* req) override;
   // [FIXME] extract to "infer" class
@@ -448,7 +562,8 @@ class HTTPAPIServer : public HTTPServer {
       const std::shared_ptr<TRITONSERVER_InferenceRequest>& triton_request)
   {
     return std::unique_ptr<InferRequestClass>(new InferRequestClass(
-        server_.get(), req, GetResponseCompressionType(req), triton_request));
+        server_.get(), req, GetResponseCompressionType(req), triton_request,
+        compression_options_));
   }
 
   // Helper function to retrieve infer request header in the form specified by
@@ -462,6 +577,11 @@ class HTTPAPIServer : public HTTPServer {
   virtual DataCompressor::Type GetResponseCompressionType(evhtp_request_t* req);
 
 
+  // Merge concurrent JSON inference requests to a model that batches but
+  // has no dynamic batcher into batched requests. A request waits at most
+  // 'max_delay_us' microseconds for others to fill the batch.
+  void EnableRequestCoalescing(const uint64_t max_delay_us);
+
   TRITONSERVER_Error* GetModelConfig(
       const std::string& model_name, int64_t requested_model_version,
       std::string* config_json);
@@ -559,6 +679,9 @@ class HTTPAPIServer : public HTTPServer {
   TRITONSERVER_Error* EVBufferToRawInput(
       const std::string& model_name, TRITONSERVER_InferenceRequest* irequest,
       evbuffer* input_buffer, InferRequestClass* infer_req);
+  TRITONSERVER_Error* EVBufferToCompactInput(
+      const std::string& model_name, TRITONSERVER_InferenceRequest* irequest,
+      evbuffer* input_buffer, InferRequestClass* infer_req);
 
 
   // Helpers for parsing JSON requests for Triton-specific fields
@@ -604,6 +727,10 @@ class HTTPAPIServer : public HTTPServer {
   std::unique_ptr<MappingSchema> generate_stream_request_schema_{
       new MappingSchema()};
 
+  // How long a generate_stream flush waits for more responses, 0 sends the
+  // responses as soon as the connection thread is available.
+  uint64_t generate_stream_flush_interval_us_{0};
+
   // Provisional definition of generate mapping schema
   // to allow for parameters passing
   //
@@ -623,6 +750,15 @@ class HTTPAPIServer : public HTTPServer {
         new MappingSchema(MappingSchema::Kind::MAPPING_SCHEMA, true));
   }
   RestrictedFeatures restricted_apis_{};
+  DataCompressor::Options compression_options_;
+
+  // Set if admission control is enabled
+  std::shared_ptr<AdmissionController> admission_controller_;
+
+  // Set if request coalescing is enabled
+  class RequestCoalescer;
+  std::unique_ptr<RequestCoalescer> coalescer_;
+
   bool RespondIfRestricted(
       evhtp_request_t* req, const Restriction& restriction);
 };
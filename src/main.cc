@@ -42,6 +42,7 @@
 
 #include <algorithm>
 #include <cctype>
+#include <functional>
 #include <iomanip>
 #include <iostream>
 #include <sstream>
@@ -53,8 +54,12 @@
 #include <sanitizer/lsan_interface.h>
 #endif  // TRITON_ENABLE_ASAN
 
+#include "admission_control.h"
 #include "command_line_parser.h"
 #include "common.h"
+#include "model_load_planner.h"
+#include "readiness_cache.h"
+#include "repository_watcher.h"
 #include "shared_memory_manager.h"
 #include "tracer.h"
 #include "triton/common/logging.h"
@@ -83,6 +88,7 @@ namespace {
 
 #ifdef TRITON_ENABLE_HTTP
 std::unique_ptr<triton::server::HTTPServer> g_http_service;
+std::unique_ptr<triton::server::HTTPServer> g_health_service;
 #endif  // TRITON_ENABLE_HTTP
 
 #ifdef TRITON_ENABLE_GRPC
@@ -109,11 +115,13 @@ StartGrpcService(
     std::unique_ptr<triton::server::grpc::Server>* service,
     const std::shared_ptr<TRITONSERVER_Server>& server,
     triton::server::TraceManager* trace_manager,
-    const std::shared_ptr<triton::server::SharedMemoryManager>& shm_manager)
+    const std::shared_ptr<triton::server::SharedMemoryManager>& shm_manager,
+    const std::shared_ptr<triton::server::AdmissionController>&
+        admission_controller)
 {
   TRITONSERVER_Error* err = triton::server::grpc::Server::Create(
-      server, trace_manager, shm_manager, g_triton_params.grpc_options_,
-      service);
+      server, trace_manager, shm_manager, admission_controller,
+      g_triton_params.grpc_options_, service);
   if (err == nullptr) {
     err = (*service)->Start();
   }
@@ -132,14 +140,18 @@ StartHttpService(
     std::unique_ptr<triton::server::HTTPServer>* service,
     const std::shared_ptr<TRITONSERVER_Server>& server,
     triton::server::TraceManager* trace_manager,
-    const std::shared_ptr<triton::server::SharedMemoryManager>& shm_manager)
+    const std::shared_ptr<triton::server::SharedMemoryManager>& shm_manager,
+    const std::shared_ptr<triton::server::AdmissionController>&
+        admission_controller)
 {
   TRITONSERVER_Error* err = triton::server::HTTPAPIServer::Create(
       server, trace_manager, shm_manager, g_triton_params.http_port_,
       g_triton_params.reuse_http_port_, g_triton_params.http_address_,
       g_triton_params.http_forward_header_pattern_,
       g_triton_params.http_thread_cnt_, g_triton_params.http_restricted_apis_,
-      service);
+      g_triton_params.http_compression_options_,
+      g_triton_params.http_generate_stream_flush_interval_us_,
+      admission_controller, service);
   if (err == nullptr) {
     err = (*service)->Start();
   }
@@ -150,6 +162,24 @@ StartHttpService(
 
   return err;
 }
+
+TRITONSERVER_Error*
+StartHealthService(
+    std::unique_ptr<triton::server::HTTPServer>* service,
+    const std::shared_ptr<triton::server::ReadinessCache>& readiness_cache)
+{
+  TRITONSERVER_Error* err = triton::server::HTTPHealthServer::Create(
+      readiness_cache, g_triton_params.http_health_port_,
+      g_triton_params.http_address_, service);
+  if (err == nullptr) {
+    err = (*service)->Start();
+  }
+  if (err != nullptr) {
+    service->reset();
+  }
+
+  return err;
+}
 #endif  // TRITON_ENABLE_HTTP
 
 #ifdef TRITON_ENABLE_METRICS
@@ -160,7 +190,11 @@ StartMetricsService(
 {
   TRITONSERVER_Error* err = triton::server::HTTPMetricsServer::Create(
       server, g_triton_params.metrics_port_, g_triton_params.metrics_address_,
-      1 /* HTTP thread count */, service);
+      1 /* HTTP thread count */,
+      g_triton_params.metrics_response_cache_
+          ? static_cast<uint64_t>(g_triton_params.metrics_interval_ms_)
+          : 0,
+      service);
   if (err == nullptr) {
     err = (*service)->Start();
   }
@@ -183,7 +217,9 @@ StartSagemakerService(
   TRITONSERVER_Error* err = triton::server::SagemakerAPIServer::Create(
       server, trace_manager, shm_manager, g_triton_params.sagemaker_port_,
       g_triton_params.sagemaker_address_, g_triton_params.sagemaker_thread_cnt_,
-      service);
+      g_triton_params.sagemaker_mme_host_memory_budget_,
+      g_triton_params.sagemaker_mme_gpu_memory_budget_,
+      g_triton_params.sagemaker_coalesce_delay_us_, service);
   if (err == nullptr) {
     err = (*service)->Start();
   }
@@ -207,7 +243,8 @@ StartVertexAiService(
   TRITONSERVER_Error* err = triton::server::VertexAiAPIServer::Create(
       server, trace_manager, shm_manager, g_triton_params.vertex_ai_port_,
       g_triton_params.vertex_ai_address_, g_triton_params.vertex_ai_thread_cnt_,
-      g_triton_params.vertex_ai_default_model_, service);
+      g_triton_params.vertex_ai_default_model_,
+      g_triton_params.vertex_ai_coalesce_delay_us_, service);
   if (err == nullptr) {
     err = (*service)->Start();
   }
@@ -224,7 +261,10 @@ bool
 StartEndpoints(
     const std::shared_ptr<TRITONSERVER_Server>& server,
     triton::server::TraceManager* trace_manager,
-    const std::shared_ptr<triton::server::SharedMemoryManager>& shm_manager)
+    const std::shared_ptr<triton::server::SharedMemoryManager>& shm_manager,
+    const std::shared_ptr<triton::server::AdmissionController>&
+        admission_controller,
+    const std::shared_ptr<triton::server::ReadinessCache>& readiness_cache)
 {
 #ifdef _WIN32
   WSADATA wsaData;
@@ -239,8 +279,9 @@ StartEndpoints(
 #ifdef TRITON_ENABLE_GRPC
   // Enable GRPC endpoints if requested...
   if (g_triton_params.allow_grpc_) {
-    TRITONSERVER_Error* err =
-        StartGrpcService(&g_grpc_service, server, trace_manager, shm_manager);
+    TRITONSERVER_Error* err = StartGrpcService(
+        &g_grpc_service, server, trace_manager, shm_manager,
+        admission_controller);
     if (err != nullptr) {
       LOG_TRITONSERVER_ERROR(err, "failed to start GRPC service");
       return false;
@@ -251,13 +292,24 @@ StartEndpoints(
 #ifdef TRITON_ENABLE_HTTP
   // Enable HTTP endpoints if requested...
   if (g_triton_params.allow_http_) {
-    TRITONSERVER_Error* err =
-        StartHttpService(&g_http_service, server, trace_manager, shm_manager);
+    TRITONSERVER_Error* err = StartHttpService(
+        &g_http_service, server, trace_manager, shm_manager,
+        admission_controller);
     if (err != nullptr) {
       LOG_TRITONSERVER_ERROR(err, "failed to start HTTP service");
       return false;
     }
   }
+
+  // Enable the dedicated health probe listener if requested...
+  if (readiness_cache) {
+    TRITONSERVER_Error* err =
+        StartHealthService(&g_health_service, readiness_cache);
+    if (err != nullptr) {
+      LOG_TRITONSERVER_ERROR(err, "failed to start Health service");
+      return false;
+    }
+  }
 #endif  // TRITON_ENABLE_HTTP
 
 
@@ -327,6 +379,18 @@ StopEndpoints()
   // TODO: Add support for 'exit_timeout_secs' to the endpoints below and move
   // them to the 'StopEndpoints(uint32_t* exit_timeout_secs)' function above.
 
+#ifdef TRITON_ENABLE_HTTP
+  if (g_health_service) {
+    TRITONSERVER_Error* err = g_health_service->Stop();
+    if (err != nullptr) {
+      LOG_TRITONSERVER_ERROR(err, "failed to stop Health service");
+      ret = false;
+    }
+
+    g_health_service.reset();
+  }
+#endif  // TRITON_ENABLE_HTTP
+
 #ifdef TRITON_ENABLE_GRPC
   if (g_grpc_service) {
     TRITONSERVER_Error* err = g_grpc_service->Stop();
@@ -496,8 +560,61 @@ main(int argc, char** argv)
     exit(1);
   }
 
+  // Admission control shared by the HTTP and GRPC endpoints, if configured.
+  std::shared_ptr<triton::server::AdmissionController> admission_controller;
+  if (g_triton_params.admission_control_options_.Enabled()) {
+    FAIL_IF_ERR(
+        triton::server::AdmissionController::Create(
+            g_triton_params.admission_control_options_, &admission_controller),
+        "creating admission controller");
+  }
+
+  // Readiness cached for the dedicated health probe listener, if
+  // configured. Refreshed when the model states are changed below.
+  std::shared_ptr<triton::server::ReadinessCache> readiness_cache;
+  std::function<void()> notify_readiness;
+#ifdef TRITON_ENABLE_HTTP
+  if (g_triton_params.http_health_port_ >= 0) {
+    FAIL_IF_ERR(
+        triton::server::ReadinessCache::Create(
+            server, g_triton_params.http_health_refresh_ms_, &readiness_cache),
+        "creating readiness cache");
+    notify_readiness = [readiness_cache] { readiness_cache->Notify(); };
+  }
+#endif  // TRITON_ENABLE_HTTP
+
+  // Watch the model repository for changes instead of polling it, if
+  // requested.
+  std::unique_ptr<triton::server::RepositoryWatcher> repository_watcher;
+  if (g_triton_params.repository_watch_) {
+    FAIL_IF_ERR(
+        triton::server::RepositoryWatcher::Create(
+            server, g_triton_params.model_repository_paths_,
+            g_triton_params.repository_watch_debounce_ms_, notify_readiness,
+            &repository_watcher),
+        "watching model repository");
+  }
+
+  // Load the startup models in a planned order, if requested. The
+  // server is reported not ready until the plan completes, so the
+  // endpoints started below report readiness per model as the loads
+  // complete.
+  std::unique_ptr<triton::server::ModelLoadPlanner> model_load_planner;
+  if (g_triton_params.model_load_planner_) {
+    FAIL_IF_ERR(
+        triton::server::ModelLoadPlanner::Create(
+            server, g_triton_params.model_repository_paths_,
+            g_triton_params.planned_models_, g_triton_params.model_config_name_,
+            g_triton_params.model_load_thread_count_,
+            g_triton_params.model_load_timeline_, notify_readiness,
+            &model_load_planner),
+        "planning model loads");
+  }
+
   // Start the HTTP, GRPC, and metrics endpoints.
-  if (!StartEndpoints(server, trace_manager, shm_manager)) {
+  if (!StartEndpoints(
+          server, trace_manager, shm_manager, admission_controller,
+          readiness_cache)) {
     exit(1);
   }
 
@@ -509,6 +626,9 @@ main(int argc, char** argv)
       LOG_TRITONSERVER_ERROR(
           TRITONSERVER_ServerPollModelRepository(server_ptr),
           "failed to poll model repository");
+      if (readiness_cache) {
+        readiness_cache->Notify();
+      }
     }
 
     // Wait for the polling interval (or a long time if polling is not
@@ -521,6 +641,11 @@ main(int argc, char** argv)
     triton::server::signal_exit_cv_.wait_for(lock, wait_timeout);
   }
 
+  // Stop loading startup models and stop loading and unloading models on
+  // repository changes.
+  model_load_planner.reset();
+  repository_watcher.reset();
+
   // Stop the HTTP[, gRPC, and metrics] endpoints, and update exit timeout.
   uint32_t exit_timeout_secs = g_triton_params.exit_timeout_secs_;
   StopEndpoints(&exit_timeout_secs);
@@ -536,8 +661,10 @@ main(int argc, char** argv)
     exit(1);
   }
 
-  // Stop gRPC and metrics endpoints that do not yet support exit timeout.
+  // Stop gRPC, metrics and health endpoints that do not yet support exit
+  // timeout.
   StopEndpoints();
+  readiness_cache.reset();
 
   // Stop tracing.
   StopTracing(&trace_manager);
@@ -0,0 +1,375 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+#include "model_load_planner.h"
+
+#include <algorithm>
+#include <chrono>
+#include <filesystem>
+#include <fstream>
+#include <map>
+#include <regex>
+#include <sstream>
+
+#include "common.h"
+#include "triton/common/logging.h"
+
+#define TRITONJSON_STATUSTYPE TRITONSERVER_Error*
+#define TRITONJSON_STATUSRETURN(M) \
+  return TRITONSERVER_ErrorNew(TRITONSERVER_ERROR_INTERNAL, (M).c_str())
+#define TRITONJSON_STATUSSUCCESS nullptr
+#include "triton/common/triton_json.h"
+
+namespace triton { namespace server {
+
+namespace {
+
+uint64_t
+SteadyNowNs()
+{
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+uint64_t
+DirectoryByteSize(const std::filesystem::path& path)
+{
+  uint64_t byte_size = 0;
+  std::error_code ec;
+  for (std::filesystem::recursive_directory_iterator
+           it(path,
+              std::filesystem::directory_options::follow_directory_symlink, ec),
+       end;
+       !ec && (it != end); it.increment(ec)) {
+    if (it->is_regular_file(ec)) {
+      byte_size += it->file_size(ec);
+    }
+  }
+  return byte_size;
+}
+
+// Return the names of the models used by the steps of the ensemble
+// configured in 'config_path', empty if it is not an ensemble. The
+// configuration is only scanned for the step model names, a model that
+// fails to parse fails when it is loaded.
+std::set<std::string>
+EnsembleSteps(const std::filesystem::path& config_path)
+{
+  std::set<std::string> steps;
+  std::ifstream in(config_path);
+  if (!in) {
+    return steps;
+  }
+  std::stringstream ss;
+  ss << in.rdbuf();
+  const std::string config = ss.str();
+
+  const size_t scheduling_pos = config.find("ensemble_scheduling");
+  if (scheduling_pos == std::string::npos) {
+    return steps;
+  }
+  static const std::regex kStepModel("model_name\\s*:\\s*\"([^\"]+)\"");
+  for (std::sregex_iterator
+           it(config.begin() + scheduling_pos, config.end(), kStepModel),
+       end;
+       it != end; ++it) {
+    steps.insert((*it)[1].str());
+  }
+  return steps;
+}
+
+}  // namespace
+
+TRITONSERVER_Error*
+ModelLoadPlanner::Create(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    const std::set<std::string>& repository_paths,
+    const std::set<std::string>& models, const std::string& config_name,
+    const uint32_t thread_count, const std::string& timeline_path,
+    const std::function<void()>& on_change,
+    std::unique_ptr<ModelLoadPlanner>* planner)
+{
+  // Each directory in a repository is a model, the first repository
+  // holding a model name wins
+  std::map<std::string, std::filesystem::path> model_paths;
+  for (const auto& repository_path : repository_paths) {
+    std::error_code ec;
+    for (std::filesystem::directory_iterator it(repository_path, ec), end;
+         !ec && (it != end); it.increment(ec)) {
+      if (it->is_directory(ec)) {
+        model_paths.emplace(it->path().filename().string(), it->path());
+      }
+    }
+  }
+
+  // The requested models and, for ensembles, the models of their steps
+  std::vector<std::string> names;
+  std::map<std::string, std::set<std::string>> steps;
+  if (models.find("*") != models.end()) {
+    for (const auto& pr : model_paths) {
+      names.push_back(pr.first);
+    }
+  } else {
+    names.assign(models.begin(), models.end());
+  }
+  std::set<std::string> planned(names.begin(), names.end());
+  for (size_t i = 0; i < names.size(); ++i) {
+    auto it = model_paths.find(names[i]);
+    if (it == model_paths.end()) {
+      // Not in a repository, loading it reports the error
+      continue;
+    }
+    std::filesystem::path config_path = it->second / "config.pbtxt";
+    if (!config_name.empty()) {
+      const auto custom_path =
+          it->second / "configs" / (config_name + ".pbtxt");
+      std::error_code ec;
+      if (std::filesystem::exists(custom_path, ec)) {
+        config_path = custom_path;
+      }
+    }
+    steps[names[i]] = EnsembleSteps(config_path);
+    for (const auto& step : steps[names[i]]) {
+      if ((model_paths.find(step) != model_paths.end()) &&
+          planned.insert(step).second) {
+        names.push_back(step);
+      }
+    }
+  }
+
+  std::map<std::string, size_t> indices;
+  for (size_t i = 0; i < names.size(); ++i) {
+    indices[names[i]] = i;
+  }
+  std::vector<Model> plan(names.size());
+  for (size_t i = 0; i < names.size(); ++i) {
+    plan[i].name_ = names[i];
+    auto it = model_paths.find(names[i]);
+    if (it != model_paths.end()) {
+      plan[i].path_ = it->second.string();
+      plan[i].byte_size_ = DirectoryByteSize(it->second);
+    }
+    for (const auto& step : steps[names[i]]) {
+      auto sit = indices.find(step);
+      if (sit != indices.end()) {
+        plan[i].dependencies_.push_back(sit->second);
+      }
+    }
+  }
+
+  LOG_INFO << "Planned loading of " << plan.size() << " models with "
+           << thread_count << " threads";
+
+  planner->reset(new ModelLoadPlanner(
+      server, std::move(plan), std::max(thread_count, 1u), timeline_path,
+      on_change));
+  return nullptr;  // success
+}
+
+std::atomic<size_t> ModelLoadPlanner::loading_count_(0);
+
+bool
+ModelLoadPlanner::Loading()
+{
+  return loading_count_.load() > 0;
+}
+
+int
+ModelLoadPlanner::NextModel(const std::vector<Model>& models)
+{
+  int next = -1;
+  int next_blocked = -1;
+  bool loading = false;
+  for (size_t i = 0; i < models.size(); ++i) {
+    const Model& model = models[i];
+    if (model.started_) {
+      loading |= !model.finished_;
+      continue;
+    }
+    bool runnable = true;
+    for (const size_t dependency : model.dependencies_) {
+      runnable &= models[dependency].finished_;
+    }
+    int& candidate = runnable ? next : next_blocked;
+    if ((candidate < 0) || (model.byte_size_ > models[candidate].byte_size_)) {
+      candidate = i;
+    }
+  }
+
+  // If nothing can be loaded and nothing is loading the remaining
+  // models depend on each other, load the largest and let the server
+  // report the cycle
+  if ((next < 0) && !loading) {
+    next = next_blocked;
+  }
+  return next;
+}
+
+ModelLoadPlanner::ModelLoadPlanner(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    std::vector<Model>&& models, const uint32_t thread_count,
+    const std::string& timeline_path, const std::function<void()>& on_change)
+    : server_(server), thread_count_(thread_count),
+      timeline_path_(timeline_path), on_change_(on_change),
+      start_ns_(SteadyNowNs()), models_(std::move(models)), started_count_(0),
+      finished_count_(0), stopping_(false)
+{
+  if (!models_.empty()) {
+    ++loading_count_;
+  }
+  for (uint32_t i = 0; i < thread_count_; ++i) {
+    workers_.emplace_back(&ModelLoadPlanner::Worker, this);
+  }
+}
+
+ModelLoadPlanner::~ModelLoadPlanner()
+{
+  {
+    std::lock_guard<std::mutex> lock(mu_);
+    stopping_ = true;
+  }
+  cv_.notify_all();
+  for (auto& worker : workers_) {
+    worker.join();
+  }
+}
+
+uint64_t
+ModelLoadPlanner::ElapsedMs() const
+{
+  return (SteadyNowNs() - start_ns_) / 1000000;
+}
+
+void
+ModelLoadPlanner::Worker()
+{
+  std::unique_lock<std::mutex> lock(mu_);
+  while (!stopping_ && (started_count_ < models_.size())) {
+    const int next = NextModel(models_);
+    if (next < 0) {
+      cv_.wait(lock);
+      continue;
+    }
+
+    Model& model = models_[next];
+    model.started_ = true;
+    model.start_ms_ = ElapsedMs();
+    ++started_count_;
+    const std::string name = model.name_;
+    LOG_VERBOSE(1) << "Loading '" << name << "', " << model.byte_size_
+                   << " bytes";
+
+    lock.unlock();
+    TRITONSERVER_Error* err =
+        TRITONSERVER_ServerLoadModel(server_.get(), name.c_str());
+    lock.lock();
+
+    model.finished_ = true;
+    model.end_ms_ = ElapsedMs();
+    if (err != nullptr) {
+      model.error_ = TRITONSERVER_ErrorMessage(err);
+      LOG_ERROR << "failed to load '" << name << "': " << model.error_;
+      TRITONSERVER_ErrorDelete(err);
+    }
+    if (++finished_count_ == models_.size()) {
+      LOG_INFO << "Loaded " << models_.size() << " models in " << ElapsedMs()
+               << " ms";
+      if (!timeline_path_.empty()) {
+        LOG_TRITONSERVER_ERROR(
+            WriteTimeline(), "failed to write model load timeline");
+      }
+      --loading_count_;
+    }
+    cv_.notify_all();
+
+    // Notify after the plan state is updated so that the server readiness
+    // is observed once the last load completes
+    if (on_change_) {
+      lock.unlock();
+      on_change_();
+      lock.lock();
+    }
+  }
+}
+
+TRITONSERVER_Error*
+ModelLoadPlanner::WriteTimeline()
+{
+  triton::common::TritonJson::Value timeline(
+      triton::common::TritonJson::ValueType::OBJECT);
+  RETURN_IF_ERR(timeline.AddUInt("thread_count", thread_count_));
+  RETURN_IF_ERR(timeline.AddUInt("total_ms", ElapsedMs()));
+
+  std::vector<const Model*> by_start;
+  for (const auto& model : models_) {
+    by_start.push_back(&model);
+  }
+  std::stable_sort(
+      by_start.begin(), by_start.end(), [](const Model* a, const Model* b) {
+        return a->start_ms_ < b->start_ms_;
+      });
+
+  triton::common::TritonJson::Value models_json(
+      timeline, triton::common::TritonJson::ValueType::ARRAY);
+  for (const Model* model : by_start) {
+    triton::common::TritonJson::Value model_json(
+        models_json, triton::common::TritonJson::ValueType::OBJECT);
+    RETURN_IF_ERR(model_json.AddString("name", model->name_));
+    RETURN_IF_ERR(model_json.AddUInt("byte_size", model->byte_size_));
+    triton::common::TritonJson::Value dependencies_json(
+        model_json, triton::common::TritonJson::ValueType::ARRAY);
+    for (const size_t dependency : model->dependencies_) {
+      RETURN_IF_ERR(dependencies_json.AppendString(models_[dependency].name_));
+    }
+    RETURN_IF_ERR(model_json.Add("dependencies", std::move(dependencies_json)));
+    RETURN_IF_ERR(model_json.AddUInt("start_ms", model->start_ms_));
+    RETURN_IF_ERR(model_json.AddUInt("end_ms", model->end_ms_));
+    if (model->error_.empty()) {
+      RETURN_IF_ERR(model_json.AddString("state", "READY"));
+    } else {
+      RETURN_IF_ERR(model_json.AddString("state", "UNAVAILABLE"));
+      RETURN_IF_ERR(model_json.AddString("error", model->error_));
+    }
+    RETURN_IF_ERR(models_json.Append(std::move(model_json)));
+  }
+  RETURN_IF_ERR(timeline.Add("models", std::move(models_json)));
+
+  triton::common::TritonJson::WriteBuffer buffer;
+  RETURN_IF_ERR(timeline.PrettyWrite(&buffer));
+  std::ofstream out(timeline_path_);
+  out << buffer.Contents();
+  if (!out) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INTERNAL,
+        ("failed to write model load timeline to '" + timeline_path_ + "'")
+            .c_str());
+  }
+
+  return nullptr;  // success
+}
+
+}}  // namespace triton::server
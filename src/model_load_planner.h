@@ -0,0 +1,131 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#pragma once
+
+#include <atomic>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <set>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "triton/core/tritonserver.h"
+
+namespace triton { namespace server {
+
+//
+// ModelLoadPlanner
+//
+// Loads the startup models through the model control API in a planned
+// order instead of leaving the order to the server. The planner reads
+// the model directories and configurations in the repositories, and
+// loads a model only once the models it depends on, the steps of an
+// ensemble, are loaded. Among the models that can be loaded it picks
+// the largest first, so that large models do not start loading last
+// and hold up the end of startup. Each model is ready as soon as its
+// own load completes, while the server is reported not ready until all
+// planned loads complete. The start and end of every load is recorded
+// and can be written out as a JSON timeline.
+//
+class ModelLoadPlanner {
+ public:
+  struct Model {
+    std::string name_;
+    std::string path_;
+    // Total byte size of the files in the model directory
+    uint64_t byte_size_{0};
+    // Index of the models in the plan that must be loaded before this one
+    std::vector<size_t> dependencies_;
+
+    // Load timeline, in milliseconds since the start of the plan
+    bool started_{false};
+    bool finished_{false};
+    uint64_t start_ms_{0};
+    uint64_t end_ms_{0};
+    std::string error_;
+  };
+
+  // Plan the loading of 'models', all the models in the repositories
+  // if it contains "*", and start loading with 'thread_count' threads.
+  // 'config_name' is the custom model configuration name, empty for
+  // 'config.pbtxt'. The timeline is written to 'timeline_path' once
+  // all loads complete, if not empty. 'on_change', if set, is called
+  // after each load.
+  static TRITONSERVER_Error* Create(
+      const std::shared_ptr<TRITONSERVER_Server>& server,
+      const std::set<std::string>& repository_paths,
+      const std::set<std::string>& models, const std::string& config_name,
+      const uint32_t thread_count, const std::string& timeline_path,
+      const std::function<void()>& on_change,
+      std::unique_ptr<ModelLoadPlanner>* planner);
+
+  // Return the index of the next model to load, -1 if no model can be
+  // loaded until a load in progress completes. Exposed for testing.
+  static int NextModel(const std::vector<Model>& models);
+
+  // Return true if a plan has not completed all of its loads. The server
+  // readiness endpoints report not ready while this is true.
+  static bool Loading();
+
+  // Stop starting new loads and wait for the loads in progress. A plan
+  // stopped before it completes leaves the server not ready.
+  ~ModelLoadPlanner();
+
+ private:
+  ModelLoadPlanner(
+      const std::shared_ptr<TRITONSERVER_Server>& server,
+      std::vector<Model>&& models, const uint32_t thread_count,
+      const std::string& timeline_path, const std::function<void()>& on_change);
+
+  void Worker();
+  TRITONSERVER_Error* WriteTimeline();
+
+  // Milliseconds since the start of the plan
+  uint64_t ElapsedMs() const;
+
+  std::shared_ptr<TRITONSERVER_Server> server_;
+  const uint32_t thread_count_;
+  const std::string timeline_path_;
+  const std::function<void()> on_change_;
+  const uint64_t start_ns_;
+
+  std::mutex mu_;
+  std::condition_variable cv_;
+  std::vector<Model> models_;
+  size_t started_count_;
+  size_t finished_count_;
+  bool stopping_;
+  std::vector<std::thread> workers_;
+
+  // Number of plans that have not completed all of their loads
+  static std::atomic<size_t> loading_count_;
+};
+
+}}  // namespace triton::server
@@ -0,0 +1,209 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+#include "readiness_cache.h"
+
+#include <algorithm>
+#include <chrono>
+#include <cstdlib>
+
+#include "common.h"
+#include "model_load_planner.h"
+#include "triton/common/logging.h"
+
+#define TRITONJSON_STATUSTYPE TRITONSERVER_Error*
+#define TRITONJSON_STATUSRETURN(M) \
+  return TRITONSERVER_ErrorNew(TRITONSERVER_ERROR_INTERNAL, (M).c_str())
+#define TRITONJSON_STATUSSUCCESS nullptr
+#include "triton/common/triton_json.h"
+
+namespace triton { namespace server {
+
+namespace {
+
+// Number of refresh intervals without a successful refresh after which
+// the cached state is stale
+constexpr uint64_t kStaleRefreshIntervals = 3;
+
+uint64_t
+SteadyNowNs()
+{
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+}  // namespace
+
+TRITONSERVER_Error*
+ReadinessCache::Create(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    const uint64_t refresh_ms, std::shared_ptr<ReadinessCache>* cache)
+{
+  std::shared_ptr<ReadinessCache> lcache(
+      new ReadinessCache(server, std::max<uint64_t>(refresh_ms, 1)));
+  RETURN_IF_ERR(lcache->Refresh());
+  lcache->worker_ = std::thread(&ReadinessCache::Run, lcache.get());
+  *cache = std::move(lcache);
+  return nullptr;  // success
+}
+
+ReadinessCache::ReadinessCache(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    const uint64_t refresh_ms)
+    : server_(server), refresh_ms_(refresh_ms),
+      state_(std::make_shared<const State>())
+{
+}
+
+ReadinessCache::~ReadinessCache()
+{
+  {
+    std::lock_guard<std::mutex> lock(mu_);
+    stopping_ = true;
+  }
+  cv_.notify_all();
+  if (worker_.joinable()) {
+    worker_.join();
+  }
+}
+
+std::shared_ptr<const ReadinessCache::State>
+ReadinessCache::FreshState() const
+{
+  std::shared_ptr<const State> state;
+  {
+    std::lock_guard<std::mutex> lock(state_mu_);
+    state = state_;
+  }
+  const uint64_t stale_ns = kStaleRefreshIntervals * refresh_ms_ * 1000000;
+  if (SteadyNowNs() - state->refresh_ns_ > stale_ns) {
+    return nullptr;
+  }
+  return state;
+}
+
+bool
+ReadinessCache::ServerLive() const
+{
+  auto state = FreshState();
+  return (state != nullptr) && state->live_;
+}
+
+bool
+ReadinessCache::ServerReady() const
+{
+  // The plan is checked on every probe, a plan started after the last
+  // refresh must not leave the cached readiness of an empty server
+  auto state = FreshState();
+  return (state != nullptr) && state->ready_ && !ModelLoadPlanner::Loading();
+}
+
+bool
+ReadinessCache::ModelReady(
+    const std::string& model_name, const int64_t model_version) const
+{
+  auto state = FreshState();
+  if (state == nullptr) {
+    return false;
+  }
+  if (model_version < 0) {
+    return state->models_.find(model_name) != state->models_.end();
+  }
+  return state->versions_.find(std::make_pair(model_name, model_version)) !=
+         state->versions_.end();
+}
+
+void
+ReadinessCache::Notify()
+{
+  {
+    std::lock_guard<std::mutex> lock(mu_);
+    notified_ = true;
+  }
+  cv_.notify_all();
+}
+
+TRITONSERVER_Error*
+ReadinessCache::Refresh()
+{
+  auto state = std::make_shared<State>();
+  state->refresh_ns_ = SteadyNowNs();
+  RETURN_IF_ERR(TRITONSERVER_ServerIsLive(server_.get(), &state->live_));
+  RETURN_IF_ERR(TRITONSERVER_ServerIsReady(server_.get(), &state->ready_));
+
+  TRITONSERVER_Message* message = nullptr;
+  RETURN_IF_ERR(TRITONSERVER_ServerModelIndex(
+      server_.get(), TRITONSERVER_INDEX_FLAG_READY, &message));
+  const char* buffer;
+  size_t byte_size;
+  triton::common::TritonJson::Value index;
+  TRITONSERVER_Error* err =
+      TRITONSERVER_MessageSerializeToJson(message, &buffer, &byte_size);
+  if (err == nullptr) {
+    err = index.Parse(buffer, byte_size);
+  }
+  TRITONSERVER_MessageDelete(message);
+  RETURN_IF_ERR(err);
+
+  for (size_t i = 0; i < index.ArraySize(); ++i) {
+    triton::common::TritonJson::Value model;
+    RETURN_IF_ERR(index.IndexAsObject(i, &model));
+    std::string name, version, model_state;
+    RETURN_IF_ERR(model.MemberAsString("name", &name));
+    RETURN_IF_ERR(model.MemberAsString("version", &version));
+    RETURN_IF_ERR(model.MemberAsString("state", &model_state));
+    if (model_state != "READY") {
+      continue;
+    }
+    state->models_.insert(name);
+    state->versions_.emplace(name, std::strtoll(version.c_str(), nullptr, 10));
+  }
+
+  std::lock_guard<std::mutex> lock(state_mu_);
+  state_ = std::move(state);
+  return nullptr;  // success
+}
+
+void
+ReadinessCache::Run()
+{
+  std::unique_lock<std::mutex> lock(mu_);
+  while (!stopping_) {
+    cv_.wait_for(lock, std::chrono::milliseconds(refresh_ms_), [this] {
+      return notified_ || stopping_;
+    });
+    if (stopping_) {
+      break;
+    }
+    notified_ = false;
+    lock.unlock();
+    LOG_TRITONSERVER_ERROR(Refresh(), "failed to refresh readiness cache");
+    lock.lock();
+  }
+}
+
+}}  // namespace triton::server
@@ -0,0 +1,114 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#pragma once
+
+#include <condition_variable>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <set>
+#include <string>
+#include <thread>
+#include <utility>
+
+#include "triton/core/tritonserver.h"
+
+namespace triton { namespace server {
+
+/// The liveness and readiness of the server and of each model version,
+/// cached so that health probes are answered without calling into the
+/// server. The cache is refreshed in the background every refresh
+/// interval and as soon as Notify() reports a change in model states.
+/// If no refresh succeeds for several refresh intervals the cached state
+/// is stale, and the server and models are reported not live and not
+/// ready until a refresh succeeds again.
+class ReadinessCache {
+ public:
+  /// Create a readiness cache. The cache is refreshed before returning.
+  /// \param server The server to cache the readiness of.
+  /// \param refresh_ms The longest time, in milliseconds, between two
+  /// refreshes of the cache.
+  /// \param cache Returns the readiness cache.
+  /// \return a TRITONSERVER_Error indicating success or failure.
+  static TRITONSERVER_Error* Create(
+      const std::shared_ptr<TRITONSERVER_Server>& server,
+      const uint64_t refresh_ms, std::shared_ptr<ReadinessCache>* cache);
+
+  ~ReadinessCache();
+
+  /// \return true if the server is live.
+  bool ServerLive() const;
+
+  /// \return true if the server is ready and no startup load plan is
+  /// still loading models.
+  bool ServerReady() const;
+
+  /// \param model_name The name of the model.
+  /// \param model_version The version of the model, -1 for any version.
+  /// \return true if the model version is ready.
+  bool ModelReady(
+      const std::string& model_name, const int64_t model_version) const;
+
+  /// Report that model states may have changed, the cache is refreshed
+  /// without waiting for the refresh interval.
+  void Notify();
+
+ private:
+  struct State {
+    // Steady clock time of the refresh, in nanoseconds
+    uint64_t refresh_ns_{0};
+    bool live_{false};
+    bool ready_{false};
+    // Names of the models with a ready version, and the ready versions
+    std::set<std::string> models_;
+    std::set<std::pair<std::string, int64_t>> versions_;
+  };
+
+  ReadinessCache(
+      const std::shared_ptr<TRITONSERVER_Server>& server,
+      const uint64_t refresh_ms);
+  TRITONSERVER_Error* Refresh();
+  void Run();
+
+  // Return the latest state, nullptr if it is stale.
+  std::shared_ptr<const State> FreshState() const;
+
+  std::shared_ptr<TRITONSERVER_Server> server_;
+  const uint64_t refresh_ms_;
+
+  // The latest state, replaced as a whole on refresh so that readers
+  // only hold 'state_mu_' to copy the pointer.
+  mutable std::mutex state_mu_;
+  std::shared_ptr<const State> state_;
+
+  std::mutex mu_;
+  std::condition_variable cv_;
+  bool notified_{false};
+  bool stopping_{false};
+  std::thread worker_;
+};
+
+}}  // namespace triton::server
@@ -0,0 +1,443 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+#include "repository_watcher.h"
+
+#ifdef __linux__
+#include <dirent.h>
+#include <poll.h>
+#include <sys/eventfd.h>
+#include <sys/inotify.h>
+#include <sys/stat.h>
+#include <sys/vfs.h>
+#include <unistd.h>
+
+#include <cerrno>
+#include <chrono>
+#include <cstring>
+#endif  // __linux__
+
+#include "common.h"
+#include "triton/common/logging.h"
+
+#define TRITONJSON_STATUSTYPE TRITONSERVER_Error*
+#define TRITONJSON_STATUSRETURN(M) \
+  return TRITONSERVER_ErrorNew(TRITONSERVER_ERROR_INTERNAL, (M).c_str())
+#define TRITONJSON_STATUSSUCCESS nullptr
+#include "triton/common/triton_json.h"
+
+namespace triton { namespace server {
+
+#ifdef __linux__
+
+namespace {
+
+uint64_t
+SteadyNowMs()
+{
+  return std::chrono::duration_cast<std::chrono::milliseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+bool
+IsDirectory(const std::string& path)
+{
+  struct stat st;
+  return (stat(path.c_str(), &st) == 0) && S_ISDIR(st.st_mode);
+}
+
+// Call 'fn' with the name of each sub-directory of 'path'.
+template <typename F>
+void
+ForEachSubdirectory(const std::string& path, F fn)
+{
+  DIR* dir = opendir(path.c_str());
+  if (dir == nullptr) {
+    return;
+  }
+  struct dirent* ent;
+  while ((ent = readdir(dir)) != nullptr) {
+    if ((strcmp(ent->d_name, ".") == 0) || (strcmp(ent->d_name, "..") == 0)) {
+      continue;
+    }
+    // Symbolic links and filesystems not reporting the type need a stat
+    if ((ent->d_type == DT_DIR) ||
+        (((ent->d_type == DT_LNK) || (ent->d_type == DT_UNKNOWN)) &&
+         IsDirectory(path + "/" + ent->d_name))) {
+      fn(std::string(ent->d_name));
+    }
+  }
+  closedir(dir);
+}
+
+// Changes to a directory that can affect the model it belongs to
+constexpr uint32_t kWatchMask = IN_CREATE | IN_DELETE | IN_CLOSE_WRITE |
+                                IN_MOVED_FROM | IN_MOVED_TO | IN_ATTRIB |
+                                IN_ONLYDIR;
+
+// Filesystems whose remote changes are not reported by inotify
+struct RemoteFilesystem {
+  uint32_t magic_;
+  const char* name_;
+};
+constexpr RemoteFilesystem kRemoteFilesystems[] = {
+    {0x6969, "NFS"},       {0x517B, "SMB"},       {0xFF534D42, "CIFS"},
+    {0xFE534D42, "SMB2"},  {0x65735546, "FUSE"},  {0x00C36400, "Ceph"},
+    {0x5346414F, "AFS"},   {0x47504653, "GPFS"},  {0x0BD00BD0, "Lustre"},
+    {0x013111A8, "IBRIX"}, {0x6B414653, "kAFS"},  {0x564C, "NCP"},
+    {0x73757245, "Coda"},  {0x19830326, "FhGFS"}, {0x1161970, "GFS2"}};
+
+}  // namespace
+
+bool
+RepositoryWatcher::Supported(
+    const std::set<std::string>& repository_paths, std::string* reason)
+{
+  for (const auto& path : repository_paths) {
+    for (const char* prefix : {"s3://", "gs://", "as://"}) {
+      if (path.rfind(prefix, 0) == 0) {
+        *reason = "'" + path + "' is a cloud storage path";
+        return false;
+      }
+    }
+    struct statfs st;
+    if (statfs(path.c_str(), &st) != 0) {
+      *reason = "unable to stat '" + path + "': " + strerror(errno);
+      return false;
+    }
+    for (const auto& fs : kRemoteFilesystems) {
+      if (static_cast<uint32_t>(st.f_type) == fs.magic_) {
+        *reason = "'" + path + "' is on a " + fs.name_ + " filesystem";
+        return false;
+      }
+    }
+  }
+  return true;
+}
+
+RepositoryWatcher::RepositoryWatcher(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    const std::set<std::string>& repository_paths, const uint64_t debounce_ms,
+    const std::function<void()>& on_change)
+    : server_(server), repository_paths_(repository_paths),
+      debounce_ms_(debounce_ms), on_change_(on_change), inotify_fd_(-1),
+      stop_fd_(-1)
+{
+}
+
+RepositoryWatcher::~RepositoryWatcher()
+{
+  if (worker_.joinable()) {
+    const uint64_t stop = 1;
+    if (write(stop_fd_, &stop, sizeof(stop)) != sizeof(stop)) {
+      LOG_ERROR << "failed to stop the model repository watcher: "
+                << strerror(errno);
+    }
+    worker_.join();
+  }
+  if (inotify_fd_ >= 0) {
+    close(inotify_fd_);
+  }
+  if (stop_fd_ >= 0) {
+    close(stop_fd_);
+  }
+}
+
+TRITONSERVER_Error*
+RepositoryWatcher::Create(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    const std::set<std::string>& repository_paths, const uint64_t debounce_ms,
+    const std::function<void()>& on_change,
+    std::unique_ptr<RepositoryWatcher>* watcher)
+{
+  std::unique_ptr<RepositoryWatcher> lwatcher(
+      new RepositoryWatcher(server, repository_paths, debounce_ms, on_change));
+
+  lwatcher->inotify_fd_ = inotify_init1(IN_NONBLOCK | IN_CLOEXEC);
+  lwatcher->stop_fd_ = eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC);
+  if ((lwatcher->inotify_fd_ < 0) || (lwatcher->stop_fd_ < 0)) {
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INTERNAL,
+        (std::string("failed to initialize inotify: ") + strerror(errno))
+            .c_str());
+  }
+
+  for (const auto& path : repository_paths) {
+    RETURN_IF_ERR(lwatcher->AddWatches(path, ""));
+  }
+  LOG_INFO << "Watching " << lwatcher->watches_.size()
+           << " model repository directories for changes";
+
+  lwatcher->worker_ = std::thread([w = lwatcher.get()] { w->Run(); });
+  *watcher = std::move(lwatcher);
+  return nullptr;  // success
+}
+
+TRITONSERVER_Error*
+RepositoryWatcher::AddWatches(
+    const std::string& path, const std::string& model_name)
+{
+  const int wd = inotify_add_watch(inotify_fd_, path.c_str(), kWatchMask);
+  if (wd < 0) {
+    std::string msg =
+        "failed to watch '" + path + "' for changes: " + strerror(errno);
+    if (errno == ENOSPC) {
+      msg += ", the 'fs.inotify.max_user_watches' limit may need to be raised";
+    }
+    return TRITONSERVER_ErrorNew(TRITONSERVER_ERROR_INTERNAL, msg.c_str());
+  }
+  watches_[wd] = std::make_pair(path, model_name);
+
+  // Each directory directly in a repository is a model, deeper
+  // directories belong to the model they are in
+  TRITONSERVER_Error* err = nullptr;
+  ForEachSubdirectory(path, [&](const std::string& name) {
+    if (err == nullptr) {
+      err =
+          AddWatches(path + "/" + name, model_name.empty() ? name : model_name);
+    }
+  });
+  return err;
+}
+
+void
+RepositoryWatcher::Run()
+{
+  while (true) {
+    // Wake up when the earliest pending change has been quiet for the
+    // debounce interval
+    int timeout_ms = -1;
+    if (!pending_.empty()) {
+      uint64_t earliest = UINT64_MAX;
+      for (const auto& pr : pending_) {
+        earliest = std::min(earliest, pr.second);
+      }
+      const uint64_t now = SteadyNowMs();
+      timeout_ms = (earliest + debounce_ms_ > now)
+                       ? static_cast<int>(earliest + debounce_ms_ - now)
+                       : 0;
+    }
+
+    struct pollfd fds[2];
+    fds[0].fd = inotify_fd_;
+    fds[0].events = POLLIN;
+    fds[1].fd = stop_fd_;
+    fds[1].events = POLLIN;
+    if (poll(fds, 2, timeout_ms) < 0) {
+      if (errno == EINTR) {
+        continue;
+      }
+      LOG_ERROR << "stopped watching the model repository: " << strerror(errno);
+      return;
+    }
+    if (fds[1].revents & POLLIN) {
+      return;
+    }
+    if (fds[0].revents & POLLIN) {
+      ReadEvents();
+    }
+    ApplyChanges();
+  }
+}
+
+void
+RepositoryWatcher::ReadEvents()
+{
+  alignas(struct inotify_event) char buf[64 * 1024];
+  while (true) {
+    const ssize_t len = read(inotify_fd_, buf, sizeof(buf));
+    if (len <= 0) {
+      // EAGAIN once all the events are read
+      return;
+    }
+
+    const uint64_t now = SteadyNowMs();
+    const struct inotify_event* event;
+    for (char* ptr = buf; ptr < buf + len;
+         ptr += sizeof(struct inotify_event) + event->len) {
+      event = reinterpret_cast<const struct inotify_event*>(ptr);
+
+      if (event->mask & IN_Q_OVERFLOW) {
+        LOG_WARNING << "model repository changes were dropped by the kernel, "
+                       "reloading all models";
+        Rescan();
+        continue;
+      }
+
+      auto it = watches_.find(event->wd);
+      if (it == watches_.end()) {
+        continue;
+      }
+      if (event->mask & IN_IGNORED) {
+        // The directory was removed
+        watches_.erase(it);
+        continue;
+      }
+
+      const std::string dir = it->second.first;
+      const std::string name = (event->len > 0) ? event->name : "";
+      std::string model_name = it->second.second;
+      if (model_name.empty()) {
+        // Only directories in a repository are models
+        if (((event->mask & IN_ISDIR) == 0) || name.empty()) {
+          continue;
+        }
+        model_name = name;
+      }
+
+      if (event->mask & IN_ISDIR) {
+        const std::string path = dir + "/" + name;
+        if (event->mask & (IN_CREATE | IN_MOVED_TO)) {
+          LOG_TRITONSERVER_ERROR(
+              AddWatches(path, model_name),
+              "failed to watch new model repository directory");
+        } else if (event->mask & IN_MOVED_FROM) {
+          // The watches follow the moved directory, drop them so that
+          // its changes are no longer attributed to this model
+          for (auto wit = watches_.begin(); wit != watches_.end();) {
+            const std::string& wpath = wit->second.first;
+            if ((wpath == path) || (wpath.rfind(path + "/", 0) == 0)) {
+              inotify_rm_watch(inotify_fd_, wit->first);
+              wit = watches_.erase(wit);
+            } else {
+              ++wit;
+            }
+          }
+        }
+      }
+
+      LOG_VERBOSE(1) << "model repository change in '" << dir << "/" << name
+                     << "' for model '" << model_name << "'";
+      pending_[model_name] = now;
+    }
+  }
+}
+
+void
+RepositoryWatcher::Rescan()
+{
+  const uint64_t now = SteadyNowMs();
+  for (const auto& path : repository_paths_) {
+    LOG_TRITONSERVER_ERROR(
+        AddWatches(path, ""), "failed to watch model repository");
+    ForEachSubdirectory(
+        path, [&](const std::string& name) { pending_[name] = now; });
+  }
+  // The models removed while events were dropped no longer have a
+  // directory to find them by
+  LOG_TRITONSERVER_ERROR(
+      QueueLoadedModels(now), "failed to list the loaded models");
+}
+
+TRITONSERVER_Error*
+RepositoryWatcher::QueueLoadedModels(const uint64_t now)
+{
+  TRITONSERVER_Message* message = nullptr;
+  RETURN_IF_ERR(TRITONSERVER_ServerModelIndex(
+      server_.get(), TRITONSERVER_INDEX_FLAG_READY, &message));
+  const char* buffer;
+  size_t byte_size;
+  triton::common::TritonJson::Value index;
+  TRITONSERVER_Error* err =
+      TRITONSERVER_MessageSerializeToJson(message, &buffer, &byte_size);
+  if (err == nullptr) {
+    err = index.Parse(buffer, byte_size);
+  }
+  TRITONSERVER_MessageDelete(message);
+  RETURN_IF_ERR(err);
+
+  for (size_t i = 0; i < index.ArraySize(); ++i) {
+    triton::common::TritonJson::Value model;
+    std::string name;
+    RETURN_IF_ERR(index.IndexAsObject(i, &model));
+    RETURN_IF_ERR(model.MemberAsString("name", &name));
+    pending_[name] = now;
+  }
+  return nullptr;  // success
+}
+
+void
+RepositoryWatcher::ApplyChanges()
+{
+  const uint64_t now = SteadyNowMs();
+  for (auto it = pending_.begin(); it != pending_.end();) {
+    if (now - it->second < debounce_ms_) {
+      ++it;
+      continue;
+    }
+    const std::string model_name = it->first;
+    it = pending_.erase(it);
+
+    bool exists = false;
+    for (const auto& path : repository_paths_) {
+      exists |= IsDirectory(path + "/" + model_name);
+    }
+    if (exists) {
+      LOG_INFO << "model repository changed, loading '" << model_name << "'";
+      LOG_TRITONSERVER_ERROR(
+          TRITONSERVER_ServerLoadModel(server_.get(), model_name.c_str()),
+          ("failed to load '" + model_name + "'").c_str());
+    } else {
+      LOG_INFO << "model removed from repository, unloading '" << model_name
+               << "'";
+      LOG_TRITONSERVER_ERROR(
+          TRITONSERVER_ServerUnloadModel(server_.get(), model_name.c_str()),
+          ("failed to unload '" + model_name + "'").c_str());
+    }
+    if (on_change_) {
+      on_change_();
+    }
+  }
+}
+
+#else
+
+bool
+RepositoryWatcher::Supported(
+    const std::set<std::string>& repository_paths, std::string* reason)
+{
+  *reason = "inotify is not available on this platform";
+  return false;
+}
+
+RepositoryWatcher::~RepositoryWatcher() {}
+
+TRITONSERVER_Error*
+RepositoryWatcher::Create(
+    const std::shared_ptr<TRITONSERVER_Server>& server,
+    const std::set<std::string>& repository_paths, const uint64_t debounce_ms,
+    const std::function<void()>& on_change,
+    std::unique_ptr<RepositoryWatcher>* watcher)
+{
+  return TRITONSERVER_ErrorNew(
+      TRITONSERVER_ERROR_UNSUPPORTED,
+      "model repository watching is not supported on this platform");
+}
+
+#endif  // __linux__
+
+}}  // namespace triton::server
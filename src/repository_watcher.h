@@ -0,0 +1,111 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#pragma once
+
+#include <cstdint>
+#include <functional>
+#include <map>
+#include <memory>
+#include <set>
+#include <string>
+#include <thread>
+#include <unordered_map>
+#include <utility>
+
+#include "triton/core/tritonserver.h"
+
+namespace triton { namespace server {
+
+//
+// RepositoryWatcher
+//
+// Watches local model repositories with inotify and loads, reloads or
+// unloads only the models whose directories changed, instead of
+// rescanning every model on a fixed interval. A burst of changes to a
+// model is acted on once, after the model directory has been quiet for
+// the debounce interval. The server must use explicit model control so
+// that models can be loaded and unloaded individually.
+//
+class RepositoryWatcher {
+ public:
+  // Return true if all 'repository_paths' can be watched. Otherwise
+  // return false and set 'reason', e.g. for cloud storage and network
+  // filesystems whose remote changes are not reported by inotify.
+  static bool Supported(
+      const std::set<std::string>& repository_paths, std::string* reason);
+
+  // Create a watcher for 'repository_paths' and start watching.
+  // 'on_change', if set, is called after each model load or unload.
+  static TRITONSERVER_Error* Create(
+      const std::shared_ptr<TRITONSERVER_Server>& server,
+      const std::set<std::string>& repository_paths, const uint64_t debounce_ms,
+      const std::function<void()>& on_change,
+      std::unique_ptr<RepositoryWatcher>* watcher);
+
+  ~RepositoryWatcher();
+
+ private:
+  RepositoryWatcher(
+      const std::shared_ptr<TRITONSERVER_Server>& server,
+      const std::set<std::string>& repository_paths, const uint64_t debounce_ms,
+      const std::function<void()>& on_change);
+
+  // Watch 'path' and, recursively, its sub-directories for changes to
+  // 'model_name'. An empty 'model_name' watches a repository directory.
+  TRITONSERVER_Error* AddWatches(
+      const std::string& path, const std::string& model_name);
+
+  void Run();
+  // Read the available events and record the models they change.
+  void ReadEvents();
+  // Mark every model in the repositories and every loaded model as
+  // changed, used when the kernel dropped events.
+  void Rescan();
+  // Mark the models loaded in the server as changed, so that the ones
+  // removed from the repositories are unloaded.
+  TRITONSERVER_Error* QueueLoadedModels(const uint64_t now);
+  // Load, reload or unload the models that have been quiet for the
+  // debounce interval.
+  void ApplyChanges();
+
+  std::shared_ptr<TRITONSERVER_Server> server_;
+  const std::set<std::string> repository_paths_;
+  const uint64_t debounce_ms_;
+  const std::function<void()> on_change_;
+
+  int inotify_fd_;
+  // Written to stop the watcher thread
+  int stop_fd_;
+  std::thread worker_;
+
+  // Watched directory and the model it belongs to for each watch
+  // descriptor. The model is empty for the repository directories.
+  std::unordered_map<int, std::pair<std::string, std::string>> watches_;
+  // Models with unapplied changes and the time of their last change
+  std::map<std::string, uint64_t> pending_;
+};
+
+}}  // namespace triton::server
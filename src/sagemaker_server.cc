@@ -25,6 +25,9 @@
 // OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #include "sagemaker_server.h"
 
+#include <algorithm>
+#include <chrono>
+
 namespace triton { namespace server {
 
 #define HTTP_RESPOND_IF_ERR(REQ, X)                   \
@@ -111,8 +114,215 @@ EVBufferToJson(
   return nullptr;  // success
 }
 
+uint64_t
+SteadyNowNs()
+{
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+// Total size of the regular files under 'path', used as the memory estimate
+// of a model that is not loaded yet.
+uint64_t
+DirectoryByteSize(const std::string& path)
+{
+  uint64_t byte_size = 0;
+  DIR* dir = opendir(path.c_str());
+  if (dir == nullptr) {
+    return byte_size;
+  }
+  struct dirent* ent;
+  while ((ent = readdir(dir)) != nullptr) {
+    if ((strcmp(ent->d_name, ".") == 0) || (strcmp(ent->d_name, "..") == 0)) {
+      continue;
+    }
+    const std::string entry_path = path + "/" + ent->d_name;
+    struct stat st;
+    if (stat(entry_path.c_str(), &st) != 0) {
+      continue;
+    }
+    if (S_ISDIR(st.st_mode)) {
+      byte_size += DirectoryByteSize(entry_path);
+    } else if (S_ISREG(st.st_mode)) {
+      byte_size += st.st_size;
+    }
+  }
+  closedir(dir);
+  return byte_size;
+}
+
 }  // namespace
 
+bool
+SageMakerResidencyManager::Fits(const Footprint& usage) const
+{
+  return ((host_memory_budget_ == 0) ||
+          (usage.host_bytes_ <= host_memory_budget_)) &&
+         ((gpu_memory_budget_ == 0) ||
+          (usage.gpu_bytes_ <= gpu_memory_budget_));
+}
+
+bool
+SageMakerResidencyManager::Reserve(
+    const std::string& model_name_hash, const std::string& target_model,
+    const Footprint& estimate, std::vector<Victim>* victims, bool* reserved)
+{
+  *reserved = false;
+  std::lock_guard<std::shared_mutex> lock(mu_);
+  if (models_.find(model_name_hash) != models_.end()) {
+    return true;
+  }
+
+  // Pick victims in least recently used order, loading models are not
+  // eligible as their memory is still being allocated and models with
+  // requests in flight are not eligible as they are in use
+  std::vector<std::pair<uint64_t, const std::string*>> lru;
+  for (const auto& model : models_) {
+    if (!model.second->loading_ && (model.second->in_flight_->load() == 0)) {
+      lru.emplace_back(model.second->last_use_ns_.load(), &model.first);
+    }
+  }
+  std::sort(lru.begin(), lru.end());
+
+  Footprint usage = usage_;
+  usage.host_bytes_ += estimate.host_bytes_;
+  usage.gpu_bytes_ += estimate.gpu_bytes_;
+  size_t victim_cnt = 0;
+  while (!Fits(usage) && (victim_cnt < lru.size())) {
+    const auto& footprint = models_.at(*lru[victim_cnt].second)->footprint_;
+    usage.host_bytes_ -= footprint.host_bytes_;
+    usage.gpu_bytes_ -= footprint.gpu_bytes_;
+    ++victim_cnt;
+  }
+  if (!Fits(usage)) {
+    return false;
+  }
+
+  for (size_t i = 0; i < victim_cnt; ++i) {
+    auto it = models_.find(*lru[i].second);
+    victims->emplace_back(
+        Victim{it->first, it->second->target_model_, it->second->footprint_});
+    models_.erase(it);
+  }
+  evictions_ += victim_cnt;
+  usage_ = usage;
+
+  std::unique_ptr<Entry> entry(new Entry(target_model, estimate));
+  entry->last_use_ns_ = SteadyNowNs();
+  models_.emplace(model_name_hash, std::move(entry));
+  *reserved = true;
+  return true;
+}
+
+void
+SageMakerResidencyManager::Restore(const Victim& victim)
+{
+  std::lock_guard<std::shared_mutex> lock(mu_);
+  if (models_.find(victim.model_name_hash_) != models_.end()) {
+    return;
+  }
+  // Never used since restored, so the model is the next eviction candidate
+  std::unique_ptr<Entry> entry(
+      new Entry(victim.target_model_, victim.footprint_));
+  entry->loading_ = false;
+  models_.emplace(victim.model_name_hash_, std::move(entry));
+  usage_.host_bytes_ += victim.footprint_.host_bytes_;
+  usage_.gpu_bytes_ += victim.footprint_.gpu_bytes_;
+  --evictions_;
+}
+
+void
+SageMakerResidencyManager::Commit(
+    const std::string& model_name_hash, const Footprint& footprint)
+{
+  std::lock_guard<std::shared_mutex> lock(mu_);
+  auto it = models_.find(model_name_hash);
+  if (it == models_.end()) {
+    return;
+  }
+  auto& entry = it->second;
+  usage_.host_bytes_ = usage_.host_bytes_ - entry->footprint_.host_bytes_ +
+                       footprint.host_bytes_;
+  usage_.gpu_bytes_ =
+      usage_.gpu_bytes_ - entry->footprint_.gpu_bytes_ + footprint.gpu_bytes_;
+  entry->footprint_ = footprint;
+  entry->loading_ = false;
+  entry->last_use_ns_ = SteadyNowNs();
+}
+
+void
+SageMakerResidencyManager::Release(const std::string& model_name_hash)
+{
+  std::lock_guard<std::shared_mutex> lock(mu_);
+  auto it = models_.find(model_name_hash);
+  if (it == models_.end()) {
+    return;
+  }
+  usage_.host_bytes_ -= it->second->footprint_.host_bytes_;
+  usage_.gpu_bytes_ -= it->second->footprint_.gpu_bytes_;
+  models_.erase(it);
+}
+
+std::shared_ptr<void>
+SageMakerResidencyManager::Use(const std::string& model_name_hash)
+{
+  std::shared_lock<std::shared_mutex> lock(mu_);
+  auto it = models_.find(model_name_hash);
+  if (it == models_.end()) {
+    return nullptr;
+  }
+  it->second->last_use_ns_ = SteadyNowNs();
+  it->second->use_count_++;
+  std::shared_ptr<std::atomic<uint64_t>> in_flight = it->second->in_flight_;
+  ++*in_flight;
+  return std::shared_ptr<void>(
+      in_flight.get(), [in_flight](void*) { --*in_flight; });
+}
+
+TRITONSERVER_Error*
+SageMakerResidencyManager::WriteStats(triton::common::TritonJson::Value* stats)
+{
+  std::shared_lock<std::shared_mutex> lock(mu_);
+  RETURN_IF_ERR(stats->AddUInt("hostMemoryBudget", host_memory_budget_));
+  RETURN_IF_ERR(stats->AddUInt("gpuMemoryBudget", gpu_memory_budget_));
+  RETURN_IF_ERR(stats->AddUInt("hostMemoryUsage", usage_.host_bytes_));
+  RETURN_IF_ERR(stats->AddUInt("gpuMemoryUsage", usage_.gpu_bytes_));
+  RETURN_IF_ERR(stats->AddUInt("evictions", evictions_));
+
+  // Most recently used first, so the next eviction candidate is last
+  std::vector<std::pair<uint64_t, const std::string*>> mru;
+  for (const auto& model : models_) {
+    mru.emplace_back(model.second->last_use_ns_.load(), &model.first);
+  }
+  std::sort(mru.begin(), mru.end(), [](const auto& a, const auto& b) {
+    return a.first > b.first;
+  });
+
+  const uint64_t now_ns = SteadyNowNs();
+  triton::common::TritonJson::Value models_array(
+      *stats, triton::common::TritonJson::ValueType::ARRAY);
+  for (const auto& model : mru) {
+    const auto& entry = models_.at(*model.second);
+    triton::common::TritonJson::Value model_json(
+        models_array, triton::common::TritonJson::ValueType::OBJECT);
+    RETURN_IF_ERR(model_json.AddString("modelName", *model.second));
+    RETURN_IF_ERR(model_json.AddString("targetModel", entry->target_model_));
+    RETURN_IF_ERR(model_json.AddBool("loading", entry->loading_));
+    RETURN_IF_ERR(
+        model_json.AddUInt("hostMemoryBytes", entry->footprint_.host_bytes_));
+    RETURN_IF_ERR(
+        model_json.AddUInt("gpuMemoryBytes", entry->footprint_.gpu_bytes_));
+    RETURN_IF_ERR(model_json.AddUInt(
+        "idleMs", (now_ns - std::min(now_ns, model.first)) / 1000000));
+    RETURN_IF_ERR(model_json.AddUInt("useCount", entry->use_count_.load()));
+    RETURN_IF_ERR(models_array.Append(std::move(model_json)));
+  }
+  RETURN_IF_ERR(stats->Add("models", std::move(models_array)));
+
+  return nullptr;  // success
+}
+
 
 const std::string SagemakerAPIServer::binary_mime_type_(
     "application/vnd.sagemaker-triton.binary+json;json-header-size=");
@@ -200,6 +410,17 @@ SagemakerAPIServer::Handle(evhtp_request_t* req)
     return;
   }
 
+  if (RE2::FullMatch(std::string(req->uri->path->full), residency_regex_)) {
+    if (req->method != htp_method_GET) {
+      evhtp_send_reply(req, EVHTP_RES_METHNALLOWED);
+      return;
+    }
+    LOG_VERBOSE(1) << "SageMaker request: MODEL RESIDENCY";
+
+    SageMakerMMEResidency(req);
+    return;
+  }
+
   std::string multi_model_name, action;
   if (RE2::FullMatch(
           std::string(req->uri->path->full), models_regex_, &multi_model_name,
@@ -240,7 +461,13 @@ SagemakerAPIServer::Handle(evhtp_request_t* req)
 
           LOG_INFO << "Invoking SageMaker TargetModel: " << target_model;
 
-          SageMakerMMEHandleInfer(req, target_model, model_version_str_);
+          std::shared_ptr<void> in_flight;
+          if (residency_.Enabled()) {
+            in_flight = residency_.Use(multi_model_name);
+          }
+
+          SageMakerMMEHandleInfer(
+              req, target_model, model_version_str_, in_flight);
           return;
         }
         if (action.empty()) {
@@ -284,13 +511,28 @@ SagemakerAPIServer::Create(
     triton::server::TraceManager* trace_manager,
     const std::shared_ptr<SharedMemoryManager>& shm_manager, const int32_t port,
     const std::string address, const int thread_cnt,
-    std::unique_ptr<HTTPServer>* http_server)
+    const uint64_t mme_host_memory_budget, const uint64_t mme_gpu_memory_budget,
+    const uint64_t coalesce_delay_us, std::unique_ptr<HTTPServer>* http_server)
 {
-  http_server->reset(new SagemakerAPIServer(
-      server, trace_manager, shm_manager, port, address, thread_cnt));
+  auto sagemaker_server = new SagemakerAPIServer(
+      server, trace_manager, shm_manager, port, address, thread_cnt,
+      mme_host_memory_budget, mme_gpu_memory_budget);
+  if (coalesce_delay_us != 0) {
+    sagemaker_server->EnableRequestCoalescing(coalesce_delay_us);
+  }
+  http_server->reset(sagemaker_server);
 
   const std::string addr = address + ":" + std::to_string(port);
   LOG_INFO << "Started Sagemaker HTTPService at " << addr;
+  if ((mme_host_memory_budget != 0) || (mme_gpu_memory_budget != 0)) {
+    LOG_INFO << "SageMaker MME memory budget: host " << mme_host_memory_budget
+             << " bytes, GPU " << mme_gpu_memory_budget
+             << " bytes (0 is unlimited)";
+  }
+  if (coalesce_delay_us != 0) {
+    LOG_INFO << "Sagemaker requests are coalesced for up to "
+             << coalesce_delay_us << " us";
+  }
 
   return nullptr;
 }
@@ -431,7 +673,8 @@ SagemakerAPIServer::SagemakeInferRequestClass::InferResponseComplete(
 void
 SagemakerAPIServer::SageMakerMMEHandleInfer(
     evhtp_request_t* req, const std::string& model_name,
-    const std::string& model_version_str)
+    const std::string& model_version_str,
+    const std::shared_ptr<void>& in_flight)
 {
   if (req->method != htp_method_POST) {
     evhtp_send_reply(req, EVHTP_RES_METHNALLOWED);
@@ -484,7 +727,9 @@ SagemakerAPIServer::SageMakerMMEHandleInfer(
     auto compression_type = GetRequestCompressionType(req);
     switch (compression_type) {
       case DataCompressor::Type::DEFLATE:
-      case DataCompressor::Type::GZIP: {
+      case DataCompressor::Type::GZIP:
+      case DataCompressor::Type::ZSTD:
+      case DataCompressor::Type::LZ4: {
         decompressed_buffer = evbuffer_new();
         err = DataCompressor::DecompressData(
             compression_type, req->buffer_in, decompressed_buffer);
@@ -495,7 +740,9 @@ SagemakerAPIServer::SageMakerMMEHandleInfer(
         // send 415 error with supported types in Accept-Encoding
         evhtp_headers_add_header(
             req->headers_out,
-            evhtp_header_new(kAcceptEncodingHTTPHeader, "gzip, deflate", 1, 1));
+            evhtp_header_new(
+                kAcceptEncodingHTTPHeader,
+                DataCompressor::SupportedTypesString(), 1, 1));
         evhtp_send_reply(req, EVHTP_RES_UNSUPPORTED);
         return;
       }
@@ -540,6 +787,8 @@ SagemakerAPIServer::SageMakerMMEHandleInfer(
     connection_paused = true;
 
     auto infer_request = CreateInferRequest(req, irequest_shared);
+    static_cast<SagemakeInferRequestClass*>(infer_request.get())->in_flight_ =
+        in_flight;
     auto request_release_payload = std::make_unique<RequestReleasePayload>(
         irequest_shared, decompressed_buffer);
 
@@ -683,6 +932,54 @@ SagemakerAPIServer::SageMakerMMECheckUnloadedModelIsUnavailable(
   return nullptr;
 }
 
+// Wait for the model to be completely unloaded. SageMaker waits a maximum of
+// 360 seconds for the UNLOAD request to timeout. Setting a limit of 350
+// seconds for Triton unload. This should be run only if the unload call has
+// succeeded.
+void
+SagemakerAPIServer::SageMakerMMEWaitForUnload(const char* target_model)
+{
+  auto start_time = std::chrono::high_resolution_clock::now();
+  bool is_model_unavailable = false;
+  int64_t unload_time_in_secs = 0;
+
+  LOG_VERBOSE(1) << "Using Model Repository Index during UNLOAD to check for "
+                    "status of model: "
+                 << target_model;
+  while (is_model_unavailable == false &&
+         unload_time_in_secs < UNLOAD_TIMEOUT_SECS_) {
+    LOG_VERBOSE(1) << "In the loop to wait for model to be unavailable";
+    TRITONSERVER_Error* unload_err =
+        SageMakerMMECheckUnloadedModelIsUnavailable(
+            target_model, &is_model_unavailable);
+    if (unload_err != nullptr) {
+      LOG_ERROR << "Error: Received non-zero exit code on checking for "
+                   "model unavailability. "
+                << TRITONSERVER_ErrorMessage(unload_err);
+      TRITONSERVER_ErrorDelete(unload_err);
+      break;
+    }
+    std::this_thread::sleep_for(
+        std::chrono::milliseconds(UNLOAD_SLEEP_MILLISECONDS_));
+
+    auto end_time = std::chrono::high_resolution_clock::now();
+
+    unload_time_in_secs =
+        std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time)
+            .count();
+  }
+  LOG_INFO << "UNLOAD for model " << target_model << " completed in "
+           << unload_time_in_secs << " seconds.";
+
+  if ((is_model_unavailable == false) &&
+      (unload_time_in_secs >= UNLOAD_TIMEOUT_SECS_)) {
+    LOG_ERROR << "Error: UNLOAD did not complete within expected "
+              << UNLOAD_TIMEOUT_SECS_
+              << " seconds. This may "
+                 "result in SageMaker UNLOAD timeout.";
+  }
+}
+
 void
 SagemakerAPIServer::SageMakerMMEUnloadModel(
     evhtp_request_t* req, const char* model_name_hash)
@@ -707,8 +1004,6 @@ SagemakerAPIServer::SageMakerMMEUnloadModel(
 
   LOG_INFO << "Unloading SageMaker TargetModel: " << target_model << std::endl;
 
-  auto start_time = std::chrono::high_resolution_clock::now();
-
   /* Always unload dependents as well - this is required to unload dependents in
    * ensemble */
   TRITONSERVER_Error* unload_err = nullptr;
@@ -729,49 +1024,7 @@ SagemakerAPIServer::SageMakerMMEUnloadModel(
 
   /*Note: Model status check is repo-specific and therefore must be run before
    * unregistering the repo, else the model information is lost*/
-  bool is_model_unavailable = false;
-  int64_t unload_time_in_secs = 0;
-
-  /* Wait for the model to be completely unloaded. SageMaker waits a maximum
-  of 360 seconds for the UNLOAD request to timeout. Setting a limit of 350
-  seconds for Triton unload. This should be run only if above UNLOAD call has
-  succeeded.*/
-  if (unload_err == nullptr) {
-    LOG_VERBOSE(1) << "Using Model Repository Index during UNLOAD to check for "
-                      "status of model hash: "
-                   << model_name_hash << " for model: " << target_model;
-    while (is_model_unavailable == false &&
-           unload_time_in_secs < UNLOAD_TIMEOUT_SECS_) {
-      LOG_VERBOSE(1) << "In the loop to wait for model to be unavailable";
-      unload_err = SageMakerMMECheckUnloadedModelIsUnavailable(
-          target_model, &is_model_unavailable);
-      if (unload_err != nullptr) {
-        LOG_ERROR << "Error: Received non-zero exit code on checking for "
-                     "model unavailability. "
-                  << TRITONSERVER_ErrorMessage(unload_err);
-        break;
-      }
-      std::this_thread::sleep_for(
-          std::chrono::milliseconds(UNLOAD_SLEEP_MILLISECONDS_));
-
-      auto end_time = std::chrono::high_resolution_clock::now();
-
-      unload_time_in_secs = std::chrono::duration_cast<std::chrono::seconds>(
-                                end_time - start_time)
-                                .count();
-    }
-    LOG_INFO << "UNLOAD for model " << target_model << " completed in "
-             << unload_time_in_secs << " seconds.";
-    TRITONSERVER_ErrorDelete(unload_err);
-  }
-
-  if ((is_model_unavailable == false) &&
-      (unload_time_in_secs >= UNLOAD_TIMEOUT_SECS_)) {
-    LOG_ERROR << "Error: UNLOAD did not complete within expected "
-              << UNLOAD_TIMEOUT_SECS_
-              << " seconds. This may "
-                 "result in SageMaker UNLOAD timeout.";
-  }
+  SageMakerMMEWaitForUnload(target_model);
 
   std::string repo_parent_path = sagemaker_models_list_.at(model_name_hash);
 
@@ -781,7 +1034,7 @@ SagemakerAPIServer::SageMakerMMEUnloadModel(
       server_.get(), repo_parent_path.c_str());
 
   if (unregister_err != nullptr) {
-    EVBufferAddErrorJson(req->buffer_out, unload_err);
+    EVBufferAddErrorJson(req->buffer_out, unregister_err);
     evhtp_send_reply(req, EVHTP_RES_BADREQ);
     LOG_ERROR << "Unable to unregister model repository for path: "
               << repo_parent_path << std::endl;
@@ -791,6 +1044,10 @@ SagemakerAPIServer::SageMakerMMEUnloadModel(
 
   TRITONSERVER_ErrorDelete(unregister_err);
 
+  if (residency_.Enabled()) {
+    residency_.Release(model_name_hash);
+  }
+
   std::lock_guard<std::mutex> lock(models_list_mutex_);
   sagemaker_models_list_.erase(model_name_hash);
 }
@@ -872,6 +1129,202 @@ SagemakerAPIServer::SageMakerMMEListModel(evhtp_request_t* req)
   evhtp_send_reply(req, EVHTP_RES_OK);
 }
 
+bool
+SagemakerAPIServer::SageMakerMMEMakeResident(
+    const std::string& model_name_hash, const std::string& target_model,
+    const SageMakerResidencyManager::Footprint& estimate, bool* reserved)
+{
+  std::vector<SageMakerResidencyManager::Victim> victims;
+  if (!residency_.Reserve(
+          model_name_hash, target_model, estimate, &victims, reserved)) {
+    LOG_VERBOSE(1) << "Model " << target_model
+                   << " does not fit in the SageMaker MME memory budget";
+    return false;
+  }
+
+  for (const auto& victim : victims) {
+    /* Remove from the list first so that the model is no longer invoked */
+    std::string repo_parent_path;
+    {
+      std::lock_guard<std::mutex> lock(models_list_mutex_);
+      auto it = sagemaker_models_list_.find(victim.model_name_hash_);
+      if (it == sagemaker_models_list_.end()) {
+        continue;
+      }
+      repo_parent_path = it->second;
+      sagemaker_models_list_.erase(it);
+    }
+
+    LOG_INFO << "Evicting least recently used SageMaker TargetModel: "
+             << victim.target_model_ << " to load " << target_model;
+
+    TRITONSERVER_Error* err = TRITONSERVER_ServerUnloadModelAndDependents(
+        server_.get(), victim.target_model_.c_str());
+    if (err != nullptr) {
+      /* The model is still loaded, keep serving and accounting for it */
+      LOG_ERROR << "Error when evicting SageMaker model "
+                << victim.target_model_ << ": "
+                << TRITONSERVER_ErrorMessage(err);
+      TRITONSERVER_ErrorDelete(err);
+      {
+        std::lock_guard<std::mutex> lock(models_list_mutex_);
+        sagemaker_models_list_.emplace(
+            victim.model_name_hash_, repo_parent_path);
+      }
+      residency_.Restore(victim);
+      continue;
+    }
+
+    SageMakerMMEWaitForUnload(victim.target_model_.c_str());
+    err = TRITONSERVER_ServerUnregisterModelRepository(
+        server_.get(), repo_parent_path.c_str());
+    if (err != nullptr) {
+      LOG_ERROR << "Error when evicting SageMaker model "
+                << victim.target_model_ << ": "
+                << TRITONSERVER_ErrorMessage(err);
+      TRITONSERVER_ErrorDelete(err);
+    }
+  }
+
+  return true;
+}
+
+SageMakerResidencyManager::Footprint
+SagemakerAPIServer::SageMakerMMEModelFootprint(
+    const std::string& target_model, const uint64_t disk_byte_size)
+{
+  SageMakerResidencyManager::Footprint footprint;
+
+#ifdef TRITON_ENABLE_STATS
+  /* Use the memory usage reported by the backend, if any */
+  TRITONSERVER_Message* model_stats_message = nullptr;
+  TRITONSERVER_Error* err = TRITONSERVER_ServerModelStatistics(
+      server_.get(), target_model.c_str(), -1 /* all versions */,
+      &model_stats_message);
+  if (err == nullptr) {
+    const char* buffer;
+    size_t byte_size;
+    triton::common::TritonJson::Value stats_json;
+    triton::common::TritonJson::Value model_stats_json;
+    err = TRITONSERVER_MessageSerializeToJson(
+        model_stats_message, &buffer, &byte_size);
+    if (err == nullptr) {
+      err = stats_json.Parse(buffer, byte_size);
+    }
+    if (err == nullptr) {
+      err = stats_json.MemberAsArray("model_stats", &model_stats_json);
+    }
+    for (size_t i = 0; (err == nullptr) && (i < model_stats_json.ArraySize());
+         ++i) {
+      triton::common::TritonJson::Value model_stat;
+      triton::common::TritonJson::Value memory_usage_json;
+      err = model_stats_json.IndexAsObject(i, &model_stat);
+      if ((err == nullptr) &&
+          model_stat.Find("memory_usage", &memory_usage_json)) {
+        for (size_t j = 0;
+             (err == nullptr) && (j < memory_usage_json.ArraySize()); ++j) {
+          triton::common::TritonJson::Value usage;
+          std::string type;
+          uint64_t usage_byte_size = 0;
+          err = memory_usage_json.IndexAsObject(j, &usage);
+          if (err == nullptr) {
+            err = usage.MemberAsString("type", &type);
+          }
+          if (err == nullptr) {
+            err = usage.MemberAsUInt("byte_size", &usage_byte_size);
+          }
+          if (err == nullptr) {
+            if (type == "GPU") {
+              footprint.gpu_bytes_ += usage_byte_size;
+            } else {
+              footprint.host_bytes_ += usage_byte_size;
+            }
+          }
+        }
+      }
+    }
+    TRITONSERVER_MessageDelete(model_stats_message);
+  }
+  if (err != nullptr) {
+    LOG_VERBOSE(1) << "Unable to read memory usage of model " << target_model
+                   << ": " << TRITONSERVER_ErrorMessage(err);
+    TRITONSERVER_ErrorDelete(err);
+    footprint = SageMakerResidencyManager::Footprint();
+  }
+#endif  // TRITON_ENABLE_STATS
+
+  /* Fall back to the size of the model files for backends that do not
+   * report memory usage, charged against the budget of the kind of the
+   * model instances, or both budgets if the kind is not known */
+  if ((footprint.host_bytes_ == 0) && (footprint.gpu_bytes_ == 0)) {
+    bool host = true;
+    bool gpu = true;
+    SageMakerMMEModelInstanceKinds(target_model, &host, &gpu);
+    footprint.host_bytes_ = host ? disk_byte_size : 0;
+    footprint.gpu_bytes_ = gpu ? disk_byte_size : 0;
+  }
+
+  return footprint;
+}
+
+void
+SagemakerAPIServer::SageMakerMMEModelInstanceKinds(
+    const std::string& target_model, bool* host, bool* gpu)
+{
+  std::string config_json;
+  triton::common::TritonJson::Value config;
+  triton::common::TritonJson::Value instance_groups;
+  TRITONSERVER_Error* err =
+      GetModelConfig(target_model, -1 /* latest version */, &config_json);
+  if (err == nullptr) {
+    err = config.Parse(config_json);
+  }
+  if (err != nullptr) {
+    LOG_VERBOSE(1) << "Unable to read the instance kind of model "
+                   << target_model << ": " << TRITONSERVER_ErrorMessage(err);
+    TRITONSERVER_ErrorDelete(err);
+    return;
+  }
+  if (!config.Find("instance_group", &instance_groups) ||
+      (instance_groups.ArraySize() == 0)) {
+    return;
+  }
+
+  /* KIND_MODEL instances place themselves, so they are charged to both */
+  bool cpu_only = true;
+  bool gpu_only = true;
+  for (size_t i = 0; i < instance_groups.ArraySize(); ++i) {
+    triton::common::TritonJson::Value instance_group;
+    std::string kind;
+    err = instance_groups.IndexAsObject(i, &instance_group);
+    if (err == nullptr) {
+      err = instance_group.MemberAsString("kind", &kind);
+    }
+    if (err != nullptr) {
+      TRITONSERVER_ErrorDelete(err);
+      return;
+    }
+    cpu_only &= (kind == "KIND_CPU");
+    gpu_only &= (kind == "KIND_GPU");
+  }
+  *host = !gpu_only;
+  *gpu = !cpu_only;
+}
+
+void
+SagemakerAPIServer::SageMakerMMEResidency(evhtp_request_t* req)
+{
+  triton::common::TritonJson::Value residency_json(
+      triton::common::TritonJson::ValueType::OBJECT);
+  HTTP_RESPOND_IF_ERR(req, residency_.WriteStats(&residency_json));
+
+  triton::common::TritonJson::WriteBuffer json_buffer_;
+  HTTP_RESPOND_IF_ERR(req, residency_json.Write(&json_buffer_));
+
+  evbuffer_add(req->buffer_out, json_buffer_.Base(), json_buffer_.Size());
+  evhtp_send_reply(req, EVHTP_RES_OK);
+}
+
 bool
 SagemakerAPIServer::SageMakerMMECheckOOMError(TRITONSERVER_Error* err)
 {
@@ -1071,7 +1524,38 @@ SagemakerAPIServer::SageMakerMMELoadModel(
     return;
   }
 
-  err = TRITONSERVER_ServerLoadModel(server_.get(), target_model.c_str());
+  /* Evict least recently used models to make room, using the size of the
+   * model files as the memory estimate until the model is loaded */
+  uint64_t disk_byte_size = 0;
+  bool reserved = false;
+  bool resident = true;
+  if (residency_.Enabled()) {
+    disk_byte_size = DirectoryByteSize(repo_path);
+    resident = SageMakerMMEMakeResident(
+        model_name_hash, target_model, {disk_byte_size, disk_byte_size},
+        &reserved);
+  }
+
+  if (resident) {
+    err = TRITONSERVER_ServerLoadModel(server_.get(), target_model.c_str());
+  } else {
+    err = TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_UNAVAILABLE,
+        ("failed to load '" + target_model +
+         "', out of memory: the model does not fit in the SageMaker MME "
+         "memory budget")
+            .c_str());
+  }
+
+  if (reserved) {
+    if (err == nullptr) {
+      residency_.Commit(
+          model_name_hash,
+          SageMakerMMEModelFootprint(target_model, disk_byte_size));
+    } else {
+      residency_.Release(model_name_hash);
+    }
+  }
 
   /* Unlikely after duplicate repo check, but in case Load Model also returns
    * ALREADY_EXISTS error */
@@ -27,8 +27,12 @@
 
 #include <sys/stat.h>
 
+#include <atomic>
 #include <fstream>
+#include <memory>
 #include <mutex>
+#include <shared_mutex>
+#include <vector>
 
 #include "common.h"
 #include "dirent.h"
@@ -37,6 +41,91 @@
 
 namespace triton { namespace server {
 
+// Tracks the models loaded through the SageMaker multi-model endpoint (MME)
+// and the host and GPU memory each of them uses, so that the least recently
+// used models can be evicted before a load that would exceed the configured
+// memory budget. A budget of 0 is unlimited.
+class SageMakerResidencyManager {
+ public:
+  struct Footprint {
+    uint64_t host_bytes_{0};
+    uint64_t gpu_bytes_{0};
+  };
+
+  struct Victim {
+    std::string model_name_hash_;
+    std::string target_model_;
+    Footprint footprint_;
+  };
+
+  SageMakerResidencyManager(
+      const uint64_t host_memory_budget, const uint64_t gpu_memory_budget)
+      : host_memory_budget_(host_memory_budget),
+        gpu_memory_budget_(gpu_memory_budget), evictions_(0)
+  {
+  }
+
+  bool Enabled() const
+  {
+    return (host_memory_budget_ != 0) || (gpu_memory_budget_ != 0);
+  }
+
+  // Reserve 'estimate' for a model that is about to be loaded. The models
+  // that must be evicted to stay within the budget are returned in
+  // 'victims' and are no longer tracked. Returns false, reserving nothing,
+  // if the model does not fit even after evicting every idle model. Models
+  // that are loading or have requests in flight are not idle. A model that
+  // is already tracked is not reserved again and 'reserved' is false.
+  bool Reserve(
+      const std::string& model_name_hash, const std::string& target_model,
+      const Footprint& estimate, std::vector<Victim>* victims, bool* reserved);
+
+  // Track again a victim returned by Reserve() that could not be unloaded.
+  void Restore(const Victim& victim);
+
+  // Replace the reserved estimate with the footprint of the loaded model.
+  void Commit(const std::string& model_name_hash, const Footprint& footprint);
+
+  // Stop tracking a model that failed to load or has been unloaded.
+  void Release(const std::string& model_name_hash);
+
+  // Record a use of the model. The model is not evicted until the returned
+  // reference is released, nullptr if the model is not tracked.
+  std::shared_ptr<void> Use(const std::string& model_name_hash);
+
+  TRITONSERVER_Error* WriteStats(triton::common::TritonJson::Value* stats);
+
+ private:
+  struct Entry {
+    Entry(const std::string& target_model, const Footprint& footprint)
+        : target_model_(target_model), footprint_(footprint), loading_(true),
+          last_use_ns_(0), use_count_(0),
+          in_flight_(std::make_shared<std::atomic<uint64_t>>(0))
+    {
+    }
+    const std::string target_model_;
+    Footprint footprint_;
+    bool loading_;
+    std::atomic<uint64_t> last_use_ns_;
+    std::atomic<uint64_t> use_count_;
+    // Shared with the references returned by Use(), which may outlive the
+    // entry
+    std::shared_ptr<std::atomic<uint64_t>> in_flight_;
+  };
+
+  bool Fits(const Footprint& usage) const;
+
+  const uint64_t host_memory_budget_;
+  const uint64_t gpu_memory_budget_;
+
+  // Protects 'models_', 'usage_' and 'evictions_'. Uses only need the
+  // shared lock as they update the atomics of an existing entry.
+  std::shared_mutex mu_;
+  std::unordered_map<std::string, std::unique_ptr<Entry>> models_;
+  Footprint usage_;
+  uint64_t evictions_;
+};
+
 // Handle Sagemaker HTTP requests to inference server APIs
 class SagemakerAPIServer : public HTTPAPIServer {
  public:
@@ -45,6 +134,8 @@ class SagemakerAPIServer : public HTTPAPIServer {
       triton::server::TraceManager* trace_manager,
       const std::shared_ptr<SharedMemoryManager>& smb_manager,
       const int32_t port, const std::string address, const int thread_cnt,
+      const uint64_t mme_host_memory_budget,
+      const uint64_t mme_gpu_memory_budget, const uint64_t coalesce_delay_us,
       std::unique_ptr<HTTPServer>* sagemaker_server);
 
   class SagemakeInferRequestClass : public InferRequestClass {
@@ -64,6 +155,9 @@ class SagemakerAPIServer : public HTTPAPIServer {
 
     void SetResponseHeader(
         const bool has_binary_data, const size_t header_length) override;
+
+    // Keeps the model from being evicted until the request completes
+    std::shared_ptr<void> in_flight_;
   };
 
  private:
@@ -71,12 +165,15 @@ class SagemakerAPIServer : public HTTPAPIServer {
       const std::shared_ptr<TRITONSERVER_Server>& server,
       triton::server::TraceManager* trace_manager,
       const std::shared_ptr<SharedMemoryManager>& shm_manager,
-      const int32_t port, const std::string address, const int thread_cnt)
+      const int32_t port, const std::string address, const int thread_cnt,
+      const uint64_t mme_host_memory_budget,
+      const uint64_t mme_gpu_memory_budget)
       : HTTPAPIServer(
             server, trace_manager, shm_manager, port, false /* reuse_port */,
             address, "" /* header_forward_pattern */, thread_cnt),
         ping_regex_(R"(/ping)"), invocations_regex_(R"(/invocations)"),
         models_regex_(R"(/models(?:/)?([^/]+)?(/invoke)?)"),
+        residency_regex_(R"(/residency)"),
         model_path_regex_(
             R"((\/opt\/ml\/models\/[0-9A-Za-z._]+)\/(model)\/?([0-9A-Za-z._]+)?)"),
         platform_ensemble_regex_(R"(platform:(\s)*\"ensemble\")"),
@@ -85,7 +182,8 @@ class SagemakerAPIServer : public HTTPAPIServer {
         model_name_(GetEnvironmentVariableOrDefault(
             "SAGEMAKER_TRITON_DEFAULT_MODEL_NAME",
             "unspecified_SAGEMAKER_TRITON_DEFAULT_MODEL_NAME")),
-        model_version_str_("")
+        model_version_str_(""),
+        residency_(mme_host_memory_budget, mme_gpu_memory_budget)
   {
   }
 
@@ -96,7 +194,8 @@ class SagemakerAPIServer : public HTTPAPIServer {
 
   void SageMakerMMEHandleInfer(
       evhtp_request_t* req, const std::string& model_name,
-      const std::string& model_version_str);
+      const std::string& model_version_str,
+      const std::shared_ptr<void>& in_flight = nullptr);
 
   void SageMakerMMELoadModel(
       evhtp_request_t* req,
@@ -116,6 +215,24 @@ class SagemakerAPIServer : public HTTPAPIServer {
 
   void SageMakerMMEGetModel(evhtp_request_t* req, const char* model_name);
 
+  void SageMakerMMEWaitForUnload(const char* target_model);
+
+  // Evict least recently used models until 'estimate' fits in the memory
+  // budget. Returns false if it cannot fit.
+  bool SageMakerMMEMakeResident(
+      const std::string& model_name_hash, const std::string& target_model,
+      const SageMakerResidencyManager::Footprint& estimate, bool* reserved);
+
+  SageMakerResidencyManager::Footprint SageMakerMMEModelFootprint(
+      const std::string& target_model, const uint64_t disk_byte_size);
+
+  // Set 'host' and 'gpu' to whether the instances of the model may use host
+  // and GPU memory. Both are left unchanged if the kind is not known.
+  void SageMakerMMEModelInstanceKinds(
+      const std::string& target_model, bool* host, bool* gpu);
+
+  void SageMakerMMEResidency(evhtp_request_t* req);
+
   void Handle(evhtp_request_t* req) override;
 
   std::unique_ptr<InferRequestClass> CreateInferRequest(
@@ -144,6 +261,7 @@ class SagemakerAPIServer : public HTTPAPIServer {
   re2::RE2 ping_regex_;
   re2::RE2 invocations_regex_;
   re2::RE2 models_regex_;
+  re2::RE2 residency_regex_;
   re2::RE2 model_path_regex_;
   re2::RE2 platform_ensemble_regex_;
 
@@ -162,6 +280,9 @@ class SagemakerAPIServer : public HTTPAPIServer {
   /* Mutex to handle concurrent updates */
   std::mutex models_list_mutex_;
 
+  /* LRU eviction of MME models, enabled by a memory budget */
+  SageMakerResidencyManager residency_;
+
   /* Constants */
   const uint32_t UNLOAD_TIMEOUT_SECS_ = 350;
   const uint32_t UNLOAD_SLEEP_MILLISECONDS_ = 500;
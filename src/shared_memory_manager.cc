@@ -29,6 +29,14 @@
 // Not supporting shared memory for now
 #ifdef _WIN32
 namespace triton { namespace server {
+SharedMemoryManager::SharedMemoryInfo::~SharedMemoryInfo() {}
+
+TRITONSERVER_Error*
+SharedMemoryManager::SharedMemoryInfo::Unmap()
+{
+  return nullptr;
+}
+
 SharedMemoryManager::~SharedMemoryManager() {}
 
 TRITONSERVER_Error*
@@ -69,7 +77,7 @@ TRITONSERVER_Error*
 SharedMemoryManager::GetMemoryInfo(
     const std::string& name, size_t offset, size_t byte_size,
     void** shm_mapped_addr, TRITONSERVER_MemoryType* memory_type,
-    int64_t* device_id)
+    int64_t* device_id, std::shared_ptr<const SharedMemoryInfo>* shm_info)
 {
   return TRITONSERVER_ErrorNew(
       TRITONSERVER_ERROR_UNSUPPORTED,
@@ -342,6 +350,49 @@ CheckCudaSharedMemoryRegionSize(
 
 }  // namespace
 
+SharedMemoryManager::SharedMemoryInfo::~SharedMemoryInfo()
+{
+  TRITONSERVER_Error* err = Unmap();
+  if (err != nullptr) {
+    LOG_ERROR << "failed to release shared memory region '" << name_
+              << "': " << TRITONSERVER_ErrorMessage(err);
+    TRITONSERVER_ErrorDelete(err);
+  }
+}
+
+TRITONSERVER_Error*
+SharedMemoryManager::SharedMemoryInfo::Unmap()
+{
+  if (mapped_addr_ == nullptr) {
+    return nullptr;
+  }
+
+  if (kind_ == TRITONSERVER_MEMORY_CPU) {
+    RETURN_IF_ERR(UnmapSharedMemory(mapped_addr_, byte_size_));
+  } else {
+#ifdef TRITON_ENABLE_GPU
+    cudaError_t err = cudaIpcCloseMemHandle(mapped_addr_);
+    if (err != cudaSuccess) {
+      return TRITONSERVER_ErrorNew(
+          TRITONSERVER_ERROR_INTERNAL, std::string(
+                                           "failed to close CUDA IPC handle: " +
+                                           std::string(cudaGetErrorString(err)))
+                                           .c_str());
+    }
+#else
+    return TRITONSERVER_ErrorNew(
+        TRITONSERVER_ERROR_INVALID_ARG,
+        std::string(
+            "failed to unregister CUDA shared memory region: '" + name_ +
+            "', GPUs not supported")
+            .c_str());
+#endif  // TRITON_ENABLE_GPU
+  }
+
+  mapped_addr_ = nullptr;
+  return nullptr;  // success
+}
+
 SharedMemoryManager::~SharedMemoryManager()
 {
   UnregisterAll(TRITONSERVER_MEMORY_CPU);
@@ -353,7 +404,7 @@ SharedMemoryManager::RegisterSystemSharedMemory(
     const std::string& name, const std::string& shm_key, const size_t offset,
     const size_t byte_size)
 {
-  std::lock_guard<std::mutex> lock(mu_);
+  std::unique_lock<std::shared_mutex> lock(mu_);
 
   if (shared_memory_map_.find(name) != shared_memory_map_.end()) {
     return TRITONSERVER_ErrorNew(
@@ -408,9 +459,9 @@ SharedMemoryManager::RegisterSystemSharedMemory(
   }
 
   shared_memory_map_.insert(std::make_pair(
-      name, std::unique_ptr<SharedMemoryInfo>(new SharedMemoryInfo(
+      name, std::make_shared<SharedMemoryInfo>(
                 name, shm_key, offset, byte_size, shm_fd, mapped_addr,
-                TRITONSERVER_MEMORY_CPU, 0))));
+                TRITONSERVER_MEMORY_CPU, 0)));
 
   return nullptr;  // success
 }
@@ -422,7 +473,7 @@ SharedMemoryManager::RegisterCUDASharedMemory(
     const size_t byte_size, const int device_id)
 {
   // Serialize all operations that write/read current shared memory regions
-  std::lock_guard<std::mutex> lock(mu_);
+  std::unique_lock<std::shared_mutex> lock(mu_);
 
   // If name is already in shared_memory_map_ then return error saying already
   // registered
@@ -444,9 +495,9 @@ SharedMemoryManager::RegisterCUDASharedMemory(
       name, reinterpret_cast<CUdeviceptr>(mapped_addr), byte_size));
 
   shared_memory_map_.insert(std::make_pair(
-      name, std::unique_ptr<CUDASharedMemoryInfo>(new CUDASharedMemoryInfo(
+      name, std::make_shared<CUDASharedMemoryInfo>(
                 name, "", 0, byte_size, 0, mapped_addr, TRITONSERVER_MEMORY_GPU,
-                device_id, cuda_shm_handle))));
+                device_id, cuda_shm_handle)));
 
   return nullptr;  // success
 }
@@ -456,10 +507,11 @@ TRITONSERVER_Error*
 SharedMemoryManager::GetMemoryInfo(
     const std::string& name, size_t offset, size_t byte_size,
     void** shm_mapped_addr, TRITONSERVER_MemoryType* memory_type,
-    int64_t* device_id)
+    int64_t* device_id, std::shared_ptr<const SharedMemoryInfo>* shm_info)
 {
-  // protect shared_memory_map_ from concurrent access
-  std::lock_guard<std::mutex> lock(mu_);
+  // Lookups only read shared_memory_map_ so concurrent requests don't
+  // serialize on each other, only on register / unregister.
+  std::shared_lock<std::shared_mutex> lock(mu_);
 
   auto it = shared_memory_map_.find(name);
   if (it == shared_memory_map_.end()) {
@@ -503,6 +555,9 @@ SharedMemoryManager::GetMemoryInfo(
 
   *memory_type = it->second->kind_;
   *device_id = it->second->device_id_;
+  if (shm_info != nullptr) {
+    *shm_info = it->second;
+  }
 
   return nullptr;
 }
@@ -513,7 +568,7 @@ SharedMemoryManager::GetCUDAHandle(
     const std::string& name, cudaIpcMemHandle_t** cuda_mem_handle)
 {
   // protect shared_memory_map_ from concurrent access
-  std::lock_guard<std::mutex> lock(mu_);
+  std::shared_lock<std::shared_mutex> lock(mu_);
 
   auto it = shared_memory_map_.find(name);
   if (it == shared_memory_map_.end()) {
@@ -535,7 +590,7 @@ SharedMemoryManager::GetStatus(
     const std::string& name, TRITONSERVER_MemoryType memory_type,
     triton::common::TritonJson::Value* shm_status)
 {
-  std::lock_guard<std::mutex> lock(mu_);
+  std::shared_lock<std::shared_mutex> lock(mu_);
 
   if (name.empty()) {
     for (const auto& shm_info : shared_memory_map_) {
@@ -611,7 +666,7 @@ SharedMemoryManager::Unregister(
     const std::string& name, TRITONSERVER_MemoryType memory_type)
 {
   // Serialize all operations that write/read current shared memory regions
-  std::lock_guard<std::mutex> lock(mu_);
+  std::unique_lock<std::shared_mutex> lock(mu_);
 
   return UnregisterHelper(name, memory_type);
 }
@@ -619,7 +674,7 @@ SharedMemoryManager::Unregister(
 TRITONSERVER_Error*
 SharedMemoryManager::UnregisterAll(TRITONSERVER_MemoryType memory_type)
 {
-  std::lock_guard<std::mutex> lock(mu_);
+  std::unique_lock<std::shared_mutex> lock(mu_);
   std::string error_message = "Failed to unregister the following ";
   std::vector<std::string> unregister_fails;
   if (memory_type == TRITONSERVER_MEMORY_CPU) {
@@ -666,31 +721,18 @@ TRITONSERVER_Error*
 SharedMemoryManager::UnregisterHelper(
     const std::string& name, TRITONSERVER_MemoryType memory_type)
 {
-  // Must hold the lock on register_mu_ while calling this function.
+  // Must hold the exclusive lock on mu_ while calling this function.
   auto it = shared_memory_map_.find(name);
   if (it != shared_memory_map_.end() && it->second->kind_ == memory_type) {
-    if (it->second->kind_ == TRITONSERVER_MEMORY_CPU) {
-      RETURN_IF_ERR(
-          UnmapSharedMemory(it->second->mapped_addr_, it->second->byte_size_));
+    // No new reference can be taken while the lock is held exclusively.
+    // If requests in flight still reference the region, it is unmapped
+    // when the last of them releases it, otherwise unmap it now so that
+    // failures are reported to the caller.
+    if (it->second.use_count() == 1) {
+      RETURN_IF_ERR(it->second->Unmap());
     } else {
-#ifdef TRITON_ENABLE_GPU
-      cudaError_t err = cudaIpcCloseMemHandle(it->second->mapped_addr_);
-      if (err != cudaSuccess) {
-        return TRITONSERVER_ErrorNew(
-            TRITONSERVER_ERROR_INTERNAL,
-            std::string(
-                "failed to close CUDA IPC handle: " +
-                std::string(cudaGetErrorString(err)))
-                .c_str());
-      }
-#else
-      return TRITONSERVER_ErrorNew(
-          TRITONSERVER_ERROR_INVALID_ARG,
-          std::string(
-              "failed to unregister CUDA shared memory region: '" + name +
-              "', GPUs not supported")
-              .c_str());
-#endif  // TRITON_ENABLE_GPU
+      LOG_VERBOSE(1) << "shared memory region '" << name
+                     << "' is in use, deferring unmap until released";
     }
 
     // Remove region information from shared_memory_map_
@@ -0,0 +1,187 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#include "admission_control.h"
+
+#include <chrono>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+namespace ni = triton::server;
+
+namespace {
+
+std::shared_ptr<ni::AdmissionController>
+CreateController(const ni::AdmissionController::Options& options)
+{
+  std::shared_ptr<ni::AdmissionController> controller;
+  TRITONSERVER_Error* err =
+      ni::AdmissionController::Create(options, &controller);
+  EXPECT_EQ(err, nullptr) << TRITONSERVER_ErrorMessage(err);
+  TRITONSERVER_ErrorDelete(err);
+  return controller;
+}
+
+TEST(AdmissionControllerTest, MaxInflight)
+{
+  ni::AdmissionController::Options options;
+  options.global_.max_inflight_ = 2;
+  auto controller = CreateController(options);
+
+  std::string message;
+  ni::AdmissionController::Ticket first, second, third;
+  EXPECT_TRUE(controller->Admit("model", "http", &first, &message));
+  EXPECT_TRUE(controller->Admit("model", "http", &second, &message));
+  EXPECT_FALSE(controller->Admit("model", "http", &third, &message));
+  EXPECT_NE(message.find("too many requests in flight"), std::string::npos)
+      << message;
+
+  // Releasing a request admits the next one
+  first.Release();
+  EXPECT_TRUE(controller->Admit("model", "http", &third, &message));
+
+  // A moved ticket is released once
+  ni::AdmissionController::Ticket moved(std::move(second));
+  second.Release();
+  EXPECT_FALSE(controller->Admit("model", "http", &first, &message));
+  moved.Release();
+  EXPECT_TRUE(controller->Admit("model", "http", &first, &message));
+}
+
+TEST(AdmissionControllerTest, ModelRate)
+{
+  ni::AdmissionController::Options options;
+  options.models_["limited"].rate_ = 10;
+  options.models_["limited"].burst_ = 5;
+  auto controller = CreateController(options);
+
+  std::string message;
+  size_t admitted = 0;
+  for (size_t i = 0; i < 20; ++i) {
+    ni::AdmissionController::Ticket ticket;
+    if (controller->Admit("limited", "grpc", &ticket, &message)) {
+      ++admitted;
+    }
+  }
+  EXPECT_EQ(admitted, 5u);
+  EXPECT_NE(message.find("request rate limit exceeded"), std::string::npos)
+      << message;
+
+  // Other models are not limited
+  for (size_t i = 0; i < 20; ++i) {
+    ni::AdmissionController::Ticket ticket;
+    EXPECT_TRUE(controller->Admit("other", "grpc", &ticket, &message));
+  }
+
+  // The bucket refills at the configured rate
+  std::this_thread::sleep_for(std::chrono::milliseconds(250));
+  ni::AdmissionController::Ticket ticket;
+  EXPECT_TRUE(controller->Admit("limited", "grpc", &ticket, &message));
+}
+
+TEST(AdmissionControllerTest, ModelRejectionReturnsGlobalSlot)
+{
+  ni::AdmissionController::Options options;
+  options.global_.max_inflight_ = 1;
+  options.models_["limited"].rate_ = 1;
+  auto controller = CreateController(options);
+
+  std::string message;
+  {
+    ni::AdmissionController::Ticket ticket;
+    EXPECT_TRUE(controller->Admit("limited", "http", &ticket, &message));
+  }
+  {
+    // Rejected by the model rate, must not keep the global slot
+    ni::AdmissionController::Ticket ticket;
+    EXPECT_FALSE(controller->Admit("limited", "http", &ticket, &message));
+  }
+  ni::AdmissionController::Ticket ticket;
+  EXPECT_TRUE(controller->Admit("other", "http", &ticket, &message));
+}
+
+TEST(AdmissionControllerTest, QueueDelay)
+{
+  ni::AdmissionController::Options options;
+  options.global_.target_delay_us_ = 1000;
+  options.global_.interval_us_ = 10000;
+  auto controller = CreateController(options);
+
+  // Requests that take longer than the target start to be rejected after
+  // an interval, at an increasing rate
+  std::string message;
+  std::vector<std::chrono::steady_clock::time_point> rejections;
+  const auto start = std::chrono::steady_clock::now();
+  while (std::chrono::steady_clock::now() - start <
+         std::chrono::milliseconds(200)) {
+    ni::AdmissionController::Ticket ticket;
+    if (!controller->Admit("model", "http", &ticket, &message)) {
+      rejections.push_back(std::chrono::steady_clock::now());
+      continue;
+    }
+    std::this_thread::sleep_for(std::chrono::milliseconds(2));
+  }
+  ASSERT_GT(rejections.size(), 2u);
+  EXPECT_GE(rejections.front() - start, std::chrono::milliseconds(10));
+  EXPECT_NE(message.find("queue delay above target"), std::string::npos)
+      << message;
+
+  // A request released within the target stops the rejections
+  bool admitted = false;
+  ni::AdmissionController::Ticket ticket;
+  while (!admitted) {
+    admitted = controller->Admit("model", "http", &ticket, &message);
+  }
+  ticket.Release();
+  for (size_t i = 0; i < 20; ++i) {
+    EXPECT_TRUE(controller->Admit("model", "http", &ticket, &message));
+    ticket.Release();
+  }
+}
+
+TEST(AdmissionControllerTest, InvalidOptions)
+{
+  ni::AdmissionController::Options options;
+  options.models_["model"].burst_ = 4;
+  std::shared_ptr<ni::AdmissionController> controller;
+  TRITONSERVER_Error* err =
+      ni::AdmissionController::Create(options, &controller);
+  ASSERT_NE(err, nullptr);
+  EXPECT_EQ(TRITONSERVER_ErrorCode(err), TRITONSERVER_ERROR_INVALID_ARG);
+  TRITONSERVER_ErrorDelete(err);
+  EXPECT_FALSE(options.Enabled());
+}
+
+}  // namespace
+
+int
+main(int argc, char** argv)
+{
+  ::testing::InitGoogleTest(&argc, argv);
+  return RUN_ALL_TESTS();
+}
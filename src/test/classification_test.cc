@@ -0,0 +1,163 @@
+// Copyright 2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#include "classification.h"
+
+#include <chrono>
+#include <cstdint>
+#include <iostream>
+#include <numeric>
+#include <random>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+namespace ni = triton::server;
+
+namespace {
+
+// Reference selection, full sort with equal values ordered by index
+template <typename T>
+std::vector<size_t>
+SortedIndices(const std::vector<T>& values, const size_t k)
+{
+  std::vector<size_t> idx(values.size());
+  std::iota(idx.begin(), idx.end(), 0);
+  std::stable_sort(idx.begin(), idx.end(), [&values](size_t a, size_t b) {
+    return values[a] > values[b];
+  });
+  idx.resize(std::min(k, values.size()));
+  return idx;
+}
+
+template <typename T>
+std::vector<T>
+RandomValues(const size_t cnt, const int distinct, std::mt19937* rng)
+{
+  std::uniform_int_distribution<int> dist(0, distinct - 1);
+  std::vector<T> values(cnt);
+  for (auto& value : values) {
+    value = static_cast<T>(dist(*rng));
+  }
+  return values;
+}
+
+template <typename T>
+void
+CheckTopk(const std::vector<T>& values)
+{
+  const size_t cnt = values.size();
+  std::vector<size_t> idx;
+  for (const size_t k :
+       {size_t(0), size_t(1), size_t(5), size_t(17), cnt / 16, cnt / 2, cnt,
+        cnt + 3}) {
+    ni::TopkIndices(values.data(), cnt, k, &idx);
+    EXPECT_EQ(idx, SortedIndices(values, k))
+        << "element count " << cnt << ", k " << k;
+  }
+}
+
+class ClassificationTest : public ::testing::Test {
+ protected:
+  std::mt19937 rng_{1234};
+};
+
+TEST_F(ClassificationTest, TopkMatchesSort)
+{
+  for (const size_t cnt : {1, 7, 16, 100, 1000, 4099}) {
+    CheckTopk(RandomValues<float>(cnt, 1 << 20, &rng_));
+    CheckTopk(RandomValues<double>(cnt, 1 << 20, &rng_));
+    CheckTopk(RandomValues<int64_t>(cnt, 1 << 20, &rng_));
+  }
+}
+
+TEST_F(ClassificationTest, TopkTies)
+{
+  // Few distinct values, ties must be ordered by index
+  for (const size_t cnt : {5, 64, 1000, 4099}) {
+    CheckTopk(RandomValues<uint8_t>(cnt, 3, &rng_));
+    CheckTopk(RandomValues<int8_t>(cnt, 7, &rng_));
+    CheckTopk(RandomValues<float>(cnt, 10, &rng_));
+  }
+  CheckTopk(std::vector<uint16_t>(1000, 7));
+}
+
+TEST_F(ClassificationTest, TopkSortedInput)
+{
+  // Ascending input replaces the heap top on every element
+  std::vector<float> values(10000);
+  std::iota(values.begin(), values.end(), 0.0f);
+  CheckTopk(values);
+  std::reverse(values.begin(), values.end());
+  CheckTopk(values);
+}
+
+TEST_F(ClassificationTest, TopkBenchmark)
+{
+  // Compare against the full sort used before, for a large vocabulary
+  constexpr size_t kClassCnt = 100000;
+  constexpr int kIterations = 50;
+  const std::vector<float> values =
+      RandomValues<float>(kClassCnt, 1 << 24, &rng_);
+
+  for (const size_t k : {size_t(1), size_t(5), size_t(100), size_t(1000)}) {
+    std::vector<size_t> idx;
+    auto start = std::chrono::steady_clock::now();
+    for (int i = 0; i < kIterations; ++i) {
+      idx.resize(kClassCnt);
+      std::iota(idx.begin(), idx.end(), 0);
+      std::sort(idx.begin(), idx.end(), [&values](size_t a, size_t b) {
+        return values[a] > values[b];
+      });
+    }
+    const auto sort_ns = std::chrono::duration_cast<std::chrono::nanoseconds>(
+                             std::chrono::steady_clock::now() - start)
+                             .count() /
+                         kIterations;
+
+    start = std::chrono::steady_clock::now();
+    for (int i = 0; i < kIterations; ++i) {
+      ni::TopkIndices(values.data(), kClassCnt, k, &idx);
+    }
+    const auto topk_ns = std::chrono::duration_cast<std::chrono::nanoseconds>(
+                             std::chrono::steady_clock::now() - start)
+                             .count() /
+                         kIterations;
+
+    std::cout << "classes " << kClassCnt << ", k " << k << ": full sort "
+              << sort_ns / 1000 << " us, top-k " << topk_ns / 1000 << " us"
+              << std::endl;
+    EXPECT_EQ(idx, SortedIndices(values, k));
+  }
+}
+
+}  // namespace
+
+int
+main(int argc, char** argv)
+{
+  ::testing::InitGoogleTest(&argc, argv);
+  return RUN_ALL_TESTS();
+}
@@ -34,6 +34,7 @@
 
 #include <event2/buffer.h>
 
+#include <algorithm>
 #include <chrono>
 #include <condition_variable>
 #include <fstream>
@@ -616,6 +617,219 @@ TEST_F(DataCompressorTest, CompressGzipBuffer)
   WriteEVBufferToFile("generated_gzip_compressed_data", compressed);
 }
 
+// Representative tensor payloads of 'byte_size' bytes each
+std::vector<std::pair<std::string, std::vector<char>>>
+TensorPayloads(const size_t byte_size)
+{
+  std::mt19937 rng(0);
+  std::vector<std::pair<std::string, std::vector<char>>> payloads;
+
+  // Dense FP32 embeddings
+  {
+    std::normal_distribution<float> dist(0.0f, 1.0f);
+    std::vector<float> values(byte_size / sizeof(float));
+    for (auto& value : values) {
+      value = dist(rng);
+    }
+    payloads.emplace_back(
+        "fp32 embedding",
+        std::vector<char>(
+            reinterpret_cast<char*>(values.data()),
+            reinterpret_cast<char*>(values.data() + values.size())));
+  }
+
+  // FP32 activations after ReLU, about half of the values are zero
+  {
+    std::normal_distribution<float> dist(0.0f, 1.0f);
+    std::vector<float> values(byte_size / sizeof(float));
+    for (auto& value : values) {
+      value = std::max(0.0f, dist(rng));
+    }
+    payloads.emplace_back(
+        "fp32 relu activation",
+        std::vector<char>(
+            reinterpret_cast<char*>(values.data()),
+            reinterpret_cast<char*>(values.data() + values.size())));
+  }
+
+  // INT64 token ids from a 32k vocabulary
+  {
+    std::uniform_int_distribution<int64_t> dist(0, 32000);
+    std::vector<int64_t> values(byte_size / sizeof(int64_t));
+    for (auto& value : values) {
+      value = dist(rng);
+    }
+    payloads.emplace_back(
+        "int64 token ids",
+        std::vector<char>(
+            reinterpret_cast<char*>(values.data()),
+            reinterpret_cast<char*>(values.data() + values.size())));
+  }
+  return payloads;
+}
+
+std::vector<ni::DataCompressor::Type>
+SupportedTypes()
+{
+  std::vector<ni::DataCompressor::Type> types{
+      ni::DataCompressor::Type::GZIP, ni::DataCompressor::Type::DEFLATE};
+  for (const auto type :
+       {ni::DataCompressor::Type::ZSTD, ni::DataCompressor::Type::LZ4}) {
+    if (ni::DataCompressor::ParseType(ni::DataCompressor::TypeString(type)) ==
+        type) {
+      types.push_back(type);
+    }
+  }
+  return types;
+}
+
+TEST(DataCompressorStreamTest, ParseType)
+{
+  EXPECT_EQ(
+      ni::DataCompressor::ParseType("identity"),
+      ni::DataCompressor::Type::IDENTITY);
+  EXPECT_EQ(
+      ni::DataCompressor::ParseType("gzip"), ni::DataCompressor::Type::GZIP);
+  EXPECT_EQ(
+      ni::DataCompressor::ParseType("deflate"),
+      ni::DataCompressor::Type::DEFLATE);
+  EXPECT_EQ(
+      ni::DataCompressor::ParseType("br"), ni::DataCompressor::Type::UNKNOWN);
+  EXPECT_EQ(
+      ni::DataCompressor::ParseType(""), ni::DataCompressor::Type::UNKNOWN);
+
+  auto err = ni::DataCompressor::CheckLevel(ni::DataCompressor::Type::GZIP, 9);
+  EXPECT_TRUE((err == nullptr)) << TRITONSERVER_ErrorMessage(err);
+  err = ni::DataCompressor::CheckLevel(ni::DataCompressor::Type::GZIP, 10);
+  EXPECT_TRUE((err != nullptr)) << "Expect error for invalid gzip level";
+  err = ni::DataCompressor::CheckLevel(ni::DataCompressor::Type::IDENTITY, 1);
+  EXPECT_TRUE((err != nullptr)) << "Expect error for identity level";
+}
+
+TEST(DataCompressorStreamTest, ChunkedRoundTrip)
+{
+  const auto payloads = TensorPayloads(1024 * 1024 + 123);
+  for (const auto type : SupportedTypes()) {
+    for (const int level : {ni::DataCompressor::kDefaultLevel, 1}) {
+      for (const auto& payload : payloads) {
+        const std::string desc =
+            std::string(ni::DataCompressor::TypeString(type)) + " level " +
+            std::to_string(level) + ", " + payload.first;
+        // Append the payload in uneven chunks, as the outputs of a response
+        // would be appended
+        auto compressed = evbuffer_new();
+        std::unique_ptr<ni::DataCompressor::Stream> stream;
+        auto err = ni::DataCompressor::Stream::Create(
+            type, level, compressed, &stream);
+        ASSERT_TRUE((err == nullptr))
+            << desc << ": " << TRITONSERVER_ErrorMessage(err);
+        size_t offset = 0;
+        size_t chunk_size = 7;
+        while (offset < payload.second.size()) {
+          const size_t size =
+              std::min(chunk_size, payload.second.size() - offset);
+          err = stream->Append(payload.second.data() + offset, size);
+          ASSERT_TRUE((err == nullptr))
+              << desc << ": " << TRITONSERVER_ErrorMessage(err);
+          offset += size;
+          chunk_size *= 3;
+        }
+        err = stream->Finish();
+        ASSERT_TRUE((err == nullptr))
+            << desc << ": " << TRITONSERVER_ErrorMessage(err);
+        // The compressed embedding is larger than an output chunk
+        if (payload.first == "fp32 embedding") {
+          EXPECT_GT(evbuffer_peek(compressed, -1, NULL, NULL, 0), 1)
+              << desc << ": expect compressed data in multiple chunks";
+        }
+
+        auto decompressed = evbuffer_new();
+        err =
+            ni::DataCompressor::DecompressData(type, compressed, decompressed);
+        ASSERT_TRUE((err == nullptr))
+            << desc << ": " << TRITONSERVER_ErrorMessage(err);
+        std::vector<char> res;
+        EVBufferToContiguousBuffer(decompressed, &res);
+        EXPECT_TRUE((res == payload.second)) << desc << ": data mismatch";
+        evbuffer_free(compressed);
+        evbuffer_free(decompressed);
+      }
+    }
+  }
+}
+
+TEST(DataCompressorStreamTest, TruncatedData)
+{
+  const auto payloads = TensorPayloads(64 * 1024);
+  for (const auto type : SupportedTypes()) {
+    if ((type == ni::DataCompressor::Type::GZIP) ||
+        (type == ni::DataCompressor::Type::DEFLATE)) {
+      // zlib decompression doesn't detect truncated data
+      continue;
+    }
+    auto source = evbuffer_new();
+    evbuffer_add(source, payloads[0].second.data(), payloads[0].second.size());
+    auto compressed = evbuffer_new();
+    auto err = ni::DataCompressor::CompressData(type, source, compressed);
+    ASSERT_TRUE((err == nullptr)) << TRITONSERVER_ErrorMessage(err);
+    auto truncated = evbuffer_new();
+    evbuffer_remove_buffer(
+        compressed, truncated, evbuffer_get_length(compressed) / 2);
+    auto decompressed = evbuffer_new();
+    err = ni::DataCompressor::DecompressData(type, truncated, decompressed);
+    EXPECT_TRUE((err != nullptr)) << ni::DataCompressor::TypeString(type)
+                                  << ": expect error for truncated data";
+    evbuffer_free(source);
+    evbuffer_free(compressed);
+    evbuffer_free(truncated);
+    evbuffer_free(decompressed);
+  }
+}
+
+TEST(DataCompressorStreamTest, CodecBenchmark)
+{
+  constexpr size_t kByteSize = 2 * 1024 * 1024;
+  constexpr int kIterations = 3;
+  const auto payloads = TensorPayloads(kByteSize);
+  std::vector<std::pair<ni::DataCompressor::Type, int>> settings;
+  for (const auto type : SupportedTypes()) {
+    settings.emplace_back(type, ni::DataCompressor::kDefaultLevel);
+    settings.emplace_back(type, 1);
+  }
+
+  for (const auto& payload : payloads) {
+    auto source = evbuffer_new();
+    evbuffer_add(source, payload.second.data(), payload.second.size());
+    for (const auto& setting : settings) {
+      size_t compressed_size = 0;
+      auto start = std::chrono::steady_clock::now();
+      for (int i = 0; i < kIterations; ++i) {
+        auto compressed = evbuffer_new();
+        auto err = ni::DataCompressor::CompressData(
+            setting.first, source, compressed, setting.second);
+        ASSERT_TRUE((err == nullptr)) << TRITONSERVER_ErrorMessage(err);
+        compressed_size = evbuffer_get_length(compressed);
+        evbuffer_free(compressed);
+      }
+      const auto compress_ns =
+          std::chrono::duration_cast<std::chrono::nanoseconds>(
+              std::chrono::steady_clock::now() - start)
+              .count() /
+          kIterations;
+
+      std::cout << payload.first << ", "
+                << ni::DataCompressor::TypeString(setting.first) << " level "
+                << ((setting.second == ni::DataCompressor::kDefaultLevel)
+                        ? std::string("default")
+                        : std::to_string(setting.second))
+                << ": ratio " << (double)payload.second.size() / compressed_size
+                << ", " << (payload.second.size() * 1000.0 / compress_ns)
+                << " MB/s" << std::endl;
+    }
+    evbuffer_free(source);
+  }
+}
+
 }  // namespace
 
 int
@@ -0,0 +1,138 @@
+// Copyright 2024, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#include "model_load_planner.h"
+
+#include <string>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+namespace ni = triton::server;
+
+namespace {
+
+ni::ModelLoadPlanner::Model
+MakeModel(
+    const std::string& name, const uint64_t byte_size,
+    const std::vector<size_t>& dependencies = {})
+{
+  ni::ModelLoadPlanner::Model model;
+  model.name_ = name;
+  model.byte_size_ = byte_size;
+  model.dependencies_ = dependencies;
+  return model;
+}
+
+void
+Start(std::vector<ni::ModelLoadPlanner::Model>* models, const int idx)
+{
+  ASSERT_GE(idx, 0);
+  (*models)[idx].started_ = true;
+}
+
+void
+Finish(std::vector<ni::ModelLoadPlanner::Model>* models, const int idx)
+{
+  ASSERT_GE(idx, 0);
+  (*models)[idx].finished_ = true;
+}
+
+TEST(ModelLoadPlannerTest, LargestFirst)
+{
+  std::vector<ni::ModelLoadPlanner::Model> models{
+      MakeModel("small", 10), MakeModel("large", 1000),
+      MakeModel("medium", 100)};
+
+  int next = ni::ModelLoadPlanner::NextModel(models);
+  EXPECT_EQ(next, 1);
+  Start(&models, next);
+  next = ni::ModelLoadPlanner::NextModel(models);
+  EXPECT_EQ(next, 2);
+  Start(&models, next);
+  next = ni::ModelLoadPlanner::NextModel(models);
+  EXPECT_EQ(next, 0);
+  Start(&models, next);
+
+  // Everything started
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), -1);
+}
+
+TEST(ModelLoadPlannerTest, EnsembleAfterSteps)
+{
+  // The ensemble is the largest but must wait for its steps
+  std::vector<ni::ModelLoadPlanner::Model> models{
+      MakeModel("ensemble", 5000, {1, 2}), MakeModel("step_a", 100),
+      MakeModel("step_b", 10)};
+
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 1);
+  Start(&models, 1);
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 2);
+  Start(&models, 2);
+
+  // Nothing to do until both steps are loaded
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), -1);
+  Finish(&models, 2);
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), -1);
+  Finish(&models, 1);
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 0);
+}
+
+TEST(ModelLoadPlannerTest, IndependentModelsWhileWaiting)
+{
+  // A model without dependencies is loaded while an ensemble waits
+  std::vector<ni::ModelLoadPlanner::Model> models{
+      MakeModel("ensemble", 5000, {1}), MakeModel("step", 100),
+      MakeModel("other", 10)};
+
+  Start(&models, ni::ModelLoadPlanner::NextModel(models));
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 2);
+}
+
+TEST(ModelLoadPlannerTest, DependencyCycle)
+{
+  // Models that depend on each other are still loaded, once nothing is
+  // loading, so that the server reports the error
+  std::vector<ni::ModelLoadPlanner::Model> models{
+      MakeModel("a", 10, {1}), MakeModel("b", 100, {0}), MakeModel("c", 1)};
+
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 2);
+  Start(&models, 2);
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), -1);
+  Finish(&models, 2);
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 1);
+  Start(&models, 1);
+  Finish(&models, 1);
+  EXPECT_EQ(ni::ModelLoadPlanner::NextModel(models), 0);
+}
+
+}  // namespace
+
+int
+main(int argc, char** argv)
+{
+  ::testing::InitGoogleTest(&argc, argv);
+  return RUN_ALL_TESTS();
+}
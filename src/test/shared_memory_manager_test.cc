@@ -0,0 +1,244 @@
+// Copyright 2023, NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+//
+// Redistribution and use in source and binary forms, with or without
+// modification, are permitted provided that the following conditions
+// are met:
+//  * Redistributions of source code must retain the above copyright
+//    notice, this list of conditions and the following disclaimer.
+//  * Redistributions in binary form must reproduce the above copyright
+//    notice, this list of conditions and the following disclaimer in the
+//    documentation and/or other materials provided with the distribution.
+//  * Neither the name of NVIDIA CORPORATION nor the names of its
+//    contributors may be used to endorse or promote products derived
+//    from this software without specific prior written permission.
+//
+// THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+// EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+// IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+// PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+// CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+// EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+// PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+// PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+// OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+// (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+// OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#include "shared_memory_manager.h"
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+#include <atomic>
+#include <chrono>
+#include <cstring>
+#include <iostream>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+namespace ni = triton::server;
+
+namespace {
+
+constexpr size_t kRegionByteSize = 4096;
+
+#define EXPECT_NO_ERR(X)                                   \
+  do {                                                     \
+    TRITONSERVER_Error* err__ = (X);                       \
+    EXPECT_EQ(err__, nullptr)                              \
+        << #X << ": " << TRITONSERVER_ErrorMessage(err__); \
+    if (err__ != nullptr) {                                \
+      TRITONSERVER_ErrorDelete(err__);                     \
+    }                                                      \
+  } while (false)
+
+class SharedMemoryManagerTest : public ::testing::Test {
+ protected:
+  void TearDown() override
+  {
+    for (const auto& key : shm_keys_) {
+      shm_unlink(key.c_str());
+    }
+  }
+
+  // Create a shared memory object for each region, as the manager doesn't
+  // support registering several regions from one object.
+  std::string ShmKey(const std::string& region)
+  {
+    const std::string key =
+        "/shm_manager_test_" + std::to_string(getpid()) + "_" + region;
+    int fd = shm_open(key.c_str(), O_RDWR | O_CREAT, S_IRUSR | S_IWUSR);
+    EXPECT_NE(fd, -1);
+    EXPECT_EQ(ftruncate(fd, kRegionByteSize), 0);
+    close(fd);
+    shm_keys_.push_back(key);
+    return key;
+  }
+
+  // Lookup loop run by each reader thread, returns the number of lookups
+  // done until 'stop' is set. Lookups of a region that is concurrently
+  // unregistered may fail with NOT_FOUND but must never return an
+  // unmapped address.
+  static size_t Lookup(
+      ni::SharedMemoryManager* manager, const std::string& name,
+      const std::atomic<bool>& stop, std::mutex* outer_mu)
+  {
+    size_t count = 0;
+    while (!stop.load(std::memory_order_relaxed)) {
+      void* base;
+      TRITONSERVER_MemoryType memory_type;
+      int64_t memory_type_id;
+      std::shared_ptr<const ni::SharedMemoryManager::SharedMemoryInfo> info;
+      TRITONSERVER_Error* err;
+      if (outer_mu != nullptr) {
+        std::lock_guard<std::mutex> lk(*outer_mu);
+        err = manager->GetMemoryInfo(
+            name, 0, 64, &base, &memory_type, &memory_type_id, &info);
+      } else {
+        err = manager->GetMemoryInfo(
+            name, 0, 64, &base, &memory_type, &memory_type_id, &info);
+      }
+      if (err != nullptr) {
+        EXPECT_EQ(TRITONSERVER_ErrorCode(err), TRITONSERVER_ERROR_NOT_FOUND);
+        TRITONSERVER_ErrorDelete(err);
+      } else {
+        // Touch the memory as an inference would, the reference keeps it
+        // mapped even if the region is unregistered meanwhile
+        const uint8_t value = static_cast<volatile uint8_t*>(base)[0];
+        (void)value;
+      }
+      ++count;
+    }
+    return count;
+  }
+
+  std::vector<std::string> shm_keys_;
+};
+
+TEST_F(SharedMemoryManagerTest, ReferenceOutlivesUnregister)
+{
+  ni::SharedMemoryManager manager;
+  const std::string shm_key = ShmKey("region");
+  EXPECT_NO_ERR(manager.RegisterSystemSharedMemory(
+      "region", shm_key, 0, kRegionByteSize));
+
+  void* base;
+  TRITONSERVER_MemoryType memory_type;
+  int64_t memory_type_id;
+  std::shared_ptr<const ni::SharedMemoryManager::SharedMemoryInfo> info;
+  EXPECT_NO_ERR(manager.GetMemoryInfo(
+      "region", 16, 32, &base, &memory_type, &memory_type_id, &info));
+  ASSERT_NE(info, nullptr);
+  EXPECT_EQ(memory_type, TRITONSERVER_MEMORY_CPU);
+
+  EXPECT_NO_ERR(manager.Unregister("region", TRITONSERVER_MEMORY_CPU));
+  TRITONSERVER_Error* err = manager.GetMemoryInfo(
+      "region", 16, 32, &base, &memory_type, &memory_type_id);
+  ASSERT_NE(err, nullptr);
+  EXPECT_EQ(TRITONSERVER_ErrorCode(err), TRITONSERVER_ERROR_NOT_FOUND);
+  TRITONSERVER_ErrorDelete(err);
+
+  // Still mapped through the reference
+  EXPECT_NE(info->mapped_addr_, nullptr);
+  std::memset(base, 0x5a, 32);
+  EXPECT_EQ(static_cast<uint8_t*>(base)[31], 0x5a);
+
+  // The name can be reused while the old region is still referenced
+  EXPECT_NO_ERR(manager.RegisterSystemSharedMemory(
+      "region", shm_key, 0, kRegionByteSize));
+  info.reset();
+  EXPECT_NO_ERR(manager.UnregisterAll(TRITONSERVER_MEMORY_CPU));
+}
+
+TEST_F(SharedMemoryManagerTest, RegisterUnregisterWhileLookup)
+{
+  ni::SharedMemoryManager manager;
+  const std::string churn_key = ShmKey("churn");
+  EXPECT_NO_ERR(manager.RegisterSystemSharedMemory(
+      "stable", ShmKey("stable"), 0, kRegionByteSize));
+
+  std::atomic<bool> stop{false};
+  std::vector<std::thread> readers;
+  for (const auto& name : {"stable", "churn", "stable", "churn"}) {
+    readers.emplace_back(
+        [&manager, &stop, name] { Lookup(&manager, name, stop, nullptr); });
+  }
+
+  for (int i = 0; i < 500; ++i) {
+    EXPECT_NO_ERR(manager.RegisterSystemSharedMemory(
+        "churn", churn_key, 0, kRegionByteSize));
+    EXPECT_NO_ERR(manager.Unregister("churn", TRITONSERVER_MEMORY_CPU));
+  }
+  stop = true;
+  for (auto& reader : readers) {
+    reader.join();
+  }
+
+  triton::common::TritonJson::Value status(
+      triton::common::TritonJson::ValueType::ARRAY);
+  EXPECT_NO_ERR(manager.GetStatus("", TRITONSERVER_MEMORY_CPU, &status));
+  EXPECT_EQ(status.ArraySize(), 1u);
+}
+
+TEST_F(SharedMemoryManagerTest, LookupBenchmark)
+{
+  // Compare lookup throughput against lookups serialized on one mutex, as
+  // they were before, with a concurrent register / unregister of another
+  // region every millisecond.
+  constexpr auto kDuration = std::chrono::milliseconds(500);
+  ni::SharedMemoryManager manager;
+  const std::string writer_key = ShmKey("writer");
+  EXPECT_NO_ERR(manager.RegisterSystemSharedMemory(
+      "region", ShmKey("region"), 0, kRegionByteSize));
+
+  const size_t max_threads =
+      std::max(2u, std::min(16u, std::thread::hardware_concurrency()));
+  for (size_t thread_cnt = 1; thread_cnt <= max_threads; thread_cnt *= 2) {
+    size_t counts[2] = {0, 0};
+    for (const bool serialized : {true, false}) {
+      std::mutex outer_mu;
+      std::atomic<bool> stop{false};
+      std::vector<size_t> thread_counts(thread_cnt, 0);
+      std::vector<std::thread> readers;
+      for (size_t t = 0; t < thread_cnt; ++t) {
+        readers.emplace_back([&, t] {
+          thread_counts[t] = Lookup(
+              &manager, "region", stop, serialized ? &outer_mu : nullptr);
+        });
+      }
+      const auto end = std::chrono::steady_clock::now() + kDuration;
+      while (std::chrono::steady_clock::now() < end) {
+        EXPECT_NO_ERR(manager.RegisterSystemSharedMemory(
+            "writer", writer_key, 0, kRegionByteSize));
+        EXPECT_NO_ERR(manager.Unregister("writer", TRITONSERVER_MEMORY_CPU));
+        std::this_thread::sleep_for(std::chrono::milliseconds(1));
+      }
+      stop = true;
+      for (auto& reader : readers) {
+        reader.join();
+      }
+      for (const auto count : thread_counts) {
+        counts[serialized ? 0 : 1] += count;
+      }
+    }
+
+    const double seconds = std::chrono::duration<double>(kDuration).count();
+    std::cout << "threads " << thread_cnt << ": serialized lookups "
+              << static_cast<size_t>(counts[0] / seconds)
+              << "/s, shared lookups "
+              << static_cast<size_t>(counts[1] / seconds) << "/s" << std::endl;
+  }
+  EXPECT_NO_ERR(manager.UnregisterAll(TRITONSERVER_MEMORY_CPU));
+}
+
+}  // namespace
+
+int
+main(int argc, char** argv)
+{
+  ::testing::InitGoogleTest(&argc, argv);
+  return RUN_ALL_TESTS();
+}
@@ -28,11 +28,23 @@
 
 #include <stdlib.h>
 
+#include <algorithm>
+#include <cmath>
+#include <cstdio>
+#include <limits>
+
 #include "common.h"
 #include "triton/common/logging.h"
 #ifdef TRITON_ENABLE_GPU
 #include <cuda_runtime_api.h>
 #endif  // TRITON_ENABLE_GPU
+#ifdef TRITON_ENABLE_ZSTD
+#include <zstd.h>
+#endif  // TRITON_ENABLE_ZSTD
+#ifdef __linux__
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif  // __linux__
 #ifndef _WIN32
 #include "opentelemetry/sdk/resource/semantic_conventions.h"
 #include "opentelemetry/sdk/trace/batch_span_processor_factory.h"
@@ -41,6 +53,43 @@ namespace otel_common = opentelemetry::common;
 
 namespace triton { namespace server {
 
+namespace {
+
+// Return the global 'traces-per-second' trace setting, 0 if not set.
+uint32_t
+TracesPerSecond(const TraceConfigMap& config_map)
+{
+  const auto it = config_map.find("");
+  if (it != config_map.end()) {
+    for (const auto& [setting, value] : it->second) {
+      if ((setting == "traces-per-second") &&
+          std::holds_alternative<uint32_t>(value)) {
+        return std::get<uint32_t>(value);
+      }
+    }
+  }
+  return 0;
+}
+
+// Binary trace file header, followed by the format version and the
+// compression of the record blocks.
+constexpr char kBinaryTraceMagic[] = "TRTTRACE";
+constexpr uint32_t kBinaryTraceVersion = 1;
+#ifdef TRITON_ENABLE_ZSTD
+constexpr int kTraceZstdLevel = 3;
+#endif  // TRITON_ENABLE_ZSTD
+
+// Append 'value' to 'buffer' in little-endian byte order.
+void
+AppendUInt32(std::string* buffer, const uint32_t value)
+{
+  for (size_t i = 0; i < sizeof(value); ++i) {
+    buffer->push_back(static_cast<char>((value >> (8 * i)) & 0xFF));
+  }
+}
+
+}  // namespace
+
 TRITONSERVER_Error*
 TraceManager::Create(
     TraceManager** manager, const TRITONSERVER_InferenceTraceLevel level,
@@ -63,7 +112,7 @@ TraceManager::TraceManager(
     const std::string& filepath, const InferenceTraceMode mode,
     const TraceConfigMap& config_map)
 {
-  std::shared_ptr<TraceFile> file(new TraceFile(filepath));
+  std::shared_ptr<TraceFile> file(new TraceFile(filepath, config_map));
   global_default_.reset(new TraceSetting(
       level, rate, count, log_frequency, file, mode, config_map,
       false /*level_specified*/, false /*rate_specified*/,
@@ -172,7 +221,7 @@ TraceManager::UpdateTraceSettingInternal(
   }
   if (count_specified) {
     count = (new_setting.count_ != nullptr) ? *new_setting.count_
-                                            : current_setting->count_;
+                                            : current_setting->count_.load();
   }
   if (log_frequency_specified) {
     log_frequency = (new_setting.log_frequency_ != nullptr)
@@ -195,7 +244,7 @@ TraceManager::UpdateTraceSettingInternal(
       fallback_used_models_.erase(model_name);
     } else if (none_specified) {
       // Simply let the model uses global setting
-      std::lock_guard<std::mutex> r_lk(r_mu_);
+      std::lock_guard<std::shared_mutex> r_lk(r_mu_);
       model_settings_.erase(model_name);
       return nullptr;
     } else {
@@ -214,7 +263,7 @@ TraceManager::UpdateTraceSettingInternal(
     }
   }
   if (file == nullptr) {
-    file.reset(new TraceFile(filepath));
+    file.reset(new TraceFile(filepath, config_map));
     trace_files_.emplace(filepath, file);
   }
 
@@ -237,7 +286,7 @@ TraceManager::UpdateTraceSettingInternal(
   // of there are ongoing traces. This makes sure those traces are referring
   // to the setting when the traces are sampled.
   {
-    std::lock_guard<std::mutex> r_lk(r_mu_);
+    std::lock_guard<std::shared_mutex> r_lk(r_mu_);
     if (model_name.empty()) {
       // global update
       global_setting_ = std::move(lts);
@@ -265,7 +314,7 @@ TraceManager::GetTraceSetting(
 {
   std::shared_ptr<TraceSetting> trace_setting;
   {
-    std::lock_guard<std::mutex> r_lk(r_mu_);
+    std::shared_lock<std::shared_mutex> r_lk(r_mu_);
     auto m_it = model_settings_.find(model_name);
     trace_setting =
         (m_it == model_settings_.end()) ? global_setting_ : m_it->second;
@@ -284,7 +333,7 @@ void
 TraceManager::GetTraceSetting(
     const std::string& model_name, std::shared_ptr<TraceSetting>& trace_setting)
 {
-  std::lock_guard<std::mutex> r_lk(r_mu_);
+  std::shared_lock<std::shared_mutex> r_lk(r_mu_);
   auto m_it = model_settings_.find(model_name);
   trace_setting =
       (m_it == model_settings_.end()) ? global_setting_ : m_it->second;
@@ -1080,6 +1129,42 @@ TraceManager::TraceTensorActivity(
   }
 }
 
+TraceManager::TraceFile::TraceFile(
+    const std::string& file_name, const TraceConfigMap& config_map)
+    : TraceFile(file_name)
+{
+  const auto it = config_map.find(std::to_string(TRACE_MODE_TRITON));
+  if (it == config_map.end()) {
+    return;
+  }
+  // The values are validated when the command line is parsed
+  for (const auto& [setting, value_variant] : it->second) {
+    const std::string* value = std::get_if<std::string>(&value_variant);
+    if (value == nullptr) {
+      continue;
+    }
+    if (setting == "format") {
+      format_ = (*value == "binary") ? Format::BINARY : Format::JSON;
+    } else if (setting == "compression") {
+      compression_ = (*value == "zstd") ? Compression::ZSTD : Compression::NONE;
+    } else if (setting == "max-file-size") {
+      max_file_size_ = std::stoull(*value);
+    } else if (setting == "rotation-interval") {
+      rotation_interval_s_ = std::stoull(*value);
+    } else if (setting == "max-files") {
+      max_files_ = std::stoul(*value);
+    }
+  }
+#ifndef TRITON_ENABLE_ZSTD
+  if (compression_ == Compression::ZSTD) {
+    LOG_ERROR << "zstd trace compression is not supported by this build, "
+                 "writing uncompressed traces to "
+              << file_name_;
+    compression_ = Compression::NONE;
+  }
+#endif  // TRITON_ENABLE_ZSTD
+}
+
 TraceManager::TraceFile::~TraceFile()
 {
   if (!first_write_) {
@@ -1089,27 +1174,36 @@ TraceManager::TraceFile::~TraceFile()
 
 void
 TraceManager::TraceFile::SaveTraces(
-    std::stringstream& trace_stream, const bool to_index_file)
+    const std::vector<std::string>& traces, const bool to_index_file)
 {
   try {
-    if (to_index_file) {
+    if (format_ == Format::BINARY) {
+      WriteBlock(traces);
+    } else if (to_index_file) {
       std::string file_name =
           file_name_ + "." + std::to_string(index_.fetch_add(1));
       std::ofstream file_stream;
       file_stream.open(file_name);
       file_stream << "[";
-      file_stream << trace_stream.rdbuf();
+      for (size_t i = 0; i < traces.size(); ++i) {
+        if (i != 0) {
+          file_stream << ",";
+        }
+        file_stream << traces[i];
+      }
       file_stream << "]";
     } else {
       std::lock_guard<std::mutex> lock(mu_);
-      if (first_write_) {
-        trace_file_.open(file_name_);
-        trace_file_ << "[";
-        first_write_ = false;
-      } else {
-        trace_file_ << ",";
+      for (const auto& trace : traces) {
+        if (first_write_) {
+          trace_file_.open(file_name_);
+          trace_file_ << "[";
+          first_write_ = false;
+        } else {
+          trace_file_ << ",";
+        }
+        trace_file_ << trace;
       }
-      trace_file_ << trace_stream.rdbuf();
     }
   }
   catch (const std::ofstream::failure& e) {
@@ -1120,29 +1214,114 @@ TraceManager::TraceFile::SaveTraces(
   }
 }
 
+void
+TraceManager::TraceFile::WriteBlock(const std::vector<std::string>& traces)
+{
+  // Each trace is a record holding a JSON array of its trace objects
+  std::string records;
+  for (const auto& trace : traces) {
+    AppendUInt32(&records, trace.size() + 2);
+    records += "[";
+    records += trace;
+    records += "]";
+  }
+#ifdef TRITON_ENABLE_ZSTD
+  if (compression_ == Compression::ZSTD) {
+    std::string compressed(ZSTD_compressBound(records.size()), '\0');
+    const size_t compressed_size = ZSTD_compress(
+        &compressed[0], compressed.size(), records.data(), records.size(),
+        kTraceZstdLevel);
+    if (ZSTD_isError(compressed_size)) {
+      LOG_ERROR << "failed compressing traces: "
+                << ZSTD_getErrorName(compressed_size);
+      return;
+    }
+    compressed.resize(compressed_size);
+    records.swap(compressed);
+  }
+#endif  // TRITON_ENABLE_ZSTD
+
+  std::string block;
+  block.reserve(2 * sizeof(uint32_t) + records.size());
+  AppendUInt32(&block, records.size());
+  AppendUInt32(&block, traces.size());
+  block += records;
+
+  std::lock_guard<std::mutex> lock(mu_);
+  const bool rotate = (max_file_size_ != 0) || (rotation_interval_s_ != 0);
+  if (!trace_file_.is_open() ||
+      (rotate && (((max_file_size_ != 0) &&
+                   ((file_size_ + block.size()) > max_file_size_)) ||
+                  ((rotation_interval_s_ != 0) &&
+                   ((CaptureTimestamp() - file_open_ns_) >=
+                    (rotation_interval_s_ * 1000000000)))))) {
+    OpenBinaryFile();
+  }
+  trace_file_.write(block.data(), block.size());
+  trace_file_.flush();
+  file_size_ += block.size();
+}
+
+void
+TraceManager::TraceFile::OpenBinaryFile()
+{
+  if (trace_file_.is_open()) {
+    trace_file_.close();
+  }
+
+  std::string file_name = file_name_;
+  if ((max_file_size_ != 0) || (rotation_interval_s_ != 0)) {
+    const uint32_t index = index_.fetch_add(1);
+    file_name += "." + std::to_string(index);
+    // Retention, remove the oldest file that is no longer kept
+    if ((max_files_ != 0) && (index >= max_files_)) {
+      std::remove(
+          (file_name_ + "." + std::to_string(index - max_files_)).c_str());
+    }
+  }
+
+  trace_file_.open(file_name, std::ios::binary | std::ios::trunc);
+  std::string header(kBinaryTraceMagic, sizeof(kBinaryTraceMagic) - 1);
+  AppendUInt32(&header, kBinaryTraceVersion);
+  AppendUInt32(&header, static_cast<uint32_t>(compression_));
+  trace_file_.write(header.data(), header.size());
+  file_size_ = header.size();
+  file_open_ns_ = CaptureTimestamp();
+}
+
 std::shared_ptr<TraceManager::Trace>
 TraceManager::TraceSetting::SampleTrace(bool force_sample)
 {
   bool count_rate_hit = false;
-  {
-    std::lock_guard<std::mutex> lk(mu_);
-    // [FIXME: DLIS-6033]
-    // A current WAR for initiating trace based on propagated context only
-    // Currently this is implemented through setting trace rate as 0
-    if (rate_ != 0) {
-      // If `count_` hits 0, `Valid()` returns false for this and all
-      // following requests (unless `count_` is updated by a user).
-      // At this point we only trace requests for which
-      // `force_sample` is true.
-      if (!Valid() && !force_sample) {
-        return nullptr;
+  // [FIXME: DLIS-6033]
+  // A current WAR for initiating trace based on propagated context only
+  // Currently this is implemented through setting trace rate as 0
+  if (rate_ != 0) {
+    // If `count_` hits 0, `Valid()` returns false for this and all
+    // following requests (unless `count_` is updated by a user).
+    // At this point we only trace requests for which
+    // `force_sample` is true.
+    if (!Valid() && !force_sample) {
+      return nullptr;
+    }
+    // `sample_` counts all requests, coming to server.
+    const uint64_t sample = sample_.fetch_add(1, std::memory_order_relaxed) + 1;
+    if (traces_per_second_ != 0) {
+      UpdateAdaptiveRate(sample);
+    }
+    count_rate_hit = ((sample % SampleRate()) == 0);
+    if (count_rate_hit && (traces_per_second_ != 0)) {
+      window_traces_.fetch_add(1, std::memory_order_relaxed);
+    }
+    if (count_rate_hit) {
+      // Claim one of the remaining traces, a negative count means
+      // there is no limit.
+      int32_t count = count_.load(std::memory_order_relaxed);
+      while ((count > 0) && !count_.compare_exchange_weak(count, count - 1)) {
       }
-      // `sample_` counts all requests, coming to server.
-      count_rate_hit = (((++sample_) % rate_) == 0);
-      if (count_rate_hit && (count_ > 0)) {
-        --count_;
-        ++created_;
-      } else if (count_rate_hit && (count_ == 0)) {
+      if (count > 0) {
+        created_.fetch_add(1, std::memory_order_relaxed);
+      } else if (count == 0) {
         // This condition is reached, when `force_sample` is true,
         // `count_rate_hit` is true, but `count_` is 0. Due to the
         // latter, we explicitly set `count_rate_hit` to false.
@@ -1175,41 +1354,138 @@ TraceManager::TraceSetting::SampleTrace(bool force_sample)
   return nullptr;
 }
 
+uint32_t
+TraceManager::TraceSetting::SampleRate() const
+{
+  if (traces_per_second_ == 0) {
+    return rate_;
+  }
+  return adaptive_rate_.load(std::memory_order_relaxed);
+}
+
+void
+TraceManager::TraceSetting::UpdateAdaptiveRate(const uint64_t sample)
+{
+  const uint64_t now_ns = TraceManager::CaptureTimestamp();
+  uint64_t start_ns = window_start_ns_.load(std::memory_order_relaxed);
+  // Recompute the rate every window, or as soon as the window has used up
+  // its budget so that a burst of requests is not traced at the old rate
+  // for the rest of the window.
+  if (((now_ns - start_ns) < kAdaptiveWindowNs) &&
+      (window_traces_.load(std::memory_order_relaxed) < traces_per_second_)) {
+    return;
+  }
+  // Only the thread that moves the window recomputes the rate
+  if ((now_ns == start_ns) ||
+      !window_start_ns_.compare_exchange_strong(start_ns, now_ns)) {
+    return;
+  }
+  window_traces_ = 0;
+  const uint64_t requests = sample - window_sample_.exchange(sample);
+  const double requests_per_second =
+      requests * 1e9 / static_cast<double>(now_ns - start_ns);
+  const double rate = std::round(requests_per_second / traces_per_second_);
+  adaptive_rate_.store(
+      static_cast<uint32_t>(std::min<double>(
+          std::max<double>(rate, 1), std::numeric_limits<uint32_t>::max())),
+      std::memory_order_relaxed);
+}
+
 void
 TraceManager::TraceSetting::WriteTrace(
     const std::unordered_map<uint64_t, std::unique_ptr<std::stringstream>>&
         streams)
 {
-  std::unique_lock<std::mutex> lock(mu_);
-
-  if (sample_in_stream_ != 0) {
-    trace_stream_ << ",";
-  }
-  ++sample_in_stream_;
-  ++collected_;
-
+  // Serialize the trace group before touching any shared state
+  std::string trace;
   size_t stream_count = 0;
   for (const auto& stream : streams) {
-    trace_stream_ << stream.second->rdbuf();
+    trace += stream.second->str();
     // Need to add ',' unless it is the last trace in the group
     ++stream_count;
     if (stream_count != streams.size()) {
-      trace_stream_ << ",";
+      trace += ",";
     }
   }
+
+  std::call_once(writer_started_, [this] {
+    writer_ = std::thread(&TraceManager::TraceSetting::WriterThread, this);
+  });
+
+  static std::atomic<size_t> next_buffer{0};
+  thread_local const size_t buffer_idx =
+      next_buffer.fetch_add(1, std::memory_order_relaxed);
+  auto& buffer = buffers_[buffer_idx % kTraceBufferCount];
+  {
+    std::lock_guard<std::mutex> lk(buffer.mu_);
+    buffer.traces_.emplace_back(std::move(trace));
+  }
+  // Only wake up the writer if it may be waiting for traces
+  if (pending_traces_.fetch_add(1) == 0) {
+    std::lock_guard<std::mutex> lk(writer_mu_);
+    writer_cv_.notify_one();
+  }
+}
+
+void
+TraceManager::TraceSetting::WriterThread()
+{
+#ifdef __linux__
+  // Trace output should not compete with inference for disk bandwidth,
+  // lower the I/O priority of this thread to the lowest best-effort level.
+  // Failing to do so is harmless.
+  constexpr int kIoprioWhoProcess = 1;
+  constexpr int kIoprioClassBestEffort = 2;
+  constexpr int kIoprioClassShift = 13;
+  syscall(
+      SYS_ioprio_set, kIoprioWhoProcess, 0 /* calling thread */,
+      (kIoprioClassBestEffort << kIoprioClassShift) | 7);
+#endif  // __linux__
+
+  std::vector<std::string> traces;
+  bool exiting = false;
+  while (!exiting) {
+    {
+      std::unique_lock<std::mutex> lk(writer_mu_);
+      writer_cv_.wait(
+          lk, [this] { return writer_exiting_ || (pending_traces_ != 0); });
+      exiting = writer_exiting_;
+    }
+    // Reset before emptying the buffers, a trace appended after its buffer
+    // is emptied will notify the writer again
+    pending_traces_ = 0;
+    for (auto& buffer : buffers_) {
+      {
+        std::lock_guard<std::mutex> lk(buffer.mu_);
+        traces.swap(buffer.traces_);
+      }
+      for (auto& trace : traces) {
+        CollectTrace(std::move(trace));
+      }
+      traces.clear();
+    }
+    // Binary trace files are appended to as traces are collected
+    if (file_->IsBinary() && !traces_in_stream_.empty()) {
+      file_->SaveTraces(traces_in_stream_, (log_frequency_ != 0));
+      traces_in_stream_.clear();
+    }
+  }
+}
+
+void
+TraceManager::TraceSetting::CollectTrace(std::string&& trace)
+{
+  traces_in_stream_.emplace_back(std::move(trace));
+  ++collected_;
+
   // Write to file with index when one of the following is true
   // 1. trace_count is specified and that number of traces has been collected
   // 2. log_frequency is specified and that number of traces has been
   // collected
   if (((count_ == 0) && (collected_ == sample_)) ||
-      ((log_frequency_ != 0) && (sample_in_stream_ >= log_frequency_))) {
-    // Reset variables and release lock before saving to file
-    sample_in_stream_ = 0;
-    std::stringstream stream;
-    trace_stream_.swap(stream);
-    lock.unlock();
-
-    file_->SaveTraces(stream, true /* to_index_file */);
+      ((log_frequency_ != 0) && (traces_in_stream_.size() >= log_frequency_))) {
+    file_->SaveTraces(traces_in_stream_, true /* to_index_file */);
+    traces_in_stream_.clear();
   }
 }
 
@@ -1227,8 +1503,11 @@ TraceManager::TraceSetting::TraceSetting(
       count_specified_(count_specified),
       log_frequency_specified_(log_frequency_specified),
       filepath_specified_(filepath_specified), mode_specified_(mode_specified),
-      config_map_specified_(config_map_specified), sample_(0), created_(0),
-      collected_(0), sample_in_stream_(0)
+      config_map_specified_(config_map_specified),
+      traces_per_second_(TracesPerSecond(config_map)), sample_(0), created_(0),
+      adaptive_rate_(rate), window_start_ns_(TraceManager::CaptureTimestamp()),
+      window_sample_(0), window_traces_(0), collected_(0), pending_traces_(0),
+      writer_exiting_(false)
 {
   if (level_ == TRITONSERVER_TRACE_LEVEL_DISABLED) {
     invalid_reason_ = "tracing is disabled";
@@ -1241,9 +1520,17 @@ TraceManager::TraceSetting::TraceSetting(
 
 TraceManager::TraceSetting::~TraceSetting()
 {
+  if (writer_.joinable()) {
+    {
+      std::lock_guard<std::mutex> lk(writer_mu_);
+      writer_exiting_ = true;
+    }
+    writer_cv_.notify_one();
+    writer_.join();
+  }
   // If log frequency is set, should log the remaining traces to indexed file.
-  if (mode_ == TRACE_MODE_TRITON && sample_in_stream_ != 0) {
-    file_->SaveTraces(trace_stream_, (log_frequency_ != 0));
+  if (mode_ == TRACE_MODE_TRITON && !traces_in_stream_.empty()) {
+    file_->SaveTraces(traces_in_stream_, (log_frequency_ != 0));
   }
 }
 }}  // namespace triton::server
@@ -25,17 +25,21 @@
 // OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #pragma once
 
+#include <array>
 #include <atomic>
 #include <condition_variable>
 #include <fstream>
 #include <memory>
 #include <mutex>
 #include <set>
+#include <shared_mutex>
 #include <sstream>
 #include <stack>
 #include <string>
+#include <thread>
 #include <unordered_map>
 #include <variant>
+#include <vector>
 
 #if !defined(_WIN32) && defined(TRITON_ENABLE_TRACING)
 #include "opentelemetry/context/propagation/global_propagator.h"
@@ -405,22 +409,47 @@ class TraceManager {
 
   class TraceFile {
    public:
+    // The layout of the traces in the file.
+    enum class Format { JSON, BINARY };
+    // The compression of the record blocks in a binary trace file.
+    enum class Compression { NONE, ZSTD };
+
     TraceFile(const std::string& file_name)
-        : file_name_(file_name), index_(0), first_write_(true)
+        : file_name_(file_name), index_(0), first_write_(true),
+          format_(Format::JSON), compression_(Compression::NONE),
+          max_file_size_(0), rotation_interval_s_(0), max_files_(0),
+          file_size_(0), file_open_ns_(0)
     {
     }
+    // Create a trace file with the file format, compression, rotation and
+    // retention settings found in the "triton" entry of 'config_map'.
+    TraceFile(const std::string& file_name, const TraceConfigMap& config_map);
     ~TraceFile();
 
-    // Save the traces stored in 'trace_stream' into the file. 'to_index_file'
+    // Save 'traces' into the file, each element is the comma separated
+    // JSON objects of one trace. In JSON format, 'to_index_file'
     // specifies whether the file name should be indexed, if true, the traces
     // will be written to 'file_name.index' where index will be incremented
     // every time the traces are written to a file with index. If false, the
-    // trace will be written to 'file_name'.
-    void SaveTraces(std::stringstream& trace_stream, const bool to_index_file);
+    // trace will be written to 'file_name'. In binary format the traces are
+    // appended to the current file as one block and 'to_index_file' is
+    // ignored, see WriteBlock().
+    void SaveTraces(
+        const std::vector<std::string>& traces, const bool to_index_file);
 
     const std::string& FileName() { return file_name_; }
+    bool IsBinary() const { return format_ == Format::BINARY; }
 
    private:
+    // Append 'traces' to the binary trace file as one block. The file is
+    // 'file_name' unless rotation is enabled, in which case a new
+    // 'file_name.index' file is started once the current one reaches
+    // 'max_file_size_' bytes or is 'rotation_interval_s_' seconds old,
+    // and only the last 'max_files_' files are kept.
+    void WriteBlock(const std::vector<std::string>& traces);
+    // Start the next binary trace file, must be called with 'mu_' held.
+    void OpenBinaryFile();
+
     const std::string file_name_;
     // The file index for the next index file write.
     std::atomic<uint32_t> index_;
@@ -430,6 +459,15 @@ class TraceManager {
     std::mutex mu_;
     std::ofstream trace_file_;
     bool first_write_;
+
+    Format format_;
+    Compression compression_;
+    uint64_t max_file_size_;
+    uint64_t rotation_interval_s_;
+    uint32_t max_files_;
+    // Size and creation time of the current binary trace file.
+    uint64_t file_size_;
+    uint64_t file_open_ns_;
   };
 
   class TraceSetting {
@@ -439,8 +477,10 @@ class TraceManager {
           log_frequency_(0), mode_(TRACE_MODE_TRITON), level_specified_(false),
           rate_specified_(false), count_specified_(false),
           log_frequency_specified_(false), filepath_specified_(false),
-          mode_specified_(false), config_map_specified_(false), sample_(0),
-          created_(0), collected_(0), sample_in_stream_(0)
+          mode_specified_(false), config_map_specified_(false),
+          traces_per_second_(0), sample_(0), created_(0), adaptive_rate_(0),
+          window_start_ns_(0), window_sample_(0), window_traces_(0),
+          collected_(0), pending_traces_(0), writer_exiting_(false)
     {
       invalid_reason_ = "Setting hasn't been initialized";
     }
@@ -458,6 +498,8 @@ class TraceManager {
     bool Valid() { return invalid_reason_.empty() && (count_ != 0); }
     const std::string& Reason() { return invalid_reason_; }
 
+    // Queue the trace for writing to the trace file. The trace is
+    // appended to a per-thread buffer and written by a background thread.
     void WriteTrace(
         const std::unordered_map<uint64_t, std::unique_ptr<std::stringstream>>&
             streams);
@@ -468,9 +510,13 @@ class TraceManager {
     // when OpenTelemetry context was propagated from client.
     std::shared_ptr<Trace> SampleTrace(bool force_sample = false);
 
+    // Return the current sampling rate, which is 'rate_' unless the
+    // setting targets a number of traces per second.
+    uint32_t SampleRate() const;
+
     const TRITONSERVER_InferenceTraceLevel level_;
     const uint32_t rate_;
-    int32_t count_;
+    std::atomic<int32_t> count_;
     const uint32_t log_frequency_;
     const std::shared_ptr<TraceFile> file_;
     const InferenceTraceMode mode_;
@@ -485,21 +531,63 @@ class TraceManager {
     const bool mode_specified_;
     const bool config_map_specified_;
 
+    // The number of traces per second the sampling rate is adjusted to,
+    // 0 if 'rate_' is used as is.
+    const uint32_t traces_per_second_;
+
    private:
-    std::string invalid_reason_;
+    // Number of buffers that finished traces are appended to. A thread
+    // always appends to the same buffer so that threads writing traces
+    // concurrently rarely contend on the same lock.
+    static constexpr size_t kTraceBufferCount = 16;
+    // The interval at which the adaptive sampling rate is recomputed.
+    static constexpr uint64_t kAdaptiveWindowNs = 1000000000;
+
+    struct TraceBuffer {
+      std::mutex mu_;
+      std::vector<std::string> traces_;
+    };
+
+    // Recompute 'adaptive_rate_' if the current window has elapsed or has
+    // used up its budget, 'sample' is the number of requests seen so far.
+    void UpdateAdaptiveRate(const uint64_t sample);
+
+    // Write the traces in 'buffers_' until the setting is destroyed.
+    void WriterThread();
+    // Append 'trace' to the traces to be saved, save them to the file
+    // when enough traces are collected. Only called by the writer thread.
+    void CollectTrace(std::string&& trace);
 
-    std::mutex mu_;
+    std::string invalid_reason_;
 
     // use to sample a trace based on sampling rate.
-    uint64_t sample_;
+    std::atomic<uint64_t> sample_;
 
     // use to track the status of trace count feature
-    uint64_t created_;
-    uint64_t collected_;
+    std::atomic<uint64_t> created_;
 
+    // The sampling rate currently in effect in adaptive mode, and the
+    // start time, 'sample_' value and number of sampled traces of the
+    // current rate window.
+    std::atomic<uint32_t> adaptive_rate_;
+    std::atomic<uint64_t> window_start_ns_;
+    std::atomic<uint64_t> window_sample_;
+    std::atomic<uint64_t> window_traces_;
+
+    // Only accessed by the writer thread, or after it has exited.
+    uint64_t collected_;
     // Tracking traces that haven't been saved to file
-    uint32_t sample_in_stream_;
-    std::stringstream trace_stream_;
+    std::vector<std::string> traces_in_stream_;
+
+    std::array<TraceBuffer, kTraceBufferCount> buffers_;
+    // The number of traces appended to 'buffers_' since the writer last
+    // emptied them, the writer is only notified when it becomes non-zero.
+    std::atomic<uint64_t> pending_traces_;
+    std::once_flag writer_started_;
+    std::thread writer_;
+    std::mutex writer_mu_;
+    std::condition_variable writer_cv_;
+    bool writer_exiting_;
   };
 
   // Trace settings
@@ -519,9 +607,9 @@ class TraceManager {
   std::unordered_map<std::string, std::weak_ptr<TraceFile>> trace_files_;
 
   // lock for accessing trace setting. 'w_mu_' for write and
-  // 'r_mu_' for read / write
+  // 'r_mu_' for read / write, readers only need a shared lock on 'r_mu_'
   std::mutex w_mu_;
-  std::mutex r_mu_;
+  std::shared_mutex r_mu_;
 };
 
 }}  // namespace triton::server
@@ -269,7 +269,8 @@ VertexAiAPIServer::Create(
     triton::server::TraceManager* trace_manager,
     const std::shared_ptr<SharedMemoryManager>& shm_manager, const int32_t port,
     const std::string address, const int thread_cnt,
-    std::string default_model_name, std::unique_ptr<HTTPServer>* http_server)
+    std::string default_model_name, const uint64_t coalesce_delay_us,
+    std::unique_ptr<HTTPServer>* http_server)
 {
   auto predict_route = GetEnvironmentVariableOrDefault("AIP_PREDICT_ROUTE", "");
   auto health_route = GetEnvironmentVariableOrDefault("AIP_HEALTH_ROUTE", "");
@@ -342,12 +343,20 @@ VertexAiAPIServer::Create(
     }
   }
 
-  http_server->reset(new VertexAiAPIServer(
+  auto vertex_ai_server = new VertexAiAPIServer(
       server, trace_manager, shm_manager, port, address, thread_cnt,
-      predict_route, health_route, default_model_name));
+      predict_route, health_route, default_model_name);
+  if (coalesce_delay_us != 0) {
+    vertex_ai_server->EnableRequestCoalescing(coalesce_delay_us);
+  }
+  http_server->reset(vertex_ai_server);
 
   const std::string addr = address + ":" + std::to_string(port);
   LOG_INFO << "Started Vertex AI HTTPService at " << addr;
+  if (coalesce_delay_us != 0) {
+    LOG_INFO << "Vertex AI requests are coalesced for up to "
+             << coalesce_delay_us << " us";
+  }
 
   return nullptr;
 }
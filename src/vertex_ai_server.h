@@ -37,7 +37,7 @@ class VertexAiAPIServer : public HTTPAPIServer {
       triton::server::TraceManager* trace_manager,
       const std::shared_ptr<SharedMemoryManager>& smb_manager,
       const int32_t port, const std::string address, const int thread_cnt,
-      std::string default_model_name,
+      std::string default_model_name, const uint64_t coalesce_delay_us,
       std::unique_ptr<HTTPServer>* vertex_ai_server);
 
  private: